@@ -14,6 +14,7 @@ from coupons.coupons_type.interface.coupon_type_routes import coupon_type_bp
 from coupons.event.interface.event_api import event_bp
 from coupons.product_coupon.interface.coupon_product_routes import coupon_product_bp
 from coupons.discount_type.interface.discount_type_routes import discount_type_bp
+from coupons.redemption.interface.redemption_routes import redemption_bp
 
 # ==== Blueprints (Pagos) ====
 from payment.webhook.interface.flask_webhook_controller import create_mp_webhook_blueprint
@@ -27,7 +28,11 @@ from payment.provider.provider_account.interface.mp_oauth_controller import crea
 
 # Infraestructura
 from shared.factory.container_factory import build_coupon_services
-from shared.infrastructure.database import init_db
+from shared.infrastructure.database import init_db, db, get_all_models
+from shared.infrastructure.migrations.schema_check import diff_schema
+from shared.infrastructure import query_stats
+from shared.infrastructure.metrics import endpoint as metrics
+from shared.interface.change_feed_controller import create_change_feed_blueprint
 
 
 def create_app() -> Flask:
@@ -57,11 +62,31 @@ def create_app() -> Flask:
     CORS(app, resources={r"/api/*": {"origins": "*"}})
 
     # ── DB y servicios
-    init_db()
-    coupon_services = build_coupon_services()
+    # APP_INIT_DB_ON_STARTUP=0: el esquema se crea aparte (python initialize_db.py)
+    # y el arranque no necesita la BD arriba; peewee conecta en la primera query.
+    # APP_LAZY_SERVICES=1: repos/servicios se construyen en su primer uso.
+    if os.getenv("APP_INIT_DB_ON_STARTUP", "1") == "1":
+        init_db()
+    # APP_SCHEMA_CHECK=warn|strict: compara modelos (columnas/índices) contra el esquema vivo.
+    schema_check = os.getenv("APP_SCHEMA_CHECK", "off").lower()
+    if schema_check in ("warn", "strict"):
+        drifts = diff_schema(get_all_models(), db)
+        if drifts:
+            msg = "Esquema desalineado (correr initialize_db.py): " + "; ".join(
+                f"{d.table}: {d.kind} {d.detail}" for d in drifts
+            )
+            if schema_check == "strict":
+                raise RuntimeError(msg)
+            app.logger.warning(msg)
+    coupon_services = build_coupon_services(lazy=os.getenv("APP_LAZY_SERVICES", "1") == "1")
     app.config["coupon_services"] = coupon_services
     app.config["services"] = coupon_services
 
+    # Conteo de SQL por request (headers en debug, métricas, aviso de N+1)
+    query_stats.init_app(app, db)
+    # /metrics (Prometheus), latencia por ruta y /health/ready con chequeo de BD
+    metrics.init_app(app, db)
+
     # ── Blueprints: Cupones
     app.register_blueprint(coupon_type_bp, url_prefix="/api/coupon-types")
     app.register_blueprint(discount_type_bp, url_prefix="/api/discount-types")
@@ -72,6 +97,7 @@ def create_app() -> Flask:
     app.register_blueprint(alianza_bp, url_prefix="/api/alliances")
     app.register_blueprint(category_bp, url_prefix="/api/coupon-categories")
     app.register_blueprint(event_bp, url_prefix="/api/coupon-events")
+    app.register_blueprint(redemption_bp, url_prefix="/api/coupon-stats")
 
     # ── Blueprints: Pagos
     payments_base = "/api/payments"
@@ -100,6 +126,10 @@ def create_app() -> Flask:
     payment_sources_bp = create_payment_source_blueprint(url_prefix=f"{payments_base}/payment-sources")
     app.register_blueprint(payment_sources_bp, url_prefix=payment_sources_bp.url_prefix)
 
+    # ── Change feed (long-poll sobre la outbox)
+    change_feed_bp = create_change_feed_blueprint(url_prefix="/api/changes")
+    app.register_blueprint(change_feed_bp, url_prefix=change_feed_bp.url_prefix)
+
     @app.route("/health", methods=["GET"])
     def health():
         return {"status": "ok"}, 200
@@ -0,0 +1,358 @@
+"""
+Benchmark de caminos calientes sobre datos sembrados (benchmarks.seed).
+
+Corre la app real (create_app + test_client) contra SQLite o un MySQL local y mide:
+  active_coupons        cupones vigentes (query service, ventana fija = EPOCH del seed)
+  trigger_resolution    POST /api/coupon-trigger-products/by-items con 5 ítems
+  consume_one           PUT /api/coupon-products/consume desde N hilos sobre filas calientes
+                        (reporta también actualizaciones perdidas)
+  webhook_ingest        POST /api/payments/webhooks con delivery keys nuevas
+  order_page_first      GET /api/payments/orders/by-seller/<top>?limit=50
+  order_page_deep       idem con offset=5000
+
+Reporte JSON estable (entradas con semilla fija, warmup, percentiles) y comparación
+contra un reporte anterior:
+
+    python -m benchmarks.hot_paths --db sqlite:///bench.db --scale small --out base.json
+    python -m benchmarks.hot_paths --db sqlite:///bench.db --scale small --compare base.json
+
+Los cachés de la app se apagan por defecto (se mide la BD); --with-caches los deja
+como estén configurados.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# La app no debe tocar el MySQL configurado ni migrar al arrancar
+os.environ.setdefault("APP_INIT_DB_ON_STARTUP", "0")
+os.environ.setdefault("APP_SCHEMA_CHECK", "off")
+os.environ.setdefault("QUERY_STATS_HEADERS", "1")
+
+from benchmarks.seed import EPOCH, SCALES, Scale, ensure_seeded  # noqa: E402
+
+REGRESSION_THRESHOLD = 0.10
+
+
+# -----------------------
+# Medición
+# -----------------------
+@dataclass
+class Samples:
+    latencies_ms: List[float] = field(default_factory=list)
+    db_queries: List[int] = field(default_factory=list)
+    wall_s: float = 0.0
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, float]:
+        lat = sorted(self.latencies_ms)
+        n = len(lat)
+
+        def pct(p: float) -> float:
+            return round(lat[min(n - 1, int(p * n))], 3)
+
+        out = {
+            "n": n,
+            "mean_ms": round(statistics.fmean(lat), 3),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "min_ms": round(lat[0], 3),
+            "max_ms": round(lat[-1], 3),
+            "ops_per_s": round(n / self.wall_s, 1) if self.wall_s else 0.0,
+        }
+        if self.db_queries:
+            out["db_queries_per_op"] = round(statistics.fmean(self.db_queries), 2)
+        out.update(self.extra)
+        return out
+
+
+def _timed_loop(n: int, warmup: int, op: Callable[[int], Optional[int]]) -> Samples:
+    """op(i) -> cantidad de sentencias SQL (header X-DB-Queries) o None."""
+    for i in range(warmup):
+        op(-1 - i)
+    gc.collect()
+    s = Samples()
+    t0 = time.perf_counter()
+    for i in range(n):
+        start = time.perf_counter()
+        q = op(i)
+        s.latencies_ms.append((time.perf_counter() - start) * 1000.0)
+        if q is not None:
+            s.db_queries.append(q)
+    s.wall_s = time.perf_counter() - t0
+    return s
+
+
+def _queries(resp) -> Optional[int]:
+    v = resp.headers.get("X-DB-Queries")
+    return int(v) if v is not None else None
+
+
+def _check(resp, expected=(200,)):
+    if resp.status_code not in expected:
+        raise RuntimeError(f"HTTP {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+    return resp
+
+
+@dataclass
+class Context:
+    app: object
+    database: object
+    scale: Scale
+    iterations: int
+    warmup: int
+    threads: int
+    seed: int
+
+    def rng(self, name: str) -> random.Random:
+        return random.Random(f"{self.seed}:{name}")
+
+
+# -----------------------
+# Escenarios
+# -----------------------
+def bench_active_coupons(ctx: Context) -> Samples:
+    qry = ctx.app.config["services"]["coupon_query_service"]
+
+    def op(_i: int) -> None:
+        qry.list_active_in_window(EPOCH)
+
+    s = _timed_loop(max(5, ctx.iterations // 20), 2, op)
+    s.extra["rows"] = len(qry.list_active_in_window(EPOCH))
+    return s
+
+
+def bench_trigger_resolution(ctx: Context) -> Samples:
+    client = ctx.app.test_client()
+    rng = ctx.rng("trigger_resolution")
+    bodies = [
+        {"items": [
+            {"product_type": "PRODUCT" if pid % 4 else "SERVICE", "product_id": pid,
+             "quantity": rng.randint(1, 3), "amount": "120.00"}
+            for pid in rng.sample(range(1, ctx.scale.products + 1), 5)
+        ]}
+        for _ in range(ctx.iterations + ctx.warmup)
+    ]
+    return _timed_loop(ctx.iterations, ctx.warmup, lambda i: _queries(_check(
+        client.post("/api/coupon-trigger-products/by-items", json=bodies[i]))))
+
+
+def bench_consume_one(ctx: Context) -> Samples:
+    from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+
+    # filas calientes: pocas, con stock alto, para medir contención y no agotarse
+    hot = list(CouponProductModel
+               .select(CouponProductModel.coupon, CouponProductModel.product_id)
+               .order_by(CouponProductModel.coupon, CouponProductModel.product_id)
+               .limit(4))
+    initial = 1_000_000
+    keys = [(r.coupon_id, r.product_id) for r in hot]
+    for coupon_id, product_id in keys:
+        (CouponProductModel
+         .update(stock=initial, status="ACTIVE")
+         .where((CouponProductModel.coupon == coupon_id) & (CouponProductModel.product_id == product_id))
+         .execute())
+
+    per_thread = max(1, ctx.iterations // ctx.threads)
+    s = Samples()
+    lock = threading.Lock()
+    errors = [0]
+
+    def worker(t: int) -> None:
+        client = ctx.app.test_client()
+        rng = random.Random(f"{ctx.seed}:consume:{t}")
+        local_lat, local_q = [], []
+        for _ in range(per_thread):
+            coupon_id, product_id = rng.choice(keys)
+            start = time.perf_counter()
+            resp = client.put("/api/coupon-products/consume",
+                              json={"coupon_id": coupon_id, "product_id": product_id})
+            local_lat.append((time.perf_counter() - start) * 1000.0)
+            if resp.status_code != 200:
+                with lock:
+                    errors[0] += 1
+                continue
+            q = _queries(resp)
+            if q is not None:
+                local_q.append(q)
+        with lock:
+            s.latencies_ms.extend(local_lat)
+            s.db_queries.extend(local_q)
+
+    gc.collect()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=ctx.threads) as pool:
+        list(pool.map(worker, range(ctx.threads)))
+    s.wall_s = time.perf_counter() - t0
+
+    remaining = sum(
+        CouponProductModel.get((CouponProductModel.coupon == c) & (CouponProductModel.product_id == p)).stock
+        for c, p in keys
+    )
+    consumed = initial * len(keys) - remaining
+    ok = len(s.latencies_ms) - errors[0]
+    s.extra.update({"threads": ctx.threads, "errors": errors[0], "lost_updates": ok - consumed})
+    return s
+
+
+def bench_webhook_ingest(ctx: Context) -> Samples:
+    from payment.webhook.infraestructure.model.webhook_event_model import WebhookEventModel
+
+    client = ctx.app.test_client()
+    rng = ctx.rng("webhook_ingest")
+    run_id = uuid.uuid4().hex[:8]
+    payloads = [
+        {"type": "payment", "action": "payment.updated", "live_mode": False,
+         "data": {"id": str(10_000_000 + rng.randint(1, ctx.scale.orders))}}
+        for _ in range(ctx.iterations + ctx.warmup)
+    ]
+    try:
+        return _timed_loop(ctx.iterations, ctx.warmup, lambda i: _queries(_check(client.post(
+            "/api/payments/webhooks", json=payloads[i],
+            headers={"X-Request-Id": f"bench-{run_id}-{i}"}))))
+    finally:
+        # deja la tabla como estaba para la próxima corrida
+        WebhookEventModel.delete().where(WebhookEventModel.delivery_key.startswith(f"bench-{run_id}-")).execute()
+
+
+def _order_pages(offset: int) -> Callable[[Context], Samples]:
+    def bench(ctx: Context) -> Samples:
+        client = ctx.app.test_client()
+        # vendedor 1 es el de más órdenes (distribución sesgada del seed)
+        url = f"/api/payments/orders/by-seller/1?limit=50&offset={offset}"
+        return _timed_loop(ctx.iterations, ctx.warmup, lambda i: _queries(_check(client.get(url))))
+    return bench
+
+
+SCENARIOS: Dict[str, Callable[[Context], Samples]] = {
+    "active_coupons": bench_active_coupons,
+    "trigger_resolution": bench_trigger_resolution,
+    "consume_one": bench_consume_one,
+    "webhook_ingest": bench_webhook_ingest,
+    "order_page_first": _order_pages(0),
+    "order_page_deep": _order_pages(5000),
+}
+
+
+# -----------------------
+# Reporte
+# -----------------------
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _environment(database, url: str, scale: Scale, args) -> Dict[str, object]:
+    import peewee
+    env = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "peewee": peewee.__version__,
+        "platform": platform.platform(),
+        "db": url.split("@")[-1] if "@" in url else url,
+        "scale": scale.name,
+        "seed": args.seed,
+        "iterations": args.iterations,
+        "threads": args.threads,
+        "caches": bool(args.with_caches),
+    }
+    if url.startswith("sqlite"):
+        import sqlite3
+        env["sqlite"] = sqlite3.sqlite_version
+    return env
+
+
+def run(args) -> Dict[str, object]:
+    if not args.with_caches:
+        os.environ["COUPON_REPO_CACHE_TTL"] = "0"
+        os.environ["CATALOG_CACHE_ENABLED"] = "0"
+        os.environ["CHECKOUT_SESSION_CACHE_TTL"] = "0"
+
+    scale = SCALES[args.scale]
+    database = ensure_seeded(args.db, scale, args.seed, force=args.reseed)
+
+    from app import create_app
+    from shared.infrastructure import query_stats
+
+    query_stats.install(database)
+    app = create_app()
+    ctx = Context(app, database, scale, args.iterations, args.warmup, args.threads, args.seed)
+
+    names = args.only or list(SCENARIOS)
+    results = {}
+    for name in names:
+        print(f"→ {name}", file=sys.stderr, flush=True)
+        results[name] = SCENARIOS[name](ctx).summary()
+    return {"environment": _environment(database, args.db, scale, args), "results": results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Tabla de diferencias en p50/p95; marca con ! lo que empeora más que threshold."""
+    lines = [f"{'scenario':<22}{'metric':<8}{'base':>10}{'now':>10}{'delta':>9}"]
+    regressions = []
+    for name, now in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            b, c = base.get(metric), now.get(metric)
+            if not b or c is None:
+                continue
+            delta = (c - b) / b
+            flag = " !" if delta > threshold else ""
+            if flag:
+                regressions.append(f"{name}.{metric}")
+            lines.append(f"{name:<22}{metric:<8}{b:>10.2f}{c:>10.2f}{delta:>+8.1%}{flag}")
+    if regressions:
+        lines.append(f"regresiones (> {threshold:.0%}): {', '.join(regressions)}")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de caminos calientes sobre datos sembrados")
+    parser.add_argument("--db", default=os.getenv("BENCH_DB_URL", "sqlite:///bench.db"))
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reseed", action="store_true", help="Vuelve a sembrar aunque exista la base")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=8, help="Hilos para consume_one")
+    parser.add_argument("--only", nargs="*", choices=sorted(SCENARIOS))
+    parser.add_argument("--with-caches", action="store_true")
+    parser.add_argument("--out", help="Guarda el reporte JSON en este archivo")
+    parser.add_argument("--compare", help="Reporte JSON anterior contra el cual comparar")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        table = compare(report, baseline, args.threshold)
+        print("\n".join(table), file=sys.stderr)
+        if args.fail_on_regression and table[-1].startswith("regresiones"):
+            sys.exit(1)
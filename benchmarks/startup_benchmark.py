@@ -0,0 +1,77 @@
+"""
+Benchmark de arranque en frío: mide en un proceso nuevo por corrida
+  - import de app.py (blueprints + modelos),
+  - create_app(),
+  - primer request (GET /health) y primer request que toca un servicio.
+
+Uso (desde la raíz del micro-servicio):
+    python -m benchmarks.startup_benchmark --runs 5
+    python -m benchmarks.startup_benchmark --runs 5 --with-init-db   # incluye init_db (requiere MySQL)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+application = app_module.create_app()
+t2 = time.perf_counter()
+client = application.test_client()
+client.get("/health")
+t3 = time.perf_counter()
+services = application.config["services"]
+services["coupon_query_service"]
+t4 = time.perf_counter()
+built = services.built() if hasattr(services, "built") else list(services)
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "first_service_ms": (t4 - t3) * 1000,
+    "total_ms": (t4 - t0) * 1000,
+    "services_built": len(built),
+}))
+"""
+
+MODES = {
+    "eager": {"APP_LAZY_SERVICES": "0"},
+    "lazy": {"APP_LAZY_SERVICES": "1"},
+}
+
+
+def _run_once(env_overrides: dict) -> dict:
+    env = dict(os.environ, **env_overrides)
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(runs: int, with_init_db: bool) -> dict:
+    report = {}
+    for mode, overrides in MODES.items():
+        overrides = dict(overrides, APP_INIT_DB_ON_STARTUP="1" if with_init_db else "0")
+        samples = [_run_once(overrides) for _ in range(runs)]
+        report[mode] = {
+            key: round(statistics.median(s[key] for s in samples), 2)
+            for key in samples[0]
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío de create_app()")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--with-init-db", action="store_true", help="Incluye init_db() en el arranque")
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs, args.with_init_db), indent=2))
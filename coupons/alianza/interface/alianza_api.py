@@ -6,6 +6,7 @@ from typing import Optional
 from flask import Blueprint, request, jsonify, current_app
 
 from coupons.alianza.domain.entities.alianza import AlianzaEstado
+from shared.serialization.entity_serializer import EntitySerializer
 
 alianza_bp = Blueprint("alianza_api", __name__, url_prefix="/api/alliances")
 
@@ -27,16 +28,16 @@ def _svc():
     return cmd, qry
 
 
-def _alianza_to_json(a) -> dict:
-    return {
-        "id": getattr(a, "id", None),
-        "solicitante_negocio_id": getattr(a, "solicitante_negocio_id", None),
-        "receptor_negocio_id": getattr(a, "receptor_negocio_id", None),
-        "estado": getattr(getattr(a, "estado", None), "value", None) or getattr(a, "estado", None),
-        "motivo": getattr(a, "motivo", None),
-        "fecha_solicitud": getattr(a, "fecha_solicitud", None).isoformat() if getattr(a, "fecha_solicitud", None) else None,
-        "fecha_respuesta": getattr(a, "fecha_respuesta", None).isoformat() if getattr(a, "fecha_respuesta", None) else None,
-    }
+ALIANZA_SERIALIZER = EntitySerializer({
+    "id": None,
+    "solicitante_negocio_id": None,
+    "receptor_negocio_id": None,
+    "estado": "enum",
+    "motivo": None,
+    "fecha_solicitud": "datetime",
+    "fecha_respuesta": "datetime",
+})
+_alianza_to_json = ALIANZA_SERIALIZER
 
 
 # ---------- Crear solicitud ----------
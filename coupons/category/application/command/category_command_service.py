@@ -3,11 +3,17 @@ from typing import Optional
 
 from coupons.category.domain.entities.category import CategoryData
 from coupons.category.infraestructure.repositories.category_repository import CategoryRepository
+from shared.infrastructure.catalog_cache import CatalogCache
 
 
 class CategoryCommandService:
-    def __init__(self, repo: CategoryRepository):
+    def __init__(self, repo: CategoryRepository, cache: Optional[CatalogCache] = None):
         self.repo = repo
+        self.cache = cache
+
+    def _invalidate(self) -> None:
+        if self.cache is not None:
+            self.cache.invalidate()
 
     def create(self, nombre: str, description: Optional[str] = None) -> CategoryData:
         entity = CategoryData(nombre=nombre, description=description)
@@ -15,7 +21,9 @@ class CategoryCommandService:
         existing = self.repo.get_by_nombre(entity.nombre)
         if existing:
             raise ValueError(f"Category with nombre '{entity.nombre}' already exists.")
-        return self.repo.create(entity)
+        created = self.repo.create(entity)
+        self._invalidate()
+        return created
 
     def update(self, id_: int, nombre: str, description: Optional[str] = None) -> CategoryData:
         current = self.repo.get_by_id(id_)
@@ -34,9 +42,13 @@ class CategoryCommandService:
         current.description = (description.strip() if isinstance(description, str) else description)
 
         updated = self.repo.update(current)
+        self._invalidate()
         if not updated:
             raise ValueError("Category not found.")
         return updated
 
     def delete(self, id_: int) -> bool:
-        return self.repo.delete(id_)
+        deleted = self.repo.delete(id_)
+        if deleted:
+            self._invalidate()
+        return deleted
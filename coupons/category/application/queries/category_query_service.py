@@ -3,17 +3,31 @@ from typing import Optional, List
 
 from coupons.category.domain.entities.category import CategoryData
 from coupons.category.infraestructure.repositories.category_repository import CategoryRepository
+from shared.infrastructure.catalog_cache import CatalogCache
+from shared.infrastructure.table_fingerprint import TableFingerprint
 
 
 class CategoryQueryService:
-    def __init__(self, repo: CategoryRepository):
+    def __init__(self, repo: CategoryRepository, cache: Optional[CatalogCache] = None):
         self.repo = repo
+        self.cache = cache
 
     def get_by_id(self, id_: int) -> Optional[CategoryData]:
+        if self.cache is not None:
+            return self.cache.get_by_id(id_)
         return self.repo.get_by_id(id_)
 
     def get_by_nombre(self, nombre: str) -> Optional[CategoryData]:
+        if self.cache is not None:
+            return self.cache.get_by_name(nombre) if nombre else None
         return self.repo.get_by_nombre(nombre)
 
     def list_all(self) -> List[CategoryData]:
+        if self.cache is not None:
+            return self.cache.list_all()
         return self.repo.list_all()
+
+    def fingerprint(self) -> TableFingerprint:
+        if self.cache is not None:
+            return self.cache.fingerprint()
+        return self.repo.fingerprint()
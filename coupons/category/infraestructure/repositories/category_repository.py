@@ -3,6 +3,7 @@ from typing import Optional, List
 
 from coupons.category.domain.entities.category import CategoryData
 from coupons.category.infraestructure.model.category_model import CategoryModel
+from shared.infrastructure.table_fingerprint import TableFingerprint, table_fingerprint
 
 
 class CategoryRepository:
@@ -57,3 +58,6 @@ class CategoryRepository:
             return True
         except CategoryModel.DoesNotExist:
             return False
+
+    def fingerprint(self) -> TableFingerprint:
+        return table_fingerprint(CategoryModel)
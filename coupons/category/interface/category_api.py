@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from flask import Blueprint, request, jsonify, current_app
 
+from shared.serialization.conditional import conditional_response
+
 category_bp = Blueprint("coupon_category_api", __name__, url_prefix="/api/coupon-categories")
 
 
@@ -63,11 +65,13 @@ def list_categories():
     _cmd, qry = _svc()
     try:
         nombre = request.args.get("nombre", type=str)
-        if nombre:
-            row = qry.get_by_nombre(nombre)
-            return jsonify([] if row is None else [_category_to_json(row)]), 200
-        rows = qry.list_all()
-        return jsonify([_category_to_json(r) for r in rows]), 200
+
+        def build():
+            if nombre:
+                row = qry.get_by_nombre(nombre)
+                return jsonify([] if row is None else [_category_to_json(row)])
+            return jsonify([_category_to_json(r) for r in qry.list_all()])
+        return conditional_response(qry.fingerprint(), build)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -4,11 +4,17 @@ from decimal import Decimal
 
 from coupons.coupon.domain.entities.coupon import CouponStatus, CouponData
 from coupons.coupon.infraestructure.repositories.coupon_repository import CouponRepository
+from shared.infrastructure.change_feed import ChangeRecorder, change_scope
 
 
 class CouponCommandService:
-    def __init__(self, repo: CouponRepository):
+    def __init__(self, repo: CouponRepository, changes: Optional[ChangeRecorder] = None):
         self.repo = repo
+        self.changes = changes
+
+    def _changed(self, op: str, id_: int, entity: Optional[CouponData] = None) -> None:
+        if self.changes is not None:
+            self.changes.record("coupon", id_, op, entity.to_dict() if entity is not None else None)
 
     def create(
         self,
@@ -47,7 +53,10 @@ class CouponCommandService:
             is_shared_alliances=is_shared_alliances,
             status=status,
         )
-        return self.repo.create(entity)
+        with change_scope(self.changes):
+            created = self.repo.create(entity)
+            self._changed("created", created.id, created)
+        return created
 
     def update(
         self,
@@ -86,12 +95,21 @@ class CouponCommandService:
         current.max_discount = (Decimal(str(max_discount)) if max_discount is not None else None)
         current.start_date = start_date
         current.end_date = end_date
-        current.max_uses = max_uses
+        if max_uses is not None:  # la API no lo envía: se edita por PUT /usage-limits
+            current.max_uses = max_uses
         current.event_name = event_name
         current.is_shared_alliances = bool(is_shared_alliances)
         current.status = status
 
-        return self.repo.update(current)
+        with change_scope(self.changes):
+            updated = self.repo.update(current)
+            if updated is not None:
+                self._changed("updated", updated.id, updated)
+        return updated
 
     def delete(self, id_: int) -> bool:
-        return self.repo.delete(id_)
+        with change_scope(self.changes):
+            deleted = self.repo.delete(id_)
+            if deleted:
+                self._changed("deleted", id_)
+        return deleted
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Optional
+
+from coupons.coupon.domain.entities.coupon_usage import CouponUsageData
+from coupons.coupon.infraestructure.repositories.coupon_usage_repository import CouponUsageRepository
+from coupons.redemption.domain.entities.redemption import RedemptionEntryData, RedemptionKind
+
+
+def _limit(value: Optional[int], field: str) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an integer or null")
+    if value < 0:
+        raise ValueError(f"{field} must be >= 0")
+    return value
+
+
+class CouponUsageCommandService:
+    def __init__(self, repo: CouponUsageRepository):
+        self.repo = repo
+
+    def consume(self, coupon_id: int, client_id: Optional[int] = None, quantity: int = 1,
+                order_id: Optional[int] = None, product_id: Optional[int] = None,
+                discount_amount: Optional[Decimal] = None) -> CouponUsageData:
+        """UsageLimitReachedError si no quedan usos (del cupón o del cliente)."""
+        entry = RedemptionEntryData(
+            kind=RedemptionKind.REDEEMED, coupon_id=coupon_id, client_id=client_id, order_id=order_id,
+            product_id=product_id, discount_amount=discount_amount, quantity=quantity)
+        return self.repo.consume(coupon_id, client_id, entry.quantity, entry=entry)
+
+    def release(self, coupon_id: int, client_id: Optional[int] = None, quantity: int = 1,
+                order_id: Optional[int] = None, product_id: Optional[int] = None,
+                discount_amount: Optional[Decimal] = None) -> Optional[CouponUsageData]:
+        entry = RedemptionEntryData(
+            kind=RedemptionKind.REVERSED, coupon_id=coupon_id, client_id=client_id, order_id=order_id,
+            product_id=product_id, discount_amount=discount_amount, quantity=quantity)
+        return self.repo.release(coupon_id, client_id, entry.quantity, entry=entry)
+
+    def set_limits(self, coupon_id: int, max_uses: Optional[int] = None,
+                   max_uses_per_client: Optional[int] = None) -> Optional[CouponUsageData]:
+        return self.repo.set_limits(coupon_id, _limit(max_uses, "max_uses"),
+                                    _limit(max_uses_per_client, "max_uses_per_client"))
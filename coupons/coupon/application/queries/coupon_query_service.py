@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Iterator, Dict, Any
 from datetime import datetime
 
 from coupons.coupon.domain.entities.coupon import CouponData
 from coupons.coupon.infraestructure.repositories.coupon_repository import CouponRepository
+from shared.infrastructure.table_fingerprint import TableFingerprint
 
 
 class CouponQueryService:
@@ -18,5 +19,11 @@ class CouponQueryService:
     def find_by_business(self, business_id: int) -> List[CouponData]:
         return self.repo.find_by_business(business_id)
 
+    def fingerprint_by_business(self, business_id: int) -> TableFingerprint:
+        return self.repo.fingerprint_by_business(business_id)
+
+    def iter_export_by_business(self, business_id: int) -> Iterator[Dict[str, Any]]:
+        return self.repo.iter_export_by_business(business_id)
+
     def list_active_in_window(self, now: datetime) -> List[CouponData]:
         return self.repo.find_active_in_window(now)
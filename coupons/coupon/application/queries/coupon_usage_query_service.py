@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from coupons.coupon.domain.entities.coupon_usage import CouponUsageData
+from coupons.coupon.infraestructure.repositories.coupon_usage_repository import CouponUsageRepository
+
+
+class CouponUsageQueryService:
+    def __init__(self, repo: CouponUsageRepository):
+        self.repo = repo
+
+    def get(self, coupon_id: int, client_id: Optional[int] = None) -> Optional[CouponUsageData]:
+        return self.repo.get(coupon_id, client_id)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Optional
+
+
+class UsageLimitReachedError(ValueError):
+    """El cupón (o el cliente) ya alcanzó su límite de usos."""
+
+
+def _remaining(limit: Optional[int], used: int) -> Optional[int]:
+    return None if limit is None else max(0, limit - used)
+
+
+class CouponUsageData:
+    """
+    Usos de un cupón según su contador:
+      - max_uses / max_uses_per_client en None: sin límite (remaining None)
+      - client_id / client_used: solo si la lectura se pidió para un cliente
+    """
+    def __init__(
+        self,
+        coupon_id: int,
+        used: int = 0,
+        max_uses: Optional[int] = None,
+        max_uses_per_client: Optional[int] = None,
+        client_id: Optional[int] = None,
+        client_used: Optional[int] = None,
+    ):
+        self.coupon_id = int(coupon_id)
+        self.used = int(used or 0)
+        self.max_uses = max_uses
+        self.max_uses_per_client = max_uses_per_client
+        self.client_id = client_id
+        self.client_used = client_used
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return _remaining(self.max_uses, self.used)
+
+    @property
+    def client_remaining(self) -> Optional[int]:
+        if self.client_id is None:
+            return None
+        left = _remaining(self.max_uses_per_client, self.client_used or 0)
+        # el cliente tampoco puede pasar el límite global
+        if self.remaining is not None:
+            left = self.remaining if left is None else min(left, self.remaining)
+        return left
+
+    def to_dict(self):
+        out = {
+            "coupon_id": self.coupon_id,
+            "used": self.used,
+            "max_uses": self.max_uses,
+            "max_uses_per_client": self.max_uses_per_client,
+            "remaining": self.remaining,
+        }
+        if self.client_id is not None:
+            out.update({
+                "client_id": self.client_id,
+                "client_used": self.client_used or 0,
+                "client_remaining": self.client_remaining,
+            })
+        return out
@@ -0,0 +1,29 @@
+import datetime
+from peewee import Model, BigIntegerField, IntegerField, DateTimeField, CompositeKey
+
+from shared.infrastructure.database import db
+
+
+class CouponUsageModel(Model):
+    """Contador de canjes de un cupón y sus límites (fila por cupón, se crea al primer uso)."""
+    coupon_id = BigIntegerField(primary_key=True)            # FK lógica a coupon.id
+    used = IntegerField(null=False, default=0)
+    max_uses = IntegerField(null=True)                       # NULL = sin límite
+    max_uses_per_client = IntegerField(null=True)            # NULL = sin límite por cliente
+    updated_at = DateTimeField(default=datetime.datetime.now, null=False)
+
+    class Meta:
+        database = db
+        table_name = "coupon_usage"
+
+
+class CouponClientUsageModel(Model):
+    """Canjes de un cupón por cliente (para max_uses_per_client)."""
+    coupon_id = BigIntegerField(null=False)
+    client_id = BigIntegerField(null=False)
+    used = IntegerField(null=False, default=0)
+
+    class Meta:
+        database = db
+        table_name = "coupon_client_usage"
+        primary_key = CompositeKey("coupon_id", "client_id")
@@ -1,23 +1,32 @@
-from typing import Optional, List
+from typing import Optional, List, Iterator, Dict, Any
 from datetime import datetime
 from decimal import Decimal
 
 from coupons.coupon.domain.entities.coupon import CouponData, CouponStatus
 from coupons.coupon.infraestructure.model.coupon_model import CouponModel
+from shared.infrastructure.server_cursor import iter_dict_rows
+from shared.infrastructure.table_fingerprint import TableFingerprint, table_fingerprint
 
 
 class CouponRepository:
+    # Columnas del export (mismas claves que la respuesta de la API)
+    EXPORT_COLUMNS = (
+        "id", "business_id", "coupon_type_id", "category_id", "event_id", "show_in_coupon_holder",
+        "name", "description", "discount_type_id", "value", "max_discount", "start_date", "end_date",
+        "event_name", "is_shared_alliances", "created_at",
+    )
+
     def _to_entity(self, rec: CouponModel) -> CouponData:
         return CouponData(
             id=rec.id,
             business_id=rec.business_id,
-            coupon_type_id=(rec.coupon_type.id if rec.coupon_type is not None else None),
-            category_id=(rec.category.id if rec.category is not None else None),
-            event_id=(rec.event.id if rec.event is not None else None),
+            coupon_type_id=rec.coupon_type_id,
+            category_id=rec.category_id,
+            event_id=rec.event_id,
             show_in_coupon_holder=bool(rec.show_in_coupon_holder),
             name=rec.name,
             description=rec.description,
-            discount_type_id=rec.discount_type.id,
+            discount_type_id=rec.discount_type_id,
             value=Decimal(str(rec.value)),
             max_discount=(Decimal(str(rec.max_discount)) if rec.max_discount is not None else None),
             start_date=rec.start_date,
@@ -49,6 +58,21 @@ class CouponRepository:
              ))
         return [self._to_entity(rec) for rec in q]
 
+    def find_active_by_ids(self, ids: List[int], now: datetime) -> List[CouponData]:
+        """Subconjunto de ids ACTIVE y vigentes en 'now' (una consulta)."""
+        ids = sorted({int(i) for i in ids})
+        if not ids:
+            return []
+        q = (CouponModel
+             .select()
+             .where(
+                 CouponModel.id.in_(ids) &
+                 (CouponModel.status == CouponStatus.ACTIVE.value) &
+                 (CouponModel.start_date <= now) &
+                 (CouponModel.end_date >= now)
+             ))
+        return [self._to_entity(rec) for rec in q]
+
     def create(self, coupon: CouponData) -> CouponData:
         rec = CouponModel.create(
             business_id=coupon.business_id,
@@ -94,6 +118,13 @@ class CouponRepository:
         except CouponModel.DoesNotExist:
             return None
 
+    def set_max_uses(self, id_: int, max_uses: Optional[int]) -> bool:
+        """Solo max_uses (lo escribe CouponUsageRepository.set_limits). False si no existe."""
+        return bool(CouponModel
+                    .update(max_uses=max_uses, updated_at=datetime.now())
+                    .where(CouponModel.id == id_)
+                    .execute())
+
     def delete(self, id_: int) -> bool:
         try:
             rec = CouponModel.get(CouponModel.id == id_)
@@ -105,3 +136,29 @@ class CouponRepository:
     def find_by_business(self, business_id: int) -> List[CouponData]:
         q = CouponModel.select().where(CouponModel.business_id == business_id)
         return [self._to_entity(rec) for rec in q]
+
+    def fingerprint_by_business(self, business_id: int) -> TableFingerprint:
+        return table_fingerprint(CouponModel, CouponModel.business_id == business_id)
+
+    def iter_export_by_business(self, business_id: int) -> Iterator[Dict[str, Any]]:
+        """
+        Export en streaming: filas dict (sin CouponData ni instancias de modelo) leídas
+        con cursor del servidor. Las FKs salen de la columna *_id, sin joins.
+        """
+        m = CouponModel
+        q = (m.select(
+                m.id, m.business_id,
+                m.coupon_type.alias("coupon_type_id"),
+                m.category.alias("category_id"),
+                m.event.alias("event_id"),
+                m.show_in_coupon_holder, m.name, m.description,
+                m.discount_type.alias("discount_type_id"),
+                m.value, m.max_discount, m.start_date, m.end_date,
+                m.event_name, m.is_shared_alliances, m.created_at,
+             )
+             .where(m.business_id == business_id)
+             .order_by(m.id))
+        for row in iter_dict_rows(q):
+            row["show_in_coupon_holder"] = bool(row["show_in_coupon_holder"])
+            row["is_shared_alliances"] = bool(row["is_shared_alliances"])
+            yield row
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import datetime
+from typing import Optional
+
+from coupons.coupon.domain.entities.coupon_usage import CouponUsageData, UsageLimitReachedError
+from coupons.coupon.infraestructure.model.coupon_model import CouponModel
+from coupons.coupon.infraestructure.model.coupon_usage_model import CouponUsageModel, CouponClientUsageModel
+from coupons.coupon.infraestructure.repositories.coupon_repository import CouponRepository
+from coupons.coupons_client.domain.entities.cupon_client import CouponClientStatus
+from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+from coupons.redemption.domain.entities.redemption import RedemptionEntryData
+from coupons.redemption.infraestructure.repositories.redemption_ledger_repository import (
+    RedemptionLedgerRepository,
+)
+
+
+class CouponUsageRepository:
+    """
+    Límite de usos por cupón (max_uses) y por cliente (max_uses_per_client).
+
+    consume() es un UPDATE condicional de una sola sentencia por contador
+    (used + n <= límite): bajo concurrencia nunca se pasa del límite y no hay
+    COUNT sobre coupon_client. Las filas se crean la primera vez que se tocan,
+    sembradas con los coupon_client USED que ya existían (un COUNT por cupón o por
+    cliente, una sola vez); max_uses se toma de coupon.max_uses.
+
+    'coupons' es el repositorio de cupones del container (puede ser el CachedRepository):
+    set_limits escribe coupon.max_uses a través de él para invalidar su caché.
+    """
+
+    def __init__(self, ledger: Optional[RedemptionLedgerRepository] = None,
+                 coupons: Optional[CouponRepository] = None):
+        self.ledger = ledger
+        self.coupons = coupons or CouponRepository()
+
+    def _record(self, entry: Optional[RedemptionEntryData]) -> None:
+        if self.ledger is not None and entry is not None:
+            self.ledger.append(entry)
+
+    # ----------------------------- siembra -----------------------------
+    def ensure(self, coupon_id: int) -> bool:
+        """Crea el contador si falta. False si el cupón no existe."""
+        u = CouponUsageModel
+        if u.select(u.coupon_id).where(u.coupon_id == coupon_id).exists():
+            return True
+        max_uses = CouponModel.select(CouponModel.max_uses).where(CouponModel.id == coupon_id).tuples().first()
+        if max_uses is None:
+            return False
+        cc = CouponClientModel
+        used = (cc.select().where((cc.coupon_id == coupon_id) & (cc.status == CouponClientStatus.USED.value))
+                .count())
+        u.insert(coupon_id=coupon_id, used=used, max_uses=max_uses[0]).on_conflict_ignore().execute()
+        return True
+
+    def ensure_client(self, coupon_id: int, client_id: int) -> None:
+        cu = CouponClientUsageModel
+        if cu.select(cu.coupon_id).where((cu.coupon_id == coupon_id) & (cu.client_id == client_id)).exists():
+            return
+        cc = CouponClientModel
+        used = (cc.select()
+                .where((cc.client_id == client_id) & (cc.coupon_id == coupon_id) &
+                       (cc.status == CouponClientStatus.USED.value))
+                .count())
+        cu.insert(coupon_id=coupon_id, client_id=client_id, used=used).on_conflict_ignore().execute()
+
+    # ----------------------------- escritura -----------------------------
+    def consume(self, coupon_id: int, client_id: Optional[int] = None, qty: int = 1,
+                entry: Optional[RedemptionEntryData] = None) -> CouponUsageData:
+        """
+        Descuenta 'qty' usos del cupón (y del cliente, si se indica) en una transacción.
+        UsageLimitReachedError si alguno de los límites no alcanza: no se descuenta nada.
+        Con 'entry' (REDEEMED) el canje queda en el ledger en la misma transacción;
+        coupon_client no lo pasa porque escribe su propio asiento.
+        """
+        u, cu = CouponUsageModel, CouponClientUsageModel
+        take = (u.update(used=u.used + qty, updated_at=datetime.datetime.now())
+                .where((u.coupon_id == coupon_id) &
+                       (u.max_uses.is_null(True) | (u.used + qty <= u.max_uses))))
+        with u._meta.database.atomic():
+            # la escritura va primero: toma el lock de la fila antes de cualquier lectura
+            if not take.execute():
+                if not self.ensure(coupon_id):
+                    raise ValueError(f"coupon {coupon_id} not found")
+                if not take.execute():
+                    raise UsageLimitReachedError(f"coupon {coupon_id} reached max_uses")
+            if client_id is not None:
+                cap = u.select(u.max_uses_per_client).where(u.coupon_id == coupon_id).scalar()
+                cond = (cu.coupon_id == coupon_id) & (cu.client_id == client_id)
+                if cap is not None:
+                    cond &= (cu.used + qty <= cap)
+                take_client = cu.update(used=cu.used + qty).where(cond)
+                if not take_client.execute():
+                    self.ensure_client(coupon_id, client_id)
+                    if not take_client.execute():
+                        # el raise revierte también el descuento del contador global
+                        raise UsageLimitReachedError(
+                            f"client {client_id} reached max_uses_per_client for coupon {coupon_id}")
+            self._record(entry)
+        return self.get(coupon_id, client_id)
+
+    def release(self, coupon_id: int, client_id: Optional[int] = None, qty: int = 1,
+                entry: Optional[RedemptionEntryData] = None) -> CouponUsageData:
+        """
+        Devuelve usos (p. ej. orden cancelada). Nunca deja un contador bajo cero.
+        'entry' (REVERSED) compensa el canje en el ledger.
+        """
+        u, cu = CouponUsageModel, CouponClientUsageModel
+        with u._meta.database.atomic():
+            released = (u.update(used=u.used - qty, updated_at=datetime.datetime.now())
+                        .where((u.coupon_id == coupon_id) & (u.used >= qty))
+                        .execute())
+            if released:
+                self._record(entry)
+            if client_id is not None:
+                (cu.update(used=cu.used - qty)
+                 .where((cu.coupon_id == coupon_id) & (cu.client_id == client_id) & (cu.used >= qty))
+                 .execute())
+        return self.get(coupon_id, client_id)
+
+    def set_limits(self, coupon_id: int, max_uses: Optional[int],
+                   max_uses_per_client: Optional[int]) -> Optional[CouponUsageData]:
+        """None si el cupón no existe. También guarda max_uses en coupon."""
+        u = CouponUsageModel
+        with u._meta.database.atomic():
+            if not self.ensure(coupon_id):
+                return None
+            (u.update(max_uses=max_uses, max_uses_per_client=max_uses_per_client,
+                      updated_at=datetime.datetime.now())
+             .where(u.coupon_id == coupon_id)
+             .execute())
+            self.coupons.set_max_uses(coupon_id, max_uses)
+        return self.get(coupon_id)
+
+    # ----------------------------- lectura -----------------------------
+    def get(self, coupon_id: int, client_id: Optional[int] = None) -> Optional[CouponUsageData]:
+        """Lectura por PK del contador (y del contador del cliente). None si el cupón no existe."""
+        u, cu = CouponUsageModel, CouponClientUsageModel
+        rec = u.get_or_none(u.coupon_id == coupon_id)
+        if rec is None:
+            if not self.ensure(coupon_id):
+                return None
+            rec = u.get(u.coupon_id == coupon_id)
+        client_used = None
+        if client_id is not None:
+            client_used = (cu.select(cu.used)
+                           .where((cu.coupon_id == coupon_id) & (cu.client_id == client_id))
+                           .scalar())
+            if client_used is None:
+                self.ensure_client(coupon_id, client_id)
+                client_used = (cu.select(cu.used)
+                               .where((cu.coupon_id == coupon_id) & (cu.client_id == client_id))
+                               .scalar())
+        return CouponUsageData(
+            coupon_id=rec.coupon_id,
+            used=rec.used,
+            max_uses=rec.max_uses,
+            max_uses_per_client=rec.max_uses_per_client,
+            client_id=client_id,
+            client_used=client_used,
+        )
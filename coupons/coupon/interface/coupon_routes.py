@@ -6,6 +6,12 @@ from typing import Any, Optional
 
 from flask import Blueprint, request, jsonify, current_app
 
+from coupons.coupon.domain.entities.coupon_usage import UsageLimitReachedError
+from shared.serialization.entity_serializer import EntitySerializer
+from shared.serialization.conditional import conditional_response
+from shared.serialization.export import export_response
+from shared.serialization.streaming import list_response
+
 coupon_bp = Blueprint("coupon_api", __name__, url_prefix="/api/coupons")
 
 
@@ -34,26 +40,26 @@ def _parse_decimal(value: Optional[Any], field: str) -> Optional[Decimal]:
         raise ValueError(f"{field} must be a number")
 
 
-def _coupon_to_json(c) -> dict:
-    # RESPUESTA: NO incluye max_uses ni status
-    return {
-        "id": getattr(c, "id", None),
-        "business_id": getattr(c, "business_id", None),
-        "coupon_type_id": getattr(c, "coupon_type_id", None),
-        "category_id": getattr(c, "category_id", None),
-        "event_id": getattr(c, "event_id", None),
-        "show_in_coupon_holder": bool(getattr(c, "show_in_coupon_holder", False)),
-        "name": getattr(c, "name", None),
-        "description": getattr(c, "description", None),
-        "discount_type_id": getattr(c, "discount_type_id", None),
-        "value": str(getattr(c, "value", None)) if getattr(c, "value", None) is not None else None,
-        "max_discount": str(getattr(c, "max_discount", None)) if getattr(c, "max_discount", None) is not None else None,
-        "start_date": getattr(c, "start_date", None).isoformat() if getattr(c, "start_date", None) else None,
-        "end_date": getattr(c, "end_date", None).isoformat() if getattr(c, "end_date", None) else None,
-        "event_name": getattr(c, "event_name", None),
-        "is_shared_alliances": getattr(c, "is_shared_alliances", False),
-        "created_at": getattr(c, "created_at", None).isoformat() if getattr(c, "created_at", None) else None,
-    }
+# RESPUESTA: NO incluye max_uses ni status
+COUPON_SERIALIZER = EntitySerializer({
+    "id": None,
+    "business_id": None,
+    "coupon_type_id": None,
+    "category_id": None,
+    "event_id": None,
+    "show_in_coupon_holder": ("bool", None, False),
+    "name": None,
+    "description": None,
+    "discount_type_id": None,
+    "value": "decimal",
+    "max_discount": "decimal",
+    "start_date": "datetime",
+    "end_date": "datetime",
+    "event_name": None,
+    "is_shared_alliances": (None, None, False),
+    "created_at": "datetime",
+})
+_coupon_to_json = COUPON_SERIALIZER
 
 
 @coupon_bp.route("", methods=["POST"])
@@ -140,13 +146,13 @@ def list_coupons():
             if active_only:
                 now = datetime.utcnow()
                 rows = [c for c in rows if c.start_date <= now <= c.end_date]
-            return jsonify([_coupon_to_json(r) for r in rows]), 200
+            return list_response(rows, COUPON_SERIALIZER)
 
         rows = qry.list_all()
         if active_only:
             now = datetime.utcnow()
             rows = [c for c in rows if c.start_date <= now <= c.end_date]
-        return jsonify([_coupon_to_json(r) for r in rows]), 200
+        return list_response(rows, COUPON_SERIALIZER)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -227,8 +233,26 @@ def delete_coupon(coupon_id: int):
 def list_by_business(business_id: int):
     _cmd, qry = _svc()
     try:
-        rows = qry.find_by_business(business_id)
-        return jsonify([_coupon_to_json(r) for r in rows]), 200
+        return conditional_response(
+            qry.fingerprint_by_business(business_id),
+            lambda: list_response(qry.find_by_business(business_id), COUPON_SERIALIZER),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_bp.route("/by-business/<int:business_id>/export", methods=["GET"])
+def export_by_business(business_id: int):
+    _cmd, qry = _svc()
+    try:
+        return export_response(
+            qry.iter_export_by_business(business_id),
+            qry.repo.EXPORT_COLUMNS,
+            fmt=request.args.get("format", "ndjson"),
+            filename=f"coupons-business-{business_id}",
+        )
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -239,6 +263,115 @@ def list_active_now():
     try:
         now = datetime.utcnow()
         rows = qry.list_active_in_window(now)
-        return jsonify([_coupon_to_json(r) for r in rows]), 200
+        return list_response(rows, COUPON_SERIALIZER)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_bp.route("/by-code/<string:code>", methods=["GET"])
+def get_by_code(code: str):
+    """
+    Resuelve un código de cliente (coupon_client) o de producto (coupon_product) a sus
+    cupones: {"code", "matches": [{"kind", "coupon", "coupon_client" | "product_ids"}]}.
+    Un SKU mapeado en varios cupones devuelve un match por cupón. Los códigos
+    inexistentes se rechazan con el Bloom filter en memoria, sin consultar la BD.
+    """
+    services = current_app.config.get("coupon_services")
+    if not services:
+        raise RuntimeError("coupon_services not configured in current_app.config")
+    try:
+        matches = services["coupon_code_query_service"].resolve(code)
+        if not matches:
+            return jsonify({"error": "Code not found"}), 404
+        out = []
+        for m in matches:
+            item = {"kind": m["kind"], "coupon": _coupon_to_json(m["coupon"])}
+            if "coupon_client" in m:
+                item["coupon_client"] = m["coupon_client"].to_dict() if m["coupon_client"] else None
+            else:
+                item["product_ids"] = m["product_ids"]
+            out.append(item)
+        return jsonify({"code": matches[0]["code"], "matches": out}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# ----------------------------- límites de uso -----------------------------
+def _usage_svc():
+    services = current_app.config.get("coupon_services")
+    if not services:
+        raise RuntimeError("coupon_services not configured in current_app.config")
+    return services["coupon_usage_command_service"], services["coupon_usage_query_service"]
+
+
+def _usage_body() -> dict:
+    data = request.get_json(silent=True) or {}
+    opt_int = lambda k: int(data[k]) if data.get(k) is not None else None  # noqa: E731
+    return {
+        "client_id": opt_int("client_id"),
+        "quantity": int(data.get("quantity", 1)),
+        "order_id": opt_int("order_id"),
+        "product_id": opt_int("product_id"),
+        "discount_amount": _parse_decimal(data.get("discount_amount"), "discount_amount"),
+    }
+
+
+@coupon_bp.route("/<int:coupon_id>/usage", methods=["GET"])
+def get_usage(coupon_id: int):
+    """Usos y restantes desde el contador (?client_id= agrega los del cliente)."""
+    _cmd, qry = _usage_svc()
+    try:
+        usage = qry.get(coupon_id, request.args.get("client_id", type=int))
+        if usage is None:
+            return jsonify({"error": "Coupon not found"}), 404
+        return jsonify(usage.to_dict()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_bp.route("/<int:coupon_id>/usage-limits", methods=["PUT"])
+def set_usage_limits(coupon_id: int):
+    """Body: {"max_uses": 100 | null, "max_uses_per_client": 1 | null}  (null = sin límite)"""
+    cmd, _qry = _usage_svc()
+    data = request.get_json(silent=True) or {}
+    try:
+        usage = cmd.set_limits(coupon_id, data.get("max_uses"), data.get("max_uses_per_client"))
+        if usage is None:
+            return jsonify({"error": "Coupon not found"}), 404
+        return jsonify(usage.to_dict()), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_bp.route("/<int:coupon_id>/usage/consume", methods=["POST"])
+def consume_usage(coupon_id: int):
+    """
+    Body: {"client_id": 7?, "quantity": 1?, "order_id"?, "product_id"?, "discount_amount"?}
+    El canje queda en el redemption ledger. 409 si no quedan usos.
+    """
+    cmd, _qry = _usage_svc()
+    try:
+        return jsonify(cmd.consume(coupon_id, **_usage_body()).to_dict()), 200
+    except UsageLimitReachedError as le:
+        return jsonify({"error": str(le)}), 409
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_bp.route("/<int:coupon_id>/usage/release", methods=["POST"])
+def release_usage(coupon_id: int):
+    """Devuelve usos (p. ej. orden cancelada). Mismo body que /usage/consume."""
+    cmd, _qry = _usage_svc()
+    try:
+        usage = cmd.release(coupon_id, **_usage_body())
+        if usage is None:
+            return jsonify({"error": "Coupon not found"}), 404
+        return jsonify(usage.to_dict()), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from coupons.coupon.infraestructure.repositories.coupon_repository import CouponRepository
+from coupons.coupon_code.domain.entities.coupon_code import CouponCodeKind, normalize_code
+from coupons.coupon_code.infraestructure.code_bloom_index import CodeBloomIndex
+from coupons.coupon_code.infraestructure.repositories.coupon_code_repository import CouponCodeRepository
+from coupons.coupons_client.infraestructure.repositories.coupon_client_repository import CouponClientRepository
+from shared.infrastructure.metrics.registry import REGISTRY
+
+CODE_LOOKUPS = REGISTRY.counter(
+    "coupon_code_lookups_total",
+    "Resoluciones de /api/coupons/by-code por resultado",
+    ("result",),
+)
+
+
+class CouponCodeQueryService:
+    """
+    Resuelve un código a su cupón. Con bloom, los códigos que no existen se
+    rechazan en memoria (result="rejected") sin consultar la BD.
+    """
+
+    def __init__(
+        self,
+        repo: CouponCodeRepository,
+        coupon_repo: CouponRepository,
+        coupon_client_repo: CouponClientRepository,
+        bloom: Optional[CodeBloomIndex] = None,
+    ):
+        self.repo = repo
+        self.coupon_repo = coupon_repo
+        self.coupon_client_repo = coupon_client_repo
+        self.bloom = bloom
+
+    def resolve(self, code: str) -> List[Dict[str, Any]]:
+        """
+        Dueños del código: [{kind, coupon, coupon_client | product_ids}, ...]. Vacío si no
+        existe. Un código de producto (SKU) puede estar mapeado en varios cupones.
+        """
+        key = normalize_code(code)
+        if key is None:
+            CODE_LOOKUPS.inc(result="invalid")
+            return []
+        if self.bloom is not None and not self.bloom.might_contain(key):
+            CODE_LOOKUPS.inc(result="rejected")
+            return []
+        out: List[Dict[str, Any]] = []
+        for owner in self.repo.find(key):
+            coupon = self.coupon_repo.get_by_id(owner.coupon_id)
+            if coupon is None:
+                continue  # código de un cupón ya borrado
+            match: Dict[str, Any] = {"code": owner.code, "kind": owner.kind.value, "coupon": coupon}
+            if owner.kind == CouponCodeKind.CLIENT:
+                match["coupon_client"] = self.coupon_client_repo.get_by_id(owner.coupon_client_id)
+            else:
+                match["product_ids"] = self.repo.product_ids(owner.coupon_id, owner.code)
+            out.append(match)
+        # miss tras pasar el Bloom filter: falso positivo (o dueños ya borrados)
+        CODE_LOOKUPS.inc(result="hit" if out else "miss")
+        return out
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+
+class CouponCodeKind(Enum):
+    CLIENT = "CLIENT"     # coupon_client.code (un cupón emitido a un cliente)
+    PRODUCT = "PRODUCT"   # coupon_product.code (compartido por los productos del mapping)
+
+
+class CodeConflictError(ValueError):
+    """El código de cliente ya está registrado por otro coupon_client."""
+
+
+MAX_CODE_LENGTH = 100
+
+
+def normalize_code(code: Optional[str]) -> Optional[str]:
+    """
+    Clave del índice: el código sin espacios alrededor. None si no es un código válido.
+    Mayúsculas/minúsculas las resuelve la collation de la BD (MySQL: *_ci, sin distinción).
+    """
+    if code is None:
+        return None
+    code = str(code).strip()
+    if not code or len(code) > MAX_CODE_LENGTH:
+        return None
+    return code
+
+
+class CouponCodeData:
+    def __init__(
+        self,
+        code: str,
+        kind: CouponCodeKind | str,
+        coupon_id: int,
+        client_id: Optional[int] = None,
+        coupon_client_id: Optional[int] = None,
+        id: Optional[int] = None,
+        created_at: Optional[datetime] = None,
+    ):
+        self.id = id
+        self.code = code
+        self.kind = kind if isinstance(kind, CouponCodeKind) else CouponCodeKind(str(kind))
+        self.coupon_id = int(coupon_id)
+        self.client_id = client_id
+        self.coupon_client_id = coupon_client_id
+        self.created_at = created_at
+
+    def to_dict(self):
+        return {
+            "code": self.code,
+            "kind": self.kind.value,
+            "coupon_id": self.coupon_id,
+            "client_id": self.client_id,
+            "coupon_client_id": self.coupon_client_id,
+        }
+
+
+def bloom_key(code: str) -> str:
+    """Clave del Bloom filter: sin distinción de mayúsculas, igual que la collation de MySQL."""
+    return code.casefold()
@@ -0,0 +1,152 @@
+"""
+Bloom filter de coupon_codes para rechazar códigos inexistentes sin ir a la BD.
+
+- Se construye la primera vez que se consulta (lee todos los códigos con cursor del
+  servidor) y se reconstruye cada COUPON_CODE_BLOOM_REBUILD_SECONDS o al pasar su
+  capacidad (así se olvidan los códigos borrados y se redimensiona). La reconstrucción
+  corre en un hilo aparte sobre un filtro nuevo: mientras tanto se sigue respondiendo
+  con el actual y al terminar se reemplaza.
+- Los códigos registrados después (por este u otro proceso) entran con un sync
+  incremental por id. Solo se hace ante un "no está" y como mucho cada
+  COUPON_CODE_BLOOM_SYNC_MS: un ataque de fuerza bruta cuesta a la BD una consulta
+  por intervalo, no una por intento.
+- El sync relee los códigos de los últimos SETTLE segundos: un id menor puede
+  confirmarse después de uno mayor y avanzar por id se lo saltaría.
+- Las claves van en casefold (bloom_key): la collation de MySQL compara sin
+  distinguir mayúsculas y el filtro no puede rechazar lo que la BD encontraría.
+"""
+from __future__ import annotations
+
+import datetime
+import logging
+import os
+import threading
+import time
+from typing import Optional, Set, Tuple
+
+from coupons.coupon_code.domain.entities.coupon_code import bloom_key
+from coupons.coupon_code.infraestructure.model.coupon_code_model import CouponCodeModel
+from coupons.coupon_code.infraestructure.repositories.coupon_code_repository import CouponCodeRepository
+from shared.infrastructure.bloom_filter import BloomFilter
+
+log = logging.getLogger(__name__)
+
+
+class CodeBloomIndex:
+    MIN_CAPACITY = 100_000
+    SETTLE = datetime.timedelta(seconds=5)
+
+    def __init__(
+        self,
+        repo: CouponCodeRepository,
+        error_rate: Optional[float] = None,
+        sync_interval: Optional[float] = None,
+        rebuild_interval: Optional[float] = None,
+    ):
+        self.repo = repo
+        self.error_rate = float(error_rate if error_rate is not None
+                                else os.getenv("COUPON_CODE_BLOOM_FP_RATE", "0.001"))
+        self.sync_interval = float(sync_interval if sync_interval is not None
+                                   else int(os.getenv("COUPON_CODE_BLOOM_SYNC_MS", "500")) / 1000.0)
+        self.rebuild_interval = float(rebuild_interval if rebuild_interval is not None
+                                      else os.getenv("COUPON_CODE_BLOOM_REBUILD_SECONDS", "3600"))
+        self._lock = threading.Lock()          # sync incremental y reemplazo del filtro
+        self._rebuilding = threading.Lock()    # una sola reconstrucción a la vez
+        self._bloom: Optional[BloomFilter] = None
+        self._watermark = 0
+        self._recent: Set[int] = set()
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self.rejected = 0
+        self.passed = 0
+
+    def _fill(self, bloom: BloomFilter, after_id: int, recent: Set[int]) -> int:
+        """
+        Agrega los códigos con id > after_id; devuelve el nuevo watermark. 'recent' son
+        los ids ya agregados por encima del watermark (no se vuelven a contar en el filtro).
+        """
+        cutoff = datetime.datetime.now() - self.SETTLE
+        watermark = after_id
+        for row in self.repo.iter_codes_after(after_id):
+            if row["id"] not in recent:
+                bloom.add(bloom_key(row["code"]))
+                recent.add(row["id"])
+            if row["created_at"] < cutoff:
+                watermark = max(watermark, row["id"])
+        recent.difference_update([i for i in recent if i <= watermark])
+        return watermark
+
+    def _build(self) -> Tuple[BloomFilter, int, Set[int]]:
+        # lectura completa de la tabla, sin tomar _lock
+        bloom = BloomFilter(max(self.MIN_CAPACITY, 2 * self.repo.count()), self.error_rate)
+        recent: Set[int] = set()
+        watermark = self._fill(bloom, 0, recent)
+        return bloom, watermark, recent
+
+    def _rebuild(self) -> None:
+        """Construye un filtro nuevo y lo reemplaza (ponerlo al día bajo _lock es solo el delta)."""
+        try:
+            bloom, watermark, recent = self._build()
+            with self._lock:
+                watermark = self._fill(bloom, watermark, recent)
+                self._bloom, self._watermark, self._recent = bloom, watermark, recent
+                self._built_at = self._synced_at = time.monotonic()
+        finally:
+            self._rebuilding.release()
+
+    def _rebuild_in_background(self) -> None:
+        def run():
+            try:
+                self._rebuild()
+            except Exception:
+                # se sigue con el filtro actual; se reintenta en la próxima consulta
+                log.exception("coupon code bloom: rebuild failed")
+            finally:
+                database = CouponCodeModel._meta.database
+                if not database.is_closed():
+                    database.close()  # conexión propia de este hilo
+        threading.Thread(target=run, name="coupon-code-bloom-rebuild", daemon=True).start()
+
+    def _stale(self, now: float) -> bool:
+        bloom = self._bloom
+        return bloom is None or bloom.saturated or now - self._built_at >= self.rebuild_interval
+
+    def might_contain(self, code: str) -> bool:
+        key = bloom_key(code)
+        now = time.monotonic()
+        if self._bloom is None:
+            # primera carga: sin filtro no hay con qué responder
+            self._rebuilding.acquire()
+            if self._bloom is None:
+                self._rebuild()
+            else:
+                self._rebuilding.release()
+        elif self._stale(now) and self._rebuilding.acquire(blocking=False):
+            self._rebuild_in_background()
+        bloom = self._bloom
+        if key in bloom:
+            self.passed += 1
+            return True
+        if now - self._synced_at >= self.sync_interval:
+            with self._lock:
+                if time.monotonic() - self._synced_at >= self.sync_interval:
+                    self._watermark = self._fill(self._bloom, self._watermark, self._recent)
+                    self._synced_at = time.monotonic()
+                bloom = self._bloom
+            if key in bloom:
+                self.passed += 1
+                return True
+        self.rejected += 1
+        return False
+
+    def stats(self) -> dict:
+        bloom = self._bloom
+        return {
+            "loaded": bloom is not None,
+            "codes": bloom.count if bloom else 0,
+            "capacity": bloom.capacity if bloom else 0,
+            "bits": bloom.num_bits if bloom else 0,
+            "hashes": bloom.num_hashes if bloom else 0,
+            "rejected": self.rejected,
+            "passed": self.passed,
+        }
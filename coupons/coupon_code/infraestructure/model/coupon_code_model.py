@@ -0,0 +1,28 @@
+import datetime
+from peewee import Model, AutoField, BigIntegerField, CharField, DateTimeField
+
+from coupons.coupon_code.domain.entities.coupon_code import CouponCodeKind, MAX_CODE_LENGTH
+from shared.infrastructure.database import db
+
+
+class CouponCodeModel(Model):
+    """
+    Índice de códigos (cliente y producto) -> cupón. Un código CLIENT es único
+    (client_code); un código PRODUCT (SKU) puede estar mapeado en varios cupones.
+    """
+    id = AutoField(primary_key=True)   # cursor del Bloom filter (sync incremental)
+    code = CharField(max_length=MAX_CODE_LENGTH, null=False)
+    kind = CharField(max_length=16, null=False, choices=[(e.value, e.value) for e in CouponCodeKind])
+    coupon_id = BigIntegerField(null=False)
+    client_id = BigIntegerField(null=True)           # solo CLIENT
+    coupon_client_id = BigIntegerField(null=True)    # solo CLIENT
+    client_code = CharField(max_length=MAX_CODE_LENGTH, null=True, unique=True)  # = code en CLIENT; NULL no choca
+    created_at = DateTimeField(default=datetime.datetime.now, null=False)
+
+    class Meta:
+        database = db
+        table_name = "coupon_codes"
+        indexes = (
+            (("code", "coupon_id", "kind"), True),
+            (("coupon_id", "kind"), False),
+        )
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from peewee import Value, Tuple as RowValue
+
+from coupons.coupon_code.domain.entities.coupon_code import (
+    CodeConflictError, CouponCodeData, CouponCodeKind, normalize_code,
+)
+from coupons.coupon_code.infraestructure.model.coupon_code_model import CouponCodeModel
+from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+from shared.infrastructure.server_cursor import iter_dict_rows
+
+
+class CouponCodeRepository:
+    """
+    Índice código -> dueños (coupon_client o mapping cupón↔producto).
+
+    Los repositorios de coupon_client y coupon_product registran y liberan sus
+    códigos dentro de su propia transacción. Un código CLIENT es único: si ya es
+    de otro coupon_client la escritura falla con CodeConflictError. Un código
+    PRODUCT (p. ej. un SKU) se registra una vez por cupón y puede repetirse entre
+    cupones, así que un código puede resolver a varios dueños.
+    """
+
+    MAX_MATCHES = 100
+
+    def _to_entity(self, rec: CouponCodeModel) -> CouponCodeData:
+        return CouponCodeData(
+            id=rec.id,
+            code=rec.code,
+            kind=rec.kind,
+            coupon_id=rec.coupon_id,
+            client_id=rec.client_id,
+            coupon_client_id=rec.coupon_client_id,
+            created_at=rec.created_at,
+        )
+
+    def find(self, code: str) -> List[CouponCodeData]:
+        """Dueños del código (CLIENT primero), como mucho MAX_MATCHES."""
+        key = normalize_code(code)
+        if key is None:
+            return []
+        m = CouponCodeModel
+        q = m.select().where(m.code == key).order_by(m.kind, m.coupon_id).limit(self.MAX_MATCHES)
+        return [self._to_entity(r) for r in q]
+
+    def claim(self, code: str, kind: CouponCodeKind, coupon_id: int,
+              client_id: Optional[int] = None, coupon_client_id: Optional[int] = None) -> None:
+        """Registra el código (idempotente para el mismo dueño). Llamar en la transacción del dueño."""
+        key = normalize_code(code)
+        if key is None:
+            raise ValueError("code is required")
+        client = kind == CouponCodeKind.CLIENT
+        inserted = (CouponCodeModel.insert(
+            code=key, kind=kind.value, coupon_id=coupon_id,
+            client_id=client_id, coupon_client_id=coupon_client_id,
+            client_code=key if client else None,
+        ).on_conflict_ignore().as_rowcount().execute())
+        if inserted or not client:
+            # PRODUCT: solo choca con su propia fila (code, coupon_id, kind)
+            return
+        m = CouponCodeModel
+        owner = m.select(m.coupon_client_id).where(m.client_code == key).scalar()
+        if owner is not None and owner != coupon_client_id:
+            raise CodeConflictError(f"code '{key}' is already in use")
+
+    def claim_coupon_clients(self, keys: Iterable[Tuple[int, int, str]]) -> int:
+        """
+        Registra los códigos de coupon_client recién emitidos, por (client_id, coupon_id, code),
+        con un INSERT ... SELECT. Los que ya son de otro coupon_client (o no son un código
+        válido) quedan sin registrar; devuelve cuántos se registraron.
+        """
+        keys = [k for k in keys if normalize_code(k[2]) == k[2]]
+        if not keys:
+            return 0
+        cc, m = CouponClientModel, CouponCodeModel
+        # created_at = ahora (no el del coupon_client): el sync del Bloom filter lo usa como marca de inserción
+        q = (cc.select(cc.code, Value(CouponCodeKind.CLIENT.value), cc.coupon_id, cc.client_id, cc.id,
+                       cc.code, Value(datetime.datetime.now()))
+             .where(RowValue(cc.client_id, cc.coupon_id, cc.code).in_(keys)))
+        fields = (m.code, m.kind, m.coupon_id, m.client_id, m.coupon_client_id, m.client_code, m.created_at)
+        return m.insert_from(q, fields).on_conflict_ignore().as_rowcount().execute()
+
+    def backfill(self) -> int:
+        """
+        Registra los códigos existentes de coupon_client y coupon_product (migración).
+        Si un código de cliente se repite entre coupon_client gana el primero (por id);
+        los demás quedan sin resolver por código. Devuelve cuántos se registraron.
+        """
+        cc, cp, m = CouponClientModel, CouponProductModel, CouponCodeModel
+        now = Value(datetime.datetime.now())
+        fields = (m.code, m.kind, m.coupon_id, m.client_id, m.coupon_client_id, m.client_code, m.created_at)
+        clients = (cc.select(cc.code, Value(CouponCodeKind.CLIENT.value), cc.coupon_id, cc.client_id, cc.id,
+                             cc.code, now)
+                   .where(cc.code != "")
+                   .order_by(cc.id))
+        products = (cp.select(cp.code, Value(CouponCodeKind.PRODUCT.value), cp.coupon, Value(None), Value(None),
+                              Value(None), now)
+                    .where(cp.code != "")
+                    .order_by(cp.coupon, cp.product_id))
+        total = 0
+        for q in (clients, products):
+            total += m.insert_from(q, fields).on_conflict_ignore().as_rowcount().execute()
+        return total
+
+    def release_coupon_client(self, coupon_client_id: int) -> int:
+        m = CouponCodeModel
+        return (m.delete()
+                .where((m.kind == CouponCodeKind.CLIENT.value) & (m.coupon_client_id == coupon_client_id))
+                .execute())
+
+    def release_unused_product_codes(self, coupon_id: int) -> int:
+        """Quita los códigos PRODUCT del cupón que ya no usa ningún mapping."""
+        m, cp = CouponCodeModel, CouponProductModel
+        in_use = cp.select(cp.code).where(cp.coupon == coupon_id)
+        return (m.delete()
+                .where((m.kind == CouponCodeKind.PRODUCT.value) & (m.coupon_id == coupon_id) &
+                       m.code.not_in(in_use))
+                .execute())
+
+    def product_ids(self, coupon_id: int, code: str) -> List[int]:
+        """Productos del cupón mapeados con ese código (dueño PRODUCT)."""
+        cp = CouponProductModel
+        q = (cp.select(cp.product_id)
+             .where((cp.coupon == coupon_id) & (cp.code == code))
+             .order_by(cp.product_id))
+        return [r.product_id for r in q]
+
+    # ----------------------------- Bloom filter -----------------------------
+    def count(self) -> int:
+        return CouponCodeModel.select().count()
+
+    def iter_codes_after(self, after_id: int) -> Iterator[Dict[str, Any]]:
+        """{id, code, created_at} con id > after_id, en orden y con cursor del servidor."""
+        m = CouponCodeModel
+        return iter_dict_rows(m.select(m.id, m.code, m.created_at).where(m.id > after_id).order_by(m.id))
@@ -7,10 +7,11 @@ from coupons.coupon_segment_price.infraestructure.model.coupon_segment_price_mod
 
 class CouponSegmentPriceRepository:
     def _to_entity(self, rec: CouponSegmentPriceModel) -> CouponSegmentPriceData:
+        # FKs con column_name propio: el id crudo se lee por el nombre de columna (sin query)
         return CouponSegmentPriceData(
-            coupon_id=rec.coupon.id,
-            segment_id=rec.segment.id,
-            discount_type_id=rec.discount_type.id,
+            coupon_id=rec.cupon_id,
+            segment_id=rec.segmento_id,
+            discount_type_id=rec.tipo_descuento_id,
             value=Decimal(str(rec.value)),
             priority=rec.priority,
         )
@@ -79,7 +79,7 @@ class CouponTriggerProductRepository:
         return [
             CouponTriggerProductData(
                 product_trigger_id=rec.product_trigger_id,
-                coupon_id=rec.coupon.id,
+                coupon_id=rec.coupon_id,
                 product_type=rec.product_type,          # <-- NUEVO
                 min_quantity=rec.min_quantity,
                 min_amount=rec.min_amount,
@@ -91,4 +91,23 @@ class CouponTriggerProductRepository:
         q = (CouponTriggerProductModel
              .select(CouponTriggerProductModel.coupon)
              .where(CouponTriggerProductModel.product_trigger_id == product_trigger_id))
-        return [rec.coupon.id for rec in q]
+        return [rec.coupon_id for rec in q]
+
+    def list_by_triggers(self, product_trigger_ids: List[int]) -> List[CouponTriggerProductData]:
+        """Mappings de varios productos en una sola consulta (IN)."""
+        ids = sorted({int(i) for i in product_trigger_ids})
+        if not ids:
+            return []
+        q = (CouponTriggerProductModel
+             .select()
+             .where(CouponTriggerProductModel.product_trigger_id.in_(ids)))
+        return [
+            CouponTriggerProductData(
+                product_trigger_id=rec.product_trigger_id,
+                coupon_id=rec.coupon_id,
+                product_type=rec.product_type,
+                min_quantity=rec.min_quantity,
+                min_amount=rec.min_amount,
+            )
+            for rec in q
+        ]
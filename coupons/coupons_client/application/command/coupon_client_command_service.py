@@ -1,5 +1,6 @@
 from __future__ import annotations
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
 
 from coupons.coupons_client.domain.entities.cupon_client import CouponClientData, CouponClientStatus
@@ -35,8 +36,23 @@ class CouponClientCommandService:
         )
         return self.repo.create(entity)
 
-    def mark_used(self, id_: int, order_id: Optional[int] = None) -> Optional[CouponClientData]:
-        return self.repo.mark_used(id_, order_id)
+    def mark_used(self, id_: int, order_id: Optional[int] = None, product_id: Optional[int] = None,
+                  discount_amount: Optional[Decimal] = None) -> Optional[CouponClientData]:
+        return self.repo.mark_used(id_, order_id, product_id, discount_amount)
+
+    def expire(self, id_: int) -> Optional[CouponClientData]:
+        return self.repo.expire(id_)
+
+    def expire_due(self, batch_size: int = 500, max_batches: Optional[int] = None) -> int:
+        """Lotes cortos (una transacción cada uno) hasta vencer todos los pasados de valid_to."""
+        total, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            n = self.repo.expire_due(batch_size)
+            total += n
+            batches += 1
+            if n < batch_size:
+                break
+        return total
 
     def delete(self, id_: int) -> bool:
         return self.repo.delete(id_)
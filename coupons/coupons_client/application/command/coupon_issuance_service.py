@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import secrets
+import string
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+from coupons.coupon.infraestructure.repositories.coupon_repository import CouponRepository
+from coupons.coupon_trigger_product.infraestructure.repositories.coupon_trigger_product_repository import (
+    CouponTriggerProductRepository,
+)
+from coupons.coupons_client.domain.entities.cupon_client import CouponClientData, CouponClientStatus
+from coupons.coupons_client.infraestructure.repositories.coupon_client_repository import CouponClientRepository
+from payment.party.domain.entities.party import PartySubjectType
+from payment.party.infraestructure.repositories.party_repository import PartyRepository
+from shared.infrastructure.outbox import OutboxEvent
+
+_CODE_ALPHABET = string.ascii_uppercase + string.digits
+
+
+class CouponIssuanceService:
+    """
+    Emite los cupones ganados por órdenes pagadas (handler del tópico 'order.paid').
+
+    Por lote de eventos: una consulta de triggers para todos los productos, una de
+    cupones vigentes, una de parties (solo si falta client_id) y un único INSERT
+    multi-fila. Las reglas son las de POST /api/coupon-trigger-products/by-items
+    (product_type, min_quantity, min_amount) más cupón ACTIVE y dentro de fechas.
+    Idempotente por el unique coupon_client(source_order_id, coupon_id).
+
+    Payload esperado (lo arma OrderRepository.mark_paid desde metadata de la orden):
+      {"order_id", "client_id"?, "buyer_party_id", "paid_at",
+       "items": [{"product_id", "product_type", "quantity", "amount"}]}
+    """
+
+    CODE_LENGTH = 10
+
+    def __init__(
+        self,
+        trigger_repo: CouponTriggerProductRepository,
+        coupon_repo: CouponRepository,
+        coupon_client_repo: CouponClientRepository,
+        party_repo: Optional[PartyRepository] = None,
+    ):
+        self.trigger_repo = trigger_repo
+        self.coupon_repo = coupon_repo
+        self.coupon_client_repo = coupon_client_repo
+        self.party_repo = party_repo
+
+    @classmethod
+    def _new_code(cls) -> str:
+        return "".join(secrets.choice(_CODE_ALPHABET) for _ in range(cls.CODE_LENGTH))
+
+    @staticmethod
+    def _items(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Ítems normalizados; ValueError si quantity o amount no son números."""
+        out = []
+        for it in payload.get("items") or []:
+            if not isinstance(it, dict):
+                continue
+            try:
+                pid = int(it.get("product_id", it.get("id")))
+            except (TypeError, ValueError):
+                continue
+            if pid <= 0:
+                continue
+            ptype = str(it.get("product_type") or "PRODUCT").upper()
+            try:
+                qty = max(1, int(it.get("quantity") or 1))
+                amount = it.get("amount")
+                amount = Decimal(str(amount)) if amount is not None else None
+                if amount is not None and not amount.is_finite():
+                    raise InvalidOperation
+            except (TypeError, ValueError, InvalidOperation):
+                raise ValueError(f"item {pid}: quantity/amount must be numbers")
+            out.append({
+                "product_id": pid,
+                "product_type": ptype if ptype in ("PRODUCT", "SERVICE") else "PRODUCT",
+                "quantity": qty,
+                "amount": amount,
+            })
+        return out
+
+    @classmethod
+    def _parse(cls, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Payload validado (ids enteros, ítems normalizados); ValueError si es inválido."""
+        try:
+            out = {
+                "order_id": int(payload["order_id"]),
+                "client_id": int(payload["client_id"]) if payload.get("client_id") else None,
+                "buyer_party_id": int(payload["buyer_party_id"]) if payload.get("buyer_party_id") else None,
+            }
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("order_id / client_id / buyer_party_id must be integers")
+        out["items"] = cls._items(payload)
+        return out
+
+    def _resolve_clients(self, payloads: List[Dict[str, Any]]) -> Dict[int, int]:
+        """{order_id: client_id}; usa metadata.client_id o la party compradora si es 'client'."""
+        clients: Dict[int, int] = {}
+        missing: Dict[int, int] = {}  # order_id -> buyer_party_id
+        for p in payloads:
+            if p["client_id"]:
+                clients[p["order_id"]] = p["client_id"]
+            elif p["buyer_party_id"]:
+                missing[p["order_id"]] = p["buyer_party_id"]
+        if missing and self.party_repo is not None:
+            parties = {pa.id: pa for pa in self.party_repo.list_by_ids(missing.values())}
+            for order_id, party_id in missing.items():
+                pa = parties.get(party_id)
+                if pa is not None and pa.subject_type == PartySubjectType.CLIENT:
+                    clients[order_id] = pa.subject_id
+        return clients
+
+    def issue_for_orders(self, payloads: List[Dict[str, Any]], now: Optional[datetime] = None) -> int:
+        """
+        Devuelve cuántos cupones se emitieron (las repeticiones no cuentan).
+        ValueError si algún payload es inválido (handle_order_paid los filtra antes).
+        """
+        return self._issue([self._parse(p) for p in payloads], now)
+
+    def _issue(self, payloads: List[Dict[str, Any]], now: Optional[datetime] = None) -> int:
+        now = now or datetime.now()
+        clients = self._resolve_clients(payloads)
+        orders = [(p["order_id"], p["items"]) for p in payloads if p["order_id"] in clients]
+        product_ids = {it["product_id"] for _oid, items in orders for it in items}
+        if not product_ids:
+            return 0
+
+        by_product: Dict[int, list] = {}
+        for t in self.trigger_repo.list_by_triggers(list(product_ids)):
+            by_product.setdefault(int(t.product_trigger_id), []).append(t)
+        coupon_ids = {int(t.coupon_id) for ts in by_product.values() for t in ts}
+        coupons = {c.id: c for c in self.coupon_repo.find_active_by_ids(list(coupon_ids), now)}
+
+        rows: List[CouponClientData] = []
+        for order_id, items in orders:
+            earned: Dict[int, int] = {}  # coupon_id -> product que lo disparó (primero gana)
+            for it in items:
+                for t in by_product.get(it["product_id"], ()):
+                    t_ptype = t.product_type.value if hasattr(t.product_type, "value") else str(t.product_type)
+                    if str(t_ptype).upper() != it["product_type"]:
+                        continue
+                    if it["quantity"] < int(t.min_quantity or 1):
+                        continue
+                    min_a = Decimal(str(t.min_amount)) if t.min_amount is not None else None
+                    if min_a is not None and (it["amount"] is None or it["amount"] < min_a):
+                        continue
+                    if int(t.coupon_id) in coupons:
+                        earned.setdefault(int(t.coupon_id), it["product_id"])
+            for coupon_id, trigger_id in earned.items():
+                c = coupons[coupon_id]
+                rows.append(CouponClientData(
+                    coupon_id=coupon_id,
+                    client_id=clients[order_id],
+                    code=self._new_code(),
+                    status=CouponClientStatus.ACTIVE,
+                    valid_from=c.start_date,
+                    valid_to=c.end_date,
+                    source_trigger_id=trigger_id,
+                    source_order_id=order_id,
+                ))
+        return self.coupon_client_repo.bulk_issue(rows)
+
+    def handle_order_paid(self, events: List[OutboxEvent]) -> Dict[int, str]:
+        """
+        Handler para OutboxWorker (se ejecuta dentro de la transacción del lote). Un
+        evento con payload inválido se devuelve como rechazado (dead letter) sin
+        bloquear la emisión del resto del lote.
+        """
+        payloads: List[Dict[str, Any]] = []
+        rejected: Dict[int, str] = {}
+        for e in events:
+            try:
+                payloads.append(self._parse(dict(e.payload, order_id=e.aggregate_id)))
+            except ValueError as ve:
+                rejected[e.id] = f"invalid order.paid payload: {ve}"
+        if payloads:
+            self._issue(payloads)
+        return rejected
@@ -1,13 +1,16 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Iterator, Dict, Any
 
+from coupons.coupons_client.domain.entities.coupon_wallet import CouponWalletPage
 from coupons.coupons_client.domain.entities.cupon_client import CouponClientData
 from coupons.coupons_client.infraestructure.repositories.coupon_client_repository import CouponClientRepository
+from coupons.coupons_client.infraestructure.wallet_cache import ClientWalletCache
 
 
 class CouponClientQueryService:
-    def __init__(self, repo: CouponClientRepository):
+    def __init__(self, repo: CouponClientRepository, wallet_cache: Optional[ClientWalletCache] = None):
         self.repo = repo
+        self.wallet_cache = wallet_cache
 
     def get_by_id(self, id_: int) -> Optional[CouponClientData]:
         return self.repo.get_by_id(id_)
@@ -15,5 +18,15 @@ class CouponClientQueryService:
     def list_by_client(self, client_id: int) -> List[CouponClientData]:
         return self.repo.list_by_client(client_id)
 
+    def iter_export_by_coupon(self, coupon_id: int) -> Iterator[Dict[str, Any]]:
+        return self.repo.iter_export_by_coupon(coupon_id)
+
     def list_active_for_client(self, client_id: int, now: Optional[datetime] = None) -> List[CouponClientData]:
-        return self.repo.list_active_for_client(client_id, now)
\ No newline at end of file
+        return self.repo.list_active_for_client(client_id, now)
+
+    def wallet(self, client_id: int, active_only: bool = False, cursor: Optional[int] = None,
+               limit: int = 50) -> CouponWalletPage:
+        load = lambda: self.repo.list_wallet(client_id, active_only, cursor=cursor, limit=limit)  # noqa: E731
+        if self.wallet_cache is None:
+            return load()
+        return self.wallet_cache.get_or_load(client_id, f"{int(active_only)}:{cursor}:{limit}", load)
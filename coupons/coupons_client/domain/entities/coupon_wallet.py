@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+
+class CouponWalletItemData:
+    """Un cupón del cliente con los datos del cupón que necesita la app para mostrarlo."""
+
+    def __init__(
+        self,
+        coupon_client_id: int,
+        coupon_id: int,
+        code: str,
+        status: str,
+        name: str,
+        business_id: int,
+        discount_type_id: int,
+        value: Decimal,
+        start_date: datetime,
+        end_date: datetime,
+        valid_from: Optional[datetime] = None,
+        valid_to: Optional[datetime] = None,
+        used_at: Optional[datetime] = None,
+        description: Optional[str] = None,
+        max_discount: Optional[Decimal] = None,
+        category_id: Optional[int] = None,
+        category_name: Optional[str] = None,
+        event_id: Optional[int] = None,
+        event_name: Optional[str] = None,
+        show_in_coupon_holder: bool = False,
+        created_at: Optional[datetime] = None,
+    ):
+        self.coupon_client_id = coupon_client_id
+        self.coupon_id = coupon_id
+        self.code = code
+        self.status = status
+        self.valid_from = valid_from
+        self.valid_to = valid_to
+        self.used_at = used_at
+        self.name = name
+        self.description = description
+        self.business_id = business_id
+        self.discount_type_id = discount_type_id
+        self.value = value
+        self.max_discount = max_discount
+        self.start_date = start_date
+        self.end_date = end_date
+        self.category_id = category_id
+        self.category_name = category_name
+        self.event_id = event_id
+        self.event_name = event_name
+        self.show_in_coupon_holder = bool(show_in_coupon_holder)
+        self.created_at = created_at
+
+    def to_dict(self) -> dict:
+        iso = lambda d: d.isoformat() if d else None  # noqa: E731
+        return {
+            "coupon_client_id": self.coupon_client_id,
+            "coupon_id": self.coupon_id,
+            "code": self.code,
+            "status": self.status,
+            "valid_from": iso(self.valid_from),
+            "valid_to": iso(self.valid_to),
+            "used_at": iso(self.used_at),
+            "coupon": {
+                "name": self.name,
+                "description": self.description,
+                "business_id": self.business_id,
+                "discount_type_id": self.discount_type_id,
+                "value": str(self.value) if self.value is not None else None,
+                "max_discount": str(self.max_discount) if self.max_discount is not None else None,
+                "start_date": iso(self.start_date),
+                "end_date": iso(self.end_date),
+                "category_id": self.category_id,
+                "category_name": self.category_name,
+                "event_id": self.event_id,
+                "event_name": self.event_name,
+                "show_in_coupon_holder": self.show_in_coupon_holder,
+            },
+            "created_at": iso(self.created_at),
+        }
+
+
+class CouponWalletPage:
+    """Página de la billetera; next_cursor es None en la última."""
+
+    def __init__(self, items: List[CouponWalletItemData], next_cursor: Optional[int]):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def to_dict(self) -> dict:
+        return {"items": [i.to_dict() for i in self.items], "next_cursor": self.next_cursor}
@@ -25,6 +25,10 @@ class CouponClientModel(Model):
         indexes = (
             (("client_id", "coupon_id", "code"), True),  # unique
             (("client_id", "status"), False),
+            (("client_id", "id"), False),  # billetera: cursor por id dentro del cliente
+            (("coupon_id", "id"), False),  # export por cupón
+            (("source_order_id", "coupon_id"), True),  # una emisión por (orden, cupón); NULLs no chocan
+            (("status", "valid_to"), False),  # vencimiento en lote (expire_due)
         )
 
     def save(self, *args, **kwargs):
@@ -1,12 +1,62 @@
 from __future__ import annotations
+import logging
 from datetime import datetime
-from typing import List, Optional
+from decimal import Decimal
+from typing import List, Optional, Iterable, Iterator, Dict, Any
 
+from peewee import JOIN, fn
+
+from coupons.coupon.domain.entities.coupon_usage import UsageLimitReachedError
+from coupons.coupon.infraestructure.repositories.coupon_usage_repository import CouponUsageRepository
+from coupons.coupon_code.domain.entities.coupon_code import CouponCodeKind, normalize_code
+from coupons.coupon_code.infraestructure.repositories.coupon_code_repository import CouponCodeRepository
+from coupons.category.infraestructure.model.category_model import CategoryModel
+from coupons.coupon.infraestructure.model.coupon_model import CouponModel
+from coupons.coupons_client.domain.entities.coupon_wallet import CouponWalletItemData, CouponWalletPage
 from coupons.coupons_client.domain.entities.cupon_client import CouponClientData, CouponClientStatus
 from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+from coupons.coupons_client.infraestructure.wallet_cache import ClientWalletCache
+from coupons.event.infraestructure.model.event_model import EventModel
+from coupons.redemption.domain.entities.redemption import RedemptionEntryData, RedemptionKind
+from coupons.redemption.infraestructure.repositories.redemption_ledger_repository import (
+    RedemptionLedgerRepository,
+)
+from shared.infrastructure.server_cursor import iter_dict_rows
+
+log = logging.getLogger(__name__)
+
+
+class _AlreadyUsed(Exception):
+    """Interna: otro canje marcó el cupón USED primero (revierte la transacción)."""
 
 
 class CouponClientRepository:
+    EXPORT_COLUMNS = (
+        "id", "coupon_id", "client_id", "code", "status", "valid_from", "valid_to", "used_at",
+        "source_trigger_id", "source_order_id", "created_at",
+    )
+
+    def __init__(self, usage: Optional[CouponUsageRepository] = None,
+                 ledger: Optional[RedemptionLedgerRepository] = None,
+                 codes: Optional[CouponCodeRepository] = None,
+                 wallet: Optional[ClientWalletCache] = None):
+        # con usage, mark_used respeta max_uses / max_uses_per_client del cupón;
+        # con ledger, emisión/canje/vencimiento dejan su asiento en la misma transacción;
+        # con codes, el código emitido queda en el índice de códigos (único entre coupon_client);
+        # con wallet, cada escritura invalida la billetera cacheada de los clientes tocados
+        self.usage = usage
+        self.ledger = ledger
+        self.codes = codes
+        self.wallet = wallet
+
+    def _touch(self, client_ids: Iterable[int]) -> None:
+        # después del commit: invalidar antes dejaría recachear lo anterior
+        if self.wallet is not None:
+            self.wallet.invalidate(client_ids)
+
+    def _atomic(self):
+        return CouponClientModel._meta.database.atomic()
+
     def _to_entity(self, rec: CouponClientModel) -> CouponClientData:
         return CouponClientData(
             id=rec.id,
@@ -23,19 +73,62 @@ class CouponClientRepository:
         )
 
     def create(self, cc: CouponClientData) -> CouponClientData:
-        rec = CouponClientModel.create(
-            coupon_id=cc.coupon_id,
-            client_id=cc.client_id,
-            code=cc.code,
-            status=cc.status.value if isinstance(cc.status, CouponClientStatus) else str(cc.status),
-            valid_from=cc.valid_from,
-            valid_to=cc.valid_to,
-            used_at=cc.used_at,
-            source_trigger_id=cc.source_trigger_id,
-            source_order_id=cc.source_order_id,
-        )
+        with self._atomic():
+            rec = CouponClientModel.create(
+                coupon_id=cc.coupon_id,
+                client_id=cc.client_id,
+                code=cc.code,
+                status=cc.status.value if isinstance(cc.status, CouponClientStatus) else str(cc.status),
+                valid_from=cc.valid_from,
+                valid_to=cc.valid_to,
+                used_at=cc.used_at,
+                source_trigger_id=cc.source_trigger_id,
+                source_order_id=cc.source_order_id,
+            )
+            if self.codes is not None and normalize_code(rec.code):
+                # CodeConflictError revierte la emisión (un cupón sin código no se indexa)
+                self.codes.claim(rec.code, CouponCodeKind.CLIENT, rec.coupon_id,
+                                 client_id=rec.client_id, coupon_client_id=rec.id)
+            if self.ledger is not None:
+                self.ledger.append(RedemptionEntryData(
+                    kind=RedemptionKind.ISSUED, coupon_id=rec.coupon_id, client_id=rec.client_id,
+                    coupon_client_id=rec.id, order_id=rec.source_order_id, occurred_at=rec.created_at))
+        self._touch([rec.client_id])
         return self._to_entity(rec)
 
+    def bulk_issue(self, items: List[CouponClientData]) -> int:
+        """
+        Emite varios cupones en un solo INSERT. Las filas que chocan con un unique
+        (p. ej. (source_order_id, coupon_id) ya emitido) se ignoran: reintentar es seguro.
+        Devuelve las filas realmente insertadas.
+        """
+        if not items:
+            return 0
+        rows = [{
+            "coupon_id": cc.coupon_id,
+            "client_id": cc.client_id,
+            "code": cc.code,
+            "status": cc.status.value if isinstance(cc.status, CouponClientStatus) else str(cc.status),
+            "valid_from": cc.valid_from,
+            "valid_to": cc.valid_to,
+            "source_trigger_id": cc.source_trigger_id,
+            "source_order_id": cc.source_order_id,
+        } for cc in items]
+        with self._atomic():
+            inserted = CouponClientModel.insert_many(rows).on_conflict_ignore().as_rowcount().execute()
+            if inserted and self.ledger is not None:
+                # las ignoradas no tienen ese code: solo las insertadas reciben asiento
+                self.ledger.append_issued((r["client_id"], r["coupon_id"], r["code"]) for r in rows)
+            if inserted and self.codes is not None:
+                claimed = self.codes.claim_coupon_clients((r["client_id"], r["coupon_id"], r["code"]) for r in rows)
+                if claimed < inserted:
+                    # el lote no se revierte por un choque: esos cupones no resuelven por /by-code
+                    log.warning("bulk_issue: %d of %d codes already in use by another owner",
+                                inserted - claimed, inserted)
+        if inserted:
+            self._touch(r["client_id"] for r in rows)
+        return inserted
+
     def get_by_id(self, id_: int) -> Optional[CouponClientData]:
         try:
             rec = CouponClientModel.get(CouponClientModel.id == id_)
@@ -47,6 +140,14 @@ class CouponClientRepository:
         q = CouponClientModel.select().where(CouponClientModel.client_id == client_id)
         return [self._to_entity(r) for r in q]
 
+    def iter_export_by_coupon(self, coupon_id: int) -> Iterator[Dict[str, Any]]:
+        """Cupones emitidos de un cupón como filas dict, con cursor del servidor."""
+        m = CouponClientModel
+        q = (m.select(*[getattr(m, c) for c in self.EXPORT_COLUMNS])
+             .where(m.coupon_id == coupon_id)
+             .order_by(m.id))
+        return iter_dict_rows(q)
+
     def list_active_for_client(self, client_id: int, now: Optional[datetime] = None) -> List[CouponClientData]:
         now = now or datetime.utcnow()
         q = (CouponClientModel
@@ -59,7 +160,66 @@ class CouponClientRepository:
              ))
         return [self._to_entity(r) for r in q]
 
-    def mark_used(self, id_: int, order_id: Optional[int] = None) -> Optional[CouponClientData]:
+    def list_wallet(self, client_id: int, active_only: bool = False, now: Optional[datetime] = None,
+                    cursor: Optional[int] = None, limit: int = 50) -> CouponWalletPage:
+        """
+        Billetera del cliente: coupon_client + coupon (+ nombres de categoría y evento) en
+        una sola consulta, del más nuevo al más viejo. Paginación por cursor (id < cursor)
+        sobre el índice (client_id, id). active_only filtra en SQL la vigencia del
+        coupon_client y del cupón (UTC, como list_active_for_client).
+        """
+        cc, c = CouponClientModel, CouponModel
+        q = (cc.select(cc.id, cc.coupon_id, cc.code, cc.status, cc.valid_from, cc.valid_to, cc.used_at,
+                       cc.created_at, c.name, c.description, c.business_id,
+                       c.discount_type_id.alias("discount_type_id"), c.value, c.max_discount, c.start_date,
+                       c.end_date, c.category_id.alias("category_id"), c.event_id.alias("event_id"),
+                       c.show_in_coupon_holder, CategoryModel.nombre.alias("category_name"),
+                       fn.COALESCE(EventModel.nombre, c.event_name).alias("event_name"))
+             .join(c, on=(c.id == cc.coupon_id))
+             .join(CategoryModel, JOIN.LEFT_OUTER, on=(CategoryModel.id == c.category_id))
+             .join(EventModel, JOIN.LEFT_OUTER, on=(EventModel.id == c.event_id))
+             .where(cc.client_id == client_id))
+        if cursor is not None:
+            q = q.where(cc.id < cursor)
+        if active_only:
+            now = now or datetime.utcnow()
+            q = q.where(
+                (cc.status == CouponClientStatus.ACTIVE.value) &
+                (cc.valid_from.is_null(True) | (cc.valid_from <= now)) &
+                (cc.valid_to.is_null(True) | (cc.valid_to >= now)) &
+                (c.start_date <= now) & (c.end_date >= now)
+            )
+        rows = list(q.order_by(cc.id.desc()).limit(limit + 1).dicts())
+        items = [CouponWalletItemData(
+            coupon_client_id=r["id"],
+            coupon_id=r["coupon_id"],
+            code=r["code"],
+            status=r["status"],
+            valid_from=r["valid_from"],
+            valid_to=r["valid_to"],
+            used_at=r["used_at"],
+            name=r["name"],
+            description=r["description"],
+            business_id=r["business_id"],
+            discount_type_id=r["discount_type_id"],
+            value=r["value"],
+            max_discount=r["max_discount"],
+            start_date=r["start_date"],
+            end_date=r["end_date"],
+            category_id=r["category_id"],
+            category_name=r["category_name"],
+            event_id=r["event_id"],
+            event_name=r["event_name"],
+            show_in_coupon_holder=r["show_in_coupon_holder"],
+            created_at=r["created_at"],
+        ) for r in rows[:limit]]
+        next_cursor = items[-1].coupon_client_id if len(rows) > limit else None
+        return CouponWalletPage(items, next_cursor)
+
+    def mark_used(self, id_: int, order_id: Optional[int] = None, product_id: Optional[int] = None,
+                  discount_amount: Optional[Decimal] = None) -> Optional[CouponClientData]:
+        if self.usage is not None or self.ledger is not None:
+            return self._mark_used_tracked(id_, order_id, product_id, discount_amount)
         try:
             rec = CouponClientModel.get(CouponClientModel.id == id_)
             rec.status = CouponClientStatus.USED.value
@@ -67,14 +227,103 @@ class CouponClientRepository:
             if order_id:
                 rec.source_order_id = order_id
             rec.save()
+            self._touch([rec.client_id])
             return self._to_entity(rec)
         except CouponClientModel.DoesNotExist:
             return None
 
+    def _mark_used_tracked(self, id_: int, order_id: Optional[int], product_id: Optional[int],
+                           discount_amount: Optional[Decimal]) -> Optional[CouponClientData]:
+        """
+        Descuenta el uso de los contadores, marca USED y escribe el asiento REDEEMED
+        en una transacción. UsageLimitReachedError (sin cambios) si el cupón o el
+        cliente no tienen usos. Idempotente: un cupón ya USED se devuelve sin volver a
+        contar, también si otro canje concurrente del mismo cupón gana la carrera.
+        """
+        m = CouponClientModel
+        current = self.get_by_id(id_)
+        if current is None or current.status == CouponClientStatus.USED:
+            return current
+        fields = {"status": CouponClientStatus.USED.value, "used_at": datetime.utcnow(),
+                  "updated_at": datetime.now()}
+        if order_id:
+            fields["source_order_id"] = order_id
+        try:
+            with self._atomic():
+                if self.usage is not None:
+                    self.usage.consume(current.coupon_id, current.client_id)
+                if not m.update(**fields).where((m.id == id_) & (m.status != CouponClientStatus.USED.value)).execute():
+                    # el raise revierte el descuento de los contadores
+                    raise _AlreadyUsed()
+                if self.ledger is not None:
+                    self.ledger.append(RedemptionEntryData(
+                        kind=RedemptionKind.REDEEMED, coupon_id=current.coupon_id, client_id=current.client_id,
+                        coupon_client_id=id_, order_id=order_id, product_id=product_id,
+                        discount_amount=discount_amount, occurred_at=fields["updated_at"]))
+        except _AlreadyUsed:
+            # otro canje del mismo cupón ganó la carrera: se devuelve lo que dejó
+            return self.get_by_id(id_)
+        except UsageLimitReachedError:
+            # ...o ganó y se llevó el último uso; si no quedó USED, el límite es real
+            latest = self.get_by_id(id_)
+            if latest is not None and latest.status == CouponClientStatus.USED:
+                return latest
+            raise
+        self._touch([current.client_id])
+        return self.get_by_id(id_)
+
+    def expire(self, id_: int, now: Optional[datetime] = None) -> Optional[CouponClientData]:
+        """ACTIVE -> EXPIRED (otros estados no cambian). None si no existe."""
+        m = CouponClientModel
+        now = now or datetime.now()
+        with self._atomic():
+            changed = (m.update(status=CouponClientStatus.EXPIRED.value, updated_at=now)
+                       .where((m.id == id_) & (m.status == CouponClientStatus.ACTIVE.value))
+                       .execute())
+            if changed and self.ledger is not None:
+                self.ledger.append_expired([id_], now)
+        current = self.get_by_id(id_)
+        if changed and current is not None:
+            self._touch([current.client_id])
+        return current
+
+    def expire_due(self, limit: int, now: Optional[datetime] = None) -> int:
+        """Vence hasta 'limit' cupones ACTIVE con valid_to pasado (UTC). Devuelve cuántos."""
+        m = CouponClientModel
+        now = now or datetime.utcnow()
+        active = m.status == CouponClientStatus.ACTIVE.value
+        with self._atomic():
+            q = (m.select(m.id)
+                 .where(active & m.valid_to.is_null(False) & (m.valid_to < now))
+                 .order_by(m.valid_to)
+                 .limit(limit))
+            locked = getattr(m._meta.database, "for_update", False)
+            if locked:
+                q = q.for_update(skip_locked=True)
+            ids = [r.id for r in q]
+            if not ids:
+                return 0
+            expired_at = datetime.now()
+            expire = m.update(status=CouponClientStatus.EXPIRED.value, updated_at=expired_at)
+            if locked:
+                expire.where(m.id.in_(ids) & active).execute()
+            else:
+                # sin SKIP LOCKED: solo cuentan las que esta pasada efectivamente venció
+                ids = [i for i in ids if expire.where((m.id == i) & active).execute() == 1]
+            if self.ledger is not None:
+                self.ledger.append_expired(ids, expired_at)
+        if ids and self.wallet is not None:
+            self._touch(r.client_id for r in m.select(m.client_id).where(m.id.in_(ids)).distinct())
+        return len(ids)
+
     def delete(self, id_: int) -> bool:
         try:
             rec = CouponClientModel.get(CouponClientModel.id == id_)
-            rec.delete_instance()
+            with self._atomic():
+                rec.delete_instance()
+                if self.codes is not None:
+                    self.codes.release_coupon_client(id_)
+            self._touch([rec.client_id])
             return True
         except CouponClientModel.DoesNotExist:
             return False
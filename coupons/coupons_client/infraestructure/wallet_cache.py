@@ -0,0 +1,39 @@
+"""
+Caché de la billetera por cliente (páginas de GET /api/coupon-clients/wallet/<client_id>).
+
+Cada cliente tiene un token de versión en el caché y las claves de sus páginas lo
+incluyen: invalidar es reemplazar el token (un SET), sin recorrer ni borrar páginas;
+las viejas vencen solas por TTL. Invalidar a un cliente no toca el caché del resto
+(Cache.clear() vaciaría el namespace completo en cada emisión o canje).
+
+Requiere un backend compartido (CacheBackend.shared): el token lo reemplaza el
+proceso que escribe (web u outbox worker) y tiene que verlo el resto.
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Callable, Iterable, TypeVar
+
+from shared.infrastructure.cache.cache import Cache
+
+T = TypeVar("T")
+
+
+class ClientWalletCache:
+    def __init__(self, cache: Cache):
+        self.cache = cache
+
+    def _version(self, client_id: int) -> str:
+        version = self.cache.get(f"ver:{client_id}")
+        if version is None:
+            # sin token (nunca se pidió o se desalojó): uno nuevo no reutiliza páginas viejas
+            version = uuid.uuid4().hex
+            self.cache.set(f"ver:{client_id}", version, ttl=None)
+        return version
+
+    def get_or_load(self, client_id: int, page_key: str, loader: Callable[[], T]) -> T:
+        return self.cache.get_or_load(f"{client_id}:{self._version(client_id)}:{page_key}", loader)
+
+    def invalidate(self, client_ids: Iterable[int]) -> None:
+        for client_id in set(client_ids):
+            self.cache.set(f"ver:{client_id}", uuid.uuid4().hex, ttl=None)
@@ -1,9 +1,16 @@
 # coupons/coupons_client/interface/coupon_client_routes.py
 from __future__ import annotations
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
 from flask import Blueprint, request, jsonify, current_app
 
+from coupons.coupon.domain.entities.coupon_usage import UsageLimitReachedError
+from coupons.coupon_code.domain.entities.coupon_code import CodeConflictError
+from shared.serialization.entity_serializer import EntitySerializer
+from shared.serialization.export import export_response
+from shared.serialization.streaming import list_response
+
 coupon_client_bp = Blueprint("coupon_client_api", __name__, url_prefix="/api/coupon-clients")
 
 # -----------------------------------------------------------
@@ -35,31 +42,20 @@ def _dt(v: Optional[str]) -> Optional[datetime]:
     # admite ...Z
     return datetime.fromisoformat(str(v).replace("Z", "+00:00")).replace(tzinfo=None)
 
-def _to_json(x) -> dict:
-    # status puede ser Enum o string
-    status = getattr(x, "status", None)
-    if hasattr(status, "value"):
-        status = status.value
-    elif status is not None:
-        status = str(status)
-
-    def _iso(attr: str):
-        val = getattr(x, attr, None)
-        return val.isoformat() if val else None
-
-    return {
-        "id": getattr(x, "id", None),
-        "coupon_id": getattr(x, "coupon_id", None),
-        "client_id": getattr(x, "client_id", None),
-        "code": getattr(x, "code", ""),
-        "status": status,
-        "valid_from": _iso("valid_from"),
-        "valid_to": _iso("valid_to"),
-        "used_at": _iso("used_at"),
-        "source_trigger_id": getattr(x, "source_trigger_id", None),
-        "source_order_id": getattr(x, "source_order_id", None),
-        "created_at": _iso("created_at"),
-    }
+COUPON_CLIENT_SERIALIZER = EntitySerializer({
+    "id": None,
+    "coupon_id": None,
+    "client_id": None,
+    "code": (None, None, ""),
+    "status": "enum",  # status puede ser Enum o string
+    "valid_from": "datetime",
+    "valid_to": "datetime",
+    "used_at": "datetime",
+    "source_trigger_id": None,
+    "source_order_id": None,
+    "created_at": "datetime",
+})
+_to_json = COUPON_CLIENT_SERIALIZER
 
 # ----------------- CREATE -----------------
 @coupon_client_bp.route("", methods=["POST"])
@@ -98,6 +94,8 @@ def assign_coupon_to_client():
             source_order_id=source_order_id,
         )
         return jsonify(_to_json(created)), 201
+    except CodeConflictError as ce:
+        return jsonify({"error": str(ce)}), 409
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -113,7 +111,7 @@ def list_with_filters():
             return jsonify({"error": "client_id is required"}), 400
 
         rows = qry.list_active_for_client(client_id) if active_only else qry.list_by_client(client_id)
-        return jsonify([_to_json(r) for r in rows]), 200
+        return list_response(rows, COUPON_CLIENT_SERIALIZER)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -124,7 +122,41 @@ def list_by_client(client_id: int):
     try:
         active_only = (request.args.get("active_only", "false").lower() in ("1", "true", "yes"))
         rows = qry.list_active_for_client(client_id) if active_only else qry.list_by_client(client_id)
-        return jsonify([_to_json(r) for r in rows]), 200
+        return list_response(rows, COUPON_CLIENT_SERIALIZER)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+# ----------------- BILLETERA del cliente -----------------
+MAX_WALLET_PAGE = 200
+
+
+@coupon_client_bp.route("/wallet/<int:client_id>", methods=["GET"])
+def wallet(client_id: int):
+    """
+    Cupones del cliente con los datos del cupón (nombre, valor, vigencia, categoría, evento)
+    en una sola consulta: ?active_only=true&limit=50&cursor=<next_cursor de la página anterior>.
+    """
+    _cmd, qry = _svc()
+    try:
+        active_only = (request.args.get("active_only", "false").lower() in ("1", "true", "yes"))
+        cursor = request.args.get("cursor", type=int)
+        limit = min(max(1, request.args.get("limit", default=50, type=int)), MAX_WALLET_PAGE)
+        page = qry.wallet(client_id, active_only=active_only, cursor=cursor, limit=limit)
+        return jsonify(dict(page.to_dict(), client_id=client_id)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+# ----------------- EXPORT por cupón (NDJSON / CSV en streaming) -----------------
+@coupon_client_bp.route("/by-coupon/<int:coupon_id>/export", methods=["GET"])
+def export_by_coupon(coupon_id: int):
+    _cmd, qry = _svc()
+    try:
+        return export_response(
+            qry.iter_export_by_coupon(coupon_id),
+            qry.repo.EXPORT_COLUMNS,
+            fmt=request.args.get("format", "ndjson"),
+            filename=f"coupon-{coupon_id}-clients",
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -140,16 +172,27 @@ def get_cc(cc_id: int):
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+def _redeem_args(data: dict) -> dict:
+    # order_id / product_id / discount_amount quedan en el redemption ledger
+    discount = data.get("discount_amount")
+    return {
+        "order_id": data.get("order_id"),
+        "product_id": int(data["product_id"]) if data.get("product_id") is not None else None,
+        "discount_amount": Decimal(str(discount)) if discount is not None else None,
+    }
+
 # ----------------- REDEEM (alias nuevo) -----------------
 @coupon_client_bp.route("/<int:cc_id>/redeem", methods=["PUT"])
 def redeem_cc(cc_id: int):
     cmd, _ = _svc()
     data = request.get_json(silent=True) or {}
     try:
-        updated = cmd.mark_used(cc_id, data.get("order_id"))
+        updated = cmd.mark_used(cc_id, **_redeem_args(data))
         if not updated:
             return jsonify({"error": "not found"}), 404
         return jsonify(_to_json(updated)), 200
+    except UsageLimitReachedError as le:
+        return jsonify({"error": str(le)}), 409
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -159,17 +202,26 @@ def mark_used(cc_id: int):
     cmd, _ = _svc()
     data = request.get_json(silent=True) or {}
     try:
-        updated = cmd.mark_used(cc_id, data.get("order_id"))
+        updated = cmd.mark_used(cc_id, **_redeem_args(data))
         if not updated:
             return jsonify({"error": "not found"}), 404
         return jsonify(_to_json(updated)), 200
+    except UsageLimitReachedError as le:
+        return jsonify({"error": str(le)}), 409
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-# ----------- EXPIRE (placeholder) -------------
+# ----------- EXPIRE -------------
 @coupon_client_bp.route("/<int:cc_id>/expire", methods=["PUT"])
 def expire_cc(cc_id: int):
-    return jsonify({"error": "expire not implemented"}), 501
+    cmd, _ = _svc()
+    try:
+        updated = cmd.expire(cc_id)
+        if not updated:
+            return jsonify({"error": "not found"}), 404
+        return jsonify(_to_json(updated)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
 # ----------------- DELETE -----------------
 @coupon_client_bp.route("/<int:cc_id>", methods=["DELETE"])
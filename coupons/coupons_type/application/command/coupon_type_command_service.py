@@ -2,17 +2,25 @@ from typing import Optional
 
 from coupons.coupons_type.domain.entities.coupon_type import CouponTypeData
 from coupons.coupons_type.infraestructure.repositories.coupon_type_repository import CouponTypeRepository
+from shared.infrastructure.catalog_cache import CatalogCache
 
 
 class CouponTypeCommandService:
-    def __init__(self, repo: CouponTypeRepository):
+    def __init__(self, repo: CouponTypeRepository, cache: Optional[CatalogCache] = None):
         self.repo = repo
+        self.cache = cache
+
+    def _invalidate(self) -> None:
+        if self.cache is not None:
+            self.cache.invalidate()
 
     def create(self, name: str, description: Optional[str] = None) -> CouponTypeData:
         if not name or str(name).strip() == "":
             raise ValueError("name is required")
         entity = CouponTypeData(name=name, description=description)
-        return self.repo.create(entity)
+        created = self.repo.create(entity)
+        self._invalidate()
+        return created
 
     def update(self, id_: int, name: str, description: Optional[str] = None) -> Optional[CouponTypeData]:
         current = self.repo.get_by_id(id_)
@@ -20,7 +28,12 @@ class CouponTypeCommandService:
             raise ValueError("CouponType not found.")
         current.name = name.strip()
         current.description = description.strip() if description else None
-        return self.repo.update(current)
+        updated = self.repo.update(current)
+        self._invalidate()
+        return updated
 
     def delete(self, id_: int) -> bool:
-        return self.repo.delete(id_)
+        deleted = self.repo.delete(id_)
+        if deleted:
+            self._invalidate()
+        return deleted
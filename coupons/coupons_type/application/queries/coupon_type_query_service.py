@@ -2,17 +2,32 @@ from typing import List, Optional
 
 from coupons.coupons_type.domain.entities.coupon_type import CouponTypeData
 from coupons.coupons_type.infraestructure.repositories.coupon_type_repository import CouponTypeRepository
+from shared.infrastructure.catalog_cache import CatalogCache
+from shared.infrastructure.table_fingerprint import TableFingerprint
 
 
 class CouponTypeQueryService:
-    def __init__(self, repo: CouponTypeRepository):
+    def __init__(self, repo: CouponTypeRepository, cache: Optional[CatalogCache] = None):
         self.repo = repo
+        self.cache = cache
 
     def get_by_id(self, id_: int) -> Optional[CouponTypeData]:
+        if self.cache is not None:
+            return self.cache.get_by_id(id_)
         return self.repo.get_by_id(id_)
 
     def list_all(self) -> List[CouponTypeData]:
+        if self.cache is not None:
+            return self.cache.list_all()
         return self.repo.get_all()
 
     def find_by_name(self, name: Optional[str] = None) -> List[CouponTypeData]:
+        if self.cache is not None:
+            row = self.cache.get_by_name(name) if name else None
+            return [row] if row else []
         return self.repo.find_by_name(name)
+
+    def fingerprint(self) -> TableFingerprint:
+        if self.cache is not None:
+            return self.cache.fingerprint()
+        return self.repo.fingerprint()
@@ -1,4 +1,4 @@
-from peewee import Model, AutoField, CharField, TextField, TimestampField
+from peewee import Model, AutoField, CharField, TextField, TimestampField, DateTimeField
 import datetime
 from shared.infrastructure.database import db
 
@@ -8,7 +8,12 @@ class CouponTypeModel(Model):
     name = CharField(max_length=50, unique=True, null=False)
     description = CharField(max_length=150, null=True)
     created_at = TimestampField(default=datetime.datetime.now, null=False)
+    updated_at = DateTimeField(default=datetime.datetime.now, null=False)
 
     class Meta:
         database = db
         table_name = 'coupon_type'
+
+    def save(self, *args, **kwargs):
+        self.updated_at = datetime.datetime.now()
+        return super().save(*args, **kwargs)
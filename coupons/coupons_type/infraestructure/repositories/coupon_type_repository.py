@@ -2,6 +2,7 @@ from typing import Optional, List
 
 from coupons.coupons_type.domain.entities.coupon_type import CouponTypeData
 from coupons.coupons_type.infraestructure.model.coupon_type_model import CouponTypeModel
+from shared.infrastructure.table_fingerprint import TableFingerprint, table_fingerprint
 
 
 class CouponTypeRepository:
@@ -51,3 +52,6 @@ class CouponTypeRepository:
             return True
         except CouponTypeModel.DoesNotExist:
             return False
+
+    def fingerprint(self) -> TableFingerprint:
+        return table_fingerprint(CouponTypeModel)
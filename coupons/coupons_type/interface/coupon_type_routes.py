@@ -1,6 +1,8 @@
 # coupons/coupons_type/api/coupon_type_routes.py
 from flask import Blueprint, request, jsonify, current_app
 
+from shared.serialization.conditional import conditional_response
+
 coupon_type_bp = Blueprint("coupon_type_api", __name__, url_prefix="/api/coupon-types")
 
 
@@ -49,11 +51,10 @@ def create_coupon_type():
 def list_coupon_types():
     _cmd, qry = _svc()
     try:
-        rows = qry.list_all()
-        return jsonify([
+        return conditional_response(qry.fingerprint(), lambda: jsonify([
             {"id": r.id, "name": r.name, "description": r.description}
-            for r in rows
-        ]), 200
+            for r in qry.list_all()
+        ]))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
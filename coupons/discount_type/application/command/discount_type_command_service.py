@@ -2,24 +2,37 @@ from typing import Optional
 
 from coupons.discount_type.domain.entities.discount_type import DiscountTypeName, DiscountTypeData
 from coupons.discount_type.infraestructure.repositories.discount_type_repository import DiscountTypeRepository
+from shared.infrastructure.catalog_cache import CatalogCache
 
 
 class DiscountTypeCommandService:
-    def __init__(self, repo: DiscountTypeRepository):
+    def __init__(self, repo: DiscountTypeRepository, cache: Optional[CatalogCache] = None):
         self.repo = repo
+        self.cache = cache
+
+    def _invalidate(self) -> None:
+        if self.cache is not None:
+            self.cache.invalidate()
 
     def create(self, name: str | DiscountTypeName) -> DiscountTypeData:
         if name is None or str(name).strip() == "":
             raise ValueError("name is required")
         entity = DiscountTypeData(name=name)
-        return self.repo.create(entity)
+        created = self.repo.create(entity)
+        self._invalidate()
+        return created
 
     def update(self, id_: int, name: str | DiscountTypeName) -> Optional[DiscountTypeData]:
         current = self.repo.get_by_id(id_)
         if not current:
             raise ValueError("DiscountType not found.")
         current.name = (name.value if isinstance(name, DiscountTypeName) else str(name).strip())
-        return self.repo.update(current)
+        updated = self.repo.update(current)
+        self._invalidate()
+        return updated
 
     def delete(self, id_: int) -> bool:
-        return self.repo.delete(id_)
+        deleted = self.repo.delete(id_)
+        if deleted:
+            self._invalidate()
+        return deleted
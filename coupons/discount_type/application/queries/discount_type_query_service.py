@@ -2,17 +2,32 @@ from typing import List, Optional
 
 from coupons.discount_type.domain.entities.discount_type import DiscountTypeData, DiscountTypeName
 from coupons.discount_type.infraestructure.repositories.discount_type_repository import DiscountTypeRepository
+from shared.infrastructure.catalog_cache import CatalogCache
+from shared.infrastructure.table_fingerprint import TableFingerprint
 
 
 class DiscountTypeQueryService:
-    def __init__(self, repo: DiscountTypeRepository):
+    def __init__(self, repo: DiscountTypeRepository, cache: Optional[CatalogCache] = None):
         self.repo = repo
+        self.cache = cache
 
     def get_by_id(self, id_: int) -> Optional[DiscountTypeData]:
+        if self.cache is not None:
+            return self.cache.get_by_id(id_)
         return self.repo.get_by_id(id_)
 
     def list_all(self) -> List[DiscountTypeData]:
+        if self.cache is not None:
+            return self.cache.list_all()
         return self.repo.get_all()
 
     def find_by_name(self, name: Optional[str | DiscountTypeName] = None) -> List[DiscountTypeData]:
+        if self.cache is not None:
+            row = self.cache.get_by_name(name) if name else None
+            return [row] if row else []
         return self.repo.find_by_name(name)
+
+    def fingerprint(self) -> TableFingerprint:
+        if self.cache is not None:
+            return self.cache.fingerprint()
+        return self.repo.fingerprint()
@@ -1,4 +1,5 @@
-from peewee import Model, AutoField, CharField
+import datetime
+from peewee import Model, AutoField, CharField, DateTimeField
 
 from coupons.discount_type.domain.entities.discount_type import DiscountTypeName
 from shared.infrastructure.database import db
@@ -12,7 +13,12 @@ class DiscountTypeModel(Model):
         null=False,
         choices=[(e.value, e.value) for e in DiscountTypeName]
     )
+    updated_at = DateTimeField(default=datetime.datetime.now, null=False)
 
     class Meta:
         database = db
         table_name = 'discount_type'
+
+    def save(self, *args, **kwargs):
+        self.updated_at = datetime.datetime.now()
+        return super().save(*args, **kwargs)
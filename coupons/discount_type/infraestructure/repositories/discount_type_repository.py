@@ -2,6 +2,7 @@ from typing import Optional, List
 
 from coupons.discount_type.domain.entities.discount_type import DiscountTypeData, DiscountTypeName
 from coupons.discount_type.infraestructure.model.discount_type_model import DiscountTypeModel
+from shared.infrastructure.table_fingerprint import TableFingerprint, table_fingerprint
 
 
 class DiscountTypeRepository:
@@ -53,3 +54,6 @@ class DiscountTypeRepository:
             return True
         except DiscountTypeModel.DoesNotExist:
             return False
+
+    def fingerprint(self) -> TableFingerprint:
+        return table_fingerprint(DiscountTypeModel)
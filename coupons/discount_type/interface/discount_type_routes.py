@@ -1,6 +1,8 @@
 # coupons/discount_type/interface/discount_type_routes.py
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, current_app
 from coupons.discount_type.infraestructure.model.discount_type_model import DiscountTypeModel
+from shared.infrastructure.table_fingerprint import table_fingerprint
+from shared.serialization.conditional import conditional_response
 
 discount_type_bp = Blueprint("discount_type_api", __name__, url_prefix="/api/discount-types")
 
@@ -12,8 +14,19 @@ def _canon(name: str) -> str:
         return "AMOUNT"
     return s.upper()
 
+def _qry():
+    services = current_app.config.get("coupon_services") or {}
+    return services.get("discount_type_query_service")
+
+
 @discount_type_bp.get("")
 def list_discount_types():
-    rows = list(DiscountTypeModel.select())
-    # En tu tabla tienes 'percentage' y 'amount' → se devuelven tal cual
-    return jsonify([{"id": r.id, "name": r.name} for r in rows]), 200
+    qry = _qry()
+
+    def build():
+        # catálogo cacheado en memoria si hay services; si no, directo a la tabla
+        rows = qry.list_all() if qry else list(DiscountTypeModel.select())
+        # En tu tabla tienes 'percentage' y 'amount' → se devuelven tal cual
+        return jsonify([{"id": r.id, "name": r.name} for r in rows])
+    fingerprint = qry.fingerprint() if qry else table_fingerprint(DiscountTypeModel)
+    return conditional_response(fingerprint, build)
@@ -3,17 +3,31 @@ from typing import Optional, List
 
 from coupons.event.domain.entities.event import EventData
 from coupons.event.infraestructure.repositories.event_repository import EventRepository
+from shared.infrastructure.catalog_cache import CatalogCache
+from shared.infrastructure.table_fingerprint import TableFingerprint
 
 
 class EventQueryService:
-    def __init__(self, repo: EventRepository):
+    def __init__(self, repo: EventRepository, cache: Optional[CatalogCache] = None):
         self.repo = repo
+        self.cache = cache
 
     def get_by_id(self, id_: int) -> Optional[EventData]:
+        if self.cache is not None:
+            return self.cache.get_by_id(id_)
         return self.repo.get_by_id(id_)
 
     def get_by_nombre(self, nombre: str) -> Optional[EventData]:
+        if self.cache is not None:
+            return self.cache.get_by_name(nombre) if nombre else None
         return self.repo.get_by_nombre(nombre)
 
     def list_all(self) -> List[EventData]:
+        if self.cache is not None:
+            return self.cache.list_all()
         return self.repo.list_all()
+
+    def fingerprint(self) -> TableFingerprint:
+        if self.cache is not None:
+            return self.cache.fingerprint()
+        return self.repo.fingerprint()
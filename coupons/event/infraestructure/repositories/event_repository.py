@@ -3,6 +3,7 @@ from typing import Optional, List
 
 from coupons.event.domain.entities.event import EventData
 from coupons.event.infraestructure.model.event_model import EventModel
+from shared.infrastructure.table_fingerprint import TableFingerprint, table_fingerprint
 
 
 class EventRepository:
@@ -57,3 +58,6 @@ class EventRepository:
             return True
         except EventModel.DoesNotExist:
             return False
+
+    def fingerprint(self) -> TableFingerprint:
+        return table_fingerprint(EventModel)
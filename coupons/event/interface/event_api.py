@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from flask import Blueprint, request, jsonify, current_app
 
+from shared.serialization.conditional import conditional_response
+
 event_bp = Blueprint("coupon_event_api", __name__, url_prefix="/api/coupon-events")
 
 
@@ -52,11 +54,13 @@ def list_events():
     _cmd, qry = _svc()
     try:
         nombre = request.args.get("nombre", type=str)
-        if nombre:
-            row = qry.get_by_nombre(nombre)
-            return jsonify([] if row is None else [_event_to_json(row)]), 200
-        rows = qry.list_all()
-        return jsonify([_event_to_json(r) for r in rows]), 200
+
+        def build():
+            if nombre:
+                row = qry.get_by_nombre(nombre)
+                return jsonify([] if row is None else [_event_to_json(row)])
+            return jsonify([_event_to_json(r) for r in qry.list_all()])
+        return conditional_response(qry.fingerprint(), build)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
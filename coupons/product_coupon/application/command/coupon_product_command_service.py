@@ -5,11 +5,18 @@ from coupons.product_coupon.domain.entities.coupon_product import (
     CouponProductData, ProductType, CouponProductStatus
 )
 from coupons.product_coupon.infraestructure.repositories.coupon_product_repository import CouponProductRepository
+from shared.infrastructure.change_feed import ChangeRecorder, change_scope
 
 
 class CouponProductCommandService:
-    def __init__(self, repo: CouponProductRepository):
+    def __init__(self, repo: CouponProductRepository, changes: Optional[ChangeRecorder] = None):
         self.repo = repo
+        self.changes = changes
+
+    def _changed(self, op: str, coupon_id: int, data: Optional[Dict] = None) -> None:
+        # El agregado es el cupón: los consumidores rearman sus mappings por coupon_id
+        if self.changes is not None:
+            self.changes.record("coupon_product", coupon_id, op, data)
 
     def add_mapping(
         self,
@@ -28,7 +35,10 @@ class CouponProductCommandService:
             stock=stock,
             status=status,
         )
-        return self.repo.add(entity)
+        with change_scope(self.changes):
+            saved = self.repo.add(entity)
+            self._changed("upserted", saved.coupon_id, saved.to_dict())
+        return saved
 
     def bulk_add_mappings(self, coupon_id: int, items: List[Dict]) -> List[CouponProductData]:
         """
@@ -39,11 +49,19 @@ class CouponProductCommandService:
         """
         if not items:
             return []
-        return self.repo.bulk_add(coupon_id, items)
+        with change_scope(self.changes):
+            saved = self.repo.bulk_add(coupon_id, items)
+            for m in saved:
+                self._changed("upserted", coupon_id, m.to_dict())
+        return saved
 
     def remove_mapping(self, coupon_id: int, product_id: int) -> bool:
         """Compat: elimina por (coupon, product_id)."""
-        return self.repo.remove(coupon_id, product_id)
+        with change_scope(self.changes):
+            removed = self.repo.remove(coupon_id, product_id)
+            if removed:
+                self._changed("deleted", coupon_id, {"coupon_id": coupon_id, "product_id": product_id})
+        return removed
 
     def remove_by_combo(
         self,
@@ -53,10 +71,19 @@ class CouponProductCommandService:
         product_type: Optional[str] = None,
     ) -> int:
         """Elimina respetando code/product_type si se envían. Devuelve cantidad borrada."""
-        return self.repo.remove_by_combo(coupon_id, product_id, code=code, product_type=product_type)
+        with change_scope(self.changes):
+            removed = self.repo.remove_by_combo(coupon_id, product_id, code=code, product_type=product_type)
+            if removed:
+                self._changed("deleted", coupon_id, {"coupon_id": coupon_id, "product_id": product_id,
+                                                     "code": code, "product_type": product_type})
+        return removed
 
     def remove_all_for_coupon(self, coupon_id: int) -> int:
-        return self.repo.remove_all_for_coupon(coupon_id)
+        with change_scope(self.changes):
+            removed = self.repo.remove_all_for_coupon(coupon_id)
+            if removed:
+                self._changed("deleted_all", coupon_id, {"coupon_id": coupon_id})
+        return removed
 
     # ===== NUEVO: consumir 1 de stock =====
     def consume_one(
@@ -71,4 +98,21 @@ class CouponProductCommandService:
         Si stock es NULL (sin control), no cambia stock/status.
         Devuelve dict resumen o None si no existe el mapping.
         """
-        return self.repo.consume_one(coupon_id, product_id, code=code, product_type=product_type)
+        with change_scope(self.changes):
+            result, changed = self.repo.consume_one(coupon_id, product_id, code=code, product_type=product_type)
+            # agotado o sin control de stock no cambia nada: no se publica
+            if changed:
+                self._changed("stock_consumed", coupon_id, result)
+        return result
+
+    # ===== Stock sharded (mappings "hot") =====
+    def set_sharding(self, coupon_id: int, product_id: int, shards: int) -> Optional[Dict]:
+        """shards > 0 reparte el stock en N sub-contadores; 0 lo vuelve a la fila. None si no existe."""
+        with change_scope(self.changes):
+            result = self.repo.set_shard_count(coupon_id, product_id, shards)
+            if result is not None:
+                self._changed("sharding_changed", coupon_id, result)
+        return result
+
+    def rebalance_shards(self, coupon_id: int, product_id: int) -> Optional[Dict]:
+        return self.repo.rebalance_shards(coupon_id, product_id)
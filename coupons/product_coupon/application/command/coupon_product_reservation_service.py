@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+import time
+from datetime import timedelta
+from typing import Optional
+
+from coupons.product_coupon.domain.entities.coupon_product_hold import CouponProductHoldData
+from coupons.product_coupon.infraestructure.repositories.coupon_product_hold_repository import (
+    CouponProductHoldRepository,
+)
+
+
+class CouponProductReservationService:
+    """
+    reserve -> hold (TTL) -> commit (al pagar) | release (carrito abandonado) | expiración (sweep).
+    """
+
+    DEFAULT_TTL_SECONDS = int(os.getenv("STOCK_HOLD_TTL_SECONDS", "900"))
+    MAX_TTL_SECONDS = 24 * 3600
+
+    def __init__(self, repo: CouponProductHoldRepository):
+        self.repo = repo
+
+    def reserve(
+        self,
+        coupon_id: int,
+        product_id: int,
+        quantity: int = 1,
+        ttl_seconds: Optional[int] = None,
+    ) -> Optional[CouponProductHoldData]:
+        if int(quantity) <= 0:
+            raise ValueError("quantity must be > 0")
+        ttl = int(ttl_seconds) if ttl_seconds is not None else self.DEFAULT_TTL_SECONDS
+        if not 0 < ttl <= self.MAX_TTL_SECONDS:
+            raise ValueError(f"ttl_seconds must be between 1 and {self.MAX_TTL_SECONDS}")
+        return self.repo.reserve(coupon_id, product_id, int(quantity), timedelta(seconds=ttl))
+
+    def commit(self, hold_id: str) -> Optional[CouponProductHoldData]:
+        return self.repo.commit(hold_id)
+
+    def release(self, hold_id: str) -> Optional[CouponProductHoldData]:
+        return self.repo.release(hold_id)
+
+    def get(self, hold_id: str) -> Optional[CouponProductHoldData]:
+        return self.repo.get(hold_id)
+
+    def sweep_expired(self, batch_size: int = 500, max_batches: Optional[int] = None) -> int:
+        """Lotes cortos (una transacción cada uno) hasta vaciar los vencidos."""
+        total, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            n = self.repo.sweep_expired(batch_size)
+            total += n
+            batches += 1
+            if n < batch_size:
+                break
+        return total
+
+    def run_sweeper(self, interval: float = 5.0, batch_size: int = 500, stop=None) -> None:
+        while stop is None or not stop.is_set():
+            self.sweep_expired(batch_size)
+            if stop is not None:
+                stop.wait(interval)
+            else:
+                time.sleep(interval)
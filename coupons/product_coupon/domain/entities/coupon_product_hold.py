@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+
+class HoldStatus(Enum):
+    HELD = "HELD"
+    COMMITTED = "COMMITTED"
+    RELEASED = "RELEASED"
+    EXPIRED = "EXPIRED"
+
+
+class InsufficientStockError(ValueError):
+    """No hay unidades disponibles para reservar."""
+
+
+class HoldNotActiveError(ValueError):
+    """El hold ya fue liberado o expiró (no se puede confirmar)."""
+
+
+class CouponProductHoldData:
+    """
+    Reserva temporal de stock de un mapping cupón↔producto.
+      - tracked=False: el mapping no controla stock (stock NULL); el hold no mueve unidades
+      - sharded=True: las unidades salieron de los shards del mapping (no de coupon_product.stock)
+      - expires_at: pasado este instante el sweep devuelve las unidades
+    """
+    def __init__(
+        self,
+        hold_id: str,
+        coupon_id: int,
+        product_id: int,
+        quantity: int,
+        expires_at: datetime,
+        status: HoldStatus | str = HoldStatus.HELD,
+        tracked: bool = True,
+        sharded: bool = False,
+        id: Optional[int] = None,
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+    ):
+        if not hold_id:
+            raise ValueError("hold_id is required")
+        if quantity is None or int(quantity) <= 0:
+            raise ValueError("quantity must be > 0")
+        self.id = id
+        self.hold_id = str(hold_id)
+        self.coupon_id = int(coupon_id)
+        self.product_id = int(product_id)
+        self.quantity = int(quantity)
+        self.expires_at = expires_at
+        self.status = status if isinstance(status, HoldStatus) else HoldStatus(str(status))
+        self.tracked = bool(tracked)
+        self.sharded = bool(sharded)
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def to_dict(self):
+        return {
+            "hold_id": self.hold_id,
+            "coupon_id": self.coupon_id,
+            "product_id": self.product_id,
+            "quantity": self.quantity,
+            "status": self.status.value,
+            "tracked": self.tracked,
+            "sharded": self.sharded,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
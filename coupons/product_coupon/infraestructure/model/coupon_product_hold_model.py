@@ -0,0 +1,34 @@
+import datetime
+
+from peewee import (
+    Model, AutoField, BigIntegerField, BooleanField, CharField, DateTimeField, IntegerField
+)
+
+from shared.infrastructure.database import db
+
+
+class CouponProductHoldModel(Model):
+    id = AutoField(primary_key=True)
+    hold_id = CharField(max_length=32, null=False, unique=True)
+    coupon_id = BigIntegerField(null=False)   # FK lógica a coupon_product (coupon, product_id)
+    product_id = BigIntegerField(null=False)
+    quantity = IntegerField(null=False)
+    tracked = BooleanField(null=False, default=True)
+    sharded = BooleanField(null=False, default=False)  # unidades tomadas de los shards (no de la fila)
+    status = CharField(max_length=16, null=False, default="HELD")  # HELD|COMMITTED|RELEASED|EXPIRED
+    expires_at = DateTimeField(null=False)
+
+    created_at = DateTimeField(default=datetime.datetime.now, null=False)
+    updated_at = DateTimeField(default=datetime.datetime.now, null=False)
+
+    class Meta:
+        database = db
+        table_name = "coupon_product_holds"
+        indexes = (
+            (("status", "expires_at"), False),  # sweep de vencidos
+            (("coupon_id", "product_id"), False),
+        )
+
+    def save(self, *args, **kwargs):
+        self.updated_at = datetime.datetime.now()
+        return super().save(*args, **kwargs)
@@ -21,7 +21,10 @@ class CouponProductModel(Model):
     product_type = CharField(max_length=16, null=False, choices=[("PRODUCT", "PRODUCT"), ("SERVICE", "SERVICE")])
 
     # NUEVOS
-    stock = IntegerField(null=True)  # >=0, opcional
+    stock = IntegerField(null=True)  # >=0, opcional; con reservas = unidades disponibles
+    reserved = IntegerField(null=False, default=0)  # unidades retenidas por holds vigentes
+    # > 0: mapping "hot"; el stock vive repartido en coupon_product_stock_shards y aquí queda en 0
+    shard_count = IntegerField(null=False, default=0)
     status = CharField(max_length=16, null=False, default="ACTIVE", choices=[("ACTIVE", "ACTIVE"), ("INACTIVE", "INACTIVE")])
 
     class Meta:
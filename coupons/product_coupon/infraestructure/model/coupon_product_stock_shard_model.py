@@ -0,0 +1,16 @@
+from peewee import Model, BigIntegerField, IntegerField, CompositeKey
+
+from shared.infrastructure.database import db
+
+
+class CouponProductStockShardModel(Model):
+    """Sub-contadores de stock de un mapping 'hot' (coupon_product.shard_count > 0)."""
+    coupon_id = BigIntegerField(null=False)   # FK lógica a coupon_product (coupon, product_id)
+    product_id = BigIntegerField(null=False)
+    shard_no = IntegerField(null=False)       # 0..shard_count-1
+    balance = IntegerField(null=False, default=0)
+
+    class Meta:
+        database = db
+        table_name = "coupon_product_stock_shards"
+        primary_key = CompositeKey("coupon_id", "product_id", "shard_no")
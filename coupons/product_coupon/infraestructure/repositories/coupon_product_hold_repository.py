@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from coupons.product_coupon.domain.entities.coupon_product_hold import (
+    CouponProductHoldData, HoldStatus, InsufficientStockError, HoldNotActiveError,
+)
+from coupons.product_coupon.infraestructure.model.coupon_product_hold_model import CouponProductHoldModel
+from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+from coupons.product_coupon.infraestructure.repositories.coupon_product_stock_shard_repository import (
+    CouponProductStockShardRepository,
+)
+
+
+class CouponProductHoldRepository:
+    """
+    Reservas de stock sobre coupon_product.
+
+    coupon_product.stock es el disponible y coupon_product.reserved lo retenido. Cada
+    movimiento es un UPDATE condicional de una sola sentencia (stock >= qty, status del
+    hold esperado), así que no hay lectura-modificación-escritura ni locks largos: el
+    lock de fila dura lo que dura el UPDATE dentro de una transacción corta.
+
+      reserve : stock -= q, reserved += q     (solo si stock >= q)
+      commit  : reserved -= q                 (las unidades ya salieron del disponible)
+      release : stock += q, reserved -= q     (también lo hace el sweep al expirar)
+
+    En mappings sharded (shard_count > 0) las unidades salen y vuelven a los shards y la
+    fila no se toca (ni reserved), para no reintroducir el hot-row.
+    """
+
+    def __init__(self, shards: Optional[CouponProductStockShardRepository] = None):
+        self.shards = shards or CouponProductStockShardRepository()
+
+    def _to_entity(self, rec: CouponProductHoldModel) -> CouponProductHoldData:
+        return CouponProductHoldData(
+            id=rec.id,
+            hold_id=rec.hold_id,
+            coupon_id=rec.coupon_id,
+            product_id=rec.product_id,
+            quantity=rec.quantity,
+            expires_at=rec.expires_at,
+            status=HoldStatus(rec.status),
+            tracked=bool(rec.tracked),
+            sharded=bool(rec.sharded),
+            created_at=rec.created_at,
+            updated_at=rec.updated_at,
+        )
+
+    @staticmethod
+    def _mapping(coupon_id: int, product_id: int):
+        return (CouponProductModel.coupon == coupon_id) & (CouponProductModel.product_id == product_id)
+
+    def _set_hold_status(self, hold_id: str, new: HoldStatus, now: Optional[datetime] = None) -> bool:
+        """HELD -> new, solo si sigue HELD (y no venció, si se pasa now)."""
+        m = CouponProductHoldModel
+        cond = (m.hold_id == hold_id) & (m.status == HoldStatus.HELD.value)
+        if now is not None:
+            cond &= (m.expires_at > now)
+        return m.update(status=new.value, updated_at=datetime.now()).where(cond).execute() == 1
+
+    def _return_units(self, coupon_id: int, product_id: int, qty: int, from_shards: bool) -> None:
+        # Se devuelve según el modo ACTUAL del mapping (pudo cambiar desde la reserva);
+        # reserved solo se descuenta si la reserva lo había sumado.
+        cp = CouponProductModel
+        mapping = self._mapping(coupon_id, product_id)
+        unreserve = 0 if from_shards else qty
+        shard_count = cp.select(cp.shard_count).where(mapping).scalar()
+        if shard_count:
+            was_empty = self.shards.total(coupon_id, product_id) <= 0
+            self.shards.give(coupon_id, product_id, qty, shard_count)
+            if unreserve:
+                cp.update(reserved=cp.reserved - unreserve).where(mapping).execute()
+            if was_empty:
+                # un consume concurrente pudo desactivarlo al ver los shards en 0 antes de
+                # que el hold fuera visible: las unidades vuelven, el mapping también
+                cp.update(status="ACTIVE").where(mapping & (cp.status == "INACTIVE")).execute()
+        else:
+            cp.update(stock=cp.stock + qty, reserved=cp.reserved - unreserve).where(mapping).execute()
+
+    def get(self, hold_id: str) -> Optional[CouponProductHoldData]:
+        rec = CouponProductHoldModel.get_or_none(CouponProductHoldModel.hold_id == hold_id)
+        return self._to_entity(rec) if rec else None
+
+    def reserve(self, coupon_id: int, product_id: int, quantity: int, ttl: timedelta,
+                now: Optional[datetime] = None) -> Optional[CouponProductHoldData]:
+        """None si el mapping no existe; InsufficientStockError si no alcanza el disponible."""
+        now = now or datetime.now()
+        cp = CouponProductModel
+        with cp._meta.database.atomic():
+            taken = (cp.update(stock=cp.stock - quantity, reserved=cp.reserved + quantity)
+                     .where(self._mapping(coupon_id, product_id) &
+                            (cp.status == "ACTIVE") & (cp.shard_count == 0) &
+                            cp.stock.is_null(False) & (cp.stock >= quantity))
+                     .execute())
+            tracked, sharded = True, False
+            if not taken:
+                rec = (cp.select(cp.stock, cp.status, cp.shard_count)
+                       .where(self._mapping(coupon_id, product_id)).first())
+                if rec is None:
+                    return None
+                insufficient = InsufficientStockError(
+                    f"stock insuficiente para coupon_id={coupon_id} product_id={product_id}")
+                if rec.status != "ACTIVE":
+                    raise insufficient
+                if rec.shard_count:
+                    if not self.shards.take(coupon_id, product_id, quantity, rec.shard_count):
+                        raise insufficient
+                    sharded = True
+                elif rec.stock is not None:
+                    raise insufficient
+                else:
+                    tracked = False  # sin control de stock: el hold solo registra la intención
+            rec = CouponProductHoldModel.create(
+                hold_id=uuid.uuid4().hex,
+                coupon_id=coupon_id,
+                product_id=product_id,
+                quantity=quantity,
+                tracked=tracked,
+                sharded=sharded,
+                status=HoldStatus.HELD.value,
+                expires_at=now + ttl,
+            )
+        return self._to_entity(rec)
+
+    def commit(self, hold_id: str, now: Optional[datetime] = None) -> Optional[CouponProductHoldData]:
+        """Idempotente (un hold ya COMMITTED se devuelve igual). None si no existe."""
+        now = now or datetime.now()
+        cp = CouponProductModel
+        with cp._meta.database.atomic():
+            if not self._set_hold_status(hold_id, HoldStatus.COMMITTED, now=now):
+                hold = self.get(hold_id)
+                if hold is None or hold.status == HoldStatus.COMMITTED:
+                    return hold
+                raise HoldNotActiveError(f"hold {hold_id} en estado {hold.status.value}"
+                                         if hold.status != HoldStatus.HELD else f"hold {hold_id} vencido")
+            hold = self.get(hold_id)
+            if hold.tracked and not hold.sharded:
+                mapping = self._mapping(hold.coupon_id, hold.product_id)
+                cp.update(reserved=cp.reserved - hold.quantity).where(mapping).execute()
+                # mismo criterio que consume_one: sin unidades (ni retenidas) => INACTIVE
+                (cp.update(status="INACTIVE")
+                 .where(mapping & (cp.shard_count == 0) & (cp.stock <= 0) & (cp.reserved <= 0))
+                 .execute())
+        return hold
+
+    def release(self, hold_id: str) -> Optional[CouponProductHoldData]:
+        """Devuelve las unidades. Idempotente sobre holds ya liberados/vencidos; None si no existe."""
+        with CouponProductModel._meta.database.atomic():
+            released = self._set_hold_status(hold_id, HoldStatus.RELEASED)
+            hold = self.get(hold_id)
+            if hold is None:
+                return None
+            if not released:
+                if hold.status == HoldStatus.COMMITTED:
+                    raise HoldNotActiveError(f"hold {hold_id} ya confirmado")
+                return hold
+            if hold.tracked:
+                self._return_units(hold.coupon_id, hold.product_id, hold.quantity, hold.sharded)
+        return hold
+
+    def sweep_expired(self, limit: int, now: Optional[datetime] = None) -> int:
+        """Expira hasta 'limit' holds vencidos y devuelve sus unidades (un UPDATE por mapping)."""
+        now = now or datetime.now()
+        m = CouponProductHoldModel
+        with m._meta.database.atomic():
+            q = (m.select(m.id, m.coupon_id, m.product_id, m.quantity, m.tracked, m.sharded)
+                 .where((m.status == HoldStatus.HELD.value) & (m.expires_at <= now))
+                 .order_by(m.expires_at)
+                 .limit(limit))
+            locked = getattr(m._meta.database, "for_update", False)
+            if locked:
+                q = q.for_update(skip_locked=True)
+            rows = list(q)
+            if not rows:
+                return 0
+            expire = m.update(status=HoldStatus.EXPIRED.value, updated_at=datetime.now())
+            held = m.status == HoldStatus.HELD.value
+            if locked:
+                # filas bloqueadas por este sweep: nadie más puede cambiarlas
+                expire.where(m.id.in_([r.id for r in rows]) & held).execute()
+            else:
+                # sin SKIP LOCKED: solo cuentan las que este sweep efectivamente pasó a EXPIRED
+                rows = [r for r in rows if expire.where((m.id == r.id) & held).execute() == 1]
+            units: Dict[Tuple[int, int, bool], int] = defaultdict(int)
+            for r in rows:
+                if r.tracked:
+                    units[(r.coupon_id, r.product_id, bool(r.sharded))] += r.quantity
+            for (coupon_id, product_id, from_shards), qty in units.items():
+                self._return_units(coupon_id, product_id, qty, from_shards)
+        return len(rows)
+
+    def list_active_by_mapping(self, coupon_id: int, product_id: int) -> List[CouponProductHoldData]:
+        m = CouponProductHoldModel
+        q = (m.select()
+             .where((m.coupon_id == coupon_id) & (m.product_id == product_id) &
+                    (m.status == HoldStatus.HELD.value))
+             .order_by(m.expires_at))
+        return [self._to_entity(r) for r in q]
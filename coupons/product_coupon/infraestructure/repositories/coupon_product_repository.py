@@ -1,16 +1,38 @@
 # coupons/product_coupon/infraestructure/repositories/coupon_product_repository.py
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 from peewee import fn
 
+from coupons.coupon_code.domain.entities.coupon_code import CouponCodeKind
+from coupons.coupon_code.infraestructure.repositories.coupon_code_repository import CouponCodeRepository
 from coupons.product_coupon.domain.entities.coupon_product import (
     CouponProductData, ProductType, CouponProductStatus
 )
+from coupons.product_coupon.infraestructure.model.coupon_product_hold_model import CouponProductHoldModel
 from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+from coupons.product_coupon.infraestructure.repositories.coupon_product_stock_shard_repository import (
+    CouponProductStockShardRepository,
+)
 
 
 class CouponProductRepository:
+    MAX_SHARDS = 64
+
+    def __init__(self, shards: Optional[CouponProductStockShardRepository] = None,
+                 codes: Optional[CouponCodeRepository] = None):
+        self.shards = shards or CouponProductStockShardRepository()
+        # con codes, el código del mapping queda en el índice de códigos (/api/coupons/by-code)
+        self.codes = codes
+
+    def _claim_code(self, coupon_id: int, code: str) -> None:
+        if self.codes is not None:
+            self.codes.claim(code, CouponCodeKind.PRODUCT, coupon_id)
+
+    def _release_codes(self, coupon_id: int) -> None:
+        if self.codes is not None:
+            self.codes.release_unused_product_codes(coupon_id)
+
     # ---------- Helpers ----------
     def _to_entity(self, rec: CouponProductModel) -> CouponProductData:
         return CouponProductData(
@@ -44,37 +66,63 @@ class CouponProductRepository:
     # ---------- Create ----------
     def add(self, data: CouponProductData) -> CouponProductData:
         # PK actual: (coupon, product_id). Si ya existe, actualiza (code, product_type, stock, status).
-        rec = self._find_one(data.coupon_id, data.product_id)
-        if rec:
-            rec.code = data.code
-            rec.product_type = data.product_type.value if hasattr(data.product_type, "value") else str(data.product_type)
-            rec.stock = data.stock
-            rec.status = data.status.value if hasattr(data.status, "value") else str(data.status)
-            rec.save()
-            return self._to_entity(rec)
-
-        rec = CouponProductModel.create(
-            coupon=data.coupon_id,
-            product_id=data.product_id,
-            code=data.code,
-            product_type=data.product_type.value if hasattr(data.product_type, "value") else str(data.product_type),
-            stock=data.stock,
-            status=data.status.value if hasattr(data.status, "value") else str(data.status),
-        )
+        product_type = data.product_type.value if hasattr(data.product_type, "value") else str(data.product_type)
+        status = data.status.value if hasattr(data.status, "value") else str(data.status)
+        cp = CouponProductModel
+        with cp._meta.database.atomic():
+            self._claim_code(data.coupon_id, data.code)
+            rec = self._find_one(data.coupon_id, data.product_id)
+            if rec:
+                # UPDATE dirigido: nunca reescribe reserved ni (salvo el paso a sin
+                # control) shard_count, que mueven los holds y set_shard_count en paralelo.
+                key = (cp.coupon == data.coupon_id) & (cp.product_id == data.product_id)
+                fields = {cp.code: data.code, cp.product_type: product_type, cp.status: status}
+                cond = key
+                if rec.shard_count and data.stock is not None:
+                    # mapping hot: el nuevo stock se reparte en los shards
+                    self.shards.split(data.coupon_id, data.product_id, data.stock, rec.shard_count)
+                elif rec.shard_count:
+                    # stock NULL = sin control: deja de estar sharded
+                    self.shards.delete(data.coupon_id, data.product_id)
+                    fields.update({cp.shard_count: 0, cp.stock: None})
+                    cond &= cp.shard_count == rec.shard_count
+                elif rec.stock is not None and data.stock is not None:
+                    # relativo: un reserve/consume entre la lectura y aquí no se pierde
+                    fields[cp.stock] = cp.stock + (int(data.stock) - rec.stock)
+                    cond &= (cp.shard_count == 0) & cp.stock.is_null(False)
+                else:
+                    # entra o sale del control de stock (NULL no admite delta)
+                    fields[cp.stock] = data.stock
+                    cond &= (cp.shard_count == 0)
+                if not cp.update(fields).where(cond).execute():
+                    raise ValueError("mapping changed concurrently (sharding); retry")
+                if rec.code != data.code:
+                    self._release_codes(data.coupon_id)
+                return self._to_entity(cp.get(key))
+
+            rec = cp.create(
+                coupon=data.coupon_id,
+                product_id=data.product_id,
+                code=data.code,
+                product_type=product_type,
+                stock=data.stock,
+                status=status,
+            )
         return self._to_entity(rec)
 
     def bulk_add(self, coupon_id: int, items: List[Dict]) -> List[CouponProductData]:
         out: List[CouponProductData] = []
-        for it in items:
-            entity = CouponProductData(
-                coupon_id=coupon_id,
-                product_id=int(it["product_id"]),
-                code=str(it["code"]).strip(),
-                product_type=str(it.get("product_type", "PRODUCT")).upper(),
-                stock=(int(it["stock"]) if it.get("stock") is not None else None),
-                status=str(it.get("status", "ACTIVE")).upper(),
-            )
-            out.append(self.add(entity))
+        with CouponProductModel._meta.database.atomic():
+            for it in items:
+                entity = CouponProductData(
+                    coupon_id=coupon_id,
+                    product_id=int(it["product_id"]),
+                    code=str(it["code"]).strip(),
+                    product_type=str(it.get("product_type", "PRODUCT")).upper(),
+                    stock=(int(it["stock"]) if it.get("stock") is not None else None),
+                    status=str(it.get("status", "ACTIVE")).upper(),
+                )
+                out.append(self.add(entity))
         return out
 
     # ---------- Delete ----------
@@ -86,7 +134,11 @@ class CouponProductRepository:
                  (CouponProductModel.coupon == coupon_id) &
                  (CouponProductModel.product_id == product_id)
              ))
-        return q.execute() > 0
+        deleted = q.execute() > 0
+        if deleted:
+            self.shards.delete(coupon_id, product_id)
+            self._release_codes(coupon_id)
+        return deleted
 
     def remove_by_combo(
         self,
@@ -105,20 +157,28 @@ class CouponProductRepository:
             q = q.where(CouponProductModel.code == code)
         if product_type:
             q = q.where(CouponProductModel.product_type == product_type)
-        return q.execute()
+        deleted = q.execute()
+        if deleted:
+            self.shards.delete(coupon_id, product_id)
+            self._release_codes(coupon_id)
+        return deleted
 
     def remove_all_for_coupon(self, coupon_id: int) -> int:
         q = CouponProductModel.delete().where(CouponProductModel.coupon == coupon_id)
-        return q.execute()
+        deleted = q.execute()
+        self.shards.delete(coupon_id)
+        self._release_codes(coupon_id)
+        return deleted
 
     # ---------- Read ----------
     def list_products_by_coupon(self, coupon_id: int) -> List[Dict]:
-        q = CouponProductModel.select().where(CouponProductModel.coupon == coupon_id)
+        q = list(CouponProductModel.select().where(CouponProductModel.coupon == coupon_id))
+        sharded = self.shards.totals((coupon_id, r.product_id) for r in q if r.shard_count)
         return [{
             "product_id": r.product_id,
             "code": r.code,
             "product_type": r.product_type,
-            "stock": r.stock,
+            "stock": sharded.get((coupon_id, r.product_id), 0) if r.shard_count else r.stock,
             "status": r.status,
         } for r in q]
 
@@ -130,52 +190,113 @@ class CouponProductRepository:
         return [r.coupon_id if hasattr(r, "coupon_id") else r.coupon.id for r in q]
 
     # ---------- Stock ----------
+    def _stock_of(self, rec: CouponProductModel) -> Optional[int]:
+        if rec.shard_count:
+            return self.shards.total(rec.coupon_id, rec.product_id)
+        return rec.stock
+
+    def _snapshot(self, rec: CouponProductModel, stock: Optional[int]) -> Dict:
+        return {
+            "coupon_id": rec.coupon_id,
+            "product_id": rec.product_id,
+            "code": rec.code,
+            "product_type": rec.product_type,
+            "stock": stock,
+            "status": rec.status,
+        }
+
+    def _deactivate_if_exhausted(self, rec: CouponProductModel, stock: Optional[int]) -> bool:
+        """
+        Sin unidades disponibles ni retenidas por holds => INACTIVE. Un solo UPDATE
+        condicional que vuelve a comprobar todo en la BD (una devolución o un hold entre
+        la lectura y aquí lo dejan sin efecto). Los holds sharded no suman a reserved
+        (no tocan la fila): se cuentan por sus filas HELD. True si lo desactivó.
+        """
+        if stock is None or stock > 0 or rec.status == "INACTIVE":
+            return False
+        cp, h = CouponProductModel, CouponProductHoldModel
+        cond = ((cp.coupon == rec.coupon_id) & (cp.product_id == rec.product_id) &
+                (cp.status == "ACTIVE") & (cp.reserved <= 0))
+        if rec.shard_count:
+            held = h.select(h.id).where((h.coupon_id == rec.coupon_id) & (h.product_id == rec.product_id) &
+                                        (h.status == "HELD") & (h.tracked == True))  # noqa: E712
+            cond &= ((cp.shard_count > 0) &
+                     (self.shards.total_query(rec.coupon_id, rec.product_id) <= 0) &
+                     ~fn.EXISTS(held))
+        else:
+            cond &= (cp.shard_count == 0) & (cp.stock <= 0)
+        if cp.update(status="INACTIVE").where(cond).execute():
+            rec.status = "INACTIVE"
+            return True
+        return False
+
     def consume_one(
         self,
         coupon_id: int,
         product_id: int,
         code: Optional[str] = None,
         product_type: Optional[str] = None,
-    ) -> Optional[Dict]:
+    ) -> Tuple[Optional[Dict], bool]:
+        """
+        Resta 1 unidad. Devuelve (snapshot, changed): changed=False si no se tomó ninguna
+        unidad ni cambió el status (agotado, sin control de stock). (None, False) si no existe.
+        """
         rec = self._find_one(coupon_id, product_id, code=code, product_type=product_type)
         if not rec:
-            return None
+            return None, False
 
         # Sin control de stock: no cambia nada
-        if rec.stock is None:
-            # Devuelve snapshot actual
-            return {
-                "coupon_id": coupon_id,
-                "product_id": product_id,
-                "code": rec.code,
-                "product_type": rec.product_type,
-                "stock": None,
-                "status": rec.status,
-            }
-
-        # Con control de stock:
-        if rec.stock <= 0:
-            rec.status = "INACTIVE"
-            rec.save()
-            return {
-                "coupon_id": coupon_id,
-                "product_id": product_id,
-                "code": rec.code,
-                "product_type": rec.product_type,
-                "stock": rec.stock,
-                "status": rec.status,
-            }
-
-        rec.stock = rec.stock - 1
-        if rec.stock <= 0:
-            rec.status = "INACTIVE"
-        rec.save()
+        if rec.stock is None and not rec.shard_count:
+            return self._snapshot(rec, None), False
 
-        return {
-            "coupon_id": coupon_id,
-            "product_id": product_id,
-            "code": rec.code,
-            "product_type": rec.product_type,
-            "stock": rec.stock,
-            "status": rec.status,
-        }
+        cp = CouponProductModel
+        key = (cp.coupon == coupon_id) & (cp.product_id == product_id)
+        if rec.shard_count:
+            taken = self.shards.take(coupon_id, product_id, 1, rec.shard_count)
+        else:
+            # Decremento atómico (sin lectura-modificación-escritura); si el mapping pasó
+            # a sharded entre la lectura y aquí, no matchea y se reintenta por shards.
+            taken = cp.update(stock=cp.stock - 1).where(key & (cp.shard_count == 0) & (cp.stock > 0)).execute() > 0
+            if not taken:
+                fresh = cp.get_or_none(key)
+                if fresh is not None and fresh.shard_count:
+                    taken = self.shards.take(coupon_id, product_id, 1, fresh.shard_count)
+        rec = cp.get_or_none(key)
+        if rec is None:
+            return None, False
+        stock = self._stock_of(rec)
+        deactivated = self._deactivate_if_exhausted(rec, stock)
+        return self._snapshot(rec, stock), bool(taken) or deactivated
+
+    def set_shard_count(self, coupon_id: int, product_id: int, shard_count: int) -> Optional[Dict]:
+        """
+        Activa (N > 0), cambia o desactiva (0) el modo sharded de un mapping, moviendo
+        el stock entre la fila y los shards en una transacción. None si no existe.
+        """
+        if not 0 <= int(shard_count) <= self.MAX_SHARDS:
+            raise ValueError(f"shards must be between 0 and {self.MAX_SHARDS}")
+        cp = CouponProductModel
+        key = (cp.coupon == coupon_id) & (cp.product_id == product_id)
+        with cp._meta.database.atomic():
+            q = cp.select().where(key)
+            if getattr(cp._meta.database, "for_update", False):
+                q = q.for_update()
+            rec = q.first()
+            if rec is None:
+                return None
+            if rec.shard_count != shard_count:
+                if rec.stock is None and not rec.shard_count:
+                    raise ValueError("mapping has no stock control (stock is null)")
+                total = self.shards.rebalance(coupon_id, product_id) if rec.shard_count else int(rec.stock)
+                self.shards.split(coupon_id, product_id, total, shard_count)
+                cp.update(shard_count=shard_count, stock=(0 if shard_count else total)).where(key).execute()
+            rec = cp.get(key)
+        return dict(self._snapshot(rec, self._stock_of(rec)), shard_count=rec.shard_count)
+
+    def rebalance_shards(self, coupon_id: int, product_id: int) -> Optional[Dict]:
+        rec = CouponProductModel.get_or_none(
+            (CouponProductModel.coupon == coupon_id) & (CouponProductModel.product_id == product_id))
+        if rec is None:
+            return None
+        total = self.shards.rebalance(coupon_id, product_id) if rec.shard_count else rec.stock
+        return dict(self._snapshot(rec, total), shard_count=rec.shard_count)
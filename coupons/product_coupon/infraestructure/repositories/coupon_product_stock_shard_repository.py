@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from peewee import fn, Tuple as RowValue
+
+from coupons.product_coupon.infraestructure.model.coupon_product_stock_shard_model import (
+    CouponProductStockShardModel,
+)
+
+
+class CouponProductStockShardRepository:
+    """
+    Contador de stock repartido en N filas para mappings con mucha concurrencia.
+
+    take() descuenta de un shard al azar con un UPDATE condicional (balance >= qty): los
+    consumos concurrentes caen en filas distintas y no se serializan en un único lock.
+    Si ese shard no alcanza, se prueba con los shards con saldo (una lectura de N filas);
+    si el saldo está fragmentado (hay total pero ningún shard alcanza) se toma bajo lock
+    de todos los shards. El agotamiento se detecta cuando no queda ningún shard con saldo.
+    """
+
+    # Rebalanceo automático: pocos shards con saldo y total suficiente para repartir
+    REBALANCE_NONZERO_RATIO = 0.25
+
+    @staticmethod
+    def _key(coupon_id: int, product_id: int):
+        m = CouponProductStockShardModel
+        return (m.coupon_id == coupon_id) & (m.product_id == product_id)
+
+    @staticmethod
+    def _split(total: int, shard_count: int) -> List[int]:
+        base, extra = divmod(max(0, int(total)), shard_count)
+        return [base + (1 if i < extra else 0) for i in range(shard_count)]
+
+    def _locked_rows(self, coupon_id: int, product_id: int):
+        m = CouponProductStockShardModel
+        q = m.select().where(self._key(coupon_id, product_id)).order_by(m.shard_no)
+        if getattr(m._meta.database, "for_update", False):
+            q = q.for_update()
+        return list(q)
+
+    def _take_from(self, coupon_id: int, product_id: int, shard_no: int, qty: int) -> bool:
+        m = CouponProductStockShardModel
+        return (m.update(balance=m.balance - qty)
+                .where(self._key(coupon_id, product_id) & (m.shard_no == shard_no) & (m.balance >= qty))
+                .execute()) == 1
+
+    def split(self, coupon_id: int, product_id: int, total: int, shard_count: int) -> None:
+        """Reemplaza los shards por 'shard_count' filas que suman 'total'. Llamar en transacción."""
+        m = CouponProductStockShardModel
+        m.delete().where(self._key(coupon_id, product_id)).execute()
+        if shard_count <= 0:
+            return
+        m.insert_many([
+            {"coupon_id": coupon_id, "product_id": product_id, "shard_no": i, "balance": b}
+            for i, b in enumerate(self._split(total, shard_count))
+        ]).execute()
+
+    def delete(self, coupon_id: int, product_id: Optional[int] = None) -> int:
+        m = CouponProductStockShardModel
+        cond = (m.coupon_id == coupon_id)
+        if product_id is not None:
+            cond &= (m.product_id == product_id)
+        return m.delete().where(cond).execute()
+
+    def total_query(self, coupon_id: int, product_id: int):
+        """SELECT del total como subconsulta (para condicionar un UPDATE en la misma sentencia)."""
+        m = CouponProductStockShardModel
+        return m.select(fn.COALESCE(fn.SUM(m.balance), 0)).where(self._key(coupon_id, product_id))
+
+    def total(self, coupon_id: int, product_id: int) -> int:
+        return int(self.total_query(coupon_id, product_id).scalar() or 0)
+
+    def totals(self, keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], int]:
+        """Totales de varios mappings en una consulta: {(coupon_id, product_id): total}."""
+        keys = list({(int(c), int(p)) for c, p in keys})
+        if not keys:
+            return {}
+        m = CouponProductStockShardModel
+        q = (m.select(m.coupon_id, m.product_id, fn.SUM(m.balance).alias("total"))
+             .where(RowValue(m.coupon_id, m.product_id).in_(keys))
+             .group_by(m.coupon_id, m.product_id))
+        return {(r.coupon_id, r.product_id): int(r.total or 0) for r in q}
+
+    def take(self, coupon_id: int, product_id: int, qty: int, shard_count: int) -> bool:
+        if shard_count <= 0 or qty <= 0:
+            return False
+        # Camino rápido: un shard al azar, una sentencia
+        if self._take_from(coupon_id, product_id, random.randrange(shard_count), qty):
+            return True
+
+        m = CouponProductStockShardModel
+        rows = [(r.shard_no, r.balance) for r in
+                m.select(m.shard_no, m.balance).where(self._key(coupon_id, product_id) & (m.balance > 0))]
+        if not rows:
+            return False  # agotado
+        random.shuffle(rows)
+        for shard_no, balance in rows:
+            if balance >= qty and self._take_from(coupon_id, product_id, shard_no, qty):
+                self._maybe_rebalance(coupon_id, product_id, shard_count, rows)
+                return True
+
+        # Saldo fragmentado (o carreras): descontar repartido bajo lock de los shards
+        with m._meta.database.atomic():
+            locked = self._locked_rows(coupon_id, product_id)
+            if sum(r.balance for r in locked) < qty:
+                return False
+            pending = qty
+            for r in locked:
+                if pending <= 0:
+                    break
+                use = min(r.balance, pending)
+                if use > 0:
+                    (m.update(balance=m.balance - use)
+                     .where(self._key(coupon_id, product_id) & (m.shard_no == r.shard_no))
+                     .execute())
+                    pending -= use
+        return True
+
+    def give(self, coupon_id: int, product_id: int, qty: int, shard_count: int) -> None:
+        """Devuelve unidades a un shard al azar."""
+        if shard_count <= 0 or qty <= 0:
+            return
+        m = CouponProductStockShardModel
+        (m.update(balance=m.balance + qty)
+         .where(self._key(coupon_id, product_id) & (m.shard_no == random.randrange(shard_count)))
+         .execute())
+
+    def rebalance(self, coupon_id: int, product_id: int) -> int:
+        """Reparte el total en partes iguales (lock breve de los N shards). Devuelve el total."""
+        m = CouponProductStockShardModel
+        with m._meta.database.atomic():
+            rows = self._locked_rows(coupon_id, product_id)
+            if not rows:
+                return 0
+            total = sum(r.balance for r in rows)
+            for r, b in zip(rows, self._split(total, len(rows))):
+                if r.balance != b:
+                    (m.update(balance=b)
+                     .where(self._key(coupon_id, product_id) & (m.shard_no == r.shard_no))
+                     .execute())
+        return total
+
+    def _maybe_rebalance(self, coupon_id: int, product_id: int, shard_count: int,
+                         nonzero: List[Tuple[int, int]]) -> None:
+        # Con casi todos los shards vacíos el camino rápido falla seguido: repartir de nuevo
+        total = sum(b for _s, b in nonzero)
+        if len(nonzero) <= shard_count * self.REBALANCE_NONZERO_RATIO and total >= 2 * shard_count:
+            self.rebalance(coupon_id, product_id)
@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import Any, List, Optional, Dict
 from flask import Blueprint, request, jsonify, current_app
 
+from coupons.product_coupon.domain.entities.coupon_product_hold import HoldNotActiveError, InsufficientStockError
+
 coupon_product_bp = Blueprint("coupon_product_api", __name__, url_prefix="/api/coupon-products")
 
 
@@ -235,3 +237,134 @@ def consume_one():
         return jsonify({"error": str(ve)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+# ===== Stock sharded (mappings "hot") =====
+@coupon_product_bp.route("/sharding", methods=["PUT"])
+def set_sharding():
+    """
+    Body (JSON):
+    {
+      "coupon_id": 123,
+      "product_id": 555,
+      "shards": 16        # 0 = desactiva (el stock vuelve a la fila)
+    }
+    """
+    cmd, _qry = _svc()
+    data = request.get_json(silent=True) or {}
+    try:
+        coupon_id = _require_positive_int(data.get("coupon_id"), "coupon_id")
+        product_id = _require_positive_int(data.get("product_id"), "product_id")
+        shards = _parse_optional_nonneg_int(data.get("shards"), "shards")
+        if shards is None:
+            raise ValueError("shards is required")
+
+        res = cmd.set_sharding(coupon_id, product_id, shards)
+        if res is None:
+            return jsonify({"error": "mapping not found"}), 404
+        return jsonify(res), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_product_bp.route("/sharding/rebalance", methods=["POST"])
+def rebalance_shards():
+    """Body: {"coupon_id": 123, "product_id": 555}. Reparte el total en partes iguales."""
+    cmd, _qry = _svc()
+    data = request.get_json(silent=True) or {}
+    try:
+        coupon_id = _require_positive_int(data.get("coupon_id"), "coupon_id")
+        product_id = _require_positive_int(data.get("product_id"), "product_id")
+
+        res = cmd.rebalance_shards(coupon_id, product_id)
+        if res is None:
+            return jsonify({"error": "mapping not found"}), 404
+        return jsonify(res), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# ===== Reservas de stock (holds con TTL) =====
+def _reservation_svc():
+    services = current_app.config.get("coupon_services")
+    if not services:
+        raise RuntimeError("coupon_services not configured in current_app.config")
+    return services["coupon_product_reservation_service"]
+
+
+@coupon_product_bp.route("/reservations", methods=["POST"])
+def reserve_stock():
+    """
+    Body (JSON):
+    {
+      "coupon_id": 123,
+      "product_id": 555,
+      "quantity": 1,          # opcional (default 1)
+      "ttl_seconds": 900      # opcional (default STOCK_HOLD_TTL_SECONDS)
+    }
+    201 con el hold; 409 si no hay stock disponible.
+    """
+    svc = _reservation_svc()
+    data = request.get_json(silent=True) or {}
+    try:
+        coupon_id = _require_positive_int(data.get("coupon_id"), "coupon_id")
+        product_id = _require_positive_int(data.get("product_id"), "product_id")
+        quantity = _require_positive_int(data.get("quantity", 1), "quantity")
+        ttl = _parse_optional_nonneg_int(data.get("ttl_seconds"), "ttl_seconds")
+
+        hold = svc.reserve(coupon_id, product_id, quantity=quantity, ttl_seconds=ttl)
+        if hold is None:
+            return jsonify({"error": "mapping not found"}), 404
+        return jsonify(hold.to_dict()), 201
+    except InsufficientStockError as se:
+        return jsonify({"error": str(se)}), 409
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_product_bp.route("/reservations/<hold_id>", methods=["GET"])
+def get_reservation(hold_id: str):
+    svc = _reservation_svc()
+    try:
+        hold = svc.get(hold_id)
+        if hold is None:
+            return jsonify({"error": "hold not found"}), 404
+        return jsonify(hold.to_dict()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_product_bp.route("/reservations/<hold_id>/commit", methods=["POST"])
+def commit_reservation(hold_id: str):
+    """Consume las unidades retenidas. 409 si el hold venció o fue liberado."""
+    svc = _reservation_svc()
+    try:
+        hold = svc.commit(hold_id)
+        if hold is None:
+            return jsonify({"error": "hold not found"}), 404
+        return jsonify(hold.to_dict()), 200
+    except HoldNotActiveError as he:
+        return jsonify({"error": str(he)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@coupon_product_bp.route("/reservations/<hold_id>/release", methods=["POST"])
+def release_reservation(hold_id: str):
+    """Devuelve las unidades al disponible. 409 si el hold ya fue confirmado."""
+    svc = _reservation_svc()
+    try:
+        hold = svc.release(hold_id)
+        if hold is None:
+            return jsonify({"error": "hold not found"}), 404
+        return jsonify(hold.to_dict()), 200
+    except HoldNotActiveError as he:
+        return jsonify({"error": str(he)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
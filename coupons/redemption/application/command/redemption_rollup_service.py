@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Optional
+
+from coupons.redemption.domain.entities.redemption import RedemptionKind
+from coupons.redemption.infraestructure.model.coupon_daily_stats_model import CouponDailyStatsModel
+from coupons.redemption.infraestructure.repositories.coupon_daily_stats_repository import (
+    CouponDailyStatsRepository, StatsKey,
+)
+from coupons.redemption.infraestructure.repositories.redemption_ledger_repository import (
+    RedemptionLedgerRepository,
+)
+from shared.infrastructure.id_watermark import GapHorizon, contiguous_through
+
+# (columna, signo): REVERSED descuenta lo que sumó el REDEEMED que compensa
+_COLUMN = {
+    RedemptionKind.ISSUED: ("issued", 1),
+    RedemptionKind.REDEEMED: ("redeemed", 1),
+    RedemptionKind.EXPIRED: ("expired", 1),
+    RedemptionKind.REVERSED: ("redeemed", -1),
+}
+
+
+class RedemptionRollupService:
+    """
+    Agrega el redemption_ledger en coupon_daily_stats de forma incremental: cada
+    pasada lee los asientos nuevos desde el checkpoint, los suma por (cupón, día)
+    y avanza el checkpoint en la misma transacción. Solo avanza por ids contiguos:
+    un hueco (asiento en vuelo o id que nunca se confirmó) se espera como mucho
+    LEDGER_ROLLUP_GAP_TIMEOUT_SECONDS. El estado de esa espera se guarda con el
+    checkpoint, así también funciona con pasadas sueltas (--once).
+    """
+
+    CHECKPOINT = "coupon_daily_stats"
+
+    def __init__(self, ledger_repo: RedemptionLedgerRepository, stats_repo: CouponDailyStatsRepository,
+                 gap_timeout: Optional[float] = None):
+        self.ledger_repo = ledger_repo
+        self.stats_repo = stats_repo
+        self.gap_timeout = float(
+            gap_timeout if gap_timeout is not None else os.getenv("LEDGER_ROLLUP_GAP_TIMEOUT_SECONDS", "30"))
+
+    def rollup_once(self, batch_size: int = 1000) -> int:
+        """Una transacción. Devuelve cuántos asientos se agregaron."""
+        with CouponDailyStatsModel._meta.database.atomic():
+            last_id = self.stats_repo.lock_checkpoint(self.CHECKPOINT)
+            # reloj de pared: el estado se persiste y lo retoma otro proceso
+            gaps = GapHorizon(self.gap_timeout, clock=time.time, state=self.stats_repo.gap_state(self.CHECKPOINT))
+            ids = self.ledger_repo.ids_after(last_id, batch_size)
+            through = contiguous_through(last_id, ids, gaps.observe(ids[-1] if ids else last_id))
+            entries = self.ledger_repo.list_after(last_id, batch_size, through_id=through) if through > last_id else []
+            if not entries:
+                self.stats_repo.save_checkpoint(self.CHECKPOINT, through, gaps.state)
+                return 0
+            deltas: Dict[StatsKey, Dict[str, object]] = defaultdict(lambda: defaultdict(int))
+            for e in entries:
+                d = deltas[(e.coupon_id, e.occurred_at.date())]
+                column, sign = _COLUMN[e.kind]
+                d[column] += sign * e.quantity
+                if column == "redeemed" and e.discount_amount:
+                    d["discount_total"] = d.get("discount_total", Decimal("0")) + sign * e.discount_amount
+            self.stats_repo.apply(deltas)
+            self.stats_repo.save_checkpoint(self.CHECKPOINT, through, gaps.state)
+        return len(entries)
+
+    def rollup(self, batch_size: int = 1000, max_batches: Optional[int] = None) -> int:
+        """Lotes hasta ponerse al día."""
+        total, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            n = self.rollup_once(batch_size)
+            total += n
+            batches += 1
+            if n < batch_size:
+                break
+        return total
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import datetime
+from typing import List, Optional
+
+from coupons.redemption.domain.entities.redemption import CouponDailyStatsData, RedemptionEntryData
+from coupons.redemption.infraestructure.repositories.coupon_daily_stats_repository import CouponDailyStatsRepository
+from coupons.redemption.infraestructure.repositories.redemption_ledger_repository import (
+    RedemptionLedgerRepository,
+)
+
+
+class RedemptionQueryService:
+    def __init__(self, ledger_repo: RedemptionLedgerRepository, stats_repo: CouponDailyStatsRepository):
+        self.ledger_repo = ledger_repo
+        self.stats_repo = stats_repo
+
+    def daily_by_coupon(self, coupon_id: int, date_from: Optional[datetime.date] = None,
+                        date_to: Optional[datetime.date] = None) -> List[CouponDailyStatsData]:
+        return self.stats_repo.list_by_coupon(coupon_id, date_from, date_to)
+
+    def summary_by_business(self, business_id: int, date_from: Optional[datetime.date] = None,
+                            date_to: Optional[datetime.date] = None) -> List[CouponDailyStatsData]:
+        return self.stats_repo.summary_by_business(business_id, date_from, date_to)
+
+    def totals(self, rows: List[CouponDailyStatsData]) -> dict:
+        return self.stats_repo.totals(rows)
+
+    def ledger_by_coupon(self, coupon_id: int, after_id: int = 0, limit: int = 100) -> List[RedemptionEntryData]:
+        return self.ledger_repo.list_by_coupon(coupon_id, after_id, limit)
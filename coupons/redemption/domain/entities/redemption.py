@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Optional
+
+
+class RedemptionKind(Enum):
+    ISSUED = "ISSUED"
+    REDEEMED = "REDEEMED"
+    EXPIRED = "EXPIRED"
+    REVERSED = "REVERSED"   # compensa un REDEEMED (uso devuelto); el ledger no se edita
+
+
+class RedemptionEntryData:
+    """
+    Asiento del ledger (append-only). coupon_client_id es None en los canjes hechos
+    directo sobre el contador del cupón (POST /api/coupons/<id>/usage/consume).
+    """
+    def __init__(
+        self,
+        kind: RedemptionKind | str,
+        coupon_id: int,
+        client_id: Optional[int] = None,
+        coupon_client_id: Optional[int] = None,
+        order_id: Optional[int] = None,
+        product_id: Optional[int] = None,
+        discount_amount: Optional[Decimal | float | str] = None,
+        quantity: int = 1,
+        occurred_at: Optional[datetime] = None,
+        id: Optional[int] = None,
+    ):
+        if quantity is None or int(quantity) <= 0:
+            raise ValueError("quantity must be > 0")
+        self.id = id
+        self.kind = kind if isinstance(kind, RedemptionKind) else RedemptionKind(str(kind))
+        self.coupon_id = int(coupon_id)
+        self.client_id = client_id
+        self.coupon_client_id = coupon_client_id
+        self.order_id = order_id
+        self.product_id = product_id
+        self.discount_amount = Decimal(str(discount_amount)) if discount_amount is not None else None
+        self.quantity = int(quantity)
+        self.occurred_at = occurred_at
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind.value,
+            "coupon_id": self.coupon_id,
+            "client_id": self.client_id,
+            "coupon_client_id": self.coupon_client_id,
+            "order_id": self.order_id,
+            "product_id": self.product_id,
+            "discount_amount": str(self.discount_amount) if self.discount_amount is not None else None,
+            "quantity": self.quantity,
+            "occurred_at": self.occurred_at.isoformat() if self.occurred_at else None,
+        }
+
+
+class CouponDailyStatsData:
+    def __init__(
+        self,
+        coupon_id: int,
+        day: Optional[date] = None,
+        business_id: Optional[int] = None,
+        issued: int = 0,
+        redeemed: int = 0,
+        expired: int = 0,
+        discount_total: Decimal | float | str = 0,
+    ):
+        self.coupon_id = int(coupon_id)
+        self.day = day
+        self.business_id = business_id
+        self.issued = int(issued or 0)
+        self.redeemed = int(redeemed or 0)
+        self.expired = int(expired or 0)
+        self.discount_total = Decimal(str(discount_total or 0))
+
+    def to_dict(self):
+        out = {
+            "coupon_id": self.coupon_id,
+            "business_id": self.business_id,
+            "issued": self.issued,
+            "redeemed": self.redeemed,
+            "expired": self.expired,
+            "discount_total": str(self.discount_total),
+        }
+        if self.day is not None:
+            out["day"] = self.day.isoformat()
+        return out
@@ -0,0 +1,40 @@
+import datetime
+from peewee import (
+    Model, BigIntegerField, CharField, IntegerField, DecimalField, DateField, DateTimeField, CompositeKey
+)
+
+from shared.infrastructure.database import db
+
+
+class CouponDailyStatsModel(Model):
+    """Rollup por cupón y día del redemption_ledger (lo mantiene RedemptionRollupService)."""
+    coupon_id = BigIntegerField(null=False)
+    day = DateField(null=False)
+    business_id = BigIntegerField(null=True)
+    issued = IntegerField(null=False, default=0)
+    redeemed = IntegerField(null=False, default=0)
+    expired = IntegerField(null=False, default=0)
+    discount_total = DecimalField(max_digits=14, decimal_places=2, auto_round=True, null=False, default=0)
+    updated_at = DateTimeField(default=datetime.datetime.now, null=False)
+
+    class Meta:
+        database = db
+        table_name = "coupon_daily_stats"
+        primary_key = CompositeKey("coupon_id", "day")
+        indexes = (
+            (("business_id", "day"), False),
+        )
+
+
+class LedgerRollupCheckpointModel(Model):
+    """Hasta qué id del ledger está agregado cada rollup (y los huecos que espera, ver id_watermark)."""
+    name = CharField(max_length=64, primary_key=True)
+    last_id = BigIntegerField(null=False, default=0)
+    gap_skip_id = BigIntegerField(null=False, default=0)
+    gap_pending_id = BigIntegerField(null=True)
+    gap_pending_at = DateTimeField(null=True)
+    updated_at = DateTimeField(default=datetime.datetime.now, null=False)
+
+    class Meta:
+        database = db
+        table_name = "ledger_rollup_checkpoints"
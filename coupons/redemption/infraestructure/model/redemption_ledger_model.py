@@ -0,0 +1,27 @@
+import datetime
+from peewee import Model, AutoField, BigIntegerField, CharField, DecimalField, DateTimeField, IntegerField
+
+from coupons.redemption.domain.entities.redemption import RedemptionKind
+from shared.infrastructure.database import db
+
+
+class RedemptionLedgerModel(Model):
+    """Append-only: solo INSERT. Las agregaciones salen de aquí (coupon_daily_stats)."""
+    id = AutoField(primary_key=True)
+    kind = CharField(max_length=16, null=False, choices=[(e.value, e.value) for e in RedemptionKind])
+    coupon_id = BigIntegerField(null=False)
+    client_id = BigIntegerField(null=True)
+    coupon_client_id = BigIntegerField(null=True)
+    order_id = BigIntegerField(null=True)
+    product_id = BigIntegerField(null=True)
+    discount_amount = DecimalField(max_digits=12, decimal_places=2, auto_round=True, null=True)  # total del asiento
+    quantity = IntegerField(null=False, default=1)
+    occurred_at = DateTimeField(default=datetime.datetime.now, null=False)
+
+    class Meta:
+        database = db
+        table_name = "redemption_ledger"
+        indexes = (
+            (("coupon_client_id", "kind"), True),  # un asiento por evento del coupon_client; NULLs no chocan
+            (("coupon_id", "id"), False),
+        )
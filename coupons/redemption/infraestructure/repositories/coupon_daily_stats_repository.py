@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from peewee import fn
+
+from coupons.coupon.infraestructure.model.coupon_model import CouponModel
+from coupons.redemption.domain.entities.redemption import CouponDailyStatsData
+from coupons.redemption.infraestructure.model.coupon_daily_stats_model import (
+    CouponDailyStatsModel, LedgerRollupCheckpointModel,
+)
+from shared.infrastructure.id_watermark import GapHorizonState
+
+StatsKey = Tuple[int, datetime.date]   # (coupon_id, day)
+
+_COUNTERS = ("issued", "redeemed", "expired", "discount_total")
+
+
+class CouponDailyStatsRepository:
+    def _to_entity(self, rec) -> CouponDailyStatsData:
+        return CouponDailyStatsData(
+            coupon_id=rec.coupon_id,
+            day=getattr(rec, "day", None),
+            business_id=rec.business_id,
+            issued=rec.issued,
+            redeemed=rec.redeemed,
+            expired=rec.expired,
+            discount_total=rec.discount_total,
+        )
+
+    # ----------------------------- checkpoint -----------------------------
+    def lock_checkpoint(self, name: str) -> int:
+        """last_id del rollup, bloqueando la fila (un solo rollup a la vez). Llamar en transacción."""
+        m = LedgerRollupCheckpointModel
+        m.insert(name=name, last_id=0).on_conflict_ignore().execute()
+        q = m.select(m.last_id).where(m.name == name)
+        if getattr(m._meta.database, "for_update", False):
+            q = q.for_update()
+        return int(q.scalar() or 0)
+
+    def gap_state(self, name: str) -> GapHorizonState:
+        """Huecos del ledger que el rollup está esperando (pending_at en segundos epoch)."""
+        m = LedgerRollupCheckpointModel
+        row = m.select(m.gap_skip_id, m.gap_pending_id, m.gap_pending_at).where(m.name == name).tuples().first()
+        if not row:
+            return GapHorizonState()
+        return GapHorizonState(skip_through=int(row[0] or 0), pending_id=row[1],
+                               pending_at=row[2].timestamp() if row[2] else None)
+
+    def save_checkpoint(self, name: str, last_id: int, gaps: Optional[GapHorizonState] = None) -> None:
+        m = LedgerRollupCheckpointModel
+        fields = {"last_id": last_id, "updated_at": datetime.datetime.now()}
+        if gaps is not None:
+            fields.update(
+                gap_skip_id=gaps.skip_through,
+                gap_pending_id=gaps.pending_id,
+                gap_pending_at=(datetime.datetime.fromtimestamp(gaps.pending_at)
+                                if gaps.pending_at is not None else None),
+            )
+        m.update(**fields).where(m.name == name).execute()
+
+    # ----------------------------- escritura -----------------------------
+    def apply(self, deltas: Dict[StatsKey, Dict[str, object]]) -> None:
+        """Suma los deltas a cada (cupón, día); crea las filas que falten."""
+        if not deltas:
+            return
+        m = CouponDailyStatsModel
+        coupon_ids = {c for c, _d in deltas}
+        business = dict(CouponModel.select(CouponModel.id, CouponModel.business_id)
+                        .where(CouponModel.id.in_(list(coupon_ids))).tuples())
+        m.insert_many([
+            {"coupon_id": c, "day": d, "business_id": business.get(c)} for c, d in deltas
+        ]).on_conflict_ignore().execute()
+        now = datetime.datetime.now()
+        for (coupon_id, day), delta in deltas.items():
+            changes = {getattr(m, k): getattr(m, k) + v for k, v in delta.items() if k in _COUNTERS and v}
+            if changes:
+                changes[m.updated_at] = now
+                m.update(changes).where((m.coupon_id == coupon_id) & (m.day == day)).execute()
+
+    # ----------------------------- lectura -----------------------------
+    def list_by_coupon(self, coupon_id: int, date_from: Optional[datetime.date] = None,
+                       date_to: Optional[datetime.date] = None) -> List[CouponDailyStatsData]:
+        m = CouponDailyStatsModel
+        q = m.select().where(m.coupon_id == coupon_id)
+        if date_from is not None:
+            q = q.where(m.day >= date_from)
+        if date_to is not None:
+            q = q.where(m.day <= date_to)
+        return [self._to_entity(r) for r in q.order_by(m.day)]
+
+    def summary_by_business(self, business_id: int, date_from: Optional[datetime.date] = None,
+                            date_to: Optional[datetime.date] = None) -> List[CouponDailyStatsData]:
+        """Totales por cupón del negocio en el rango (suma de filas diarias)."""
+        m = CouponDailyStatsModel
+        q = (m.select(m.coupon_id, m.business_id,
+                      fn.SUM(m.issued).alias("issued"), fn.SUM(m.redeemed).alias("redeemed"),
+                      fn.SUM(m.expired).alias("expired"), fn.SUM(m.discount_total).alias("discount_total"))
+             .where(m.business_id == business_id))
+        if date_from is not None:
+            q = q.where(m.day >= date_from)
+        if date_to is not None:
+            q = q.where(m.day <= date_to)
+        return [self._to_entity(r) for r in q.group_by(m.coupon_id, m.business_id).order_by(m.coupon_id)]
+
+    @staticmethod
+    def totals(rows: Iterable[CouponDailyStatsData]) -> Dict[str, object]:
+        out = {"issued": 0, "redeemed": 0, "expired": 0, "discount_total": Decimal("0")}
+        for r in rows:
+            out["issued"] += r.issued
+            out["redeemed"] += r.redeemed
+            out["expired"] += r.expired
+            out["discount_total"] += r.discount_total
+        out["discount_total"] = str(out["discount_total"])
+        return out
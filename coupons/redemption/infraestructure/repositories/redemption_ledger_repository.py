@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from peewee import Value, Tuple as RowValue
+
+from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+from coupons.redemption.domain.entities.redemption import RedemptionEntryData, RedemptionKind
+from coupons.redemption.infraestructure.model.redemption_ledger_model import RedemptionLedgerModel
+
+
+class RedemptionLedgerRepository:
+    """
+    Ledger append-only de emisiones, canjes, devoluciones y vencimientos de cupones.
+
+    Se escribe dentro de la transacción del cambio (CouponClientRepository,
+    CouponUsageRepository). Los asientos de un coupon_client son únicos por
+    (coupon_client_id, kind): reintentar una emisión o un canje no duplica.
+    """
+
+    _FROM_CC_FIELDS = (
+        RedemptionLedgerModel.kind, RedemptionLedgerModel.coupon_id, RedemptionLedgerModel.client_id,
+        RedemptionLedgerModel.coupon_client_id, RedemptionLedgerModel.order_id,
+        RedemptionLedgerModel.quantity, RedemptionLedgerModel.occurred_at,
+    )
+
+    def _to_entity(self, rec: RedemptionLedgerModel) -> RedemptionEntryData:
+        return RedemptionEntryData(
+            id=rec.id,
+            kind=rec.kind,
+            coupon_id=rec.coupon_id,
+            client_id=rec.client_id,
+            coupon_client_id=rec.coupon_client_id,
+            order_id=rec.order_id,
+            product_id=rec.product_id,
+            discount_amount=rec.discount_amount,
+            quantity=rec.quantity,
+            occurred_at=rec.occurred_at,
+        )
+
+    def append(self, entry: RedemptionEntryData) -> int:
+        """Devuelve 1 si se escribió, 0 si el asiento ya existía."""
+        return (RedemptionLedgerModel.insert(
+            kind=entry.kind.value,
+            coupon_id=entry.coupon_id,
+            client_id=entry.client_id,
+            coupon_client_id=entry.coupon_client_id,
+            order_id=entry.order_id,
+            product_id=entry.product_id,
+            discount_amount=entry.discount_amount,
+            quantity=entry.quantity,
+            occurred_at=entry.occurred_at or datetime.datetime.now(),
+        ).on_conflict_ignore().as_rowcount().execute())
+
+    def _append_from_coupon_clients(self, kind: RedemptionKind, where, occurred_at=None) -> int:
+        # INSERT ... SELECT: un asiento por coupon_client sin leer las filas en Python.
+        # Todas las columnas NOT NULL van explícitas: con IGNORE una fila inválida se descarta en silencio.
+        cc = CouponClientModel
+        when = Value(occurred_at) if occurred_at is not None else cc.created_at
+        q = (cc.select(Value(kind.value), cc.coupon_id, cc.client_id, cc.id, cc.source_order_id, Value(1), when)
+             .where(where))
+        return (RedemptionLedgerModel.insert_from(q, self._FROM_CC_FIELDS)
+                .on_conflict_ignore().as_rowcount().execute())
+
+    def append_issued(self, keys: Iterable[Tuple[int, int, str]]) -> int:
+        """Asientos ISSUED de coupon_client recién insertados, por (client_id, coupon_id, code)."""
+        keys = list(keys)
+        if not keys:
+            return 0
+        cc = CouponClientModel
+        return self._append_from_coupon_clients(
+            RedemptionKind.ISSUED, RowValue(cc.client_id, cc.coupon_id, cc.code).in_(keys))
+
+    def append_expired(self, coupon_client_ids: Iterable[int], occurred_at: datetime.datetime) -> int:
+        ids = list(coupon_client_ids)
+        if not ids:
+            return 0
+        return self._append_from_coupon_clients(
+            RedemptionKind.EXPIRED, CouponClientModel.id.in_(ids), occurred_at)
+
+    def ids_after(self, after_id: int, limit: int) -> List[int]:
+        m = RedemptionLedgerModel
+        return [r[0] for r in m.select(m.id).where(m.id > after_id).order_by(m.id).limit(limit).tuples()]
+
+    def list_after(self, after_id: int, limit: int,
+                   through_id: Optional[int] = None) -> List[RedemptionEntryData]:
+        """
+        Asientos con id > after_id en orden. through_id acota al tramo ya confirmado
+        (ver shared.infrastructure.id_watermark): un id menor puede confirmarse después
+        de uno mayor y quien avanza por id se lo saltaría.
+        """
+        m = RedemptionLedgerModel
+        q = m.select().where(m.id > after_id)
+        if through_id is not None:
+            q = q.where(m.id <= through_id)
+        return [self._to_entity(r) for r in q.order_by(m.id).limit(limit)]
+
+    def list_by_coupon(self, coupon_id: int, after_id: int = 0, limit: int = 100) -> List[RedemptionEntryData]:
+        m = RedemptionLedgerModel
+        q = (m.select()
+             .where((m.coupon_id == coupon_id) & (m.id > after_id))
+             .order_by(m.id)
+             .limit(limit))
+        return [self._to_entity(r) for r in q]
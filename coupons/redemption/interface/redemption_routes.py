@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from flask import Blueprint, request, jsonify, current_app
+
+redemption_bp = Blueprint("coupon_stats_api", __name__, url_prefix="/api/coupon-stats")
+
+MAX_LEDGER_PAGE = 500
+
+
+def _qry():
+    services = current_app.config.get("coupon_services")
+    if not services:
+        raise RuntimeError("coupon_services not configured in current_app.config")
+    return services["redemption_query_service"]
+
+
+def _parse_date(field: str) -> Optional[date]:
+    value = request.args.get(field)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{field} must be an ISO date (e.g. 2025-08-14)")
+
+
+@redemption_bp.route("/by-coupon/<int:coupon_id>", methods=["GET"])
+def daily_by_coupon(coupon_id: int):
+    """
+    Serie diaria del cupón desde coupon_daily_stats (?from=YYYY-MM-DD&to=YYYY-MM-DD).
+    Los últimos segundos pueden no estar agregados todavía (ver rollup_redemptions.py).
+    """
+    qry = _qry()
+    try:
+        rows = qry.daily_by_coupon(coupon_id, _parse_date("from"), _parse_date("to"))
+        return jsonify({
+            "coupon_id": coupon_id,
+            "days": [r.to_dict() for r in rows],
+            "totals": qry.totals(rows),
+        }), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@redemption_bp.route("/by-business/<int:business_id>", methods=["GET"])
+def summary_by_business(business_id: int):
+    """Totales por cupón del negocio en el rango (?from&to)."""
+    qry = _qry()
+    try:
+        rows = qry.summary_by_business(business_id, _parse_date("from"), _parse_date("to"))
+        return jsonify({
+            "business_id": business_id,
+            "coupons": [r.to_dict() for r in rows],
+            "totals": qry.totals(rows),
+        }), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@redemption_bp.route("/ledger/<int:coupon_id>", methods=["GET"])
+def ledger_by_coupon(coupon_id: int):
+    """Asientos del cupón por cursor: ?after=<id>&limit=100 (siguiente página: after=next_after)."""
+    qry = _qry()
+    try:
+        after = request.args.get("after", default=0, type=int)
+        limit = min(max(1, request.args.get("limit", default=100, type=int)), MAX_LEDGER_PAGE)
+        items = qry.ledger_by_coupon(coupon_id, after, limit)
+        return jsonify({
+            "items": [e.to_dict() for e in items],
+            "next_after": items[-1].id if items else after,
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
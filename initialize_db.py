@@ -1,5 +1,34 @@
 # initialize_db.py  (en la raíz del micro-servicio)
-from shared.infrastructure.database import init_db
+# Paso de migración separado del arranque: correr antes de levantar workers
+# con APP_INIT_DB_ON_STARTUP=0.
+#
+#   python initialize_db.py            -> aplica migraciones pendientes
+#   python initialize_db.py --status   -> lista versiones y si están aplicadas
+#   python initialize_db.py --dry-run  -> muestra qué aplicaría
+#   python initialize_db.py --check    -> diff modelos vs esquema vivo (exit 1 si hay drift)
+import argparse
+import json
+import sys
+
+from shared.infrastructure.database import db, get_all_models, init_db
+from shared.infrastructure.migrations.engine import MigrationEngine
+from shared.infrastructure.migrations.schema_check import diff_schema
+from shared.infrastructure.migrations.versions import MIGRATIONS
 
 if __name__ == "__main__":
-    init_db()
+    parser = argparse.ArgumentParser(description="Migraciones de esquema")
+    parser.add_argument("--status", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    if args.status:
+        print(json.dumps(MigrationEngine(MIGRATIONS, db).status(), indent=2))
+    elif args.dry_run:
+        print(json.dumps(MigrationEngine(MIGRATIONS, db).migrate(dry_run=True)))
+    elif args.check:
+        drifts = diff_schema(get_all_models(), db)
+        print(json.dumps([d.to_dict() for d in drifts], indent=2, ensure_ascii=False))
+        sys.exit(1 if drifts else 0)
+    else:
+        init_db()
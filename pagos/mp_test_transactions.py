@@ -5,10 +5,12 @@ Mercado Pago - Checkout API Test Runner (Peru)
 ------------------------------------------------
 - Creates card tokens for MP test cards
 - Triggers payments with different outcomes by using special cardholder names (APRO, OTHE, CONT, CALL, FUND, SECU, EXPI, FORM)
-- Saves a CSV log of attempts in ./mp_test_logs.csv
+- Runs scenarios concurrently (thread pool) for a fixed number of iterations or a duration
+- Reports p50/p95/p99 latency and error rate per scenario
+- Saves a CSV log of attempts in ./mp_test_logs.csv (single buffered writer)
 
 Usage:
-  pip install mercadopago python-dotenv
+  pip install requests python-dotenv
   # Option A: provide credentials via env (.env file or shell)
   export MP_ACCESS_TOKEN="TEST-xxxxxxxxxxxxxxxx"
   export MP_PUBLIC_KEY="TEST-xxxxxxxxxxxxxxxx"
@@ -17,12 +19,21 @@ Usage:
   # Single scenario
   python mp_test_transactions.py --status APRO --method visa --amount 10.5
 
-  # Run all key scenarios
+  # Run all key scenarios once
   python mp_test_transactions.py --run-all
 
+  # Load run against the sandbox: 16 workers for 60 seconds
+  python mp_test_transactions.py --run-all --concurrency 16 --duration 60
+
+  # Same against the local simulator (no network; run from the repo root)
+  python -m pagos.mp_test_transactions --run-all --simulator --concurrency 32 --iterations 5000 \\
+      --sim-latency-ms 40 --sim-error-rate 0.01
+
 Note:
 - This is for TEST environment only.
 - For Peru, identification type usually "DNI"; number per MP docs for testing.
+- Calls go straight to the REST API (/v1/card_tokens, /v1/payments), the same endpoints
+  the mercadopago SDK uses, so --api-base can point at the sandbox or the simulator.
 """
 
 import os
@@ -30,18 +41,23 @@ import sys
 import csv
 import json
 import time
+import uuid
 import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 try:
-    import mercadopago
+    import requests
 except ImportError:
-    print("Missing dependency: mercadopago. Install with 'pip install mercadopago'")
+    print("Missing dependency: requests. Install with 'pip install requests'")
     sys.exit(1)
 
 # ======= Credentials =======
 DEFAULT_ACCESS_TOKEN = os.getenv("MP_ACCESS_TOKEN", "TEST-6717023677658234-082111-a7fa92c3a2f98ba38957b9be0052faa7-2627767616")
 DEFAULT_PUBLIC_KEY   = os.getenv("MP_PUBLIC_KEY",   "TEST-5b04c74f-3229-4d1e-8e8f-7997c830c37b")
+DEFAULT_API_BASE     = os.getenv("MP_API_BASE_URL", "https://api.mercadopago.com")
 
 # ======= Test cards (Perú) =======
 TEST_CARDS = {
@@ -78,20 +94,58 @@ STATUS_CARDHOLDER = {
     "FORM": {"name": "FORM", "doc": "123456789"},
 }
 
-LOG_FILE = "mp_test_logs.csv"
+RUN_ALL_SCENARIOS = [
+    ("visa", "APRO"),
+    ("master", "APRO"),
+    ("amex", "APRO"),
+    ("visa", "FUND"),
+    ("visa", "SECU"),
+    ("visa", "EXPI"),
+    ("visa", "CALL"),
+    ("visa", "OTHE"),
+    ("visa", "FORM"),
+    ("visa", "CONT"),
+]
 
-
-def build_sdk(access_token: str) -> mercadopago.SDK:
-    return mercadopago.SDK(access_token)
+LOG_FILE = "mp_test_logs.csv"
+LOG_FIELDS = [
+    "timestamp", "method", "status_tag", "amount", "http", "payment_id", "mp_status",
+    "mp_status_detail", "error", "token_ms", "payment_ms", "total_ms",
+]
+
+
+class MPClient:
+    """Minimal REST client. One requests.Session per thread (keep-alive, thread safe)."""
+
+    def __init__(self, access_token: str, api_base: str = DEFAULT_API_BASE, timeout: float = 30.0):
+        self.access_token = access_token
+        self.api_base = api_base.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = self._local.session = requests.Session()
+            s.headers.update({"Authorization": f"Bearer {self.access_token}"})
+        return s
+
+    def post(self, path: str, payload: dict, headers: dict = None) -> tuple:
+        r = self.session.post(f"{self.api_base}{path}", json=payload, headers=headers, timeout=self.timeout)
+        try:
+            body = r.json()
+        except ValueError:
+            body = {"message": r.text[:200]}
+        return r.status_code, body
 
 
-def create_card_token(sdk: mercadopago.SDK, public_key: str, card_info: dict, status_key: str) -> str:
+def create_card_token(client: MPClient, card_info: dict, status_key: str) -> str:
     """Create a card token using raw test card data and the special cardholder name."""
     if status_key not in STATUS_CARDHOLDER:
         raise ValueError(f"Unsupported status '{status_key}'. Use one of: {', '.join(STATUS_CARDHOLDER.keys())}")
 
     holder = STATUS_CARDHOLDER[status_key]
-    # Tokenization endpoint (public_key-based). SDK handles host selection.
     payload = {
         "card_number": card_info["number"],
         "security_code": card_info["security_code"],
@@ -106,18 +160,14 @@ def create_card_token(sdk: mercadopago.SDK, public_key: str, card_info: dict, st
         },
     }
 
-    # The SDK exposes card_token().create using the Access Token; for proper tokenization flow,
-    # we can use the 'payment_methods/card_tokens' resource. The SDK uses private auth,
-    # which works in sandbox for tests.
-    result = sdk.card_token().create(payload)
-    if result["status"] not in (200, 201):
-        raise RuntimeError(f"Card token creation failed: HTTP {result['status']} - {result.get('response')}")
-
-    token_id = result["response"]["id"]
-    return token_id
+    # Private-auth tokenization (what the SDK's card_token().create does); works in sandbox for tests.
+    status, response = client.post("/v1/card_tokens", payload)
+    if status not in (200, 201):
+        raise RuntimeError(f"Card token creation failed: HTTP {status} - {response}")
+    return response["id"]
 
 
-def create_payment(sdk: mercadopago.SDK, amount: float, token_id: str, payment_method_id: str, email: str) -> dict:
+def create_payment(client: MPClient, amount: float, token_id: str, payment_method_id: str, email: str) -> dict:
     """Create a payment using a previously created card token."""
     payment_data = {
         "transaction_amount": round(float(amount), 2),
@@ -131,83 +181,176 @@ def create_payment(sdk: mercadopago.SDK, amount: float, token_id: str, payment_m
         },
         "binary_mode": False,  # set True if you only want approved/declined (no pending)
     }
-    res = sdk.payment().create(payment_data)
-    return res
+    status, response = client.post("/v1/payments", payment_data,
+                                    headers={"X-Idempotency-Key": uuid.uuid4().hex})
+    return {"status": status, "response": response}
+
 
+class ResultWriter:
+    """Single CSV writer shared by every worker: opened once, buffered, flushed on close."""
 
-def log_result(row: dict):
-    exists = os.path.isfile(LOG_FILE)
-    with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=list(row.keys()))
+    def __init__(self, path: str = LOG_FILE, buffer_bytes: int = 1 << 20):
+        exists = os.path.isfile(path) and os.path.getsize(path) > 0
+        self._f = open(path, "a", newline="", encoding="utf-8", buffering=buffer_bytes)
+        self._writer = csv.DictWriter(self._f, fieldnames=LOG_FIELDS, extrasaction="ignore")
+        self._lock = threading.Lock()
         if not exists:
-            writer.writeheader()
-        writer.writerow(row)
+            self._writer.writeheader()
+
+    def write(self, row: dict):
+        with self._lock:
+            self._writer.writerow(row)
+
+    def close(self):
+        with self._lock:
+            self._f.close()
 
+    def __enter__(self):
+        return self
 
-def run_scenario(access_token: str, public_key: str, method_key: str, status_key: str, amount: float):
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _normalize_method(method_key: str) -> str:
     method_key = method_key.lower()
     if method_key == "mastercard":
         method_key = "master"
     if method_key not in TEST_CARDS:
         raise ValueError(f"Unsupported method '{method_key}'. Use one of: visa, master, amex")
+    return method_key
 
-    sdk = build_sdk(access_token)
-
-    # Create token
-    token_id = create_card_token(sdk, public_key, TEST_CARDS[method_key], status_key)
-
-    # Create payment
-    payer_email = f"test_user_{int(time.time())}@testuser.com"
-    pay_res = create_payment(sdk, amount, token_id, "master" if method_key == "master" else method_key, payer_email)
-
-    http_status = pay_res.get("status")
-    response = pay_res.get("response", {})
 
-    # Pull common fields if present
-    payment_id = response.get("id")
-    status = response.get("status")
-    status_detail = response.get("status_detail")
-    error_msg = response.get("message") or response.get("error") or ""
-
-    # Print + Log
-    print("=" * 60)
-    print(f"Scenario -> Method: {method_key} | Status tag: {status_key} | Amount: {amount}")
-    print(f"HTTP: {http_status}")
-    print("Response:", json.dumps(response, indent=2, ensure_ascii=False))
-    print("=" * 60)
-
-    log_row = {
+def run_scenario(client: MPClient, method_key: str, status_key: str, amount: float, verbose: bool = True) -> dict:
+    """Token + payment for one scenario. Returns the log row (never raises on HTTP/network errors)."""
+    method_key = _normalize_method(method_key)
+    row = {
         "timestamp": datetime.utcnow().isoformat(),
         "method": method_key,
         "status_tag": status_key,
         "amount": amount,
-        "http": http_status,
-        "payment_id": payment_id,
-        "mp_status": status,
-        "mp_status_detail": status_detail,
-        "error": error_msg,
+        "http": None, "payment_id": None, "mp_status": None, "mp_status_detail": None, "error": "",
+        "token_ms": None, "payment_ms": None, "total_ms": None,
     }
-    log_result(log_row)
-
-
-def run_all(access_token: str, public_key: str, amount: float):
-    scenarios = [
-        ("visa", "APRO"),
-        ("master", "APRO"),
-        ("amex", "APRO"),
-        ("visa", "FUND"),
-        ("visa", "SECU"),
-        ("visa", "EXPI"),
-        ("visa", "CALL"),
-        ("visa", "OTHE"),
-        ("visa", "FORM"),
-        ("visa", "CONT"),
-    ]
-    for method, status in scenarios:
-        try:
-            run_scenario(access_token, public_key, method, status, amount)
-        except Exception as e:
-            print(f"[WARN] Scenario {method}-{status} failed: {e}")
+    t0 = time.perf_counter()
+    try:
+        token_id = create_card_token(client, TEST_CARDS[method_key], status_key)
+        t1 = time.perf_counter()
+        row["token_ms"] = round((t1 - t0) * 1000, 2)
+
+        payer_email = f"test_user_{int(time.time())}@testuser.com"
+        pay_res = create_payment(client, amount, token_id, method_key, payer_email)
+        row["payment_ms"] = round((time.perf_counter() - t1) * 1000, 2)
+
+        response = pay_res.get("response") or {}
+        ok = pay_res.get("status") in (200, 201)
+        row.update({
+            "http": pay_res.get("status"),
+            "payment_id": response.get("id") if ok else None,
+            # on HTTP errors MP's body carries the numeric status, not a payment status
+            "mp_status": response.get("status") if ok else None,
+            "mp_status_detail": response.get("status_detail") if ok else None,
+            "error": response.get("message") or response.get("error") or "",
+        })
+    except (requests.RequestException, RuntimeError) as e:
+        row["error"] = str(e)[:300]
+        response = {}
+    row["total_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+
+    if verbose:
+        print("=" * 60)
+        print(f"Scenario -> Method: {method_key} | Status tag: {status_key} | Amount: {amount}")
+        print(f"HTTP: {row['http']}")
+        print("Response:", json.dumps(response, indent=2, ensure_ascii=False))
+        print("=" * 60)
+    return row
+
+
+def _is_error(row: dict) -> bool:
+    # a rejected payment is an expected outcome (HTTP 201); errors are transport / HTTP failures
+    return row["http"] not in (200, 201)
+
+
+def _percentile(sorted_values: list, p: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def summarize(rows: list, elapsed_s: float) -> dict:
+    by_scenario = {}
+    for row in rows:
+        by_scenario.setdefault(f"{row['method']}-{row['status_tag']}", []).append(row)
+    report = {"elapsed_s": round(elapsed_s, 2), "total": len(rows),
+              "throughput_per_s": round(len(rows) / elapsed_s, 1) if elapsed_s else 0.0, "scenarios": {}}
+    for name, items in sorted(by_scenario.items()):
+        lat = sorted(r["total_ms"] for r in items if not _is_error(r))
+        errors = sum(1 for r in items if _is_error(r))
+        outcomes = {}
+        for r in items:
+            key = r["mp_status"] or "error"
+            outcomes[key] = outcomes.get(key, 0) + 1
+        report["scenarios"][name] = {
+            "n": len(items),
+            "error_rate": round(errors / len(items), 4),
+            "p50_ms": _percentile(lat, 0.50),
+            "p95_ms": _percentile(lat, 0.95),
+            "p99_ms": _percentile(lat, 0.99),
+            "outcomes": outcomes,
+        }
+    return report
+
+
+def run_load(client: MPClient, scenarios: list, amount: float, concurrency: int,
+             iterations: int = None, duration: float = None, log_path: str = LOG_FILE) -> dict:
+    """
+    Round-robin over scenarios from `concurrency` workers until `iterations` calls are
+    done or `duration` seconds have passed (whichever is given; both -> first reached).
+    """
+    if iterations is None and duration is None:
+        iterations = len(scenarios)
+    counter = itertools.count()
+    deadline = time.monotonic() + duration if duration else None
+    rows, rows_lock = [], threading.Lock()
+
+    def worker(writer: ResultWriter):
+        local = []
+        while True:
+            i = next(counter)
+            if iterations is not None and i >= iterations:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            method, status = scenarios[i % len(scenarios)]
+            row = run_scenario(client, method, status, amount, verbose=False)
+            writer.write(row)
+            local.append(row)
+        with rows_lock:
+            rows.extend(local)
+
+    t0 = time.perf_counter()
+    with ResultWriter(log_path) as writer, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for f in [pool.submit(worker, writer) for _ in range(concurrency)]:
+            f.result()
+    return summarize(rows, time.perf_counter() - t0)
+
+
+def print_report(report: dict):
+    print(f"\n{report['total']} calls in {report['elapsed_s']}s ({report['throughput_per_s']}/s)")
+    print(f"{'scenario':<14}{'n':>7}{'err%':>8}{'p50':>9}{'p95':>9}{'p99':>9}  outcomes")
+    for name, s in report["scenarios"].items():
+        fmt = lambda v: f"{v:>9.1f}" if v is not None else f"{'-':>9}"  # noqa: E731
+        print(f"{name:<14}{s['n']:>7}{s['error_rate'] * 100:>7.2f}%{fmt(s['p50_ms'])}{fmt(s['p95_ms'])}"
+              f"{fmt(s['p99_ms'])}  {json.dumps(s['outcomes'])}")
+
+
+def _start_simulator(args):
+    # local import: the simulator lives in the service package (run from the repo root)
+    from payment.reconciliation.infraestructure.clients.mp_stub_server import MercadoPagoStubServer
+    sim = MercadoPagoStubServer(seed=42)
+    sim.set_faults("*", latency_ms=args.sim_latency_ms, jitter_ms=args.sim_jitter_ms,
+                   error_rate=args.sim_error_rate)
+    return sim.start()
 
 
 def main():
@@ -218,18 +361,44 @@ def main():
     parser.add_argument("--status", choices=list(STATUS_CARDHOLDER.keys()), default="APRO", help="Desired test outcome")
     parser.add_argument("--amount", type=float, default=10.0, help="Transaction amount")
     parser.add_argument("--run-all", action="store_true", help="Run a battery of scenarios")
+    parser.add_argument("--api-base", default=DEFAULT_API_BASE, help="MP API base URL (sandbox or simulator)")
+    parser.add_argument("--simulator", action="store_true", help="Start the local MP simulator and use it")
+    parser.add_argument("--sim-latency-ms", type=float, default=0.0)
+    parser.add_argument("--sim-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--sim-error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=1, help="Worker threads")
+    parser.add_argument("--iterations", type=int, help="Total calls (default: one pass over the scenarios)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout per call (s)")
+    parser.add_argument("--log-file", default=LOG_FILE)
+    parser.add_argument("--report-json", help="Also write the latency report to this file")
 
     args = parser.parse_args()
 
-    if not args.access_token.startswith("TEST-"):
+    sim = _start_simulator(args) if args.simulator else None
+    api_base = sim.base_url if sim else args.api_base
+    if not sim and not args.access_token.startswith("TEST-"):
         print("WARNING: Access token does not look like a TEST token. Make sure you are not using PRODUCTION.", file=sys.stderr)
 
-    if args.run_all:
-        run_all(args.access_token, args.public_key, args.amount)
-    else:
-        run_scenario(args.access_token, args.public_key, args.method, args.status, args.amount)
-
-    print(f"\nLog saved to ./{LOG_FILE}")
+    client = MPClient(args.access_token, api_base=api_base, timeout=args.timeout)
+    scenarios = RUN_ALL_SCENARIOS if args.run_all else [(_normalize_method(args.method), args.status)]
+    single = not args.run_all and args.concurrency == 1 and not args.iterations and not args.duration
+    try:
+        if single:
+            with ResultWriter(args.log_file) as writer:
+                writer.write(run_scenario(client, args.method, args.status, args.amount))
+        else:
+            report = run_load(client, scenarios, args.amount, max(1, args.concurrency),
+                              iterations=args.iterations, duration=args.duration, log_path=args.log_file)
+            print_report(report)
+            if args.report_json:
+                with open(args.report_json, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2)
+    finally:
+        if sim:
+            sim.stop()
+
+    print(f"\nLog saved to {args.log_file}")
 
 
 if __name__ == "__main__":
@@ -1,18 +1,42 @@
 from __future__ import annotations
 
+import dataclasses
 import datetime
 from typing import Optional
 
 from payment.checkout.domain.entities.checkout_session import CheckoutSessionData
+from payment.checkout.infraestructure.cache.checkout_session_cache import CheckoutSessionCache
 from payment.checkout.infraestructure.repositories.checkout_session_repository import CheckoutSessionRepository
 
 
 class CheckoutSessionCommandService:
     """
     Casos de uso de escritura / orquestación para Checkout Sessions.
+    Si recibe el mismo cache que el query service, lo mantiene al día:
+    las mutaciones por provider_session_id son un único UPDATE y, si la sesión
+    ya estaba cacheada, se parchea en memoria sin volver a leer.
     """
-    def __init__(self, repo: CheckoutSessionRepository):
+    def __init__(self, repo: CheckoutSessionRepository, cache: Optional[CheckoutSessionCache] = None):
         self.repo = repo
+        self.cache = cache
+
+    def _apply_changes(self, provider_session_id: str, changes: dict) -> Optional[CheckoutSessionData]:
+        hit, cached = self.cache.get(provider_session_id)
+        if not changes:
+            if hit:
+                return cached
+            entity = self.repo.get_by_provider_session_id(provider_session_id)
+            self.cache.set(provider_session_id, entity)
+            return entity
+
+        rows = self.repo.update_fields_by_provider_session_id(provider_session_id, changes)
+        unchanged = cached is not None and all(getattr(cached, k) == v for k, v in changes.items())
+        if cached is not None and (rows > 0 or unchanged):
+            entity = dataclasses.replace(cached, **changes)
+        else:
+            entity = self.repo.get_by_provider_session_id(provider_session_id)
+        self.cache.set(provider_session_id, entity)
+        return entity
 
     def create(
         self,
@@ -29,7 +53,10 @@ class CheckoutSessionCommandService:
             sandbox_url=sandbox_url,
             expires_at=expires_at,
         )
-        return self.repo.create(entity)
+        created = self.repo.create(entity)
+        if self.cache is not None:
+            self.cache.set(created.provider_session_id, created)
+        return created
 
     def create_or_replace_for_order(
         self,
@@ -40,7 +67,7 @@ class CheckoutSessionCommandService:
         expires_at: Optional[datetime.datetime] = None,
         expire_previous: bool = True
     ) -> CheckoutSessionData:
-        return self.repo.create_or_replace_for_order(
+        created = self.repo.create_or_replace_for_order(
             order_id=order_id,
             provider_session_id=provider_session_id,
             init_url=init_url,
@@ -48,6 +75,11 @@ class CheckoutSessionCommandService:
             expires_at=expires_at,
             expire_previous=expire_previous,
         )
+        if self.cache is not None:
+            if expire_previous:
+                self.cache.invalidate_order(order_id)
+            self.cache.set(created.provider_session_id, created)
+        return created
 
     def update_urls_by_provider_session_id(
         self,
@@ -56,15 +88,23 @@ class CheckoutSessionCommandService:
         sandbox_url: Optional[str] = None,
         expires_at: Optional[datetime.datetime] = None,
     ):
-        return self.repo.update_urls_by_provider_session_id(
-            provider_session_id=provider_session_id,
-            init_url=init_url,
-            sandbox_url=sandbox_url,
-            expires_at=expires_at,
-        )
+        if self.cache is None:
+            return self.repo.update_urls_by_provider_session_id(
+                provider_session_id=provider_session_id,
+                init_url=init_url,
+                sandbox_url=sandbox_url,
+                expires_at=expires_at,
+            )
+        changes = self.repo.url_changes(init_url, sandbox_url, expires_at)
+        return self._apply_changes(provider_session_id, changes)
 
     def expire_by_provider_session_id(self, provider_session_id: str):
-        return self.repo.expire_by_provider_session_id(provider_session_id)
+        if self.cache is None:
+            return self.repo.expire_by_provider_session_id(provider_session_id)
+        return self._apply_changes(provider_session_id, {"expires_at": datetime.datetime.now()})
 
     def delete(self, id_: int) -> bool:
-        return self.repo.delete(id_)
+        ok = self.repo.delete(id_)
+        if ok and self.cache is not None:
+            self.cache.invalidate_id(id_)
+        return ok
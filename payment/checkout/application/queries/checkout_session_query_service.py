@@ -3,21 +3,32 @@ from __future__ import annotations
 from typing import Optional, List
 
 from payment.checkout.domain.entities.checkout_session import CheckoutSessionData
+from payment.checkout.infraestructure.cache.checkout_session_cache import CheckoutSessionCache
 from payment.checkout.infraestructure.repositories.checkout_session_repository import CheckoutSessionRepository
 
 
 class CheckoutSessionQueryService:
     """
     Casos de uso de lectura para Checkout Sessions.
+    get_by_provider_session_id pasa por el cache (si hay) porque es el que
+    golpean el polling del frontend y las return URLs de MP.
     """
-    def __init__(self, repo: CheckoutSessionRepository):
+    def __init__(self, repo: CheckoutSessionRepository, cache: Optional[CheckoutSessionCache] = None):
         self.repo = repo
+        self.cache = cache
 
     def get_by_id(self, id_: int) -> Optional[CheckoutSessionData]:
         return self.repo.get_by_id(id_)
 
     def get_by_provider_session_id(self, provider_session_id: str) -> Optional[CheckoutSessionData]:
-        return self.repo.get_by_provider_session_id(provider_session_id)
+        if self.cache is None:
+            return self.repo.get_by_provider_session_id(provider_session_id)
+        hit, entity = self.cache.get(provider_session_id)
+        if hit:
+            return entity
+        entity = self.repo.get_by_provider_session_id(provider_session_id)
+        self.cache.set(provider_session_id, entity)
+        return entity
 
     def list_by_order(self, order_id: int, only_active: bool = False) -> List[CheckoutSessionData]:
         return self.repo.list_by_order(order_id=order_id, only_active=only_active)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict, Set
+
+from payment.checkout.domain.entities.checkout_session import CheckoutSessionData
+
+
+class CheckoutSessionCache:
+    """
+    Cache-aside en memoria (por proceso) para checkout sessions, indexado por provider_session_id.
+
+    - TTL por entrada; los "no encontrado" también se cachean con un TTL más corto
+      para que el polling de un id inexistente no pegue siempre a la BD.
+    - Acotado a max_entries (LRU).
+    - Invalidación explícita: por provider_session_id, por order_id o por id.
+    - Guarda y devuelve copias para que nadie mute la entrada cacheada.
+    """
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        negative_ttl_seconds: Optional[float] = None,
+        max_entries: int = 10_000,
+    ):
+        self.ttl = float(ttl_seconds if ttl_seconds is not None
+                         else os.getenv("CHECKOUT_SESSION_CACHE_TTL", "30"))
+        self.negative_ttl = float(negative_ttl_seconds if negative_ttl_seconds is not None
+                                  else os.getenv("CHECKOUT_SESSION_CACHE_NEGATIVE_TTL", "5"))
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[str, Tuple[float, Optional[CheckoutSessionData]]]" = OrderedDict()
+        self._by_order: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _copy(e: Optional[CheckoutSessionData]) -> Optional[CheckoutSessionData]:
+        return dataclasses.replace(e) if e is not None else None
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item and item[1] is not None:
+            keys = self._by_order.get(item[1].order_id)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    self._by_order.pop(item[1].order_id, None)
+
+    # -----------------------
+    # Lectura / escritura
+    # -----------------------
+    def get(self, provider_session_id: str) -> Tuple[bool, Optional[CheckoutSessionData]]:
+        """Devuelve (hit, entidad). hit=True con entidad None = "no existe" cacheado."""
+        if not self.enabled:
+            return False, None
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(provider_session_id)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    self._drop(provider_session_id)
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(provider_session_id)
+            self.hits += 1
+            return True, self._copy(item[1])
+
+    def set(self, provider_session_id: str, entity: Optional[CheckoutSessionData]) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl if entity is not None else self.negative_ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._drop(provider_session_id)
+            self._data[provider_session_id] = (time.monotonic() + ttl, self._copy(entity))
+            if entity is not None:
+                self._by_order.setdefault(entity.order_id, set()).add(provider_session_id)
+            while len(self._data) > self.max_entries:
+                self._drop(next(iter(self._data)))
+
+    # -----------------------
+    # Invalidación
+    # -----------------------
+    def invalidate(self, provider_session_id: str) -> None:
+        with self._lock:
+            self._drop(provider_session_id)
+
+    def invalidate_order(self, order_id: int) -> None:
+        with self._lock:
+            for key in list(self._by_order.get(order_id, ())):
+                self._drop(key)
+
+    def invalidate_id(self, id_: int) -> None:
+        with self._lock:
+            for key, (_, e) in list(self._data.items()):
+                if e is not None and e.id == id_:
+                    self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._by_order.clear()
@@ -128,6 +128,35 @@ class CheckoutSessionRepository:
         )
         return self.create(entity)
 
+    @staticmethod
+    def url_changes(
+        init_url: str | None = None,
+        sandbox_url: str | None = None,
+        expires_at: datetime.datetime | None = None,
+    ) -> dict:
+        """Campos a tocar (los None se ignoran, igual que antes)."""
+        changes = {}
+        if init_url is not None:
+            changes["init_url"] = init_url
+        if sandbox_url is not None:
+            changes["sandbox_url"] = sandbox_url
+        if expires_at is not None:
+            changes["expires_at"] = expires_at
+        return changes
+
+    def update_fields_by_provider_session_id(self, provider_session_id: str, changes: dict) -> int:
+        """
+        Un solo UPDATE ... WHERE provider_session_id = ? (usa uq_session).
+        Devuelve filas afectadas; ojo: en MySQL 0 también puede significar "sin cambios".
+        """
+        if not changes:
+            return 0
+        fields = {getattr(CheckoutSessionModel, k): v for k, v in changes.items()}
+        return (CheckoutSessionModel
+                .update(fields)
+                .where(CheckoutSessionModel.provider_session_id == provider_session_id)
+                .execute())
+
     def update_urls_by_provider_session_id(
         self,
         provider_session_id: str,
@@ -137,25 +166,14 @@ class CheckoutSessionRepository:
     ) -> Optional[CheckoutSessionData]:
         """
         Cuando MP devuelve nuevas URLs (por rotación) o cambias expiración.
+        UPDATE directo + relectura (antes: lectura, relectura en update() y save()).
         """
-        rec = self.get_by_provider_session_id(provider_session_id)
-        if not rec:
-            return None
-        changed = False
-        if init_url is not None and rec.init_url != init_url:
-            rec.init_url = init_url
-            changed = True
-        if sandbox_url is not None and rec.sandbox_url != sandbox_url:
-            rec.sandbox_url = sandbox_url
-            changed = True
-        if expires_at is not None and rec.expires_at != expires_at:
-            rec.expires_at = expires_at
-            changed = True
-        return self.update(rec) if changed else rec
+        changes = self.url_changes(init_url, sandbox_url, expires_at)
+        self.update_fields_by_provider_session_id(provider_session_id, changes)
+        return self.get_by_provider_session_id(provider_session_id)
 
     def expire_by_provider_session_id(self, provider_session_id: str) -> Optional[CheckoutSessionData]:
-        rec = self.get_by_provider_session_id(provider_session_id)
-        if not rec:
-            return None
-        rec.expires_at = datetime.datetime.now()
-        return self.update(rec)
+        self.update_fields_by_provider_session_id(
+            provider_session_id, {"expires_at": datetime.datetime.now()}
+        )
+        return self.get_by_provider_session_id(provider_session_id)
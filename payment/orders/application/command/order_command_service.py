@@ -8,14 +8,27 @@ from payment.orders.domain.entities.order import OrderData
 from payment.orders.domain.value_objects.enums import OrderStatus, PaymentFlow
 from payment.orders.infraestructure.repositories.order_repository import OrderRepository
 from payment.provider.provider_customer.domain.value_objects.enums import ProviderEnum, EnvEnum
+from shared.infrastructure.change_feed import ChangeRecorder, change_scope
 
 
 class OrderCommandService:
     """
     Casos de uso de escritura / orquestación para Orders.
     """
-    def __init__(self, repo: OrderRepository):
+    def __init__(self, repo: OrderRepository, changes: Optional[ChangeRecorder] = None):
         self.repo = repo
+        self.changes = changes
+
+    def _recorded(self, op: str, mutate):
+        """
+        Ejecuta la mutación -> (orden, changed) y registra el cambio en la misma
+        transacción solo si cambió algo (un no-op no se publica). Devuelve la orden.
+        """
+        with change_scope(self.changes):
+            order, changed = mutate()
+            if changed and order is not None and self.changes is not None:
+                self.changes.record("order", order.id, op, order.to_dict())
+        return order
 
     def create(
         self,
@@ -35,7 +48,7 @@ class OrderCommandService:
             description=description,
             metadata=metadata or {},
         )
-        return self.repo.create(entity)
+        return self._recorded("created", lambda: (self.repo.create(entity), True))
 
     def set_checkout_context(
         self,
@@ -48,7 +61,7 @@ class OrderCommandService:
         mark_processing: bool = True,
         extra_metadata: Optional[Dict[str, Any]] = None
     ):
-        return self.repo.set_checkout_context(
+        return self._recorded("checkout_context", lambda: (self.repo.set_checkout_context(
             order_id=order_id,
             flow=flow,
             provider=provider,
@@ -57,7 +70,7 @@ class OrderCommandService:
             idempotency_key=idempotency_key,
             mark_processing=mark_processing,
             extra_metadata=extra_metadata,
-        )
+        ), True))
 
     def mark_paid(
         self,
@@ -69,7 +82,7 @@ class OrderCommandService:
         paid_at: Optional[datetime.datetime] = None,
         extra_metadata: Optional[Dict[str, Any]] = None
     ):
-        return self.repo.mark_paid(
+        return self._recorded("paid", lambda: self.repo.mark_paid(
             order_id=order_id,
             provider_payment_id=provider_payment_id,
             payment_type=payment_type,
@@ -77,7 +90,7 @@ class OrderCommandService:
             method_last_four=method_last_four,
             paid_at=paid_at,
             extra_metadata=extra_metadata,
-        )
+        ))
 
     def mark_failed(
         self,
@@ -86,12 +99,12 @@ class OrderCommandService:
         error_message: Optional[str] = None,
         extra_metadata: Optional[Dict[str, Any]] = None
     ):
-        return self.repo.mark_failed(
+        return self._recorded("failed", lambda: self.repo.mark_failed(
             order_id=order_id,
             error_code=error_code,
             error_message=error_message,
             extra_metadata=extra_metadata,
-        )
+        ))
 
     def cancel(self, order_id: int, reason: Optional[str] = None):
-        return self.repo.cancel(order_id, reason=reason)
+        return self._recorded("canceled", lambda: self.repo.cancel(order_id, reason=reason))
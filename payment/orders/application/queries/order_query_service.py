@@ -2,7 +2,8 @@ from payment.orders.domain.entities.order import OrderData
 from payment.orders.domain.value_objects.enums import OrderStatus, PaymentFlow
 from payment.orders.infraestructure.repositories.order_repository import OrderRepository
 from payment.provider.provider_customer.domain.value_objects.enums import ProviderEnum, EnvEnum
-from typing import Optional, List
+import datetime
+from typing import Optional, List, Iterator, Dict, Any
 
 class OrderQueryService:
     """
@@ -27,4 +28,31 @@ class OrderQueryService:
         return self.repo.list_by_seller(seller_party_id, status=status, limit=limit, offset=offset)
 
     def list_by_status(self, status: OrderStatus | str, limit: int = 100, offset: int = 0) -> List[OrderData]:
-        return self.repo.list_by_status(status, limit=limit, offset=offset)
\ No newline at end of file
+        return self.repo.list_by_status(status, limit=limit, offset=offset)
+
+    def iter_by_status_created(
+        self,
+        status: OrderStatus | str,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        page_size: int = 500,
+        only_without_provider_payment: bool = False,
+    ) -> Iterator[List[OrderData]]:
+        return self.repo.iter_by_status_created(
+            status,
+            created_from=created_from,
+            created_to=created_to,
+            page_size=page_size,
+            only_without_provider_payment=only_without_provider_payment,
+        )
+
+    def iter_export_by_seller(
+        self,
+        seller_party_id: int,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        status: Optional[OrderStatus | str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        return self.repo.iter_export_by_seller(
+            seller_party_id, created_from=created_from, created_to=created_to, status=status
+        )
@@ -58,6 +58,7 @@ class OrderModel(Model):
         indexes = (
             (("buyer_party_id",), False),
             (("seller_party_id",), False),
+            (("seller_party_id", "created_at"), False),  # export por vendedor y rango
             (("status", "created_at"), False),
             (("provider", "env"), False),
             (("created_at",), False),
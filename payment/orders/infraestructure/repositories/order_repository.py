@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import datetime
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 
 from peewee import IntegrityError
 
@@ -10,9 +10,27 @@ from payment.orders.domain.entities.order import OrderData
 from payment.orders.domain.value_objects.enums import OrderStatus, PaymentFlow
 from payment.orders.infraestructure.model.order_model import OrderModel
 from payment.provider.provider_customer.domain.value_objects.enums import ProviderEnum, EnvEnum
+from shared.infrastructure.outbox import OutboxRepository
+from shared.infrastructure.server_cursor import iter_dict_rows
+
+ORDER_PAID_TOPIC = "order.paid"
 
 
 class OrderRepository:
+    # Columnas del export (mismas claves que OrderData.to_dict())
+    EXPORT_COLUMNS = (
+        "id", "buyer_party_id", "seller_party_id", "amount", "currency", "status", "description",
+        "metadata", "flow", "provider", "env", "provider_account_id", "provider_payment_id",
+        "idempotency_key", "payment_type", "method_brand", "method_last_four",
+        "paid_at", "created_at", "updated_at",
+    )
+
+    # Estados desde los que se puede pasar a FAILED (una orden cobrada no vuelve atrás)
+    FAILABLE_STATUSES = (OrderStatus.PENDING.value, OrderStatus.PROCESSING.value)
+
+    def __init__(self, outbox: Optional[OutboxRepository] = None):
+        self.outbox = outbox or OutboxRepository()
+
     # -----------------------
     # Helpers (enums & utils)
     # -----------------------
@@ -156,6 +174,70 @@ class OrderRepository:
         )
         return [self._to_entity(r) for r in q]
 
+    def iter_by_status_created(
+        self,
+        status: OrderStatus | str,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        page_size: int = 500,
+        only_without_provider_payment: bool = False,
+    ) -> Iterator[List[OrderData]]:
+        """
+        Recorre por páginas las órdenes de un estado en orden (created_at, id).
+        Usa keyset pagination sobre el índice (status, created_at): cada página
+        arranca después del último (created_at, id) visto, sin OFFSET.
+        """
+        status_v = self._status_value(status)
+        last_created: Optional[datetime.datetime] = None
+        last_id: Optional[int] = None
+        while True:
+            q = OrderModel.select().where(OrderModel.status == status_v)
+            if only_without_provider_payment:
+                q = q.where(OrderModel.provider_payment_id.is_null(True))
+            if created_from is not None:
+                q = q.where(OrderModel.created_at >= created_from)
+            if created_to is not None:
+                q = q.where(OrderModel.created_at < created_to)
+            if last_created is not None:
+                q = q.where(
+                    (OrderModel.created_at > last_created)
+                    | ((OrderModel.created_at == last_created) & (OrderModel.id > last_id))
+                )
+            q = q.order_by(OrderModel.created_at.asc(), OrderModel.id.asc()).limit(page_size)
+            page = [self._to_entity(r) for r in q]
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            last_created, last_id = page[-1].created_at, page[-1].id
+
+    def iter_export_by_seller(
+        self,
+        seller_party_id: int,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        status: Optional[OrderStatus | str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Export en streaming de las órdenes de un vendedor en [created_from, created_to),
+        en orden (created_at, id) sobre el índice (seller_party_id, created_at).
+        Filas dict leídas con cursor del servidor; metadata se devuelve ya parseada.
+        """
+        q = (OrderModel
+             .select(*[getattr(OrderModel, c) for c in self.EXPORT_COLUMNS])
+             .where(OrderModel.seller_party_id == seller_party_id))
+        if created_from is not None:
+            q = q.where(OrderModel.created_at >= created_from)
+        if created_to is not None:
+            q = q.where(OrderModel.created_at < created_to)
+        if status:
+            q = q.where(OrderModel.status == self._status_value(status))
+        q = q.order_by(OrderModel.created_at.asc(), OrderModel.id.asc())
+        for row in iter_dict_rows(q):
+            row["metadata"] = OrderModel.loads_metadata(row["metadata"])
+            yield row
+
     # -----------------------
     # Commands (mutaciones)
     # -----------------------
@@ -258,25 +340,62 @@ class OrderRepository:
         method_last_four: Optional[str] = None,
         paid_at: Optional[datetime.datetime] = None,
         extra_metadata: Optional[Dict[str, Any]] = None,
-    ) -> Optional[OrderData]:
+    ) -> Tuple[Optional[OrderData], bool]:
+        """
+        -> PAID. Devuelve (orden, changed); changed=False si ya estaba PAID con los mismos
+        datos del pago (re-marcar es idempotente). (None, False) si no existe.
+        """
         try:
             rec = OrderModel.get(OrderModel.id == order_id)
-            rec.provider_payment_id = provider_payment_id
-            rec.payment_type = payment_type
-            rec.method_brand = method_brand
-            rec.method_last_four = method_last_four
-            rec.paid_at = paid_at or datetime.datetime.now()
-            rec.status = OrderStatus.PAID.value
-
-            meta = OrderModel.loads_metadata(rec.metadata)
-            if extra_metadata:
-                meta.update(extra_metadata)
-            rec.metadata = OrderModel.dumps_metadata(meta)
-
-            rec.save()
-            return self._to_entity(rec)
         except OrderModel.DoesNotExist:
-            return None
+            return None, False
+
+        meta = OrderModel.loads_metadata(rec.metadata)
+        if extra_metadata:
+            meta.update(extra_metadata)
+        fields = {
+            "provider_payment_id": provider_payment_id,
+            "payment_type": payment_type,
+            "method_brand": method_brand,
+            "method_last_four": method_last_four,
+            # re-marcar sin paid_at conserva el del primer cobro
+            "paid_at": paid_at or (rec.paid_at if rec.status == OrderStatus.PAID.value else None)
+                       or datetime.datetime.now(),
+            "metadata": OrderModel.dumps_metadata(meta),
+        }
+
+        # El evento se escribe en la misma transacción que el cambio de estado:
+        # o quedan ambos o ninguno. Solo quien hace la transición a PAID (UPDATE
+        # condicional) emite: dos webhooks concurrentes no lo duplican.
+        try:
+            with OrderModel._meta.database.atomic():
+                became_paid = (OrderModel
+                               .update(status=OrderStatus.PAID.value, updated_at=datetime.datetime.now(), **fields)
+                               .where((OrderModel.id == order_id) & (OrderModel.status != OrderStatus.PAID.value))
+                               .execute()) > 0
+                if became_paid:
+                    self.outbox.add(ORDER_PAID_TOPIC, "order", rec.id, {
+                        "buyer_party_id": rec.buyer_party_id,
+                        "client_id": meta.get("client_id"),
+                        "items": meta.get("items") or [],
+                        "amount": rec.amount,
+                        "currency": rec.currency,
+                        "paid_at": fields["paid_at"],
+                    })
+                    return self.get_by_id(order_id), True
+
+                # ya estaba PAID: solo se completan/corrigen los datos del pago si difieren
+                cur = OrderModel.get(OrderModel.id == order_id)
+                diff = {k: v for k, v in fields.items() if k != "metadata" and getattr(cur, k) != v}
+                if OrderModel.loads_metadata(cur.metadata) != meta:
+                    diff["metadata"] = fields["metadata"]
+                if not diff:
+                    return self._to_entity(cur), False
+                (OrderModel
+                 .update(updated_at=datetime.datetime.now(), **diff)
+                 .where(OrderModel.id == order_id)
+                 .execute())
+                return self.get_by_id(order_id), True
         except IntegrityError as e:
             raise ValueError(f"conflicto de unicidad (provider_payment_id/idempotency) al marcar paid: {e}")
 
@@ -286,40 +405,58 @@ class OrderRepository:
         error_code: Optional[str] = None,
         error_message: Optional[str] = None,
         extra_metadata: Optional[Dict[str, Any]] = None,
-    ) -> Optional[OrderData]:
+    ) -> Tuple[Optional[OrderData], bool]:
+        """
+        PENDING/PROCESSING -> FAILED con un UPDATE condicional: si un webhook la marcó
+        PAID (o se canceló) entre la lectura y la escritura no se pisa. Devuelve
+        (orden, changed): changed=False deja la orden tal como está. (None, False) si no existe.
+        """
         try:
             rec = OrderModel.get(OrderModel.id == order_id)
-            rec.status = OrderStatus.FAILED.value
+        except OrderModel.DoesNotExist:
+            return None, False
+        if rec.status not in self.FAILABLE_STATUSES:
+            return self._to_entity(rec), False
 
-            meta = OrderModel.loads_metadata(rec.metadata)
-            if error_code:
-                meta["error_code"] = error_code
-            if error_message:
-                meta["error_message"] = error_message
-            if extra_metadata:
-                meta.update(extra_metadata)
+        meta = OrderModel.loads_metadata(rec.metadata)
+        if error_code:
+            meta["error_code"] = error_code
+        if error_message:
+            meta["error_message"] = error_message
+        if extra_metadata:
+            meta.update(extra_metadata)
 
-            rec.metadata = OrderModel.dumps_metadata(meta)
-            rec.save()
-            return self._to_entity(rec)
-        except OrderModel.DoesNotExist:
-            return None
+        changed = (OrderModel
+                   .update(status=OrderStatus.FAILED.value,
+                           metadata=OrderModel.dumps_metadata(meta),
+                           updated_at=datetime.datetime.now())
+                   .where((OrderModel.id == order_id) & OrderModel.status.in_(self.FAILABLE_STATUSES))
+                   .execute()) > 0
+        # se relee: si el UPDATE no tocó filas, refleja el estado que ganó la carrera
+        return self.get_by_id(order_id), changed
 
-    def cancel(self, order_id: int, reason: Optional[str] = None) -> Optional[OrderData]:
+    def cancel(self, order_id: int, reason: Optional[str] = None) -> Tuple[Optional[OrderData], bool]:
+        """
+        -> CANCELED salvo que ya esté cobrada (regla de negocio) o cancelada. Devuelve
+        (orden, changed); (None, False) si no existe.
+        """
         try:
             rec = OrderModel.get(OrderModel.id == order_id)
-            if rec.status == OrderStatus.PAID.value:
-                # regla de negocio: no cancelar si ya está cobrada
-                return self._to_entity(rec)
-
-            rec.status = OrderStatus.CANCELED.value
-
-            meta = OrderModel.loads_metadata(rec.metadata)
-            if reason:
-                meta["cancel_reason"] = reason
-            rec.metadata = OrderModel.dumps_metadata(meta)
-
-            rec.save()
-            return self._to_entity(rec)
         except OrderModel.DoesNotExist:
-            return None
+            return None, False
+        final = (OrderStatus.PAID.value, OrderStatus.CANCELED.value)
+        if rec.status in final:
+            return self._to_entity(rec), False
+
+        meta = OrderModel.loads_metadata(rec.metadata)
+        if reason:
+            meta["cancel_reason"] = reason
+
+        # condicional: un webhook que la marcó PAID entre la lectura y aquí gana
+        changed = (OrderModel
+                   .update(status=OrderStatus.CANCELED.value,
+                           metadata=OrderModel.dumps_metadata(meta),
+                           updated_at=datetime.datetime.now())
+                   .where((OrderModel.id == order_id) & OrderModel.status.not_in(final))
+                   .execute()) > 0
+        return self.get_by_id(order_id), changed
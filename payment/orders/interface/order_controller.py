@@ -10,6 +10,9 @@ from payment.orders.application.command.order_command_service import OrderComman
 from payment.orders.application.queries.order_query_service import OrderQueryService
 from payment.orders.domain.value_objects.enums import OrderStatus, PaymentFlow
 from payment.provider.provider_customer.domain.value_objects.enums import ProviderEnum, EnvEnum
+from shared.serialization.entity_serializer import EntitySerializer
+from shared.serialization.export import export_response
+from shared.serialization.streaming import list_response
 
 
 # --------------------------
@@ -65,32 +68,30 @@ def _optional(body: Dict[str, Any], field: str, default=None):
     return body[field] if field in body else default
 
 
-def _entity_to_dict(e) -> Dict[str, Any]:
-    if hasattr(e, "to_dict") and callable(getattr(e, "to_dict")):
-        return e.to_dict()
-    # fallback genérico
-    return {
-        "id": getattr(e, "id", None),
-        "buyer_party_id": getattr(e, "buyer_party_id", None),
-        "seller_party_id": getattr(e, "seller_party_id", None),
-        "amount": str(getattr(e, "amount", None)) if getattr(e, "amount", None) is not None else None,
-        "currency": getattr(e, "currency", None),
-        "status": getattr(e, "status", None).value if isinstance(getattr(e, "status", None), OrderStatus) else getattr(e, "status", None),
-        "description": getattr(e, "description", None),
-        "metadata": getattr(e, "metadata", None),
-        "flow": getattr(e, "flow", None).value if isinstance(getattr(e, "flow", None), PaymentFlow) else getattr(e, "flow", None),
-        "provider": getattr(e, "provider", None).value if isinstance(getattr(e, "provider", None), ProviderEnum) else getattr(e, "provider", None),
-        "env": getattr(e, "env", None).value if isinstance(getattr(e, "env", None), EnvEnum) else getattr(e, "env", None),
-        "provider_account_id": getattr(e, "provider_account_id", None),
-        "provider_payment_id": getattr(e, "provider_payment_id", None),
-        "idempotency_key": getattr(e, "idempotency_key", None),
-        "payment_type": getattr(e, "payment_type", None),
-        "method_brand": getattr(e, "method_brand", None),
-        "method_last_four": getattr(e, "method_last_four", None),
-        "paid_at": getattr(e, "paid_at", None).isoformat() if getattr(e, "paid_at", None) else None,
-        "created_at": getattr(e, "created_at", None).isoformat() if getattr(e, "created_at", None) else None,
-        "updated_at": getattr(e, "updated_at", None).isoformat() if getattr(e, "updated_at", None) else None,
-    }
+# Mismo formato que OrderData.to_dict(), resuelto una vez por campo
+ORDER_SERIALIZER = EntitySerializer({
+    "id": None,
+    "buyer_party_id": None,
+    "seller_party_id": None,
+    "amount": "decimal",
+    "currency": None,
+    "status": "enum",
+    "description": None,
+    "metadata": "dict",
+    "flow": "enum",
+    "provider": "enum",
+    "env": "enum",
+    "provider_account_id": None,
+    "provider_payment_id": None,
+    "idempotency_key": None,
+    "payment_type": None,
+    "method_brand": None,
+    "method_last_four": None,
+    "paid_at": "datetime",
+    "created_at": "datetime",
+    "updated_at": "datetime",
+})
+_entity_to_dict = ORDER_SERIALIZER
 
 
 # --------------------------
@@ -289,7 +290,7 @@ def create_order_blueprint(url_prefix: str = "/orders") -> Blueprint:
         limit = int(request.args.get("limit", 100))
         offset = int(request.args.get("offset", 0))
         items = qry.list_by_buyer(buyer_party_id, status=status, limit=limit, offset=offset)
-        return jsonify(ok=True, data=[_entity_to_dict(i) for i in items]), 200
+        return list_response(items, ORDER_SERIALIZER, envelope={"ok": True})
 
     # GET /orders/by-seller/<seller_party_id>?status=paid&limit=50&offset=0
     @bp.route("/by-seller/<int:seller_party_id>", methods=["GET"])
@@ -300,7 +301,31 @@ def create_order_blueprint(url_prefix: str = "/orders") -> Blueprint:
         limit = int(request.args.get("limit", 100))
         offset = int(request.args.get("offset", 0))
         items = qry.list_by_seller(seller_party_id, status=status, limit=limit, offset=offset)
-        return jsonify(ok=True, data=[_entity_to_dict(i) for i in items]), 200
+        return list_response(items, ORDER_SERIALIZER, envelope={"ok": True})
+
+    # GET /orders/by-seller/<seller_party_id>/export?from=2025-01-01&to=2025-02-01&format=csv
+    @bp.route("/by-seller/<int:seller_party_id>/export", methods=["GET"])
+    def export_by_seller(seller_party_id: int):
+        _, qry = _get_services()
+        try:
+            created_from = _iso_to_dt(request.args.get("from"))
+            created_to = _iso_to_dt(request.args.get("to"))
+            status_raw = request.args.get("status")
+            status = _as_enum(status_raw, OrderStatus) if status_raw else None
+            # created_at se guarda naive
+            created_from = created_from.replace(tzinfo=None) if created_from else None
+            created_to = created_to.replace(tzinfo=None) if created_to else None
+            rows = qry.iter_export_by_seller(
+                seller_party_id, created_from=created_from, created_to=created_to, status=status
+            )
+            return export_response(
+                rows,
+                qry.repo.EXPORT_COLUMNS,
+                fmt=request.args.get("format", "ndjson"),
+                filename=f"orders-seller-{seller_party_id}",
+            )
+        except ValueError as ve:
+            return jsonify(ok=False, error=str(ve)), 400
 
     # GET /orders/by-status/<status>?limit=50&offset=0
     @bp.route("/by-status/<string:status>", methods=["GET"])
@@ -314,7 +339,7 @@ def create_order_blueprint(url_prefix: str = "/orders") -> Blueprint:
         limit = int(request.args.get("limit", 100))
         offset = int(request.args.get("offset", 0))
         items = qry.list_by_status(status_enum, limit=limit, offset=offset)
-        return jsonify(ok=True, data=[_entity_to_dict(i) for i in items]), 200
+        return list_response(items, ORDER_SERIALIZER, envelope={"ok": True})
 
     bp.url_prefix = url_prefix
     return bp
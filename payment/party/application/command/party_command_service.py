@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Iterable, Dict
 
 from payment.party.domain.entities.party import PartyAppName, PartySubjectType, PartyData
 from payment.party.infraestructure.repositories.party_repository import PartyRepository
@@ -32,6 +32,10 @@ class PartyCommandService:
     ) -> PartyData:
         return self.repo.upsert_by_subject(app_name, subject_type, subject_id, display_name)
 
+    def bulk_upsert_by_subject(self, items: Iterable[tuple]) -> Dict[tuple, int]:
+        """items = [(app_name, subject_type, subject_id[, display_name]), ...] -> {clave: party_id}"""
+        return self.repo.bulk_upsert_by_subject(items)
+
     def update_display_name(self, party_id: int, display_name: Optional[str]) -> Optional[PartyData]:
         current = self.repo.get_by_id(party_id)
         if not current:
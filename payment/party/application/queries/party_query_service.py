@@ -22,8 +22,8 @@ class PartyQueryService:
     def list_all(self) -> List[PartyData]:
         return self.repo.list_all()
 
-    def search_by_name(self, text: str, limit: int = 50) -> List[PartyData]:
-        return self.repo.search_by_name(text, limit)
+    def search_by_name(self, text: str, limit: int = 50, mode: str = "auto") -> List[PartyData]:
+        return self.repo.search_by_name(text, limit, mode)
 
     def list_by_app_subjects(self, triples: Iterable[tuple[str, str, int]]) -> List[PartyData]:
         return self.repo.list_by_app_subjects(triples)
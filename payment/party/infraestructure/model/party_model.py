@@ -23,8 +23,19 @@ class PartyModel(Model):
         table_name = "parties"
         indexes = (
             (("app_name", "subject_type", "subject_id"), True),  # UNIQUE
+            (("display_name",), False),                          # búsqueda por prefijo
         )
 
     def save(self, *args, **kwargs):
         self.updated_at = datetime.datetime.now()
         return super().save(*args, **kwargs)
+
+
+
+# FULLTEXT con parser ngram: sirve para substrings y búsquedas aproximadas
+# (la tokenización por n-gramas no depende de espacios ni de palabras completas).
+# peewee no sabe declararlo en Meta.indexes; lo crea la migración 0004.
+PARTY_FULLTEXT_INDEX = (
+    "ft_party_display_name",
+    "ALTER TABLE parties ADD FULLTEXT INDEX ft_party_display_name (display_name) WITH PARSER ngram",
+)
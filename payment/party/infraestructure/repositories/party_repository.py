@@ -1,11 +1,36 @@
-from typing import Optional, List, Iterable
-from peewee import IntegrityError, fn
+import datetime
+from typing import Optional, List, Iterable, Dict, Tuple
+
+from peewee import IntegrityError, DatabaseError, MySQLDatabase, fn, Case, Tuple as RowValue
+from playhouse.mysql_ext import Match
 
 from payment.party.domain.entities.party import PartyData, PartyAppName, PartySubjectType
 from payment.party.infraestructure.model.party_model import PartyModel
 
 
+SubjectKey = Tuple[str, str, int]
+
+
 class PartyRepository:
+    # Filas por sentencia en las consultas/insert masivos (cota para max_allowed_packet
+    # y para que el IN (...) siga usando el índice único).
+    CHUNK_SIZE = 500
+
+    @staticmethod
+    def _key(app_name, subject_type, subject_id) -> SubjectKey:
+        an = app_name.value if isinstance(app_name, PartyAppName) else str(app_name)
+        st = subject_type.value if isinstance(subject_type, PartySubjectType) else str(subject_type)
+        return an, st, int(subject_id)
+
+    @staticmethod
+    def _chunks(items: list, size: int):
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+
+    def _select_by_keys(self, keys: List[SubjectKey], *fields):
+        key_row = RowValue(PartyModel.app_name, PartyModel.subject_type, PartyModel.subject_id)
+        return PartyModel.select(*fields).where(key_row.in_(keys))
+
     def _to_entity(self, rec: PartyModel) -> PartyData:
         return PartyData(
             id=rec.id,
@@ -24,6 +49,13 @@ class PartyRepository:
         except PartyModel.DoesNotExist:
             return None
 
+    def list_by_ids(self, ids: Iterable[int]) -> List[PartyData]:
+        unique = sorted({int(i) for i in ids})
+        out: List[PartyData] = []
+        for chunk in self._chunks(unique, self.CHUNK_SIZE):
+            out.extend(self._to_entity(r) for r in PartyModel.select().where(PartyModel.id.in_(chunk)))
+        return out
+
     def get_by_subject(
         self,
         app_name: PartyAppName | str,
@@ -45,26 +77,78 @@ class PartyRepository:
     def list_all(self) -> List[PartyData]:
         return [self._to_entity(r) for r in PartyModel.select()]
 
-    def search_by_name(self, text: str, limit: int = 50) -> List[PartyData]:
+    SEARCH_MODES = ("auto", "prefix", "fuzzy")
+    # ngram_token_size por defecto de MySQL: textos más cortos no generan tokens
+    NGRAM_MIN_LEN = 2
+
+    def search_by_name(self, text: str, limit: int = 50, mode: str = "auto") -> List[PartyData]:
+        """
+        Búsqueda rankeada por display_name.
+        - prefix: display_name LIKE 'text%' sobre idx parties_display_name.
+        - fuzzy:  MATCH ... AGAINST (NATURAL LANGUAGE MODE) sobre el FULLTEXT ngram;
+                  tolera errores de tipeo porque comparte la mayoría de n-gramas.
+        - auto:   fuzzy, pero los que empiezan con el texto van primero.
+        El índice FULLTEXT lo mantiene InnoDB en cada INSERT/UPDATE, así que
+        create/update/upsert quedan sincronizados sin pasos extra.
+        Si no hay FULLTEXT (otra BD o índice aún no creado) cae a LIKE '%text%'.
+        """
+        text = " ".join((text or "").split())
+        if not text:
+            return []
+        if mode not in self.SEARCH_MODES:
+            raise ValueError(f"mode inválido: {mode} (usa {', '.join(self.SEARCH_MODES)})")
+        limit = max(1, int(limit))
+
+        if mode == "prefix" or len(text) < self.NGRAM_MIN_LEN:
+            q = (PartyModel
+                 .select()
+                 .where(PartyModel.display_name.startswith(text))
+                 .order_by(PartyModel.display_name, PartyModel.id)
+                 .limit(limit))
+            return [self._to_entity(r) for r in q]
+
+        if isinstance(PartyModel._meta.database, MySQLDatabase):
+            score = Match(PartyModel.display_name, text, "IN NATURAL LANGUAGE MODE")
+            order = [score.desc(), PartyModel.id]
+            if mode == "auto":
+                is_prefix = Case(None, [(PartyModel.display_name.startswith(text), 1)], 0)
+                order.insert(0, is_prefix.desc())
+            q = (PartyModel
+                 .select()
+                 .where(score)
+                 .order_by(*order)
+                 .limit(limit))
+            try:
+                return [self._to_entity(r) for r in q]
+            except DatabaseError:
+                # p. ej. 1191 "Can't find FULLTEXT index": se degrada a LIKE
+                pass
+
         q = (PartyModel
              .select()
              .where(PartyModel.display_name.contains(text))
+             .order_by(Case(None, [(PartyModel.display_name.startswith(text), 0)], 1), PartyModel.id)
              .limit(limit))
         return [self._to_entity(r) for r in q]
 
-    def list_by_app_subjects(self, triples: Iterable[tuple[str, str, int]]) -> List[PartyData]:
-        # triples = [(app_name, subject_type, subject_id), ...]
-        triples = list(triples)
-        if not triples:
+    def list_by_app_subjects(
+        self,
+        triples: Iterable[tuple[str, str, int]],
+        chunk_size: Optional[int] = None,
+    ) -> List[PartyData]:
+        """
+        triples = [(app_name, subject_type, subject_id), ...]
+        Usa (app_name, subject_type, subject_id) IN ((..), (..)) por lotes en lugar
+        de una cadena de OR: MySQL lo resuelve como rangos sobre el índice único.
+        """
+        keys = list(dict.fromkeys(self._key(*t) for t in triples))
+        if not keys:
             return []
-        query = None
-        for an, st, sid in triples:
-            cond = ((PartyModel.app_name == an) &
-                    (PartyModel.subject_type == st) &
-                    (PartyModel.subject_id == int(sid)))
-            query = cond if query is None else (query | cond)
-        q = PartyModel.select().where(query)
-        return [self._to_entity(r) for r in q]
+        size = chunk_size or self.CHUNK_SIZE
+        out: List[PartyData] = []
+        for chunk in self._chunks(keys, size):
+            out.extend(self._to_entity(r) for r in self._select_by_keys(chunk))
+        return out
 
     def create(self, entity: PartyData) -> PartyData:
         try:
@@ -106,14 +190,13 @@ class PartyRepository:
         an = app_name.value if isinstance(app_name, PartyAppName) else str(app_name)
         st = subject_type.value if isinstance(subject_type, PartySubjectType) else str(subject_type)
 
-        # Insert … ON CONFLICT (app_name, subject_type, subject_id) DO UPDATE display_name
+        # INSERT … ON DUPLICATE KEY UPDATE display_name (clave única app_name, subject_type, subject_id)
         PartyModel.insert(
             app_name=an,
             subject_type=st,
             subject_id=int(subject_id),
             display_name=(display_name.strip() if display_name else None),
         ).on_conflict(
-            conflict_target=[PartyModel.app_name, PartyModel.subject_type, PartyModel.subject_id],
             update={PartyModel.display_name: (display_name.strip() if display_name else None)}
         ).execute()
 
@@ -123,3 +206,54 @@ class PartyRepository:
             (PartyModel.subject_id == int(subject_id))
         )
         return self._to_entity(rec)
+
+    def bulk_upsert_by_subject(
+        self,
+        items: Iterable[tuple],
+        chunk_size: Optional[int] = None,
+    ) -> Dict[SubjectKey, int]:
+        """
+        items = [(app_name, subject_type, subject_id[, display_name]), ...]
+        Por lote: un INSERT ... ON DUPLICATE KEY UPDATE y un SELECT de ids con row-constructor.
+        A diferencia de upsert_by_subject, un display_name vacío no pisa el existente.
+        Devuelve {(app_name, subject_type, subject_id): party_id}.
+        """
+        rows: Dict[SubjectKey, Optional[str]] = {}
+        for item in items:
+            key = self._key(item[0], item[1], item[2])
+            name = item[3] if len(item) > 3 else None
+            rows[key] = (str(name).strip() or None) if name else None
+        if not rows:
+            return {}
+
+        size = chunk_size or self.CHUNK_SIZE
+        keys = list(rows)
+        ids: Dict[SubjectKey, int] = {}
+        for chunk in self._chunks(keys, size):
+            now = datetime.datetime.now()
+            (PartyModel
+             .insert_many([
+                 {
+                     "app_name": an,
+                     "subject_type": st,
+                     "subject_id": sid,
+                     "display_name": rows[(an, st, sid)],
+                     "created_at": now,
+                     "updated_at": now,
+                 }
+                 for an, st, sid in chunk
+             ])
+             .on_conflict(
+                 # MySQL: ON DUPLICATE KEY UPDATE (no admite conflict_target; usa el índice único)
+                 update={
+                     PartyModel.display_name: fn.COALESCE(fn.VALUES(PartyModel.display_name), PartyModel.display_name),
+                     PartyModel.updated_at: now,
+                 },
+             )
+             .execute())
+            q = self._select_by_keys(
+                chunk, PartyModel.id, PartyModel.app_name, PartyModel.subject_type, PartyModel.subject_id
+            ).tuples()
+            for id_, an, st, sid in q:
+                ids[(an, st, int(sid))] = id_
+        return ids
@@ -7,6 +7,7 @@ from flask import Blueprint, jsonify, request, current_app
 from payment.party.application.command.party_command_service import PartyCommandService
 from payment.party.application.queries.party_query_service import PartyQueryService
 from payment.party.domain.entities.party import PartyAppName, PartySubjectType
+from shared.serialization.streaming import list_response
 
 
 # --------------------------
@@ -136,6 +137,32 @@ def create_party_blueprint(url_prefix: str = "/parties") -> Blueprint:
         )
         return jsonify(ok=True, data=_entity_to_dict(entity)), 200
 
+    # PUT /parties/bulk-upsert-by-subject
+    # body: {"items":[{"app_name","subject_type","subject_id","display_name"?}, ...]}
+    @bp.route("/bulk-upsert-by-subject", methods=["PUT"])
+    def bulk_upsert_by_subject():
+        cmd, _ = _get_services()
+        body = request.get_json(silent=True) or {}
+        items_json = body.get("items") or []
+        items: List[tuple] = []
+        try:
+            for t in items_json:
+                items.append((
+                    _as_enum(t["app_name"], PartyAppName).value,
+                    _as_enum(t["subject_type"], PartySubjectType).value,
+                    int(t["subject_id"]),
+                    t.get("display_name"),
+                ))
+        except Exception as e:
+            return jsonify(ok=False, error=f"items inválidos: {e}"), 400
+
+        ids = cmd.bulk_upsert_by_subject(items)
+        data = [
+            {"app_name": an, "subject_type": st, "subject_id": sid, "id": id_}
+            for (an, st, sid), id_ in ids.items()
+        ]
+        return jsonify(ok=True, data=data), 200
+
     # PATCH /parties/<id>/display-name
     # body: {display_name?}
     @bp.route("/<int:party_id>/display-name", methods=["PATCH"])
@@ -194,9 +221,9 @@ def create_party_blueprint(url_prefix: str = "/parties") -> Blueprint:
     def list_all():
         _, qry = _get_services()
         items = qry.list_all()
-        return jsonify(ok=True, data=[_entity_to_dict(i) for i in items]), 200
+        return list_response(items, _entity_to_dict, envelope={"ok": True})
 
-    # GET /parties/search?text=juan&limit=50
+    # GET /parties/search?text=juan&limit=50&mode=auto|prefix|fuzzy
     @bp.route("/search", methods=["GET"])
     def search_by_name():
         _, qry = _get_services()
@@ -204,7 +231,11 @@ def create_party_blueprint(url_prefix: str = "/parties") -> Blueprint:
         if not text:
             return jsonify(ok=False, error="'text' es requerido"), 400
         limit = int(request.args.get("limit", 50))
-        items = qry.search_by_name(text, limit=limit)
+        mode = request.args.get("mode", "auto").strip().lower()
+        try:
+            items = qry.search_by_name(text, limit=limit, mode=mode)
+        except ValueError as ve:
+            return jsonify(ok=False, error=str(ve)), 400
         return jsonify(ok=True, data=[_entity_to_dict(i) for i in items]), 200
 
     # POST /parties/by-app-subjects
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, List, Dict
 
 from payment.provider.customer_sources.domain.entities.payment_source import PaymentSourceData
 from payment.provider.customer_sources.domain.valueobjects.enums import PaymentSourceStatus
@@ -77,3 +77,17 @@ class PaymentSourceCommandService:
             env=env,
             mp_card=mp_card,
         )
+
+    def sync_mp_cards(
+        self,
+        provider_customer_pk: int,
+        env: EnvEnum | str,
+        mp_cards: List[dict],
+        soft_delete_missing: bool = True,
+    ) -> Dict[str, object]:
+        return self.repo.sync_mp_cards(
+            provider_customer_pk=provider_customer_pk,
+            env=env,
+            mp_cards=mp_cards,
+            soft_delete_missing=soft_delete_missing,
+        )
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from typing import Optional, List
+import datetime
+from typing import Optional, List, Dict
 
-from peewee import IntegrityError
+from peewee import IntegrityError, fn
 
 from payment.provider.customer_sources.domain.entities.payment_source import PaymentSourceData
 from payment.provider.customer_sources.domain.valueobjects.enums import PaymentSourceStatus, PaymentSourceType
 from payment.provider.customer_sources.infraestructure.model.payment_source_model import PaymentSourceModel
 from payment.provider.provider_customer.domain.value_objects.enums import EnvEnum, ProviderEnum
 from payment.provider.provider_customer.infraestructure.model.provider_customer_model import ProviderCustomerModel
+from shared.infrastructure.database import db
 
 
 class PaymentSourceRepository:
@@ -270,6 +272,121 @@ class PaymentSourceRepository:
           - id, first_six_digits, last_four_digits, expiration_month, expiration_year,
             cardholder: { name }, payment_method: { id } -> (brand)
         """
+        card = self._parse_mp_card(mp_card)
+        return self.upsert_card(
+            provider_customer_pk=provider_customer_pk,
+            status=PaymentSourceStatus.ACTIVE,
+            **card,
+        )
+
+    def sync_mp_cards(
+        self,
+        provider_customer_pk: int,
+        env: EnvEnum | str,
+        mp_cards: List[dict],
+        soft_delete_missing: bool = True,
+    ) -> Dict[str, object]:
+        """
+        Sincroniza la lista COMPLETA de tarjetas de MP de un customer
+        (GET /v1/customers/{id}/cards) contra payment_sources:
+          - lee provider/env del customer y sus tarjetas actuales una sola vez,
+          - calcula el diff en memoria,
+          - inserta/actualiza en un único INSERT ... ON DUPLICATE KEY UPDATE,
+          - marca DELETED (soft) las que ya no vienen, en un único UPDATE.
+        Devuelve {"inserted", "updated", "deleted", "unchanged", "sources"}.
+        """
+        prov, env_ = self._get_provider_of_customer(provider_customer_pk)
+
+        incoming: Dict[str, dict] = {}
+        for mp_card in mp_cards or []:
+            card = self._parse_mp_card(mp_card)
+            # valida igual que create/update (last_four, exp_*, etc.)
+            PaymentSourceData(
+                provider_customer_pk=provider_customer_pk,
+                source_type=PaymentSourceType.CARD,
+                status=PaymentSourceStatus.ACTIVE,
+                **card,
+            )
+            incoming[card["provider_source_id"]] = card
+
+        existing = {
+            r.provider_source_id: r
+            for r in PaymentSourceModel
+            .select()
+            .where(
+                (PaymentSourceModel.provider_customer_pk == provider_customer_pk) &
+                (PaymentSourceModel.source_type == PaymentSourceType.CARD.value)
+            )
+        }
+
+        fields = ("brand", "last_four", "exp_month", "exp_year", "holder_name")
+        now = datetime.datetime.now()
+        to_write: List[dict] = []
+        inserted = updated = 0
+        for source_id, card in incoming.items():
+            rec = existing.get(source_id)
+            if rec is not None and rec.status == PaymentSourceStatus.ACTIVE.value and \
+                    all(getattr(rec, f) == card[f] for f in fields):
+                continue
+            if rec is None:
+                inserted += 1
+            else:
+                updated += 1
+            to_write.append({
+                "provider_customer_pk": provider_customer_pk,
+                "provider": prov,
+                "env": env_,
+                "source_type": PaymentSourceType.CARD.value,
+                "status": PaymentSourceStatus.ACTIVE.value,
+                "created_at": now,
+                "updated_at": now,
+                **card,
+            })
+
+        to_delete = [
+            r.id for sid, r in existing.items()
+            if sid not in incoming and r.status != PaymentSourceStatus.DELETED.value
+        ] if soft_delete_missing else []
+
+        with db.atomic():
+            if to_write:
+                (PaymentSourceModel
+                 .insert_many(to_write)
+                 .on_conflict(update={
+                     PaymentSourceModel.provider: prov,
+                     PaymentSourceModel.env: env_,
+                     PaymentSourceModel.brand: fn.VALUES(PaymentSourceModel.brand),
+                     PaymentSourceModel.last_four: fn.VALUES(PaymentSourceModel.last_four),
+                     PaymentSourceModel.exp_month: fn.VALUES(PaymentSourceModel.exp_month),
+                     PaymentSourceModel.exp_year: fn.VALUES(PaymentSourceModel.exp_year),
+                     PaymentSourceModel.holder_name: fn.VALUES(PaymentSourceModel.holder_name),
+                     PaymentSourceModel.status: PaymentSourceStatus.ACTIVE.value,
+                     PaymentSourceModel.updated_at: now,
+                 })
+                 .execute())
+            if to_delete:
+                (PaymentSourceModel
+                 .update({PaymentSourceModel.status: PaymentSourceStatus.DELETED.value,
+                          PaymentSourceModel.updated_at: now})
+                 .where(PaymentSourceModel.id.in_(to_delete))
+                 .execute())
+
+        return {
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": len(to_delete),
+            "unchanged": len(incoming) - inserted - updated,
+            "sources": self.list_active_cards(provider_customer_pk),
+        }
+
+    @staticmethod
+    def _parse_mp_card(mp_card: dict) -> dict:
+        """
+        Normaliza el JSON de tarjeta de MP a columnas de payment_sources.
+        Campos esperados:
+          - id, first_six_digits, last_four_digits, expiration_month, expiration_year,
+            cardholder: { name }, payment_method: { id } -> (brand)
+        """
         card_id = mp_card.get("id")
         if not card_id:
             raise ValueError("mp_card sin 'id'")
@@ -288,13 +405,11 @@ class PaymentSourceRepository:
         exp_month = mp_card.get("expiration_month") or mp_card.get("exp_month")
         exp_year = mp_card.get("expiration_year") or mp_card.get("exp_year")
 
-        return self.upsert_card(
-            provider_customer_pk=provider_customer_pk,
-            provider_source_id=str(card_id),
-            brand=brand,
-            last_four=str(last_four) if last_four else None,
-            exp_month=int(exp_month) if exp_month is not None else None,
-            exp_year=int(exp_year) if exp_year is not None else None,
-            holder_name=holder_name,
-            status=PaymentSourceStatus.ACTIVE,
-        )
+        return {
+            "provider_source_id": str(card_id),
+            "brand": brand,
+            "last_four": str(last_four) if last_four else None,
+            "exp_month": int(exp_month) if exp_month is not None else None,
+            "exp_year": int(exp_year) if exp_year is not None else None,
+            "holder_name": holder_name,
+        }
@@ -282,5 +282,30 @@ def create_payment_source_blueprint(url_prefix: str = "/payment-sources") -> Blu
 
         return jsonify(ok=True, data=_entity_to_dict(entity)), 200
 
+    # PUT /payment-sources/sync/mp-cards
+    # body: {provider_customer_pk, env, mp_cards: [...], soft_delete_missing?: bool=true}
+    # (mp_cards = lista COMPLETA de MP /v1/customers/<id>/cards)
+    @bp.route("/sync/mp-cards", methods=["PUT"])
+    def sync_mp_cards():
+        cmd, _ = _get_services()
+        body = request.get_json(silent=True) or {}
+        try:
+            provider_customer_pk = int(_require(body, "provider_customer_pk"))
+            env = _as_enum(_require(body, "env"), EnvEnum)
+            mp_cards = _require(body, "mp_cards")
+            if not isinstance(mp_cards, list):
+                raise ValueError("'mp_cards' debe ser una lista JSON")
+            result = cmd.sync_mp_cards(
+                provider_customer_pk=provider_customer_pk,
+                env=env,
+                mp_cards=mp_cards,
+                soft_delete_missing=bool(_optional(body, "soft_delete_missing", True)),
+            )
+        except Exception as e:
+            return jsonify(ok=False, error=f"payload inválido: {e}"), 400
+
+        result["sources"] = [_entity_to_dict(x) for x in result["sources"]]
+        return jsonify(ok=True, data=result), 200
+
     bp.url_prefix = url_prefix
     return bp
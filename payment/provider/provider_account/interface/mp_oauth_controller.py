@@ -16,6 +16,10 @@ from payment.provider.provider_account.application.queries.provider_account_quer
 from payment.provider.provider_account.domain.entities.provider_account import (
     EnvKind, ProviderKind, ProviderAccountStatus
 )
+from shared.infrastructure.metrics.http import instrument_session
+
+# Session compartida (keep-alive) con la latencia hacia MP medida en /metrics
+_mp_http = instrument_session(requests.Session())
 
 
 # ----------------- Helpers -----------------
@@ -150,7 +154,7 @@ def create_mp_oauth_blueprint() -> Blueprint:
             "code": code,
             "redirect_uri": redirect_uri,
         }
-        r = requests.post(token_url, data=payload, timeout=30)
+        r = _mp_http.post(token_url, data=payload, timeout=30)
         if r.status_code >= 400:
             return jsonify(ok=False, error="token_exchange_failed", details=r.text), 400
         tok = r.json()
@@ -164,7 +168,7 @@ def create_mp_oauth_blueprint() -> Blueprint:
             return jsonify(ok=False, error="sin_access_token", details=tok), 400
 
         # ----- 2) Identificar vendedor (collector_id)
-        r2 = requests.get(f"{api_base}/users/me", headers={"Authorization": f"Bearer {access_token}"}, timeout=30)
+        r2 = _mp_http.get(f"{api_base}/users/me", headers={"Authorization": f"Bearer {access_token}"}, timeout=30)
         if r2.status_code >= 400:
             return jsonify(ok=False, error="users_me_failed", details=r2.text), 400
         me = r2.json()
@@ -224,7 +228,7 @@ def create_mp_oauth_blueprint() -> Blueprint:
             "client_secret": client_secret,
             "refresh_token": refresh_token,
         }
-        r = requests.post(token_url, data=payload, timeout=30)
+        r = _mp_http.post(token_url, data=payload, timeout=30)
         if r.status_code >= 400:
             return jsonify(ok=False, error="refresh_failed", details=r.text), 400
         tok = r.json()
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import datetime
+import json
+import threading
+import time
+from typing import Optional, Iterator, List, Dict
+
+from payment.orders.application.command.order_command_service import OrderCommandService
+from payment.orders.application.queries.order_query_service import OrderQueryService
+from payment.orders.domain.entities.order import OrderData
+from payment.orders.domain.value_objects.enums import OrderStatus
+from payment.provider.provider_account.infraestructure.repositories.provider_account_repository import (
+    ProviderAccountRepository,
+)
+from payment.reconciliation.domain.entities.reconciliation import (
+    ReconciliationAction, ReconciliationActionType, ReconciliationReport, ProviderPaymentSnapshot,
+    MP_APPROVED, MP_FAILED,
+)
+from payment.reconciliation.infraestructure.clients.mp_payment_client import (
+    MercadoPagoPaymentClient, PaymentLookup, ProviderLookupError,
+)
+
+
+class _RateLimiter:
+    """
+    Token bucket: como máximo `rate` unidades por segundo (0 = sin límite). Un lote
+    más grande que el bucket se cobra entero y deja el saldo negativo: se duerme lo
+    que tarda en reponerse, así el promedio nunca pasa de `rate`.
+    """
+    def __init__(self, rate: float):
+        self.rate = float(rate or 0)
+        self._allowance = self.rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int = 1) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+            self._last = now
+            self._allowance -= n
+            if self._allowance < 0:
+                # la deuda se paga durmiendo; la próxima reposición cuenta este tiempo
+                time.sleep(-self._allowance / self.rate)
+
+
+class OrderReconciliationService:
+    """
+    Concilia órdenes locales contra los pagos de Mercado Pago.
+
+    - Recorre órdenes PROCESSING (y PAID sin provider_payment_id) por (status, created_at)
+      con keyset pagination.
+    - Consulta al proveedor por lotes (concurrencia acotada en el cliente).
+    - Compara en streaming (página a página, sin cargar todo) y emite acciones
+      mark_paid / mark_failed; las discrepancias que no se pueden corregir solas
+      (PAID local vs rechazado en MP) se reportan como MISMATCH.
+    - max_orders_per_second limita el ritmo para no competir con el tráfico online.
+    """
+    RECONCILED_BY = "reconciliation"
+
+    def __init__(
+        self,
+        order_query: OrderQueryService,
+        order_command: OrderCommandService,
+        provider_account_repo: ProviderAccountRepository,
+        client: Optional[MercadoPagoPaymentClient] = None,
+        default_access_token: Optional[str] = None,
+    ):
+        self.order_query = order_query
+        self.order_command = order_command
+        self.provider_account_repo = provider_account_repo
+        self.client = client or MercadoPagoPaymentClient()
+        self.default_access_token = default_access_token
+
+    # -----------------------
+    # Helpers
+    # -----------------------
+    def _access_token_for(self, order: OrderData, cache: Dict[Optional[int], Optional[str]]) -> Optional[str]:
+        key = order.provider_account_id
+        if key in cache:
+            return cache[key]
+        token = None
+        if key is not None:
+            acc = self.provider_account_repo.get_by_id(key)
+            raw = acc.secret_json_enc if acc else None
+            if isinstance(raw, str):
+                try:
+                    raw = json.loads(raw)
+                except ValueError:
+                    raw = None
+            if isinstance(raw, dict):
+                token = raw.get("access_token")
+        cache[key] = token or self.default_access_token
+        return cache[key]
+
+    @staticmethod
+    def _external_reference(order: OrderData) -> str:
+        meta = order.metadata or {}
+        return str(meta.get("external_reference") or order.id)
+
+    def _iter_candidates(
+        self,
+        created_from: Optional[datetime.datetime],
+        created_to: Optional[datetime.datetime],
+        page_size: int,
+        include_paid_without_payment_id: bool,
+    ) -> Iterator[List[OrderData]]:
+        yield from self.order_query.iter_by_status_created(
+            OrderStatus.PROCESSING, created_from=created_from, created_to=created_to, page_size=page_size
+        )
+        if include_paid_without_payment_id:
+            yield from self.order_query.iter_by_status_created(
+                OrderStatus.PAID,
+                created_from=created_from,
+                created_to=created_to,
+                page_size=page_size,
+                only_without_provider_payment=True,
+            )
+
+    # -----------------------
+    # Reglas de comparación
+    # -----------------------
+    def decide(
+        self,
+        order: OrderData,
+        snap: Optional[ProviderPaymentSnapshot],
+        now: datetime.datetime,
+        fail_missing_after: Optional[datetime.timedelta] = None,
+    ) -> ReconciliationAction:
+        local = order.status
+        base = dict(order_id=order.id, local_status=local.value)
+
+        if snap is None:
+            if (local == OrderStatus.PROCESSING and fail_missing_after is not None
+                    and order.created_at is not None and order.created_at < now - fail_missing_after):
+                return ReconciliationAction(action=ReconciliationActionType.MARK_FAILED,
+                                            reason="not_found_at_provider", **base)
+            return ReconciliationAction(action=ReconciliationActionType.NOOP, reason="not_found_at_provider", **base)
+
+        base.update(provider_status=snap.status, provider_payment_id=snap.provider_payment_id, snapshot=snap)
+
+        if snap.status in MP_APPROVED:
+            if local != OrderStatus.PAID or not order.provider_payment_id:
+                return ReconciliationAction(action=ReconciliationActionType.MARK_PAID, **base)
+            return ReconciliationAction(action=ReconciliationActionType.NOOP, **base)
+
+        if snap.status in MP_FAILED:
+            if local == OrderStatus.PAID:
+                return ReconciliationAction(action=ReconciliationActionType.MISMATCH,
+                                            reason="paid_locally_but_not_approved_at_provider", **base)
+            if local in (OrderStatus.PENDING, OrderStatus.PROCESSING):
+                return ReconciliationAction(action=ReconciliationActionType.MARK_FAILED,
+                                            reason=snap.status_detail or snap.status, **base)
+
+        return ReconciliationAction(action=ReconciliationActionType.NOOP, **base)
+
+    def apply(self, action: ReconciliationAction, now: datetime.datetime) -> ReconciliationAction:
+        meta = {"reconciled_at": now.isoformat(), "reconciled_by": self.RECONCILED_BY}
+        snap = action.snapshot
+        if action.action == ReconciliationActionType.MARK_PAID and snap is not None:
+            res = self.order_command.mark_paid(
+                order_id=action.order_id,
+                provider_payment_id=snap.provider_payment_id,
+                payment_type=snap.payment_type,
+                method_brand=snap.method_brand,
+                method_last_four=snap.method_last_four,
+                paid_at=snap.approved_at,
+                extra_metadata=meta,
+            )
+            action.applied = res is not None
+        elif action.action == ReconciliationActionType.MARK_FAILED:
+            res = self.order_command.mark_failed(
+                order_id=action.order_id,
+                error_code=(snap.status if snap else "not_found_at_provider"),
+                error_message=action.reason,
+                extra_metadata=meta,
+            )
+            # mark_failed no pisa una orden que se cobró mientras tanto
+            action.applied = res is not None and res.status == OrderStatus.FAILED
+        return action
+
+    # -----------------------
+    # Ejecución
+    # -----------------------
+    def iter_actions(
+        self,
+        report: ReconciliationReport,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        page_size: int = 200,
+        batch_size: int = 50,
+        max_orders: Optional[int] = None,
+        max_orders_per_second: float = 20.0,
+        include_paid_without_payment_id: bool = True,
+        fail_missing_after: Optional[datetime.timedelta] = None,
+    ) -> Iterator[ReconciliationAction]:
+        """
+        Generador: produce una acción por orden revisada, en orden de created_at.
+        No aplica nada; run() decide si aplicar (dry_run).
+        """
+        limiter = _RateLimiter(max_orders_per_second)
+        tokens: Dict[Optional[int], Optional[str]] = {}
+
+        for page in self._iter_candidates(created_from, created_to, page_size, include_paid_without_payment_id):
+            for start in range(0, len(page), batch_size):
+                batch = page[start:start + batch_size]
+                if max_orders is not None:
+                    batch = batch[:max(0, max_orders - report.scanned)]
+                    if not batch:
+                        return
+                limiter.acquire(len(batch))
+
+                lookups: List[PaymentLookup] = []
+                skipped_ids = set()
+                for o in batch:
+                    token = self._access_token_for(o, tokens)
+                    if not token:
+                        skipped_ids.add(o.id)
+                        continue
+                    lookups.append(PaymentLookup(
+                        order_id=o.id,
+                        access_token=token,
+                        provider_payment_id=o.provider_payment_id,
+                        external_reference=self._external_reference(o),
+                    ))
+
+                results = self.client.fetch_many(lookups)
+                report.provider_lookups += len(lookups)
+                now = datetime.datetime.now()
+
+                for o in batch:
+                    report.scanned += 1
+                    if o.id in skipped_ids:
+                        yield ReconciliationAction(order_id=o.id, local_status=o.status.value,
+                                                   action=ReconciliationActionType.NOOP,
+                                                   reason="no_access_token")
+                        continue
+                    res = results.get(o.id)
+                    if isinstance(res, ProviderLookupError):
+                        report.provider_errors += 1
+                        yield ReconciliationAction(order_id=o.id, local_status=o.status.value,
+                                                   action=ReconciliationActionType.NOOP,
+                                                   reason=f"provider_error: {res}")
+                        continue
+                    yield self.decide(o, res, now, fail_missing_after=fail_missing_after)
+
+    def run(
+        self,
+        dry_run: bool = True,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        page_size: int = 200,
+        batch_size: int = 50,
+        max_orders: Optional[int] = None,
+        max_orders_per_second: float = 20.0,
+        include_paid_without_payment_id: bool = True,
+        fail_missing_after: Optional[datetime.timedelta] = None,
+    ) -> ReconciliationReport:
+        report = ReconciliationReport(dry_run=dry_run, started_at=datetime.datetime.now())
+        for action in self.iter_actions(
+            report,
+            created_from=created_from,
+            created_to=created_to,
+            page_size=page_size,
+            batch_size=batch_size,
+            max_orders=max_orders,
+            max_orders_per_second=max_orders_per_second,
+            include_paid_without_payment_id=include_paid_without_payment_id,
+            fail_missing_after=fail_missing_after,
+        ):
+            if not dry_run and action.action in (ReconciliationActionType.MARK_PAID,
+                                                 ReconciliationActionType.MARK_FAILED):
+                try:
+                    self.apply(action, datetime.datetime.now())
+                except ValueError as e:
+                    # p. ej. provider_payment_id ya usado por otra orden (uq_order_provider_payment)
+                    action.reason = str(e)
+            report.record(action)
+        report.finished_at = datetime.datetime.now()
+        return report
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Optional, Dict, Any, List
+
+
+class ReconciliationActionType(Enum):
+    MARK_PAID = "mark_paid"        # proveedor aprobado, local sin cerrar
+    MARK_FAILED = "mark_failed"    # proveedor rechazado/cancelado, local sin cerrar
+    MISMATCH = "mismatch"          # discrepancia que NO se corrige sola (p. ej. PAID local vs rejected)
+    NOOP = "noop"                  # consistente o aún pendiente en el proveedor
+
+
+# Estados de pago de MP -> agrupación
+MP_APPROVED = {"approved"}
+MP_FAILED = {"rejected", "cancelled", "refunded", "charged_back"}
+MP_PENDING = {"pending", "in_process", "authorized", "in_mediation"}
+
+
+@dataclass
+class ProviderPaymentSnapshot:
+    """
+    Vista mínima de un pago en el proveedor (respuesta de GET /v1/payments/{id}
+    o de /v1/payments/search).
+    """
+    provider_payment_id: str
+    status: str
+    status_detail: Optional[str] = None
+    external_reference: Optional[str] = None
+    payment_type: Optional[str] = None
+    method_brand: Optional[str] = None
+    method_last_four: Optional[str] = None
+    approved_at: Optional[datetime] = None
+
+    @classmethod
+    def from_mp_json(cls, payment: Dict[str, Any]) -> "ProviderPaymentSnapshot":
+        card = payment.get("card") or {}
+        approved_raw = payment.get("date_approved")
+        approved_at = None
+        if approved_raw:
+            try:
+                approved_at = datetime.fromisoformat(str(approved_raw).replace("Z", "+00:00")).replace(tzinfo=None)
+            except ValueError:
+                approved_at = None
+        return cls(
+            provider_payment_id=str(payment.get("id")),
+            status=str(payment.get("status") or "").lower(),
+            status_detail=payment.get("status_detail"),
+            external_reference=(str(payment["external_reference"])
+                                if payment.get("external_reference") is not None else None),
+            payment_type=payment.get("payment_type_id"),
+            method_brand=payment.get("payment_method_id"),
+            method_last_four=card.get("last_four_digits"),
+            approved_at=approved_at,
+        )
+
+
+@dataclass
+class ReconciliationAction:
+    order_id: int
+    action: ReconciliationActionType
+    local_status: str
+    provider_status: Optional[str] = None
+    provider_payment_id: Optional[str] = None
+    reason: Optional[str] = None
+    applied: bool = False
+    snapshot: Optional[ProviderPaymentSnapshot] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "order_id": self.order_id,
+            "action": self.action.value,
+            "local_status": self.local_status,
+            "provider_status": self.provider_status,
+            "provider_payment_id": self.provider_payment_id,
+            "reason": self.reason,
+            "applied": self.applied,
+        }
+
+
+@dataclass
+class ReconciliationReport:
+    scanned: int = 0
+    provider_lookups: int = 0
+    provider_errors: int = 0
+    marked_paid: int = 0
+    marked_failed: int = 0
+    mismatches: int = 0
+    dry_run: bool = True
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    actions: List[ReconciliationAction] = field(default_factory=list)
+
+    def record(self, action: ReconciliationAction) -> None:
+        if action.action == ReconciliationActionType.MARK_PAID and action.applied:
+            self.marked_paid += 1
+        elif action.action == ReconciliationActionType.MARK_FAILED and action.applied:
+            self.marked_failed += 1
+        elif action.action == ReconciliationActionType.MISMATCH:
+            self.mismatches += 1
+        if action.action != ReconciliationActionType.NOOP:
+            self.actions.append(action)
+
+    def to_dict(self) -> dict:
+        return {
+            "scanned": self.scanned,
+            "provider_lookups": self.provider_lookups,
+            "provider_errors": self.provider_errors,
+            "marked_paid": self.marked_paid,
+            "marked_failed": self.marked_failed,
+            "mismatches": self.mismatches,
+            "dry_run": self.dry_run,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "actions": [a.to_dict() for a in self.actions],
+        }
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, List
+
+import requests
+
+from payment.reconciliation.domain.entities.reconciliation import ProviderPaymentSnapshot
+from shared.infrastructure.metrics.http import instrument_session
+
+
+class ProviderLookupError(Exception):
+    """Error de red/HTTP (distinto de 404) al consultar el proveedor."""
+
+
+@dataclass
+class PaymentLookup:
+    """
+    Qué buscar para una orden: por provider_payment_id si ya lo tenemos,
+    si no por external_reference (= order.id enviado a MP al crear el cobro).
+    """
+    order_id: int
+    access_token: str
+    provider_payment_id: Optional[str] = None
+    external_reference: Optional[str] = None
+
+
+class MercadoPagoPaymentClient:
+    """
+    Cliente HTTP mínimo contra la API de pagos de Mercado Pago.
+    - Reutiliza una sola requests.Session (keep-alive) por proceso.
+    - fetch_many() resuelve un lote de órdenes con concurrencia acotada.
+    - api_base se puede apuntar al stub/simulador local para pruebas.
+    """
+    def __init__(
+        self,
+        api_base: Optional[str] = None,
+        timeout: float = 10.0,
+        max_workers: int = 4,
+    ):
+        self.api_base = (api_base or os.getenv("MP_API_BASE_URL") or "https://api.mercadopago.com").rstrip("/")
+        self.timeout = timeout
+        self.max_workers = max(1, int(max_workers))
+        self.session = instrument_session(requests.Session())
+
+    def _get(self, path: str, access_token: str, params: Optional[dict] = None) -> Optional[dict]:
+        try:
+            r = self.session.get(
+                f"{self.api_base}{path}",
+                params=params,
+                headers={"Authorization": f"Bearer {access_token}"},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise ProviderLookupError(str(e)) from e
+        if r.status_code == 404:
+            return None
+        if r.status_code >= 400:
+            raise ProviderLookupError(f"HTTP {r.status_code}: {r.text[:200]}")
+        return r.json()
+
+    def get_payment(self, access_token: str, provider_payment_id: str) -> Optional[ProviderPaymentSnapshot]:
+        data = self._get(f"/v1/payments/{provider_payment_id}", access_token)
+        return ProviderPaymentSnapshot.from_mp_json(data) if data else None
+
+    def search_by_external_reference(self, access_token: str, external_reference: str) -> Optional[ProviderPaymentSnapshot]:
+        """
+        Devuelve el pago más reciente asociado a external_reference (o None).
+        Si hay uno aprobado, gana sobre intentos rechazados previos.
+        """
+        data = self._get(
+            "/v1/payments/search",
+            access_token,
+            params={"external_reference": external_reference, "sort": "date_created", "criteria": "desc"},
+        )
+        results = (data or {}).get("results") or []
+        if not results:
+            return None
+        snaps = [ProviderPaymentSnapshot.from_mp_json(p) for p in results]
+        for s in snaps:
+            if s.status == "approved":
+                return s
+        return snaps[0]
+
+    def lookup(self, item: PaymentLookup) -> Optional[ProviderPaymentSnapshot]:
+        if item.provider_payment_id:
+            return self.get_payment(item.access_token, item.provider_payment_id)
+        if item.external_reference:
+            return self.search_by_external_reference(item.access_token, item.external_reference)
+        return None
+
+    def fetch_many(self, items: List[PaymentLookup]) -> Dict[int, Optional[ProviderPaymentSnapshot] | ProviderLookupError]:
+        """
+        Resuelve un lote: {order_id: snapshot | None | ProviderLookupError}.
+        Los errores por orden se devuelven como valor para no abortar el lote.
+        """
+        def _one(item: PaymentLookup):
+            try:
+                return item.order_id, self.lookup(item)
+            except ProviderLookupError as e:
+                return item.order_id, e
+
+        if not items:
+            return {}
+        if self.max_workers == 1 or len(items) == 1:
+            return dict(_one(i) for i in items)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return dict(pool.map(_one, items))
@@ -0,0 +1,598 @@
+"""
+Simulador local de Mercado Pago para pruebas de integración y de carga sin red.
+
+Imita lo que usa este micro-servicio:
+  POST /oauth/token                    authorization_code | refresh_token
+  GET  /users/me                       (Bearer) -> {"id": collector_id, ...}
+  POST /v1/card_tokens                 tokeniza; el nombre del titular (APRO, FUND, ...) fija el resultado
+  POST /v1/payments                    crea el pago (y dispara el webhook si hay webhook_url)
+  GET  /v1/payments/{id}, /v1/payments/search?external_reference=
+  POST /v1/customers, GET /v1/customers/{id}, GET /v1/customers/search?email=
+  POST|GET /v1/customers/{id}/cards, DELETE /v1/customers/{id}/cards/{card_id}
+
+Fallas configurables por ruta (o "*" para todas) con set_faults(): latencia fija +
+jitter, tasa de errores (500/503/429...) y tasa de "cuelgues" (responde tarde para
+provocar timeouts del cliente).
+
+Webhooks salientes: cada cambio de pago se notifica a webhook_url con el formato de
+MP (type/action/data.id, X-Request-Id estable entre reintentos y X-Signature
+sha256=<hmac> si hay secreto, igual que espera flask_webhook_controller). Si el
+destino no responde 2xx se reintenta con backoff; duplicate_rate y retry_storm()
+reproducen entregas repetidas.
+
+Uso en código:
+    stub = MercadoPagoStubServer(webhook_url="http://127.0.0.1:5000/api/payments/webhooks").start()
+    stub.add_payment({"id": 111, "status": "approved", "external_reference": "42"})
+    client = MercadoPagoPaymentClient(api_base=stub.base_url)
+    ...
+    stub.stop()
+
+Como proceso (apuntar la app con MP_API_BASE_URL / MP_TOKEN_URL):
+    python -m payment.reconciliation.infraestructure.clients.mp_stub_server --port 8089 \\
+        --latency-ms 20 --jitter-ms 30 --error-rate 0.01 \\
+        --webhook-url http://127.0.0.1:5000/api/payments/webhooks
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Resultado según el nombre del titular de la tarjeta (convención del sandbox de MP)
+CARDHOLDER_OUTCOMES: Dict[str, Tuple[str, str]] = {
+    "APRO": ("approved", "accredited"),
+    "CONT": ("in_process", "pending_contingency"),
+    "OTHE": ("rejected", "cc_rejected_other_reason"),
+    "CALL": ("rejected", "cc_rejected_call_for_authorize"),
+    "FUND": ("rejected", "cc_rejected_insufficient_amount"),
+    "SECU": ("rejected", "cc_rejected_bad_filled_security_code"),
+    "EXPI": ("rejected", "cc_rejected_bad_filled_date"),
+    "FORM": ("rejected", "cc_rejected_bad_filled_other"),
+}
+
+
+@dataclass(frozen=True)
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    hang_rate: float = 0.0
+    hang_seconds: float = 30.0
+
+
+@dataclass(frozen=True)
+class _Route:
+    name: str
+    method: str
+    pattern: "re.Pattern[str]"
+    handler: str
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # backlog amplio para pruebas de carga
+
+
+class MercadoPagoStubServer:
+    ROUTES = (
+        _Route("oauth", "POST", re.compile(r"^/oauth/token$"), "_oauth_token"),
+        _Route("users", "GET", re.compile(r"^/users/me$"), "_users_me"),
+        _Route("card_tokens", "POST", re.compile(r"^/v1/card_tokens$"), "_create_card_token"),
+        _Route("payments", "GET", re.compile(r"^/v1/payments/search$"), "_search_payments"),
+        _Route("payments", "GET", re.compile(r"^/v1/payments/(?P<id>[^/]+)$"), "_get_payment"),
+        _Route("payments", "POST", re.compile(r"^/v1/payments$"), "_create_payment"),
+        _Route("customers", "GET", re.compile(r"^/v1/customers/search$"), "_search_customers"),
+        _Route("customers", "POST", re.compile(r"^/v1/customers$"), "_create_customer"),
+        _Route("customers", "GET", re.compile(r"^/v1/customers/(?P<id>[^/]+)$"), "_get_customer"),
+        _Route("customers", "GET", re.compile(r"^/v1/customers/(?P<id>[^/]+)/cards$"), "_list_cards"),
+        _Route("customers", "POST", re.compile(r"^/v1/customers/(?P<id>[^/]+)/cards$"), "_add_card"),
+        _Route("customers", "DELETE",
+               re.compile(r"^/v1/customers/(?P<id>[^/]+)/cards/(?P<card_id>[^/]+)$"), "_delete_card"),
+    )
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        webhook_url: Optional[str] = None,
+        webhook_secret: Optional[str] = None,
+        webhook_max_attempts: int = 5,
+        webhook_backoff_s: float = 0.5,
+        webhook_workers: int = 8,
+        duplicate_rate: float = 0.0,
+        collector_id: int = 123456789,
+        strict_auth: bool = False,
+        seed: Optional[int] = None,
+    ):
+        self._payments: Dict[str, Dict[str, Any]] = {}
+        self._customers: Dict[str, Dict[str, Any]] = {}
+        self._cards: Dict[str, List[Dict[str, Any]]] = {}
+        self._card_tokens: Dict[str, Dict[str, Any]] = {}
+        self._tokens: Dict[str, int] = {}          # access_token -> collector_id
+        self._refresh_tokens: Dict[str, int] = {}
+        self._faults: Dict[str, FaultConfig] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(int(time.time()) * 1000)
+        self.collector_id = collector_id
+        self.strict_auth = strict_auth
+
+        self.requests_served = 0
+        self.requests_by_route: Dict[str, int] = {}
+        self.faults_injected = 0
+
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.webhook_max_attempts = max(1, webhook_max_attempts)
+        self.webhook_backoff_s = webhook_backoff_s
+        self.duplicate_rate = duplicate_rate
+        self.webhook_stats = {"sent": 0, "delivered": 0, "failed": 0, "retries": 0, "duplicates": 0}
+        self._webhook_pool = ThreadPoolExecutor(max_workers=max(1, webhook_workers),
+                                                thread_name_prefix="mp-sim-webhook")
+
+        self._httpd = _Server((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # -----------------------
+    # Configuración / estado
+    # -----------------------
+    def set_faults(self, route: str = "*", **kwargs) -> None:
+        """set_faults("payments", latency_ms=50, error_rate=0.05); route="*" aplica a todas."""
+        with self._lock:
+            self._faults[route] = replace(self._faults.get(route, FaultConfig()), **kwargs)
+
+    def clear_faults(self) -> None:
+        with self._lock:
+            self._faults.clear()
+
+    def add_payment(self, payment: Dict[str, Any]) -> None:
+        with self._lock:
+            self._payments[str(payment["id"])] = dict(payment)
+
+    def update_payment(self, payment_id: str, notify: bool = True, **fields) -> Optional[Dict[str, Any]]:
+        """Cambia un pago (p. ej. status="refunded") y lo notifica como payment.updated."""
+        with self._lock:
+            p = self._payments.get(str(payment_id))
+            if p is None:
+                return None
+            p.update(fields, date_last_updated=_now_iso())
+            p = dict(p)
+        if notify:
+            self.notify_payment(p["id"], "payment.updated")
+        return p
+
+    def issue_token(self, collector_id: Optional[int] = None) -> str:
+        """Access token válido para /users/me y el resto de la API."""
+        token = f"TEST-{secrets.token_hex(12)}-{collector_id or self.collector_id}"
+        with self._lock:
+            self._tokens[token] = collector_id or self.collector_id
+        return token
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests_served": self.requests_served,
+                "requests_by_route": dict(self.requests_by_route),
+                "faults_injected": self.faults_injected,
+                "payments": len(self._payments),
+                "webhooks": dict(self.webhook_stats),
+            }
+
+    def _next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    # -----------------------
+    # Fallas
+    # -----------------------
+    def _fault_for(self, route: str) -> Tuple[float, Optional[int]]:
+        """(segundos a dormir, status de error o None)."""
+        with self._lock:
+            cfg = self._faults.get(route) or self._faults.get("*")
+            if cfg is None:
+                return 0.0, None
+            delay = (cfg.latency_ms + self._rng.uniform(0, cfg.jitter_ms)) / 1000.0
+            if cfg.hang_rate and self._rng.random() < cfg.hang_rate:
+                self.faults_injected += 1
+                return delay + cfg.hang_seconds, None
+            if cfg.error_rate and self._rng.random() < cfg.error_rate:
+                self.faults_injected += 1
+                return delay, cfg.error_status
+            return delay, None
+
+    # -----------------------
+    # Auth
+    # -----------------------
+    def _collector_for(self, headers) -> Optional[int]:
+        auth = headers.get("Authorization") or ""
+        token = auth[7:].strip() if auth.startswith("Bearer ") else ""
+        with self._lock:
+            known = self._tokens.get(token)
+        if known is not None:
+            return known
+        if self.strict_auth or not token:
+            return None
+        # modo permisivo: cualquier token sirve (el sufijo numérico, si existe, es el collector)
+        tail = token.rsplit("-", 1)[-1]
+        return int(tail) if tail.isdigit() else self.collector_id
+
+    # -----------------------
+    # Handlers: (status, body)
+    # -----------------------
+    def _oauth_token(self, req) -> Tuple[int, Any]:
+        form = req.form()
+        grant = form.get("grant_type")
+        if grant == "authorization_code":
+            if not form.get("code"):
+                return 400, {"error": "invalid_grant", "message": "code required"}
+            collector = self.collector_id
+        elif grant == "refresh_token":
+            with self._lock:
+                collector = self._refresh_tokens.pop(form.get("refresh_token") or "", None)
+            if collector is None and self.strict_auth:
+                return 400, {"error": "invalid_grant", "message": "invalid refresh_token"}
+            collector = collector or self.collector_id
+        else:
+            return 400, {"error": "unsupported_grant_type"}
+        access = self.issue_token(collector)
+        refresh = f"TG-{secrets.token_hex(12)}"
+        with self._lock:
+            self._refresh_tokens[refresh] = collector
+        return 200, {
+            "access_token": access, "token_type": "bearer", "expires_in": 15_552_000,
+            "scope": "offline_access read write", "user_id": collector,
+            "refresh_token": refresh, "public_key": f"TEST-{secrets.token_hex(8)}", "live_mode": False,
+        }
+
+    def _users_me(self, req) -> Tuple[int, Any]:
+        collector = self._collector_for(req.headers)
+        if collector is None:
+            return 401, {"message": "invalid_token", "status": 401}
+        return 200, {"id": collector, "nickname": f"TESTUSER{collector}", "site_id": "MPE",
+                     "email": f"test_user_{collector}@testuser.com"}
+
+    def _create_card_token(self, req) -> Tuple[int, Any]:
+        body = req.json() or {}
+        holder = ((body.get("cardholder") or {}).get("name") or "APRO").upper()
+        number = str(body.get("card_number") or body.get("card_id") or "4009175332806176")
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._card_tokens[token] = {"holder": holder, "last_four": number[-4:], "first_six": number[:6]}
+        return 201, {"id": token, "status": "active", "last_four_digits": number[-4:],
+                     "first_six_digits": number[:6], "date_created": _now_iso()}
+
+    def _create_payment(self, req) -> Tuple[int, Any]:
+        if self._collector_for(req.headers) is None:
+            return 401, {"message": "invalid_token", "status": 401}
+        body = req.json() or {}
+        if not body.get("transaction_amount"):
+            return 400, {"message": "transaction_amount is required", "status": 400}
+        with self._lock:
+            card = self._card_tokens.pop(str(body.get("token") or ""), None)
+        status, detail = CARDHOLDER_OUTCOMES.get((card or {}).get("holder", "APRO"), CARDHOLDER_OUTCOMES["APRO"])
+        now = _now_iso()
+        payment = {
+            "id": self._next_id(),
+            "status": status,
+            "status_detail": detail,
+            "transaction_amount": body.get("transaction_amount"),
+            "currency_id": "PEN",
+            "description": body.get("description"),
+            "external_reference": body.get("external_reference"),
+            "payment_method_id": body.get("payment_method_id") or "visa",
+            "payment_type_id": "credit_card",
+            "installments": body.get("installments") or 1,
+            "payer": body.get("payer") or {},
+            "card": {"last_four_digits": (card or {}).get("last_four"),
+                     "first_six_digits": (card or {}).get("first_six")},
+            "date_created": now,
+            "date_approved": now if status == "approved" else None,
+            "date_last_updated": now,
+            "live_mode": False,
+        }
+        self.add_payment(payment)
+        self.notify_payment(payment["id"], "payment.created")
+        return 201, payment
+
+    def _get_payment(self, req, id: str) -> Tuple[int, Any]:
+        with self._lock:
+            payment = self._payments.get(id)
+        if payment is None:
+            return 404, {"message": "Payment not found", "status": 404}
+        return 200, payment
+
+    def _search_payments(self, req) -> Tuple[int, Any]:
+        ref = (req.query.get("external_reference") or [None])[0]
+        with self._lock:
+            rows = [p for p in self._payments.values()
+                    if ref is None or str(p.get("external_reference")) == ref]
+        rows.sort(key=lambda p: str(p.get("date_created") or ""), reverse=True)
+        return 200, {"results": rows, "paging": {"total": len(rows)}}
+
+    def _create_customer(self, req) -> Tuple[int, Any]:
+        body = req.json() or {}
+        email = body.get("email")
+        if not email:
+            return 400, {"message": "email is required", "status": 400}
+        with self._lock:
+            if any(c["email"] == email for c in self._customers.values()):
+                return 400, {"message": "the customer already exist", "status": 400,
+                             "cause": [{"code": "101", "description": "the customer already exist"}]}
+        customer = {"id": f"{self._next_id()}-sim", "email": email,
+                    "first_name": body.get("first_name"), "last_name": body.get("last_name"),
+                    "date_created": _now_iso(), "cards": []}
+        with self._lock:
+            self._customers[customer["id"]] = customer
+            self._cards[customer["id"]] = []
+        return 201, customer
+
+    def _get_customer(self, req, id: str) -> Tuple[int, Any]:
+        with self._lock:
+            customer = self._customers.get(id)
+            cards = list(self._cards.get(id, ()))
+        if customer is None:
+            return 404, {"message": "customer not found", "status": 404}
+        return 200, dict(customer, cards=cards)
+
+    def _search_customers(self, req) -> Tuple[int, Any]:
+        email = (req.query.get("email") or [None])[0]
+        with self._lock:
+            rows = [c for c in self._customers.values() if email is None or c["email"] == email]
+        return 200, {"results": rows, "paging": {"total": len(rows), "limit": 10, "offset": 0}}
+
+    def _list_cards(self, req, id: str) -> Tuple[int, Any]:
+        with self._lock:
+            if id not in self._customers:
+                return 404, {"message": "customer not found", "status": 404}
+            return 200, list(self._cards.get(id, ()))
+
+    def _add_card(self, req, id: str) -> Tuple[int, Any]:
+        body = req.json() or {}
+        with self._lock:
+            if id not in self._customers:
+                return 404, {"message": "customer not found", "status": 404}
+            token = self._card_tokens.pop(str(body.get("token") or ""), None)
+        if token is None:
+            return 400, {"message": "invalid card token", "status": 400}
+        card = {
+            "id": str(self._next_id()), "customer_id": id,
+            "last_four_digits": token["last_four"], "first_six_digits": token["first_six"],
+            "expiration_month": 11, "expiration_year": 2030,
+            "payment_method": {"id": "visa", "name": "Visa", "payment_type_id": "credit_card"},
+            "cardholder": {"name": token["holder"]}, "date_created": _now_iso(),
+        }
+        with self._lock:
+            self._cards[id].append(card)
+        return 201, card
+
+    def _delete_card(self, req, id: str, card_id: str) -> Tuple[int, Any]:
+        with self._lock:
+            cards = self._cards.get(id)
+            if cards is None:
+                return 404, {"message": "customer not found", "status": 404}
+            for i, c in enumerate(cards):
+                if c["id"] == card_id:
+                    return 200, cards.pop(i)
+        return 404, {"message": "card not found", "status": 404}
+
+    # -----------------------
+    # Webhooks salientes
+    # -----------------------
+    def _sign(self, raw: bytes) -> Optional[str]:
+        if not self.webhook_secret:
+            return None
+        return "sha256=" + hmac.new(self.webhook_secret.encode("utf-8"), raw, hashlib.sha256).hexdigest()
+
+    def notify_payment(self, payment_id: Any, action: str = "payment.updated",
+                       delivery_id: Optional[str] = None) -> Optional[str]:
+        """Encola la notificación; devuelve el X-Request-Id (estable entre reintentos)."""
+        if not self.webhook_url:
+            return None
+        delivery_id = delivery_id or secrets.token_hex(16)
+        body = {
+            "id": self._next_id(), "live_mode": False, "type": "payment", "date_created": _now_iso(),
+            "user_id": self.collector_id, "api_version": "v1", "action": action,
+            "data": {"id": str(payment_id)},
+        }
+        self._webhook_pool.submit(self._deliver, body, delivery_id)
+        with self._lock:
+            duplicate = self.duplicate_rate and self._rng.random() < self.duplicate_rate
+            if duplicate:
+                self.webhook_stats["duplicates"] += 1
+        if duplicate:
+            self._webhook_pool.submit(self._deliver, body, delivery_id)
+        return delivery_id
+
+    def retry_storm(self, payment_id: Any, copies: int = 50, action: str = "payment.updated") -> str:
+        """Misma notificación (mismo X-Request-Id) entregada `copies` veces en paralelo."""
+        delivery_id = secrets.token_hex(16)
+        body = {
+            "id": self._next_id(), "live_mode": False, "type": "payment", "date_created": _now_iso(),
+            "user_id": self.collector_id, "api_version": "v1", "action": action,
+            "data": {"id": str(payment_id)},
+        }
+        with self._lock:
+            self.webhook_stats["duplicates"] += max(0, copies - 1)
+        for _ in range(copies):
+            self._webhook_pool.submit(self._deliver, body, delivery_id)
+        return delivery_id
+
+    def _deliver(self, body: Dict[str, Any], delivery_id: str) -> bool:
+        raw = json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Request-Id": delivery_id,
+                   "User-Agent": "MercadoPago WebHook v1.0 (simulator)"}
+        signature = self._sign(raw)
+        if signature:
+            headers["X-Signature"] = signature
+        for attempt in range(self.webhook_max_attempts):
+            if attempt:
+                with self._lock:
+                    self.webhook_stats["retries"] += 1
+                time.sleep(self.webhook_backoff_s * (2 ** (attempt - 1)))
+            with self._lock:
+                self.webhook_stats["sent"] += 1
+            try:
+                req = urllib.request.Request(self.webhook_url, data=raw, headers=headers, method="POST")
+                with urllib.request.urlopen(req, timeout=10) as resp:
+                    ok = 200 <= resp.status < 300
+            except (urllib.error.URLError, OSError):
+                ok = False
+            if ok:
+                with self._lock:
+                    self.webhook_stats["delivered"] += 1
+                return True
+        with self._lock:
+            self.webhook_stats["failed"] += 1
+        return False
+
+    # -----------------------
+    # HTTP
+    # -----------------------
+    def _dispatch(self, method: str, path: str) -> Tuple[Optional[_Route], Dict[str, str]]:
+        for route in self.ROUTES:
+            if route.method != method:
+                continue
+            m = route.pattern.match(path)
+            if m:
+                return route, m.groupdict()
+        return None, {}
+
+    def _make_handler(self):
+        sim = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive: necesario para miles de req/s
+            # headers y body salen en escrituras separadas: sin esto Nagle + delayed ACK
+            # agregan ~40 ms por respuesta en conexiones persistentes
+            disable_nagle_algorithm = True
+
+            def _body(self) -> bytes:
+                # con keep-alive la misma instancia atiende varios requests: se relee por request
+                if self._raw is None:
+                    n = int(self.headers.get("Content-Length") or 0)
+                    self._raw = self.rfile.read(n) if n else b""
+                return self._raw
+
+            def json(self) -> Optional[Dict[str, Any]]:
+                try:
+                    return json.loads(self._body() or b"null")
+                except ValueError:
+                    return None
+
+            def form(self) -> Dict[str, str]:
+                raw = self._body().decode("utf-8", errors="replace")
+                if "json" in (self.headers.get("Content-Type") or ""):
+                    return {k: str(v) for k, v in (self.json() or {}).items()}
+                return {k: v[0] for k, v in parse_qs(raw).items()}
+
+            def _send(self, status: int, body: Any):
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def _handle(self, method: str):
+                url = urlparse(self.path)
+                self.query = parse_qs(url.query)
+                self._raw = None
+                self._body()  # consumir siempre el body para no romper el keep-alive
+                route, params = sim._dispatch(method, url.path)
+                name = route.name if route else "unknown"
+                with sim._lock:
+                    sim.requests_served += 1
+                    sim.requests_by_route[name] = sim.requests_by_route.get(name, 0) + 1
+                if route is None:
+                    return self._send(404, {"message": "not found", "status": 404})
+                delay, error = sim._fault_for(route.name)
+                if delay:
+                    time.sleep(delay)
+                if error is not None:
+                    return self._send(error, {"message": "simulated error", "status": error,
+                                              "error": "internal_error" if error >= 500 else "too_many_requests"})
+                status, body = getattr(sim, route.handler)(self, **params)
+                return self._send(status, body)
+
+            def do_GET(self):  # noqa: N802 (nombre impuesto por BaseHTTPRequestHandler)
+                self._handle("GET")
+
+            def do_POST(self):  # noqa: N802
+                self._handle("POST")
+
+            def do_DELETE(self):  # noqa: N802
+                self._handle("DELETE")
+
+            def log_message(self, format, *args):  # silencia el log por request
+                return
+
+        return _Handler
+
+    def start(self) -> "MercadoPagoStubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._webhook_pool.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador local de Mercado Pago")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--webhook-url")
+    parser.add_argument("--webhook-secret")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--strict-auth", action="store_true")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = MercadoPagoStubServer(
+        args.host, args.port, webhook_url=args.webhook_url, webhook_secret=args.webhook_secret,
+        duplicate_rate=args.duplicate_rate, strict_auth=args.strict_auth, seed=args.seed,
+    )
+    server.set_faults("*", latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                      error_rate=args.error_rate, error_status=args.error_status, hang_rate=args.hang_rate)
+    server.start()
+    print(f"Simulador MP en {server.base_url} (Ctrl+C para salir)", flush=True)
+    try:
+        while True:
+            time.sleep(10)
+            print(json.dumps(server.stats()), flush=True)
+    except KeyboardInterrupt:
+        server.stop()
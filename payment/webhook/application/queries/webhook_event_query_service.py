@@ -29,5 +29,8 @@ class WebhookEventQueryService:
                          limit: int = 100, offset: int = 0) -> List[WebhookEventData]:
         return self.repo.list_unprocessed(provider=provider, env=env, limit=limit, offset=offset)
 
+    def count_unprocessed(self) -> int:
+        return self.repo.count_unprocessed()
+
     def list_recent(self, limit: int = 100, offset: int = 0) -> List[WebhookEventData]:
         return self.repo.list_recent(limit=limit, offset=offset)
@@ -118,6 +118,10 @@ class WebhookEventRepository:
         q = q.order_by(WebhookEventModel.id.asc()).limit(limit).offset(offset)
         return [self._to_entity(r) for r in q]
 
+    def count_unprocessed(self) -> int:
+        """Backlog de eventos sin procesar (processed_at IS NULL)."""
+        return WebhookEventModel.select().where(WebhookEventModel.processed_at.is_null(True)).count()
+
     def list_recent(self, limit: int = 100, offset: int = 0) -> List[WebhookEventData]:
         q = (WebhookEventModel
              .select()
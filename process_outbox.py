@@ -0,0 +1,36 @@
+# process_outbox.py  (en la raíz del micro-servicio)
+# Procesa la outbox transaccional (order.paid -> emisión de cupones por cliente;
+# coupon/coupon_product/order.changed -> sink del change feed, ver CHANGE_FEED_SINK).
+import argparse
+import datetime
+import json
+import logging
+
+from shared.factory.container_factory import build_coupon_services
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker de la outbox transaccional")
+    parser.add_argument("--once", action="store_true", help="Procesa un lote por tópico y termina")
+    parser.add_argument("--batch-size", type=int, default=None, help="Eventos por lote (default OUTBOX_BATCH_SIZE)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Segundos de espera sin trabajo")
+    parser.add_argument("--purge-days", type=float, default=None,
+                        help="Borra eventos procesados hace más de N días y termina")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    services = build_coupon_services(lazy=True)
+    worker = services["outbox_worker"]
+    if args.batch_size:
+        worker.batch_size = max(1, args.batch_size)
+
+    if args.purge_days is not None:
+        older_than = datetime.datetime.now() - datetime.timedelta(days=args.purge_days)
+        print(json.dumps({"purged": services["outbox_repo"].purge_processed(older_than)}))
+    elif args.once:
+        print(json.dumps(worker.run_once(), indent=2, ensure_ascii=False))
+    else:
+        try:
+            worker.run_forever(poll_interval=args.poll_interval)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,37 @@
+# reconcile_orders.py  (en la raíz del micro-servicio)
+# Concilia órdenes locales contra Mercado Pago. Por defecto es dry-run.
+import argparse
+import datetime
+import json
+
+from shared.factory.container_factory import build_coupon_services
+
+
+def _parse_dt(value):
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conciliación de órdenes vs pagos de Mercado Pago")
+    parser.add_argument("--apply", action="store_true", help="Aplica mark_paid / mark_failed (sin esto: dry-run)")
+    parser.add_argument("--since", help="created_at desde (ISO 8601)")
+    parser.add_argument("--until", help="created_at hasta (ISO 8601)")
+    parser.add_argument("--max-orders", type=int, default=None)
+    parser.add_argument("--max-rate", type=float, default=20.0, help="Órdenes por segundo (0 = sin límite)")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--fail-missing-after-hours", type=float, default=None,
+                        help="Marca FAILED las PROCESSING que MP no conoce tras N horas")
+    args = parser.parse_args()
+
+    services = build_coupon_services()
+    report = services["order_reconciliation_service"].run(
+        dry_run=not args.apply,
+        created_from=_parse_dt(args.since),
+        created_to=_parse_dt(args.until),
+        batch_size=args.batch_size,
+        max_orders=args.max_orders,
+        max_orders_per_second=args.max_rate,
+        fail_missing_after=(datetime.timedelta(hours=args.fail_missing_after_hours)
+                            if args.fail_missing_after_hours else None),
+    )
+    print(json.dumps(report.to_dict(), indent=2, ensure_ascii=False))
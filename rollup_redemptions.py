@@ -0,0 +1,37 @@
+# rollup_redemptions.py  (en la raíz del micro-servicio)
+# Agrega el redemption_ledger en coupon_daily_stats y, con --expire, vence antes
+# los coupon_client pasados de valid_to (cada vencimiento deja su asiento EXPIRED).
+import argparse
+import json
+import threading
+
+from shared.factory.container_factory import build_coupon_services
+
+
+def _pass(services, args) -> dict:
+    out = {}
+    if args.expire:
+        out["expired"] = services["coupon_client_command_service"].expire_due(batch_size=max(1, args.batch_size))
+    out["rolled_up"] = services["redemption_rollup_service"].rollup(batch_size=max(1, args.batch_size))
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rollup del redemption ledger (coupon_daily_stats)")
+    parser.add_argument("--once", action="store_true", help="Una pasada y termina")
+    parser.add_argument("--expire", action="store_true", help="Vence coupon_client pasados de valid_to")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Asientos/cupones por transacción")
+    parser.add_argument("--interval", type=float, default=10.0, help="Segundos entre pasadas")
+    args = parser.parse_args()
+
+    services = build_coupon_services(lazy=True)
+    if args.once:
+        print(json.dumps(_pass(services, args)))
+    else:
+        stop = threading.Event()
+        try:
+            while not stop.is_set():
+                _pass(services, args)
+                stop.wait(args.interval)
+        except KeyboardInterrupt:
+            pass
@@ -1,4 +1,5 @@
 # coupons_container.py
+import os
 
 # ---------- IMPORT ALL REPOSITORIES / SERVICES ----------
 from coupons.alianza.application.command.alianza_commands import AlianzaCommandService
@@ -10,8 +11,16 @@ from coupons.category.application.queries.category_query_service import Category
 from coupons.category.infraestructure.repositories.category_repository import CategoryRepository
 
 from coupons.coupon.application.command.coupon_command_service import CouponCommandService
+from coupons.coupon.application.command.coupon_usage_command_service import CouponUsageCommandService
 from coupons.coupon.application.queries.coupon_query_service import CouponQueryService
+from coupons.coupon.application.queries.coupon_usage_query_service import CouponUsageQueryService
+from coupons.coupon.infraestructure.model.coupon_model import CouponModel
 from coupons.coupon.infraestructure.repositories.coupon_repository import CouponRepository
+from coupons.coupon.infraestructure.repositories.coupon_usage_repository import CouponUsageRepository
+
+from coupons.coupon_code.application.queries.coupon_code_query_service import CouponCodeQueryService
+from coupons.coupon_code.infraestructure.code_bloom_index import CodeBloomIndex
+from coupons.coupon_code.infraestructure.repositories.coupon_code_repository import CouponCodeRepository
 
 from coupons.coupon_segment_price.application.command.coupon_segment_price_command_service import CouponSegmentPriceCommandService
 from coupons.coupon_segment_price.application.queries.coupon_segment_price_query_service import CouponSegmentPriceQueryService
@@ -21,8 +30,16 @@ from coupons.coupon_trigger_product.application.command.coupon_trigger_product_c
 from coupons.coupon_trigger_product.application.queries.coupon_trigger_product_query_service import CouponTriggerProductQueryService
 from coupons.coupon_trigger_product.infraestructure.repositories.coupon_trigger_product_repository import CouponTriggerProductRepository
 from coupons.coupons_client.application.command.coupon_client_command_service import CouponClientCommandService
+from coupons.coupons_client.application.command.coupon_issuance_service import CouponIssuanceService
 from coupons.coupons_client.application.queries.coupon_client_query_service import CouponClientQueryService
 from coupons.coupons_client.infraestructure.repositories.coupon_client_repository import CouponClientRepository
+from coupons.coupons_client.infraestructure.wallet_cache import ClientWalletCache
+from coupons.redemption.application.command.redemption_rollup_service import RedemptionRollupService
+from coupons.redemption.application.queries.redemption_query_service import RedemptionQueryService
+from coupons.redemption.infraestructure.repositories.coupon_daily_stats_repository import CouponDailyStatsRepository
+from coupons.redemption.infraestructure.repositories.redemption_ledger_repository import (
+    RedemptionLedgerRepository,
+)
 
 from coupons.coupons_type.application.command.coupon_type_command_service import CouponTypeCommandService
 from coupons.coupons_type.application.queries.coupon_type_query_service import CouponTypeQueryService
@@ -38,17 +55,24 @@ from coupons.event.infraestructure.repositories.event_repository import EventRep
 
 # ---- PRODUCT COUPON (mapping cupón ↔ producto/servicio) ----
 from coupons.product_coupon.application.command.coupon_product_command_service import CouponProductCommandService
+from coupons.product_coupon.application.command.coupon_product_reservation_service import \
+    CouponProductReservationService
 from coupons.product_coupon.application.queries.coupon_product_query_service import CouponProductQueryService
 from coupons.product_coupon.infraestructure.repositories.coupon_product_repository import CouponProductRepository
+from coupons.product_coupon.infraestructure.repositories.coupon_product_hold_repository import \
+    CouponProductHoldRepository
+from coupons.product_coupon.infraestructure.repositories.coupon_product_stock_shard_repository import \
+    CouponProductStockShardRepository
 from coupons.segmentation.application.command.segment_command_service import SegmentCommandService
 from coupons.segmentation.application.queries.segment_query_service import SegmentQueryService
 from coupons.segmentation.infraestructure.repositories.segment_repository import SegmentRepository
 from payment.checkout.application.command.checkout_session_command_service import CheckoutSessionCommandService
 from payment.checkout.application.queries.checkout_session_query_service import CheckoutSessionQueryService
+from payment.checkout.infraestructure.cache.checkout_session_cache import CheckoutSessionCache
 from payment.checkout.infraestructure.repositories.checkout_session_repository import CheckoutSessionRepository
 from payment.orders.application.command.order_command_service import OrderCommandService
 from payment.orders.application.queries.order_query_service import OrderQueryService
-from payment.orders.infraestructure.repositories.order_repository import OrderRepository
+from payment.orders.infraestructure.repositories.order_repository import ORDER_PAID_TOPIC, OrderRepository
 from payment.party.application.command.party_command_service import PartyCommandService
 from payment.party.application.queries.party_query_service import PartyQueryService
 from payment.party.infraestructure.repositories.party_repository import PartyRepository
@@ -66,164 +90,227 @@ from payment.provider.provider_customer.application.command.provider_customer_co
     ProviderCustomerCommandService
 from payment.provider.provider_customer.infraestructure.repositories.provider_customer_repository import \
     ProviderCustomerRepository
+from payment.reconciliation.application.command.order_reconciliation_service import OrderReconciliationService
+from payment.reconciliation.infraestructure.clients.mp_payment_client import MercadoPagoPaymentClient
 from payment.webhook.application.command.webhook_event_command_service import WebhookEventCommandService
 from payment.webhook.application.queries.webhook_event_query_service import WebhookEventQueryService
 from payment.webhook.infraestructure.repositories.webhook_event_repository import WebhookEventRepository
+from shared.factory.service_container import ServiceContainer
+from shared.infrastructure.cache.config import build_cache, build_cache_backend
+from shared.infrastructure.cache.repository import CachedRepository
+from shared.infrastructure.catalog_cache import CatalogCache, catalog_cache_enabled
+from shared.infrastructure.change_feed import ChangeFeedRelay, ChangeRecorder, build_sink_from_env
+from shared.infrastructure.outbox import OutboxRepository, OutboxWorker
+
+
+def _coupon_repo(c: ServiceContainer):
+    # Opt-in: COUPON_REPO_CACHE_TTL > 0 cachea lecturas por id/negocio en el backend compartido
+    repo = CouponRepository()
+    ttl = float(os.getenv("COUPON_REPO_CACHE_TTL", "0"))
+    cache = build_cache(c["cache_backend"], "coupon", default_ttl=ttl) if ttl > 0 else None
+    if cache is None:
+        return repo
+    return CachedRepository(repo, cache,
+                            reads=("get_by_id", "find_by_business"),
+                            writes=("create", "update", "set_max_uses", "delete"),
+                            model=CouponModel)
+
+
+
+def _coupon_wallet_cache(c: ServiceContainer):
+    # Billetera por cliente; COUPON_WALLET_CACHE_TTL=0 la apaga. Emitir/canjear/vencer
+    # invalida al cliente; cambios del cupón (nombre, fechas) se ven al vencer el TTL.
+    # Solo con backend compartido (redis): con uno local la invalidación no llegaría a
+    # los otros workers ni a la web cuando emite el worker del outbox.
+    ttl = float(os.getenv("COUPON_WALLET_CACHE_TTL", "30"))
+    backend = c["cache_backend"]
+    if ttl <= 0 or backend is None or not backend.shared:
+        return None
+    return ClientWalletCache(build_cache(backend, "coupon_wallet", default_ttl=ttl))
+
+def build_service_container() -> ServiceContainer:
+    """
+    Registra repositorios y servicios sin construir nada: cada uno se instancia
+    la primera vez que se pide (container["..."]).
+    """
+    c = ServiceContainer()
+
+    # ---------- CACHE COMPARTIDO ----------
+    c.register("cache_backend", lambda c: build_cache_backend())
 
-
-def build_coupon_services():
     # ---------- REPOSITORIES ----------
-    discount_type_repo = DiscountTypeRepository()
-    coupon_type_repo = CouponTypeRepository()
-    coupon_repo = CouponRepository()
-
-    coupon_product_repo = CouponProductRepository()
-    coupon_trigger_product_repo = CouponTriggerProductRepository()
-
-    segment_repo = SegmentRepository()
-    coupon_segment_price_repo = CouponSegmentPriceRepository()
-
-    category_repo = CategoryRepository()
-    event_repo = EventRepository()
-
-    alianza_repo = AlianzaRepository()
-
-
-
-
-
-    webhook_repo= WebhookEventRepository()
-    webhook_command_service = WebhookEventCommandService(webhook_repo)
-    webhook_query_service = WebhookEventQueryService(webhook_repo)
-    checkout_session_repo =  CheckoutSessionRepository()
-    checkout_session_command_service = CheckoutSessionCommandService(checkout_session_repo)
-    checkout_session_query_service = CheckoutSessionQueryService(checkout_session_repo)
-    orders_repo = OrderRepository()
-    order_query_service = OrderQueryService(orders_repo)
-    order_command_service = OrderCommandService(orders_repo)
-    party_repository = PartyRepository()
-    party_query_service = PartyQueryService(party_repository)
-    party_command_service =PartyCommandService(party_repository)
-    payment_source_repo = PaymentSourceRepository()
-    payment_source_command_service = PaymentSourceCommandService(payment_source_repo)
-    payment_source_query_service = PaymentSourceCommandService(payment_source_repo)
-    provider_account_repository = ProviderAccountRepository()
-    provider_account_command_service = ProviderAccountCommandService(provider_account_repository)
-    provider_account_query_service = ProviderAccountQueryService(provider_account_repository)
-    provider_customer_repo =ProviderCustomerRepository()
-    provider_customer_command_service = ProviderCustomerCommandService(provider_customer_repo)
-    provider_customer_query_service = ProviderCustomerCommandService(provider_customer_repo)
+    c.register("discount_type_repo", lambda c: DiscountTypeRepository())
+    c.register("coupon_type_repo", lambda c: CouponTypeRepository())
+    c.register("coupon_repo", _coupon_repo)
+
+    c.register("coupon_product_stock_shard_repo", lambda c: CouponProductStockShardRepository())
+    c.register("coupon_code_repo", lambda c: CouponCodeRepository())
+    # Bloom filter de códigos por proceso (None si COUPON_CODE_BLOOM=0)
+    c.register("coupon_code_bloom", lambda c: (CodeBloomIndex(c["coupon_code_repo"])
+                                               if os.getenv("COUPON_CODE_BLOOM", "1") == "1" else None))
+    c.register("coupon_product_repo",
+               lambda c: CouponProductRepository(c["coupon_product_stock_shard_repo"], c["coupon_code_repo"]))
+    c.register("coupon_product_hold_repo",
+               lambda c: CouponProductHoldRepository(c["coupon_product_stock_shard_repo"]))
+    c.register("coupon_trigger_product_repo", lambda c: CouponTriggerProductRepository())
+
+    c.register("segment_repo", lambda c: SegmentRepository())
+    c.register("coupon_segment_price_repo", lambda c: CouponSegmentPriceRepository())
+
+    c.register("category_repo", lambda c: CategoryRepository())
+    c.register("event_repo", lambda c: EventRepository())
+
+    # Cachés de catálogos (por proceso; None si CATALOG_CACHE_ENABLED=0)
+    def _catalog(name, repo_key, loader, name_of):
+        def factory(c):
+            if not catalog_cache_enabled():
+                return None
+            return CatalogCache(name, lambda: loader(c[repo_key]), name_of=name_of,
+                                fingerprinter=lambda: c[repo_key].fingerprint())
+        c.register(f"{name}_cache", factory)
+
+    _catalog("discount_type", "discount_type_repo", lambda r: r.get_all(), lambda e: e.name)
+    _catalog("coupon_type", "coupon_type_repo", lambda r: r.get_all(), lambda e: e.name)
+    _catalog("category", "category_repo", lambda r: r.list_all(), lambda e: e.nombre)
+    _catalog("event", "event_repo", lambda r: r.list_all(), lambda e: e.nombre)
+
+    c.register("alianza_repo", lambda c: AlianzaRepository())
+    c.register("redemption_ledger_repo", lambda c: RedemptionLedgerRepository())
+    c.register("coupon_daily_stats_repo", lambda c: CouponDailyStatsRepository())
+    c.register("coupon_usage_repo", lambda c: CouponUsageRepository(c["redemption_ledger_repo"], c["coupon_repo"]))
+    c.register("coupon_wallet_cache", _coupon_wallet_cache)
+    c.register("coupon_client_repo",
+               lambda c: CouponClientRepository(c["coupon_usage_repo"], c["redemption_ledger_repo"],
+                                                c["coupon_code_repo"], c["coupon_wallet_cache"]))
+
+    c.register("webhook_repo", lambda c: WebhookEventRepository())
+    c.register("checkout_session_repo", lambda c: CheckoutSessionRepository())
+    c.register("checkout_session_cache", lambda c: CheckoutSessionCache())
+    c.register("outbox_repo", lambda c: OutboxRepository())
+    # Change feed (coupon / coupon_product / order): None si CHANGE_FEED_ENABLED=0
+    c.register("change_recorder", lambda c: (ChangeRecorder(c["outbox_repo"])
+                                             if os.getenv("CHANGE_FEED_ENABLED", "1") == "1" else None))
+    c.register("change_feed_relay", lambda c: ChangeFeedRelay(build_sink_from_env()))
+    c.register("orders_repo", lambda c: OrderRepository(c["outbox_repo"]))
+    c.register("party_repository", lambda c: PartyRepository())
+    c.register("payment_source_repo", lambda c: PaymentSourceRepository())
+    c.register("provider_account_repository", lambda c: ProviderAccountRepository())
+    c.register("provider_customer_repo", lambda c: ProviderCustomerRepository())
+
     # ---------- SERVICES ----------
     # Catálogos
-    discount_type_command_service = DiscountTypeCommandService(discount_type_repo)
-    discount_type_query_service = DiscountTypeQueryService(discount_type_repo)
+    c.register("discount_type_command_service",
+               lambda c: DiscountTypeCommandService(c["discount_type_repo"], cache=c["discount_type_cache"]))
+    c.register("discount_type_query_service",
+               lambda c: DiscountTypeQueryService(c["discount_type_repo"], cache=c["discount_type_cache"]))
 
-    coupon_type_command_service = CouponTypeCommandService(coupon_type_repo)
-    coupon_type_query_service = CouponTypeQueryService(coupon_type_repo)
+    c.register("coupon_type_command_service",
+               lambda c: CouponTypeCommandService(c["coupon_type_repo"], cache=c["coupon_type_cache"]))
+    c.register("coupon_type_query_service",
+               lambda c: CouponTypeQueryService(c["coupon_type_repo"], cache=c["coupon_type_cache"]))
 
     # Coupon (core)
-    coupon_command_service = CouponCommandService(coupon_repo)
-    coupon_query_service = CouponQueryService(coupon_repo)
+    c.register("coupon_command_service", lambda c: CouponCommandService(c["coupon_repo"], c["change_recorder"]))
+    c.register("coupon_query_service", lambda c: CouponQueryService(c["coupon_repo"]))
+    c.register("coupon_usage_command_service", lambda c: CouponUsageCommandService(c["coupon_usage_repo"]))
+    c.register("coupon_usage_query_service", lambda c: CouponUsageQueryService(c["coupon_usage_repo"]))
+    c.register("coupon_code_query_service", lambda c: CouponCodeQueryService(
+        c["coupon_code_repo"], c["coupon_repo"], c["coupon_client_repo"], c["coupon_code_bloom"]))
 
     # CouponProduct (mapping). Incluye métodos nuevos: consume_one / remove_by_combo (ya en el service/repo)
-    coupon_product_command_service = CouponProductCommandService(coupon_product_repo)
-    coupon_product_query_service = CouponProductQueryService(coupon_product_repo)
+    c.register("coupon_product_command_service",
+               lambda c: CouponProductCommandService(c["coupon_product_repo"], c["change_recorder"]))
+    c.register("coupon_product_query_service", lambda c: CouponProductQueryService(c["coupon_product_repo"]))
+    c.register("coupon_product_reservation_service",
+               lambda c: CouponProductReservationService(c["coupon_product_hold_repo"]))
 
     # CouponTriggerProduct (triggers que generan cupones)
-    coupon_trigger_product_command_service = CouponTriggerProductCommandService(coupon_trigger_product_repo)
-    coupon_trigger_product_query_service = CouponTriggerProductQueryService(coupon_trigger_product_repo)
+    c.register("coupon_trigger_product_command_service",
+               lambda c: CouponTriggerProductCommandService(c["coupon_trigger_product_repo"]))
+    c.register("coupon_trigger_product_query_service",
+               lambda c: CouponTriggerProductQueryService(c["coupon_trigger_product_repo"]))
 
     # Segmentación / precios por segmento
-    segment_command_service = SegmentCommandService(segment_repo)
-    segment_query_service = SegmentQueryService(segment_repo)
+    c.register("segment_command_service", lambda c: SegmentCommandService(c["segment_repo"]))
+    c.register("segment_query_service", lambda c: SegmentQueryService(c["segment_repo"]))
 
-    coupon_segment_price_command_service = CouponSegmentPriceCommandService(coupon_segment_price_repo)
-    coupon_segment_price_query_service = CouponSegmentPriceQueryService(coupon_segment_price_repo)
+    c.register("coupon_segment_price_command_service",
+               lambda c: CouponSegmentPriceCommandService(c["coupon_segment_price_repo"]))
+    c.register("coupon_segment_price_query_service",
+               lambda c: CouponSegmentPriceQueryService(c["coupon_segment_price_repo"]))
 
     # Category / Event
-    category_command_service = CategoryCommandService(category_repo)
-    category_query_service = CategoryQueryService(category_repo)
+    c.register("category_command_service",
+               lambda c: CategoryCommandService(c["category_repo"], cache=c["category_cache"]))
+    c.register("category_query_service",
+               lambda c: CategoryQueryService(c["category_repo"], cache=c["category_cache"]))
 
-    event_command_service = EventCommandService(event_repo)
-    event_query_service = EventQueryService(event_repo)
+    c.register("event_command_service", lambda c: EventCommandService(c["event_repo"], cache=c["event_cache"]))
+    c.register("event_query_service", lambda c: EventQueryService(c["event_repo"], cache=c["event_cache"]))
 
     # Alianzas
-    alianza_command_service = AlianzaCommandService(alianza_repo)
-    alianza_query_service = AlianzaQueryService(alianza_repo)
+    c.register("alianza_command_service", lambda c: AlianzaCommandService(c["alianza_repo"]))
+    c.register("alianza_query_service", lambda c: AlianzaQueryService(c["alianza_repo"]))
 
     # CouponClient (cupones emitidos/personalizados por cliente)
-    coupon_client_repo = CouponClientRepository()
-    coupon_client_command_service = CouponClientCommandService(coupon_client_repo)
-    coupon_client_query_service = CouponClientQueryService(coupon_client_repo)
-
-    # ---------- RETURN MAP ----------
-    return {
-        # Catalogs
-        "discount_type_command_service": discount_type_command_service,
-        "discount_type_query_service": discount_type_query_service,
-        "coupon_type_command_service": coupon_type_command_service,
-        "coupon_type_query_service": coupon_type_query_service,
-
-        # Coupon core
-        "coupon_command_service": coupon_command_service,
-        "coupon_query_service": coupon_query_service,
-
-        # Relations / mappings
-        "coupon_product_command_service": coupon_product_command_service,
-        "coupon_product_query_service": coupon_product_query_service,
-
-        "coupon_trigger_product_command_service": coupon_trigger_product_command_service,
-        "coupon_trigger_product_query_service": coupon_trigger_product_query_service,
-
-        # Segmentation
-        "segment_command_service": segment_command_service,
-        "segment_query_service": segment_query_service,
-        "coupon_segment_price_command_service": coupon_segment_price_command_service,
-        "coupon_segment_price_query_service": coupon_segment_price_query_service,
-
-        # Category / Event
-        "category_command_service": category_command_service,
-        "category_query_service": category_query_service,
-        "event_command_service": event_command_service,
-        "event_query_service": event_query_service,
-
-        # Alliances
-        "alianza_command_service": alianza_command_service,
-        "alianza_query_service": alianza_query_service,
-
-        # ---- coupon_client (nuevo) ----
-        "coupon_client_command_service": coupon_client_command_service,
-        "coupon_client_query_service": coupon_client_query_service,
-
-        # (Opcional) Exponer repos si los necesitas
-        "discount_type_repo": discount_type_repo,
-        "coupon_type_repo": coupon_type_repo,
-        "coupon_repo": coupon_repo,
-        "coupon_product_repo": coupon_product_repo,
-        "coupon_trigger_product_repo": coupon_trigger_product_repo,
-        "segment_repo": segment_repo,
-        "coupon_segment_price_repo": coupon_segment_price_repo,
-        "category_repo": category_repo,
-        "event_repo": event_repo,
-        "alianza_repo": alianza_repo,
-        "coupon_client_repo": coupon_client_repo,
-
-
-
-
-
-        "webhook_command_service": webhook_command_service,
-        "webhook_query_service": webhook_query_service,
-        "checkout_session_command_service": checkout_session_command_service,
-        "checkout_session_query_service": checkout_session_query_service,
-        "order_command_service": order_command_service,
-        "order_query_service": order_query_service,
-        "party_command_service": party_command_service,
-        "party_query_service": party_query_service,
-        "payment_source_command_service": payment_source_command_service,
-        "payment_source_query_service": payment_source_query_service,
-        "provider_account_command_service": provider_account_command_service,
-        "provider_account_query_service": provider_account_query_service,
-        "provider_customer_command_service": provider_customer_command_service,
-        "provider_customer_query_service": provider_customer_query_service,
-    }
+    c.register("coupon_client_command_service", lambda c: CouponClientCommandService(c["coupon_client_repo"]))
+    c.register("coupon_client_query_service",
+               lambda c: CouponClientQueryService(c["coupon_client_repo"], c["coupon_wallet_cache"]))
+    c.register("coupon_issuance_service", lambda c: CouponIssuanceService(
+        c["coupon_trigger_product_repo"], c["coupon_repo"], c["coupon_client_repo"], c["party_repository"]))
+
+    # ---------- REDEMPTION LEDGER / ESTADÍSTICAS ----------
+    c.register("redemption_rollup_service", lambda c: RedemptionRollupService(
+        c["redemption_ledger_repo"], c["coupon_daily_stats_repo"]))
+    c.register("redemption_query_service", lambda c: RedemptionQueryService(
+        c["redemption_ledger_repo"], c["coupon_daily_stats_repo"]))
+
+    # Pagos
+    c.register("webhook_command_service", lambda c: WebhookEventCommandService(c["webhook_repo"]))
+    c.register("webhook_query_service", lambda c: WebhookEventQueryService(c["webhook_repo"]))
+    c.register("checkout_session_command_service",
+               lambda c: CheckoutSessionCommandService(c["checkout_session_repo"], c["checkout_session_cache"]))
+    c.register("checkout_session_query_service",
+               lambda c: CheckoutSessionQueryService(c["checkout_session_repo"], c["checkout_session_cache"]))
+    c.register("order_command_service", lambda c: OrderCommandService(c["orders_repo"], c["change_recorder"]))
+    c.register("order_query_service", lambda c: OrderQueryService(c["orders_repo"]))
+    c.register("party_command_service", lambda c: PartyCommandService(c["party_repository"]))
+    c.register("party_query_service", lambda c: PartyQueryService(c["party_repository"]))
+    c.register("payment_source_command_service", lambda c: PaymentSourceCommandService(c["payment_source_repo"]))
+    c.register("payment_source_query_service", lambda c: PaymentSourceCommandService(c["payment_source_repo"]))
+    c.register("provider_account_command_service",
+               lambda c: ProviderAccountCommandService(c["provider_account_repository"]))
+    c.register("provider_account_query_service",
+               lambda c: ProviderAccountQueryService(c["provider_account_repository"]))
+    c.register("provider_customer_command_service",
+               lambda c: ProviderCustomerCommandService(c["provider_customer_repo"]))
+    c.register("provider_customer_query_service",
+               lambda c: ProviderCustomerCommandService(c["provider_customer_repo"]))
+    c.register("order_reconciliation_service", lambda c: OrderReconciliationService(
+        c["order_query_service"],
+        c["order_command_service"],
+        c["provider_account_repository"],
+        client=MercadoPagoPaymentClient(),
+        default_access_token=os.getenv("MP_ACCESS_TOKEN"),
+    ))
+
+    # Outbox: order.paid -> emisión de cupones; *.changed -> sink del change feed
+    # (lo corre process_outbox.py)
+    c.register("outbox_worker", lambda c: OutboxWorker(
+        c["outbox_repo"],
+        {ORDER_PAID_TOPIC: c["coupon_issuance_service"].handle_order_paid,
+         **c["change_feed_relay"].handlers()},
+        batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "100")),
+        max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10")),
+    ))
+
+    return c
+
+
+def build_coupon_services(lazy: bool = False):
+    """
+    lazy=False: construye todo al arrancar y devuelve un dict (comportamiento histórico).
+    lazy=True:  devuelve el ServiceContainer; cada servicio se crea en su primer uso.
+    """
+    container = build_service_container()
+    return container if lazy else container.resolve_all()
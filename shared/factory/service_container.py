@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Iterator, Mapping, List
+
+Factory = Callable[["ServiceContainer"], Any]
+
+
+class ServiceContainer(Mapping):
+    """
+    Contenedor mínimo de servicios con construcción perezosa.
+
+    - register(name, factory): factory recibe el container para resolver dependencias
+      (p. ej. lambda c: OrderQueryService(c["orders_repo"])).
+    - container[name] construye la instancia la primera vez y la reutiliza (singleton por container).
+    - Se comporta como el dict que devolvía build_coupon_services(): los controllers
+      siguen usando services["..."] / services.get("...") sin cambios.
+    """
+    def __init__(self):
+        self._factories: Dict[str, Factory] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Factory) -> "ServiceContainer":
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+        return self
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                factory = self._factories[name]  # KeyError si no existe, igual que un dict
+                self._instances[name] = factory(self)
+            return self._instances[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+
+    def built(self) -> List[str]:
+        """Nombres ya instanciados (útil para diagnóstico / benchmark de arranque)."""
+        return list(self._instances)
+
+    def resolve_all(self) -> Dict[str, Any]:
+        """Construye todo (modo eager) y devuelve un dict plano."""
+        return {name: self[name] for name in self._factories}
@@ -0,0 +1,204 @@
+"""
+Backends del caché compartido. Todos guardan bytes (la serialización la hace Cache):
+
+- LocalLRUBackend: en memoria del proceso, acotado (LRU) y con TTL.
+- RedisBackend:    red, compartido entre workers (requiere el paquete `redis`;
+                   sirve cualquier servidor con protocolo Redis: Redis, KeyDB, Valkey...).
+- FakeBackend:     para pruebas; varias instancias pueden compartir el mismo `store`
+                   (simula varios workers contra un mismo servidor) y el reloj es manual.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+try:  # dependencia opcional
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+
+class CacheBackend:
+    """Interfaz mínima. ttl en segundos; None o <= 0 = sin vencimiento."""
+    name = "base"
+    shared = False  # True si todos los workers/procesos ven las mismas claves
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """SET NX: escribe solo si no existe. True si escribió (usado como lock)."""
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> int:
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        raise NotImplementedError
+
+
+class _MemoryStore:
+    """Dict con TTL y LRU opcional; base de LocalLRUBackend y FakeBackend."""
+    def __init__(self, max_entries: Optional[int], clock: Callable[[], float]):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.data: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _alive(self, key: str) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires is not None and expires <= self.clock():
+            del self.data[key]
+            return None
+        return value
+
+    def _put(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        expires = self.clock() + ttl if ttl and ttl > 0 else None
+        self.data[key] = (expires, value)
+        self.data.move_to_end(key)
+        if self.max_entries:
+            while len(self.data) > self.max_entries:
+                self.data.popitem(last=False)
+
+    def get(self, key):
+        with self.lock:
+            value = self._alive(key)
+            if value is not None:
+                self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self._put(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        with self.lock:
+            if self._alive(key) is not None:
+                return False
+            self._put(key, value, ttl)
+            return True
+
+    def delete(self, keys: Iterable[str]) -> int:
+        with self.lock:
+            return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    def incr(self, key, amount=1):
+        with self.lock:
+            current = self._alive(key)
+            value = int(current or 0) + amount
+            expires = self.data[key][0] if current is not None else None
+            self.data[key] = (expires, str(value).encode())
+            return value
+
+
+class LocalLRUBackend(CacheBackend):
+    name = "local"
+
+    def __init__(self, max_entries: int = 10_000):
+        self._store = _MemoryStore(max(1, int(max_entries)), time.monotonic)
+
+    def get(self, key):
+        return self._store.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._store.set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        return self._store.add(key, value, ttl)
+
+    def delete(self, *keys):
+        return self._store.delete(keys)
+
+    def incr(self, key, amount=1):
+        return self._store.incr(key, amount)
+
+    def __len__(self) -> int:
+        return len(self._store.data)
+
+
+class FakeBackend(CacheBackend):
+    """
+    Backend de pruebas: sin LRU, reloj manual (advance) y registro de llamadas.
+        server = FakeBackend.new_store()
+        w1, w2 = FakeBackend(server), FakeBackend(server)   # dos "workers"
+    """
+    name = "fake"
+    shared = True
+
+    def __init__(self, store: Optional[_MemoryStore] = None):
+        self._store = store or self.new_store()
+        self.calls: Dict[str, int] = {}
+
+    @staticmethod
+    def new_store() -> _MemoryStore:
+        clock = {"now": 0.0}
+        store = _MemoryStore(None, lambda: clock["now"])
+        store.clock_state = clock
+        return store
+
+    def advance(self, seconds: float) -> None:
+        self._store.clock_state["now"] += seconds
+
+    def _count(self, op: str) -> None:
+        self.calls[op] = self.calls.get(op, 0) + 1
+
+    def get(self, key):
+        self._count("get")
+        return self._store.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._count("set")
+        self._store.set(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        self._count("add")
+        return self._store.add(key, value, ttl)
+
+    def delete(self, *keys):
+        self._count("delete")
+        return self._store.delete(keys)
+
+    def incr(self, key, amount=1):
+        self._count("incr")
+        return self._store.incr(key, amount)
+
+    def keys(self):
+        return list(self._store.data)
+
+
+class RedisBackend(CacheBackend):
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str, socket_timeout: float = 0.5):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self.client = redis.Redis.from_url(url, socket_timeout=socket_timeout,
+                                           socket_connect_timeout=socket_timeout)
+
+    @staticmethod
+    def _px(ttl: Optional[float]) -> Optional[int]:
+        return int(ttl * 1000) if ttl and ttl > 0 else None
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, px=self._px(ttl))
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(key, value, px=self._px(ttl), nx=True))
+
+    def delete(self, *keys):
+        return int(self.client.delete(*keys)) if keys else 0
+
+    def incr(self, key, amount=1):
+        return int(self.client.incr(key, amount))
@@ -0,0 +1,237 @@
+"""
+Caché con namespaces sobre un CacheBackend.
+
+- Claves: "{prefix}:{namespace}:g{generación}:{key}". clear() sube la generación del
+  namespace (un INCR) en vez de borrar claves: lo viejo vence solo por TTL. La
+  generación se relee del backend como mucho cada generation_ttl segundos.
+- Valores: pickle (entidades del dominio tal cual). None se cachea como "no existe".
+- get_or_load(): single-flight. Dentro del proceso un lock por clave; entre procesos
+  un lock corto en el backend (SET NX) para que solo un worker vaya a la BD y el
+  resto espere el valor un momento (lock_wait) antes de cargar por su cuenta.
+- Errores del backend (p. ej. Redis caído) no rompen la request: cuentan como miss.
+"""
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from shared.infrastructure.cache.backends import CacheBackend
+
+_MISSING = object()
+_NONE = b"\x00none"  # marcador de "no existe" cacheado
+
+
+@dataclass
+class CacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_errors: int = 0
+    waits: int = 0           # esperas por el lock de otro worker/hilo
+    backend_errors: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits, "misses": self.misses, "loads": self.loads,
+            "load_errors": self.load_errors, "waits": self.waits,
+            "backend_errors": self.backend_errors, "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+# namespace -> métricas (para /metrics y diagnósticos)
+_REGISTRY: Dict[str, CacheMetrics] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _REGISTRY_LOCK:
+        return {ns: m.snapshot() for ns, m in _REGISTRY.items()}
+
+
+class Cache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str,
+        default_ttl: Optional[float] = 60.0,
+        negative_ttl: Optional[float] = 5.0,
+        prefix: str = "cms",
+        lock_ttl: float = 10.0,
+        lock_wait: float = 2.0,
+        generation_ttl: float = 1.0,
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        self.generation_ttl = generation_ttl
+        self._gen: Optional[Tuple[float, int]] = None  # (leída_en, generación)
+        with _REGISTRY_LOCK:
+            self.metrics = _REGISTRY.setdefault(namespace, CacheMetrics())
+        self._local_locks: Dict[str, threading.Lock] = {}
+        self._local_locks_guard = threading.Lock()
+
+    # -----------------------
+    # Claves
+    # -----------------------
+    def _gen_key(self) -> str:
+        return f"{self.prefix}:{self.namespace}:gen"
+
+    def _generation(self) -> int:
+        now = time.monotonic()
+        cached = self._gen
+        if cached is not None and now - cached[0] < self.generation_ttl:
+            return cached[1]
+        try:
+            raw = self.backend.get(self._gen_key())
+        except Exception:
+            self.metrics.incr("backend_errors")
+            return cached[1] if cached else 0
+        gen = int(raw) if raw else 0
+        self._gen = (now, gen)
+        return gen
+
+    def key(self, key: Any) -> str:
+        return f"{self.prefix}:{self.namespace}:g{self._generation()}:{key}"
+
+    # -----------------------
+    # Operaciones
+    # -----------------------
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        return _NONE if value is None else pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _loads(raw: bytes) -> Any:
+        return None if raw == _NONE else pickle.loads(raw)
+
+    def _get_raw(self, full_key: str) -> Tuple[bool, Any]:
+        try:
+            raw = self.backend.get(full_key)
+        except Exception:
+            self.metrics.incr("backend_errors")
+            return False, None
+        if raw is None:
+            return False, None
+        return True, self._loads(raw)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        hit, value = self._get_raw(self.key(key))
+        self.metrics.incr("hits" if hit else "misses")
+        return value if hit else default
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        if ttl is _MISSING:
+            ttl = self.default_ttl if value is not None else self.negative_ttl
+        if value is None and not ttl:
+            return
+        try:
+            self.backend.set(self.key(key), self._dumps(value), ttl)
+        except Exception:
+            self.metrics.incr("backend_errors")
+
+    def delete(self, key: Any) -> None:
+        try:
+            self.backend.delete(self.key(key))
+        except Exception:
+            self.metrics.incr("backend_errors")
+
+    def clear(self) -> None:
+        """Invalida todo el namespace (en todos los workers que compartan backend)."""
+        try:
+            gen = self.backend.incr(self._gen_key())
+            self._gen = (time.monotonic(), int(gen))
+        except Exception:
+            self.metrics.incr("backend_errors")
+            self._gen = None
+
+    # -----------------------
+    # Read-through con single-flight
+    # -----------------------
+    def _local_lock(self, full_key: str) -> threading.Lock:
+        with self._local_locks_guard:
+            lock = self._local_locks.get(full_key)
+            if lock is None:
+                lock = self._local_locks[full_key] = threading.Lock()
+            return lock
+
+    def _release_local(self, full_key: str, lock: threading.Lock) -> None:
+        with self._local_locks_guard:
+            if self._local_locks.get(full_key) is lock and not lock.locked():
+                self._local_locks.pop(full_key, None)
+
+    def get_or_load(self, key: Any, loader: Callable[[], Any], ttl: Optional[float] = _MISSING) -> Any:
+        full_key = self.key(key)
+        hit, value = self._get_raw(full_key)
+        if hit:
+            self.metrics.incr("hits")
+            return value
+        self.metrics.incr("misses")
+
+        lock = self._local_lock(full_key)
+        try:
+            with lock:
+                # otro hilo pudo cargarlo mientras esperábamos
+                hit, value = self._get_raw(full_key)
+                if hit:
+                    self.metrics.incr("waits")
+                    return value
+                return self._load_distributed(full_key, loader, ttl)
+        finally:
+            self._release_local(full_key, lock)
+
+    def _load_distributed(self, full_key: str, loader: Callable[[], Any], ttl) -> Any:
+        lock_key = full_key + ":lock"
+        try:
+            owner = self.backend.add(lock_key, b"1", self.lock_ttl)
+        except Exception:
+            self.metrics.incr("backend_errors")
+            owner = True
+        if not owner:
+            # otro worker está cargando: esperar su resultado un rato
+            self.metrics.incr("waits")
+            deadline = time.monotonic() + self.lock_wait
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                hit, value = self._get_raw(full_key)
+                if hit:
+                    return value
+        try:
+            self.metrics.incr("loads")
+            try:
+                value = loader()
+            except Exception:
+                self.metrics.incr("load_errors")
+                raise
+            if ttl is _MISSING:
+                ttl_ = self.default_ttl if value is not None else self.negative_ttl
+            else:
+                ttl_ = ttl
+            if value is not None or ttl_:
+                try:
+                    self.backend.set(full_key, self._dumps(value), ttl_)
+                except Exception:
+                    self.metrics.incr("backend_errors")
+            return value
+        finally:
+            if owner:
+                try:
+                    self.backend.delete(lock_key)
+                except Exception:
+                    self.metrics.incr("backend_errors")
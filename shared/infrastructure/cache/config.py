@@ -0,0 +1,34 @@
+"""
+Backend del caché según el entorno:
+  CACHE_BACKEND=local (defecto) | redis | fake | none
+  CACHE_REDIS_URL=redis://localhost:6379/0
+  CACHE_LOCAL_MAX_ENTRIES=10000
+  CACHE_PREFIX=cms
+"""
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from shared.infrastructure.cache.backends import CacheBackend, FakeBackend, LocalLRUBackend, RedisBackend
+from shared.infrastructure.cache.cache import Cache
+
+
+def build_cache_backend(kind: Optional[str] = None) -> Optional[CacheBackend]:
+    kind = (kind or os.getenv("CACHE_BACKEND", "local")).lower()
+    if kind in ("none", "off", "0"):
+        return None
+    if kind == "local":
+        return LocalLRUBackend(int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "10000")))
+    if kind == "redis":
+        return RedisBackend(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    if kind == "fake":
+        return FakeBackend()
+    raise ValueError(f"CACHE_BACKEND inválido: {kind} (local | redis | fake | none)")
+
+
+def build_cache(backend: Optional[CacheBackend], namespace: str, **kwargs) -> Optional[Cache]:
+    """None si el caché está apagado (CACHE_BACKEND=none): los consumidores lo toleran."""
+    if backend is None:
+        return None
+    return Cache(backend, namespace, prefix=os.getenv("CACHE_PREFIX", "cms"), **kwargs)
@@ -0,0 +1,120 @@
+"""
+Opt-in de repositorios al caché sin reimplementarlo en cada uno:
+
+1) Wrapper (no toca el repositorio):
+       repo = CachedRepository(CouponRepository(), cache,
+                               reads={"get_by_id": 60, "find_by_business": 30},
+                               writes=("create", "update", "delete"),
+                               model=CouponModel)
+
+2) Decoradores (el repositorio tiene un atributo `cache`, que puede ser None):
+       class FooRepository:
+           cache: Optional[Cache] = None
+
+           @cached(ttl=60)
+           def get_by_id(self, id_): ...
+
+           @invalidates
+           def update(self, foo): ...
+
+Las lecturas se cachean por (método, argumentos); cualquier escritura invalida el
+namespace completo (Cache.clear), que es lo correcto para tablas con pocas escrituras.
+
+Con model, la escritura invalida también después del commit de la transacción más
+externa: si la escritura corre dentro de un atomic() (change_scope, set_limits), otro
+hilo puede leer y recachear el valor anterior entre el clear y el commit.
+"""
+from __future__ import annotations
+
+import functools
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from shared.infrastructure.cache.cache import Cache
+
+_DEFAULT = object()
+
+
+def call_key(method: str, args: tuple, kwargs: dict) -> str:
+    parts = [repr(a) for a in args]
+    parts += [f"{k}={kwargs[k]!r}" for k in sorted(kwargs)]
+    return f"{method}({','.join(parts)})"
+
+
+class CachedRepository:
+    def __init__(
+        self,
+        repo: Any,
+        cache: Cache,
+        reads: Union[Dict[str, Optional[float]], Iterable[str]] = (),
+        writes: Iterable[str] = (),
+        model: Any = None,
+    ):
+        self._repo = repo
+        self._cache = cache
+        self._model = model
+        self._reads = dict(reads) if isinstance(reads, dict) else {m: _DEFAULT for m in reads}
+        self._writes = frozenset(writes)
+
+    @property
+    def wrapped(self) -> Any:
+        return self._repo
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._repo, name)
+        if name in self._reads:
+            ttl = self._reads[name]
+
+            def read(*args, **kwargs):
+                key = call_key(name, args, kwargs)
+                load = lambda: attr(*args, **kwargs)  # noqa: E731
+                if ttl is _DEFAULT:
+                    return self._cache.get_or_load(key, load)
+                return self._cache.get_or_load(key, load, ttl=ttl)
+            return read
+        if name in self._writes:
+            def write(*args, **kwargs):
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    self._invalidate()
+            return write
+        return attr
+
+    def _invalidate(self) -> None:
+        # Ya: quien escribió relee su propio cambio dentro de la transacción.
+        self._cache.clear()
+        # Y al commit: lo que otro hilo recacheó mientras tanto es el valor anterior.
+        # Fuera de una transacción after_commit corre en el acto; tras un rollback no corre.
+        database = self._model._meta.database if self._model is not None else None
+        if database is not None and database.transaction_depth() > 0 and hasattr(database, "after_commit"):
+            database.after_commit(self._cache.clear)
+
+
+def cached(ttl: Any = _DEFAULT, cache_attr: str = "cache") -> Callable:
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[Cache] = getattr(self, cache_attr, None)
+            if cache is None:
+                return fn(self, *args, **kwargs)
+            key = call_key(fn.__name__, args, kwargs)
+            load = lambda: fn(self, *args, **kwargs)  # noqa: E731
+            if ttl is _DEFAULT:
+                return cache.get_or_load(key, load)
+            return cache.get_or_load(key, load, ttl=ttl)
+        return wrapper
+    return deco
+
+
+def invalidates(fn: Callable = None, *, cache_attr: str = "cache") -> Callable:
+    def deco(f: Callable) -> Callable:
+        @functools.wraps(f)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return f(self, *args, **kwargs)
+            finally:
+                cache: Optional[Cache] = getattr(self, cache_attr, None)
+                if cache is not None:
+                    cache.clear()
+        return wrapper
+    return deco(fn) if fn is not None else deco
@@ -0,0 +1,195 @@
+"""
+Caché read-through por proceso para tablas de catálogo chicas (tipos de descuento,
+tipos de cupón, categorías, eventos): se cargan enteras una vez y se sirven desde
+memoria get_by_id / búsqueda por nombre / list_all.
+
+Invalidación entre workers: cada catálogo tiene una fila en catalog_versions.
+Las escrituras (command services) incrementan la versión; cada proceso compara
+su versión cargada con la de la BD como mucho cada check_interval segundos
+(una lectura por PK) y recarga si cambió.
+
+ETag: fingerprint() compara la huella actual de la tabla con la que tenía el snapshot
+al cargarse y, si difiere, recarga en el momento. Así el ETag (que sale de la huella)
+nunca anuncia datos más nuevos que el cuerpo servido desde memoria.
+"""
+from __future__ import annotations
+
+import copy
+import datetime
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Optional, TypeVar
+
+from peewee import BigIntegerField, CharField, DatabaseError, DateTimeField, IntegrityError, Model
+
+from shared.infrastructure.database import db
+from shared.infrastructure.table_fingerprint import TableFingerprint
+
+T = TypeVar("T")
+
+
+class CatalogVersionModel(Model):
+    name = CharField(max_length=64, primary_key=True)
+    version = BigIntegerField(default=1, null=False)
+    updated_at = DateTimeField(default=datetime.datetime.now, null=False)
+
+    class Meta:
+        database = db
+        table_name = "catalog_versions"
+
+
+def catalog_cache_enabled() -> bool:
+    return os.getenv("CATALOG_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+
+
+def read_version(name: str) -> Optional[int]:
+    """Versión actual del catálogo (0 si nunca se escribió; None si la tabla no está)."""
+    try:
+        row = (CatalogVersionModel
+               .select(CatalogVersionModel.version)
+               .where(CatalogVersionModel.name == name)
+               .tuples()
+               .first())
+    except DatabaseError:
+        return None
+    return int(row[0]) if row else 0
+
+
+def bump_version(name: str) -> None:
+    now = datetime.datetime.now()
+    q = (CatalogVersionModel
+         .update(version=CatalogVersionModel.version + 1, updated_at=now)
+         .where(CatalogVersionModel.name == name))
+    if q.execute():
+        return
+    try:
+        CatalogVersionModel.create(name=name, version=1, updated_at=now)
+    except IntegrityError:
+        # otro worker creó la fila entre el UPDATE y el INSERT
+        q.execute()
+
+
+@dataclass
+class _Snapshot:
+    items: list
+    by_id: dict
+    by_name: dict
+    version: Optional[int]
+    fingerprint: Optional[TableFingerprint]
+    checked_at: float
+
+
+class CatalogCache(Generic[T]):
+    """
+    - loader(): lista completa de entidades (el orden se conserva en list_all).
+    - name_of(e): clave para la búsqueda por nombre (se compara sin mayúsculas ni
+      espacios en los extremos, igual que la collation de MySQL).
+    - fingerprinter(): huella de la tabla (opcional; habilita fingerprint()).
+    - Devuelve copias: los command services mutan la entidad que leen.
+    """
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], List[T]],
+        name_of: Optional[Callable[[T], Any]] = None,
+        check_interval: Optional[float] = None,
+        fingerprinter: Optional[Callable[[], TableFingerprint]] = None,
+    ):
+        self.name = name
+        self.loader = loader
+        self.name_of = name_of
+        self.fingerprinter = fingerprinter
+        self.check_interval = float(check_interval if check_interval is not None
+                                    else os.getenv("CATALOG_CACHE_CHECK_INTERVAL", "5"))
+        self._lock = threading.Lock()
+        self._snap: Optional[_Snapshot] = None
+        self.hits = 0
+        self.reloads = 0
+
+    @staticmethod
+    def _name_key(value: Any) -> str:
+        value = getattr(value, "value", value)  # Enum -> value
+        return str(value or "").strip().lower()
+
+    def _load(self) -> "_Snapshot":
+        # Versión y huella se leen ANTES de cargar: si alguien escribe en el medio,
+        # el próximo chequeo ve una versión (o huella) distinta y vuelve a cargar.
+        version = read_version(self.name)
+        fingerprint = self.fingerprinter() if self.fingerprinter else None
+        items = list(self.loader())
+        self.reloads += 1
+        return _Snapshot(
+            items=items,
+            by_id={getattr(e, "id", None): e for e in items},
+            by_name=({self._name_key(self.name_of(e)): e for e in items} if self.name_of else {}),
+            version=version,
+            fingerprint=fingerprint,
+            checked_at=time.monotonic(),
+        )
+
+    def _snapshot(self) -> "_Snapshot":
+        snap = self._snap
+        now = time.monotonic()
+        if snap is not None and now - snap.checked_at < self.check_interval:
+            return snap
+        with self._lock:
+            snap = self._snap
+            if snap is None:
+                snap = self._snap = self._load()
+            elif now - snap.checked_at >= self.check_interval:
+                if read_version(self.name) != snap.version:
+                    snap = self._snap = self._load()
+                else:
+                    snap.checked_at = now
+            return snap
+
+    # -----------------------
+    # Lecturas
+    # -----------------------
+    def list_all(self) -> List[T]:
+        snap = self._snapshot()
+        self.hits += 1
+        return [copy.copy(e) for e in snap.items]
+
+    def get_by_id(self, id_: Any) -> Optional[T]:
+        e = self._snapshot().by_id.get(id_)
+        self.hits += 1
+        return copy.copy(e) if e is not None else None
+
+    def get_by_name(self, name: Any) -> Optional[T]:
+        if self.name_of is None:
+            raise ValueError(f"catalog '{self.name}' has no name lookup")
+        e = self._snapshot().by_name.get(self._name_key(name))
+        self.hits += 1
+        return copy.copy(e) if e is not None else None
+
+    def fingerprint(self) -> TableFingerprint:
+        """
+        Huella para el ETag, consistente con lo que sirve la caché: si la tabla cambió
+        desde la carga del snapshot se recarga ya, sin esperar a check_interval.
+        """
+        if self.fingerprinter is None:
+            raise ValueError(f"catalog '{self.name}' has no fingerprint")
+        current = self.fingerprinter()
+        snap = self._snapshot()
+        if snap.fingerprint != current:
+            with self._lock:
+                snap = self._snap
+                if snap is None or snap.fingerprint != current:
+                    snap = self._snap = self._load()
+        # la huella del snapshot se leyó antes de cargar: el cuerpo es igual o más nuevo
+        return snap.fingerprint
+
+    # -----------------------
+    # Invalidación
+    # -----------------------
+    def invalidate(self) -> None:
+        """Llamar después de cada escritura: sube la versión global y descarta lo local."""
+        try:
+            bump_version(self.name)
+        except DatabaseError:
+            pass  # sin tabla de versiones: al menos este proceso se entera
+        with self._lock:
+            self._snap = None
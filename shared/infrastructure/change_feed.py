@@ -0,0 +1,155 @@
+"""
+Change feed de cupones, mappings cupón↔producto y órdenes, sobre la outbox transaccional.
+
+- ChangeRecorder: los command services lo usan para escribir "<aggregate>.changed"
+  en la misma transacción que la mutación (change_scope(...) abre el atomic()).
+- ChangeFeedRelay: handler de OutboxWorker que publica los lotes en un sink:
+    http  -> POST JSON firmado (X-Signature sha256=<hmac>) a CHANGE_FEED_URL
+    queue -> cola en memoria (stand-in de un broker; útil embebido/en pruebas)
+    none  -> solo marca procesado; los consumidores leen por long-poll
+  Un sink que lanza excepción hace que el lote se reintente con backoff.
+- GET /api/changes (shared/interface/change_feed_controller.py) lee la outbox por
+  cursor (id) hasta el último id con commit contiguo (shared.infrastructure.id_watermark)
+  y espera hasta 'wait' segundos si no hay nada nuevo.
+
+Entrega al-menos-una-vez: los consumidores deduplican por "id" del evento.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import hmac
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from peewee import SqliteDatabase
+
+from shared.infrastructure.outbox import OutboxEvent, OutboxEventModel, OutboxRepository
+
+AGGREGATE_TYPES = ("coupon", "coupon_product", "order")
+CHANGE_TOPICS = tuple(f"{a}.changed" for a in AGGREGATE_TYPES)
+
+# Despierta a los long-poll de este proceso apenas se confirma un cambio
+# (los de otros procesos lo ven en su siguiente sondeo).
+_changed = threading.Condition()
+
+
+def wait_for_change(timeout: float) -> None:
+    with _changed:
+        _changed.wait(timeout)
+
+
+def _notify() -> None:
+    with _changed:
+        _changed.notify_all()
+
+
+class ChangeRecorder:
+    def __init__(self, outbox: OutboxRepository):
+        self.outbox = outbox
+
+    def atomic(self):
+        database = OutboxEventModel._meta.database
+        if isinstance(database, SqliteDatabase):
+            # En SQLite (dev/benchmarks) una transacción diferida que lee y luego escribe
+            # falla con "database is locked" bajo concurrencia: tomar el lock de escritura al inicio.
+            return database.atomic("IMMEDIATE")
+        return database.atomic()
+
+    def record(self, aggregate_type: str, aggregate_id: int, op: str,
+               data: Optional[Dict[str, Any]] = None) -> None:
+        """Llamar dentro de change_scope(): el evento comparte la transacción de la mutación."""
+        self.outbox.add(f"{aggregate_type}.changed", aggregate_type, aggregate_id, {"op": op, "data": data})
+
+
+@contextlib.contextmanager
+def change_scope(changes: Optional[ChangeRecorder]):
+    """atomic() si hay recorder; sin él, no cambia el comportamiento del servicio."""
+    if changes is None:
+        yield
+        return
+    with changes.atomic():
+        yield
+    # después del commit: antes, el long-poll despertaría sin ver la fila
+    _notify()
+
+
+def to_feed_item(e: OutboxEvent) -> Dict[str, Any]:
+    return {
+        "id": e.id,
+        "type": e.topic,
+        "aggregate_type": e.aggregate_type,
+        "aggregate_id": e.aggregate_id,
+        "op": e.payload.get("op"),
+        "data": e.payload.get("data"),
+        "created_at": e.created_at.isoformat() if e.created_at else None,
+    }
+
+
+# ----------------------------- sinks -----------------------------
+class NullSink:
+    def publish(self, items: List[Dict[str, Any]]) -> None:
+        return None
+
+
+class LocalQueueSink:
+    """Cola acotada en memoria; si está llena el lote falla y se reintenta."""
+
+    def __init__(self, maxsize: int = 10000):
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=maxsize)
+
+    def publish(self, items: List[Dict[str, Any]]) -> None:
+        if self.queue.maxsize and self.queue.qsize() + len(items) > self.queue.maxsize:
+            raise queue.Full(f"cola del change feed llena ({self.queue.qsize()})")
+        for it in items:
+            self.queue.put_nowait(it)
+
+
+class HttpCallbackSink:
+    """Un POST por lote: {"events": [...]}. Cualquier respuesta no-2xx reintenta el lote."""
+
+    def __init__(self, url: str, secret: Optional[str] = None, timeout: float = 5.0, session=None):
+        import requests
+        from shared.infrastructure.metrics.http import instrument_session
+
+        self.url = url
+        self.secret = secret
+        self.timeout = timeout
+        self.session = instrument_session(session or requests.Session(), target="change_feed")
+
+    def publish(self, items: List[Dict[str, Any]]) -> None:
+        body = json.dumps({"events": items}, ensure_ascii=False, default=str).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            mac = hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Signature"] = f"sha256={mac}"
+        resp = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+        if not 200 <= resp.status_code < 300:
+            raise RuntimeError(f"change feed callback respondió {resp.status_code}")
+
+
+def build_sink_from_env():
+    kind = os.getenv("CHANGE_FEED_SINK", "none").lower()
+    if kind == "http":
+        url = os.getenv("CHANGE_FEED_URL")
+        if not url:
+            raise RuntimeError("CHANGE_FEED_SINK=http requiere CHANGE_FEED_URL")
+        return HttpCallbackSink(url, secret=os.getenv("CHANGE_FEED_SECRET"),
+                                timeout=float(os.getenv("CHANGE_FEED_TIMEOUT", "5")))
+    if kind == "queue":
+        return LocalQueueSink(int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "10000")))
+    return NullSink()
+
+
+class ChangeFeedRelay:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def handle(self, events: List[OutboxEvent]) -> None:
+        self.sink.publish([to_feed_item(e) for e in events])
+
+    def handlers(self, topics: Iterable[str] = CHANGE_TOPICS) -> Dict[str, Any]:
+        return {t: self.handle for t in topics}
@@ -16,21 +16,20 @@ if not hasattr(db, "SQL"):
 
 
 # ------------------------------------------------------------------
-# Función para crear TODAS las tablas.  Importa modelos **dentro**.
+# Lista de TODOS los modelos.  Importa modelos **dentro**.
 # ------------------------------------------------------------------
-def init_db() -> None:
+def get_all_models() -> list:
     """
-    Conecta (si está cerrada) y crea TODAS las tablas definidas en los modelos
-    de la capa 'infraestructure/model' de cupones y pagos.
-    Ejecuta con:  from shared.infrastructure.database import init_db; init_db()
+    Modelos de la capa 'infraestructure/model' de cupones y pagos,
+    en orden de creación (respeta FKs).
     """
-    if db.is_closed():
-        db.connect(reuse_if_open=True)
-        print("Driver conectado:", type(db._state.conn))
-
     # ------------ IMPORTS LOCALES (evitar ciclos) ------------
     # --- Cupones ---
     from coupons.coupon.infraestructure.model.coupon_model import CouponModel
+    from coupons.coupon.infraestructure.model.coupon_usage_model import (
+        CouponUsageModel,
+        CouponClientUsageModel,
+    )
     from coupons.coupon_segment_price.infraestructure.model.coupon_segment_price_model import (
         CouponSegmentPriceModel,
     )
@@ -46,6 +45,12 @@ def init_db() -> None:
     from coupons.product_coupon.infraestructure.model.coupon_product_model import (
         CouponProductModel,
     )
+    from coupons.product_coupon.infraestructure.model.coupon_product_hold_model import (
+        CouponProductHoldModel,
+    )
+    from coupons.product_coupon.infraestructure.model.coupon_product_stock_shard_model import (
+        CouponProductStockShardModel,
+    )
     from coupons.segmentation.infraestructure.model.segment_model import SegmentModel
     from coupons.alianza.infraestructure.model.alianza_model import AlianzaModel
     from coupons.category.infraestructure.model.category_model import CategoryModel
@@ -53,6 +58,14 @@ def init_db() -> None:
     from coupons.coupons_client.infraestructure.model.coupon_client_model import (
         CouponClientModel,
     )
+    from coupons.coupon_code.infraestructure.model.coupon_code_model import CouponCodeModel
+    from coupons.redemption.infraestructure.model.redemption_ledger_model import (
+        RedemptionLedgerModel,
+    )
+    from coupons.redemption.infraestructure.model.coupon_daily_stats_model import (
+        CouponDailyStatsModel,
+        LedgerRollupCheckpointModel,
+    )
 
     # --- Pagos ---
     # Orden de creación importante por FKs:
@@ -81,34 +94,65 @@ def init_db() -> None:
         WebhookEventModel,
     )
 
-    # ------------ CREAR TABLAS ---------------
-    # Puedes crear todo en una sola llamada manteniendo el orden.
-    db.create_tables(
-        [
-            # === Catálogos / Cupones ===
-            DiscountTypeModel,
-            CouponTypeModel,
-            CouponModel,
-            CouponProductModel,
-            CouponTriggerProductModel,
-            SegmentModel,
-            CouponSegmentPriceModel,
-            AlianzaModel,
-            CategoryModel,
-            EventModel,
-            CouponClientModel,
+    # --- Infra compartida ---
+    from shared.infrastructure.catalog_cache import CatalogVersionModel
+    from shared.infrastructure.outbox import OutboxEventModel
 
-            # === Pagos (orden por FK) ===
-            PartyModel,              # parties
-            ProviderAccountModel,    # provider_accounts
-            ProviderCustomerModel,   # provider_customers
-            PaymentSourceModel,      # payment_sources
-            OrderModel,              # orders
-            CheckoutSessionModel,    # checkout_sessions
-            WebhookEventModel,       # webhook_events
-        ],
-        safe=True,
-    )
+    return [
+        # === Catálogos / Cupones ===
+        DiscountTypeModel,
+        CouponTypeModel,
+        CouponModel,
+        CouponUsageModel,
+        CouponClientUsageModel,
+        CouponProductModel,
+        CouponProductHoldModel,
+        CouponProductStockShardModel,
+        CouponTriggerProductModel,
+        SegmentModel,
+        CouponSegmentPriceModel,
+        AlianzaModel,
+        CategoryModel,
+        EventModel,
+        CouponClientModel,
+        CouponCodeModel,
+        RedemptionLedgerModel,
+        CouponDailyStatsModel,
+        LedgerRollupCheckpointModel,
+
+        # === Pagos (orden por FK) ===
+        PartyModel,              # parties
+        ProviderAccountModel,    # provider_accounts
+        ProviderCustomerModel,   # provider_customers
+        PaymentSourceModel,      # payment_sources
+        OrderModel,              # orders
+        CheckoutSessionModel,    # checkout_sessions
+        WebhookEventModel,       # webhook_events
+
+        # === Infra compartida ===
+        CatalogVersionModel,     # catalog_versions
+        OutboxEventModel,        # outbox_events
+    ]
+
+
+# ------------------------------------------------------------------
+# Crea/actualiza el esquema aplicando las migraciones pendientes.
+# ------------------------------------------------------------------
+def init_db() -> None:
+    """
+    Conecta (si está cerrada) y aplica las migraciones versionadas pendientes
+    (shared/infrastructure/migrations). La primera crea TODAS las tablas;
+    las siguientes agregan columnas/índices que create_tables(safe=True) no toca
+    en tablas ya existentes.
+    Ejecuta con:  from shared.infrastructure.database import init_db; init_db()
+    """
+    from shared.infrastructure.migrations.engine import MigrationEngine
+    from shared.infrastructure.migrations.versions import MIGRATIONS
+
+    if db.is_closed():
+        db.connect(reuse_if_open=True)
+        print("Driver conectado:", type(db._state.conn))
 
-    print("✅ Tablas creadas/aseguradas.")
+    applied = MigrationEngine(MIGRATIONS, db).migrate()
+    print("✅ Tablas creadas/aseguradas. Migraciones aplicadas:", ", ".join(applied) or "ninguna")
     db.close()
@@ -0,0 +1,70 @@
+"""
+Avance por id autoincremental para lectores incrementales (change feed, rollups).
+
+Un id menor puede confirmarse después de uno mayor: quien avanza hasta el último id
+visible se saltaría el que todavía está en vuelo. Por eso solo se avanza por ids
+contiguos. Un hueco es una transacción en curso o un id que no va a aparecer nunca
+(rollback, INSERT IGNORE que no insertó, filas purgadas): se espera a que se llene y
+se da por perdido recién cuando lleva gap_timeout siendo hueco.
+
+Ese tiempo se mide con el reloj del lector (desde que VIO el id mayor), no con
+timestamps de las filas: no depende de la hora de inserción (que no es la de commit)
+ni de relojes de otros servidores.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+
+def contiguous_through(after_id: int, ids: Iterable[int], skip_gaps_through: int = 0) -> int:
+    """
+    Último id hasta el que se puede avanzar desde after_id. ids: los ids > after_id que
+    hay en la tabla, en orden. Los huecos <= skip_gaps_through se dan por perdidos.
+    """
+    mark = after_id
+    for i in ids:
+        if i > mark + 1 and i - 1 > skip_gaps_through:
+            # hueco todavía abierto: se llega como mucho hasta donde ya se puede saltar
+            return max(mark, min(skip_gaps_through, i - 1))
+        mark = i
+    return mark
+
+
+@dataclass
+class GapHorizonState:
+    skip_through: int = 0                 # huecos <= este id: perdidos
+    pending_id: Optional[int] = None      # mayor id visto en pending_at
+    pending_at: Optional[float] = None    # segundos del clock del GapHorizon
+
+
+class GapHorizon:
+    """
+    Hasta qué id se pueden saltar huecos. observe(max_id) anota el mayor id visto y
+    cuándo; pasado timeout, todo id <= ese ya estaba asignado hace más de timeout y
+    si sigue faltando no va a llegar. Un hueco espera entre timeout y 2*timeout.
+
+    El estado vive en memoria; 'state' se puede persistir (p. ej. junto al checkpoint
+    de un job que corre como proceso nuevo cada vez) usando un clock de pared.
+    """
+
+    def __init__(self, timeout: float, clock: Callable[[], float] = time.monotonic,
+                 state: Optional[GapHorizonState] = None):
+        self.timeout = float(timeout)
+        self.clock = clock
+        self.state = state or GapHorizonState()
+        self._lock = threading.Lock()
+
+    def observe(self, max_id: int) -> int:
+        """Registra el mayor id visto; devuelve el id hasta el que se pueden saltar huecos."""
+        now = self.clock()
+        with self._lock:
+            s = self.state
+            if s.pending_at is None:
+                s.pending_id, s.pending_at = max_id, now
+            elif now - s.pending_at >= self.timeout:
+                s.skip_through = max(s.skip_through, s.pending_id or 0)
+                s.pending_id, s.pending_at = max_id, now
+            return s.skip_through
@@ -0,0 +1,237 @@
+"""
+Integración de métricas con Flask.
+
+init_app(app, db) agrega:
+- Histograma http_request_duration_seconds{method,blueprint,route,status} y gauge
+  http_requests_in_flight{blueprint,route} (route = regla de la URL, no el path).
+- GET /metrics (texto Prometheus). Además de lo anterior, en cada scrape lee:
+  sentencias SQL por endpoint (query_stats), pool de conexiones (si la base es un
+  PooledDatabase), caches (Cache compartido, checkout sessions, catálogos), backlog
+  de webhooks sin procesar y latencia saliente a Mercado Pago (metrics.http).
+- GET /health/ready: SELECT 1 contra la BD con timeout (HEALTH_DB_TIMEOUT, 2 s);
+  503 si falla o no responde. /health sigue siendo solo "el proceso está vivo".
+
+Entorno:
+  METRICS_ENABLED=1
+  METRICS_WEBHOOK_BACKLOG_TTL=15   (segundos que se reutiliza el COUNT del backlog)
+  HEALTH_DB_TIMEOUT=2
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Optional
+
+from flask import Flask, Response, current_app, g, jsonify, request
+
+from shared.infrastructure import query_stats
+from shared.infrastructure.cache.cache import cache_stats
+from shared.infrastructure.metrics.registry import REGISTRY
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Latencia de requests HTTP por ruta",
+    ("method", "blueprint", "route", "status"),
+)
+IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight",
+    "Requests en curso por ruta",
+    ("blueprint", "route"),
+)
+
+
+# -----------------------
+# Colectores (se evalúan en el scrape)
+# -----------------------
+def _services():
+    return current_app.config.get("services") or {}
+
+
+def _built_services():
+    services = _services()
+    if hasattr(services, "built"):
+        # contenedor lazy: no construir nada solo para reportarlo
+        return {name: services[name] for name in services.built()}
+    return dict(services)
+
+
+def _collect_db_statements():
+    requests_, statements, db_ms, nplusone = [], [], [], []
+    for endpoint, m in query_stats.query_metrics().items():
+        method, _, rule = endpoint.partition(" ")
+        labels = {"method": method, "route": rule}
+        requests_.append((labels, m["requests"]))
+        statements.append((labels, m["statements"]))
+        db_ms.append((labels, m["db_time_ms"] / 1000.0))
+        nplusone.append((labels, m["nplusone_warnings"]))
+    return [
+        ("db_requests_total", "counter", "Requests medidos por query_stats", requests_),
+        ("db_statements_total", "counter", "Sentencias SQL ejecutadas por ruta", statements),
+        ("db_time_seconds_total", "counter", "Tiempo en la BD por ruta", db_ms),
+        ("db_nplusone_warnings_total", "counter", "Requests con posible N+1", nplusone),
+    ]
+
+
+def _collect_pool(database):
+    def collect():
+        in_use = getattr(database, "_in_use", None)
+        if in_use is None:
+            return [("db_pool_enabled", "gauge", "1 si la base usa pool de conexiones", [({}, 0)])]
+        return [
+            ("db_pool_enabled", "gauge", "1 si la base usa pool de conexiones", [({}, 1)]),
+            ("db_pool_connections_in_use", "gauge", "Conexiones del pool en uso", [({}, len(in_use))]),
+            ("db_pool_connections_idle", "gauge", "Conexiones del pool libres",
+             [({}, len(getattr(database, "_connections", ()) or ()))]),
+            ("db_pool_max_connections", "gauge", "Tamaño máximo del pool",
+             [({}, getattr(database, "_max_connections", 0) or 0)]),
+        ]
+    return collect
+
+
+def _collect_caches():
+    hits, misses, ratio, loads = [], [], [], []
+    for ns, m in cache_stats().items():
+        labels = {"cache": ns}
+        hits.append((labels, m["hits"]))
+        misses.append((labels, m["misses"]))
+        ratio.append((labels, m["hit_ratio"]))
+        loads.append((labels, m["loads"]))
+    for name, svc in _built_services().items():
+        if svc is None or not name.endswith("_cache") or not hasattr(svc, "hits"):
+            continue
+        labels = {"cache": name}
+        h = svc.hits
+        hits.append((labels, h))
+        if hasattr(svc, "misses"):
+            miss = svc.misses
+        else:
+            # catálogos: cada recarga desde la BD equivale a un miss
+            miss = getattr(svc, "reloads", 0)
+        misses.append((labels, miss))
+        ratio.append((labels, round(h / (h + miss), 4) if h + miss else 0.0))
+    return [
+        ("cache_hits_total", "counter", "Lecturas servidas desde caché", hits),
+        ("cache_misses_total", "counter", "Lecturas que fueron a la BD", misses),
+        ("cache_hit_ratio", "gauge", "hits / (hits + misses)", ratio),
+        ("cache_loads_total", "counter", "Cargas desde la BD (single-flight)", loads),
+    ]
+
+
+class _WebhookBacklog:
+    """COUNT de eventos sin procesar, reutilizado durante ttl segundos entre scrapes."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: Optional[tuple] = None  # (leído_en, conteo)
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._value is None or now - self._value[0] >= self.ttl:
+                qry = _services()["webhook_query_service"]
+                self._value = (now, qry.count_unprocessed())
+            count = self._value[1]
+        return [("webhook_events_unprocessed", "gauge",
+                 "Webhooks recibidos sin procesar (processed_at IS NULL)", [({}, count)])]
+
+
+# -----------------------
+# Readiness
+# -----------------------
+class _DbProbe:
+    """
+    SELECT 1 en un hilo propio para poder cortarlo por timeout. Si un chequeo
+    anterior sigue colgado no se encola otro: se responde no-ready directamente.
+    """
+
+    def __init__(self, database, timeout: float):
+        self.database = database
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-db")
+        self._pending = None
+
+    def _ping(self) -> None:
+        try:
+            self.database.connect(reuse_if_open=True)
+            self.database.execute_sql("SELECT 1").fetchone()
+        except Exception:
+            # conexión rota: cerrarla para que el próximo chequeo reconecte
+            try:
+                self.database.close()
+            except Exception:
+                pass
+            raise
+
+    def check(self) -> Optional[str]:
+        """None si la BD responde; si no, el motivo."""
+        if self._pending is not None and not self._pending.done():
+            return "previous check still running"
+        self._pending = self._executor.submit(self._ping)
+        try:
+            self._pending.result(timeout=self.timeout)
+        except FutureTimeout:
+            return f"timeout after {self.timeout}s"
+        except Exception as e:
+            return str(e) or e.__class__.__name__
+        return None
+
+
+# -----------------------
+# Integración con Flask
+# -----------------------
+def _labels():
+    rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+    return request.blueprint or "", rule
+
+
+def init_app(app: Flask, database) -> None:
+    if os.getenv("METRICS_ENABLED", "1").lower() not in ("1", "true", "yes"):
+        return
+
+    collectors = [
+        _collect_db_statements,
+        _collect_pool(database),
+        _collect_caches,
+        _WebhookBacklog(float(os.getenv("METRICS_WEBHOOK_BACKLOG_TTL", "15"))),
+    ]
+    probe = _DbProbe(database, float(os.getenv("HEALTH_DB_TIMEOUT", "2")))
+
+    @app.before_request
+    def _metrics_start():
+        blueprint, route = _labels()
+        g._metrics = (time.perf_counter(), blueprint, route)
+        IN_FLIGHT.inc(blueprint=blueprint, route=route)
+
+    @app.after_request
+    def _metrics_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        started = g.pop("_metrics", None)
+        if started is None:
+            return
+        start, blueprint, route = started
+        status = g.pop("_metrics_status", None) or (500 if exc is not None else 200)
+        IN_FLIGHT.dec(blueprint=blueprint, route=route)
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method, blueprint=blueprint, route=route, status=str(status),
+        )
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(REGISTRY.render(collectors), mimetype=None, content_type=CONTENT_TYPE)
+
+    @app.route("/health/ready", methods=["GET"])
+    def health_ready():
+        error = probe.check()
+        if error is not None:
+            return jsonify(status="unavailable", checks={"db": error}), 503
+        return jsonify(status="ok", checks={"db": "ok"}), 200
@@ -0,0 +1,54 @@
+"""
+Latencia de llamadas HTTP salientes (Mercado Pago) hacia el registro de métricas.
+
+instrument_session(session) envuelve session.request: todas las llamadas de esa
+requests.Session quedan medidas en outbound_http_duration_seconds con labels
+target / method / endpoint / status. El endpoint se normaliza (ids numéricos ->
+:id) para no crear una serie por recurso; los errores de red cuentan como
+status="error".
+"""
+from __future__ import annotations
+
+import re
+import time
+from urllib.parse import urlsplit
+
+from shared.infrastructure.metrics.registry import REGISTRY
+
+OUTBOUND_LATENCY = REGISTRY.histogram(
+    "outbound_http_duration_seconds",
+    "Latencia de llamadas HTTP salientes",
+    ("target", "method", "endpoint", "status"),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0),
+)
+
+_ID_SEGMENT = re.compile(r"/(?:\d+|[0-9a-f]{16,}|[0-9a-f-]{32,36})(?=/|$)", re.IGNORECASE)
+
+
+def endpoint_label(url: str) -> str:
+    return _ID_SEGMENT.sub("/:id", urlsplit(url).path or "/")
+
+
+def instrument_session(session, target: str = "mercadopago"):
+    """Idempotente; devuelve la misma session."""
+    if getattr(session, "_metrics_target", None):
+        return session
+    original = session.request
+
+    def request(method, url, *args, **kwargs):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            resp = original(method, url, *args, **kwargs)
+            status = str(resp.status_code)
+            return resp
+        finally:
+            OUTBOUND_LATENCY.observe(
+                time.perf_counter() - start,
+                target=target, method=str(method).upper(),
+                endpoint=endpoint_label(url), status=status,
+            )
+
+    session.request = request
+    session._metrics_target = target
+    return session
@@ -0,0 +1,212 @@
+"""
+Motor de migraciones versionadas sobre playhouse.migrate.
+
+- Cada migración tiene una versión ordenable ("0001", "0002", ...) y una función up(ctx).
+- Las versiones aplicadas quedan en la tabla schema_migrations.
+- En MySQL se toma un GET_LOCK para que dos deploys no migren a la vez.
+- Los índices se agregan "online" (ALGORITHM=INPLACE, LOCK=NONE) y de forma idempotente.
+"""
+from __future__ import annotations
+
+import datetime
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Sequence, Set, Tuple, Type
+
+from peewee import (
+    Model, CharField, DateTimeField, IntegerField, MySQLDatabase, Database, Field,
+)
+from playhouse.migrate import SchemaMigrator, migrate
+
+from shared.infrastructure.database import db
+
+
+class SchemaMigrationModel(Model):
+    version = CharField(max_length=32, primary_key=True)
+    name = CharField(max_length=128, null=False)
+    applied_at = DateTimeField(default=datetime.datetime.now, null=False)
+    duration_ms = IntegerField(null=True)
+
+    class Meta:
+        database = db
+        table_name = "schema_migrations"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    up: Callable[["MigrationContext"], None]
+
+
+class MigrationError(Exception):
+    pass
+
+
+class MigrationContext:
+    """
+    Lo que recibe cada migración: la BD, el migrator de peewee y helpers idempotentes
+    (consultan el esquema vivo antes de tocar nada).
+    """
+    def __init__(self, database: Database):
+        self.db = database
+        self.migrator = SchemaMigrator.from_database(database)
+        self.is_mysql = isinstance(database, MySQLDatabase)
+
+    # -----------------------
+    # Introspección
+    # -----------------------
+    def table_exists(self, table: str) -> bool:
+        return self.db.table_exists(table)
+
+    def columns(self, table: str) -> Set[str]:
+        return {c.name for c in self.db.get_columns(table)}
+
+    def index_columns(self, table: str) -> List[Tuple[Tuple[str, ...], bool]]:
+        """[(columnas, unique), ...] del esquema vivo (incluye la PK)."""
+        out = [(tuple(ix.columns), bool(ix.unique)) for ix in self.db.get_indexes(table)]
+        pk = tuple(self.db.get_primary_keys(table) or ())
+        if pk:
+            out.append((pk, True))
+        return out
+
+    def has_index(self, table: str, columns: Sequence[str], unique: bool = False) -> bool:
+        cols = tuple(columns)
+        return any(c == cols and (u or not unique) for c, u in self.index_columns(table))
+
+    # -----------------------
+    # Operaciones idempotentes
+    # -----------------------
+    def execute(self, sql: str, params: Optional[tuple] = None):
+        return self.db.execute_sql(sql, params)
+
+    def bind(self, models: Iterable[Type[Model]]):
+        """Liga los modelos a la BD de la migración mientras dure el bloque (backfills de datos)."""
+        return self.db.bind_ctx(list(models))
+
+    def create_tables(self, models: Iterable[Type[Model]]) -> None:
+        models = list(models)
+        with self.bind(models):
+            self.db.create_tables(models, safe=True)
+
+    def add_column_if_missing(self, model: Type[Model], field_name: str) -> bool:
+        table = model._meta.table_name
+        field: Field = model._meta.fields[field_name]
+        if field.column_name in self.columns(table):
+            return False
+        migrate(self.migrator.add_column(table, field.column_name, field))
+        return True
+
+    def add_index_online(
+        self,
+        table: str,
+        columns: Sequence[str],
+        unique: bool = False,
+        name: Optional[str] = None,
+    ) -> bool:
+        """
+        Agrega el índice si no hay uno equivalente (mismas columnas, mismo orden).
+        MySQL/InnoDB: ALTER TABLE ... ALGORITHM=INPLACE, LOCK=NONE (no bloquea escrituras).
+        """
+        if self.has_index(table, columns, unique):
+            return False
+        name = name or "idx_%s_%s" % (table, "_".join(columns))
+        name = name[:64]
+        if self.is_mysql:
+            cols = ", ".join(f"`{c}`" for c in columns)
+            kind = "UNIQUE INDEX" if unique else "INDEX"
+            self.execute(f"ALTER TABLE `{table}` ADD {kind} `{name}` ({cols}), ALGORITHM=INPLACE, LOCK=NONE")
+        else:
+            migrate(self.migrator.add_index(table, tuple(columns), unique, name=name))
+        return True
+
+    def add_declared_indexes(self, models: Iterable[Type[Model]]) -> List[str]:
+        """Crea online todos los índices declarados (Meta.indexes + index/unique de campos) que falten."""
+        from shared.infrastructure.migrations.schema_check import declared_indexes
+
+        created = []
+        for model in models:
+            table = model._meta.table_name
+            if not self.table_exists(table):
+                continue
+            for cols, unique, name in declared_indexes(model):
+                if self.add_index_online(table, cols, unique, name=name):
+                    created.append(f"{table}({', '.join(cols)})")
+        return created
+
+
+class MigrationEngine:
+    LOCK_NAME = "schema_migrations"
+
+    def __init__(self, migrations: Sequence[Migration], database: Database = db, lock_timeout: int = 60):
+        versions = [m.version for m in migrations]
+        if len(set(versions)) != len(versions):
+            raise MigrationError(f"versiones de migración duplicadas: {versions}")
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+        self.db = database
+        self.lock_timeout = lock_timeout
+
+    # -----------------------
+    # Estado
+    # -----------------------
+    def _ensure_table(self) -> None:
+        with SchemaMigrationModel.bind_ctx(self.db):
+            self.db.create_tables([SchemaMigrationModel], safe=True)
+
+    def applied(self) -> List[str]:
+        self._ensure_table()
+        with SchemaMigrationModel.bind_ctx(self.db):
+            return [r.version for r in SchemaMigrationModel.select().order_by(SchemaMigrationModel.version)]
+
+    def pending(self) -> List[Migration]:
+        done = set(self.applied())
+        return [m for m in self.migrations if m.version not in done]
+
+    def status(self) -> List[dict]:
+        done = set(self.applied())
+        return [{"version": m.version, "name": m.name, "applied": m.version in done} for m in self.migrations]
+
+    # -----------------------
+    # Lock (solo MySQL)
+    # -----------------------
+    def _acquire_lock(self) -> None:
+        if not isinstance(self.db, MySQLDatabase):
+            return
+        got = self.db.execute_sql("SELECT GET_LOCK(%s, %s)", (self.LOCK_NAME, self.lock_timeout)).fetchone()[0]
+        if got != 1:
+            raise MigrationError("otra instancia está migrando (GET_LOCK timeout)")
+
+    def _release_lock(self) -> None:
+        if isinstance(self.db, MySQLDatabase):
+            self.db.execute_sql("SELECT RELEASE_LOCK(%s)", (self.LOCK_NAME,))
+
+    # -----------------------
+    # Ejecución
+    # -----------------------
+    def migrate(self, target: Optional[str] = None, dry_run: bool = False) -> List[str]:
+        """
+        Aplica las migraciones pendientes hasta target (inclusive). Devuelve las versiones aplicadas.
+        DDL en MySQL no es transaccional: cada migración debe ser idempotente
+        (los helpers de MigrationContext lo son), así un fallo a mitad se reintenta sin daño.
+        """
+        self._ensure_table()
+        self._acquire_lock()
+        try:
+            todo = [m for m in self.pending() if target is None or m.version <= target]
+            if dry_run:
+                return [m.version for m in todo]
+            ctx = MigrationContext(self.db)
+            done = []
+            for m in todo:
+                t0 = time.monotonic()
+                m.up(ctx)
+                with SchemaMigrationModel.bind_ctx(self.db):
+                    SchemaMigrationModel.create(
+                        version=m.version,
+                        name=m.name,
+                        duration_ms=int((time.monotonic() - t0) * 1000),
+                    )
+                done.append(m.version)
+            return done
+        finally:
+            self._release_lock()
@@ -0,0 +1,58 @@
+"""
+Diff entre lo declarado en los modelos (columnas + Meta.indexes / index=True / unique=True)
+y el esquema vivo. Sirve para garantizar que los índices de los que dependen los planes
+de consulta existen de verdad en producción.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple, Type
+
+from peewee import Database, Model, ModelIndex
+
+
+@dataclass
+class SchemaDrift:
+    table: str
+    kind: str        # missing_table | missing_column | missing_index
+    detail: str
+
+    def to_dict(self) -> dict:
+        return {"table": self.table, "kind": self.kind, "detail": self.detail}
+
+
+def declared_indexes(model: Type[Model]) -> List[Tuple[Tuple[str, ...], bool, Optional[str]]]:
+    """[(columnas, unique, nombre_peewee), ...] declarados en el modelo."""
+    out = []
+    for ix in model._meta.fields_to_index():
+        if not isinstance(ix, ModelIndex):
+            continue  # índices SQL crudos: no comparables por columnas
+        cols = tuple(getattr(e, "column_name", None) for e in ix._expressions)
+        if None in cols:
+            continue
+        out.append((cols, bool(ix._unique), ix._name))
+    return out
+
+
+def diff_schema(models: Iterable[Type[Model]], database: Database) -> List[SchemaDrift]:
+    drifts: List[SchemaDrift] = []
+    for model in models:
+        table = model._meta.table_name
+        if not database.table_exists(table):
+            drifts.append(SchemaDrift(table, "missing_table", table))
+            continue
+
+        live_cols = {c.name for c in database.get_columns(table)}
+        for field in model._meta.sorted_fields:
+            if field.column_name not in live_cols:
+                drifts.append(SchemaDrift(table, "missing_column", field.column_name))
+
+        live = [(tuple(ix.columns), bool(ix.unique)) for ix in database.get_indexes(table)]
+        pk = tuple(database.get_primary_keys(table) or ())
+        if pk:
+            live.append((pk, True))
+        for cols, unique, _name in declared_indexes(model):
+            if not any(c == cols and (u or not unique) for c, u in live):
+                kind = "UNIQUE " if unique else ""
+                drifts.append(SchemaDrift(table, "missing_index", f"{kind}({', '.join(cols)})"))
+    return drifts
@@ -0,0 +1,187 @@
+"""
+Migraciones del micro-servicio, en orden. Agregar siempre al final con una versión nueva;
+no editar una migración ya aplicada en producción.
+"""
+from __future__ import annotations
+
+from shared.infrastructure.migrations.engine import Migration, MigrationContext
+
+
+def _baseline_models() -> list:
+    """
+    Tablas que existían al introducir las migraciones (get_all_models() de entonces),
+    en orden de FKs. Congelado: las tablas nuevas se crean en su propia migración.
+    """
+    from coupons.alianza.infraestructure.model.alianza_model import AlianzaModel
+    from coupons.category.infraestructure.model.category_model import CategoryModel
+    from coupons.coupon.infraestructure.model.coupon_model import CouponModel
+    from coupons.coupon_segment_price.infraestructure.model.coupon_segment_price_model import (
+        CouponSegmentPriceModel,
+    )
+    from coupons.coupon_trigger_product.infraestructure.model.coupon_trigger_product_model import (
+        CouponTriggerProductModel,
+    )
+    from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+    from coupons.coupons_type.infraestructure.model.coupon_type_model import CouponTypeModel
+    from coupons.discount_type.infraestructure.model.discount_type_model import DiscountTypeModel
+    from coupons.event.infraestructure.model.event_model import EventModel
+    from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+    from coupons.segmentation.infraestructure.model.segment_model import SegmentModel
+    from payment.checkout.infraestructure.model.checkout_session_model import CheckoutSessionModel
+    from payment.orders.infraestructure.model.order_model import OrderModel
+    from payment.party.infraestructure.model.party_model import PartyModel
+    from payment.provider.customer_sources.infraestructure.model.payment_source_model import (
+        PaymentSourceModel,
+    )
+    from payment.provider.provider_account.infraestructure.model.provider_account_model import (
+        ProviderAccountModel,
+    )
+    from payment.provider.provider_customer.infraestructure.model.provider_customer_model import (
+        ProviderCustomerModel,
+    )
+    from payment.webhook.infraestructure.model.webhook_event_model import WebhookEventModel
+
+    return [
+        DiscountTypeModel, CouponTypeModel, CouponModel, CouponProductModel, CouponTriggerProductModel,
+        SegmentModel, CouponSegmentPriceModel, AlianzaModel, CategoryModel, EventModel, CouponClientModel,
+        PartyModel, ProviderAccountModel, ProviderCustomerModel, PaymentSourceModel, OrderModel,
+        CheckoutSessionModel, WebhookEventModel,
+    ]
+
+
+def _0001_baseline_tables(ctx: MigrationContext) -> None:
+    ctx.create_tables(_baseline_models())
+
+
+def _0002_coupon_show_in_coupon_holder(ctx: MigrationContext) -> None:
+    from coupons.coupon.infraestructure.model.coupon_model import CouponModel
+    ctx.add_column_if_missing(CouponModel, "show_in_coupon_holder")
+
+
+def _0003_declared_indexes(ctx: MigrationContext) -> None:
+    # Índices de Meta.indexes que faltan en tablas creadas antes de declararlos
+    # (p. ej. los compuestos de coupon y orders(status, created_at)).
+    ctx.add_declared_indexes(_baseline_models())
+
+
+def _0004_party_fulltext(ctx: MigrationContext) -> None:
+    from payment.party.infraestructure.model.party_model import PartyModel, PARTY_FULLTEXT_INDEX
+    if not ctx.is_mysql:
+        return
+    name, ddl = PARTY_FULLTEXT_INDEX
+    if name not in {ix.name for ix in ctx.db.get_indexes(PartyModel._meta.table_name)}:
+        ctx.execute(ddl)
+
+
+def _0005_export_indexes(ctx: MigrationContext) -> None:
+    # coupon_client(coupon_id, id) y orders(seller_party_id, created_at) para los exports
+    from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+    from payment.orders.infraestructure.model.order_model import OrderModel
+    ctx.add_declared_indexes([CouponClientModel, OrderModel])
+
+
+def _0006_coupon_type_updated_at(ctx: MigrationContext) -> None:
+    # Necesario para que el ETag de /api/coupon-types detecte ediciones
+    from coupons.coupons_type.infraestructure.model.coupon_type_model import CouponTypeModel
+    ctx.add_column_if_missing(CouponTypeModel, "updated_at")
+
+
+def _0007_catalog_versions(ctx: MigrationContext) -> None:
+    from shared.infrastructure.catalog_cache import CatalogVersionModel
+    ctx.create_tables([CatalogVersionModel])
+
+
+def _0008_order_outbox(ctx: MigrationContext) -> None:
+    # outbox_events + unique coupon_client(source_order_id, coupon_id) para emitir
+    # cupones por orden pagada de forma idempotente
+    from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+    from shared.infrastructure.outbox import OutboxEventModel
+    ctx.create_tables([OutboxEventModel])
+    ctx.add_declared_indexes([CouponClientModel])
+
+
+def _0009_stock_holds(ctx: MigrationContext) -> None:
+    from coupons.product_coupon.infraestructure.model.coupon_product_hold_model import CouponProductHoldModel
+    from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+    ctx.add_column_if_missing(CouponProductModel, "reserved")
+    ctx.create_tables([CouponProductHoldModel])
+
+
+def _0010_stock_shards(ctx: MigrationContext) -> None:
+    from coupons.product_coupon.infraestructure.model.coupon_product_hold_model import CouponProductHoldModel
+    from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+    from coupons.product_coupon.infraestructure.model.coupon_product_stock_shard_model import (
+        CouponProductStockShardModel,
+    )
+    ctx.add_column_if_missing(CouponProductModel, "shard_count")
+    ctx.add_column_if_missing(CouponProductHoldModel, "sharded")
+    ctx.create_tables([CouponProductStockShardModel])
+
+
+def _0011_coupon_usage(ctx: MigrationContext) -> None:
+    from coupons.coupon.infraestructure.model.coupon_usage_model import (
+        CouponClientUsageModel, CouponUsageModel,
+    )
+    ctx.create_tables([CouponUsageModel, CouponClientUsageModel])
+
+
+def _0012_redemption_ledger(ctx: MigrationContext) -> None:
+    # ledger + rollups; coupon_client(status, valid_to) para el vencimiento en lote
+    from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+    from coupons.redemption.infraestructure.model.coupon_daily_stats_model import (
+        CouponDailyStatsModel, LedgerRollupCheckpointModel,
+    )
+    from coupons.redemption.infraestructure.model.redemption_ledger_model import RedemptionLedgerModel
+    ctx.create_tables([RedemptionLedgerModel, CouponDailyStatsModel, LedgerRollupCheckpointModel])
+    ctx.add_declared_indexes([CouponClientModel])
+
+
+def _0013_coupon_codes(ctx: MigrationContext) -> None:
+    # índice global de códigos (cliente + producto) para /api/coupons/by-code
+    from coupons.coupon_code.infraestructure.model.coupon_code_model import CouponCodeModel
+    from coupons.coupon_code.infraestructure.repositories.coupon_code_repository import CouponCodeRepository
+    from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+    from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+    ctx.create_tables([CouponCodeModel])
+    # los datos también por la conexión del motor, en una transacción
+    with ctx.bind([CouponCodeModel, CouponClientModel, CouponProductModel]), ctx.db.atomic():
+        CouponCodeRepository().backfill()
+
+
+def _0014_client_wallet_index(ctx: MigrationContext) -> None:
+    # coupon_client(client_id, id): billetera paginada por cursor
+    from coupons.coupons_client.infraestructure.model.coupon_client_model import CouponClientModel
+    ctx.add_declared_indexes([CouponClientModel])
+
+
+def _0015_rollup_checkpoint_gaps(ctx: MigrationContext) -> None:
+    # huecos de ids que espera el rollup del ledger (reemplaza la ventana por occurred_at)
+    from coupons.redemption.infraestructure.model.coupon_daily_stats_model import LedgerRollupCheckpointModel
+    for name in ("gap_skip_id", "gap_pending_id", "gap_pending_at"):
+        ctx.add_column_if_missing(LedgerRollupCheckpointModel, name)
+
+
+def _0016_discount_type_updated_at(ctx: MigrationContext) -> None:
+    # Necesario para que el ETag de /api/discount-types detecte ediciones
+    from coupons.discount_type.infraestructure.model.discount_type_model import DiscountTypeModel
+    ctx.add_column_if_missing(DiscountTypeModel, "updated_at")
+
+
+MIGRATIONS = [
+    Migration("0001", "baseline_tables", _0001_baseline_tables),
+    Migration("0002", "coupon_show_in_coupon_holder", _0002_coupon_show_in_coupon_holder),
+    Migration("0003", "declared_indexes", _0003_declared_indexes),
+    Migration("0004", "party_fulltext", _0004_party_fulltext),
+    Migration("0005", "export_indexes", _0005_export_indexes),
+    Migration("0006", "coupon_type_updated_at", _0006_coupon_type_updated_at),
+    Migration("0007", "catalog_versions", _0007_catalog_versions),
+    Migration("0008", "order_outbox", _0008_order_outbox),
+    Migration("0009", "stock_holds", _0009_stock_holds),
+    Migration("0010", "stock_shards", _0010_stock_shards),
+    Migration("0011", "coupon_usage", _0011_coupon_usage),
+    Migration("0012", "redemption_ledger", _0012_redemption_ledger),
+    Migration("0013", "coupon_codes", _0013_coupon_codes),
+    Migration("0014", "client_wallet_index", _0014_client_wallet_index),
+    Migration("0015", "rollup_checkpoint_gaps", _0015_rollup_checkpoint_gaps),
+    Migration("0016", "discount_type_updated_at", _0016_discount_type_updated_at),
+]
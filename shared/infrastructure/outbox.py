@@ -0,0 +1,217 @@
+"""
+Transactional outbox: eventos de dominio escritos en la MISMA transacción que el
+cambio que los origina (p. ej. orders.mark_paid) y procesados después por un worker.
+
+- OutboxRepository.add(...) se llama dentro del atomic() del repositorio que muta.
+- OutboxWorker.run_once() toma un lote por tópico (FOR UPDATE SKIP LOCKED en MySQL,
+  así varios workers no se pisan), llama al handler con el lote completo y marca
+  processed_at en la misma transacción que los efectos del handler. Si el handler
+  falla, el lote se reintenta con backoff hasta max_attempts.
+- Un handler puede devolver {event_id: error} con los eventos que rechaza por payload
+  inválido: esos van directo a dead letter y el resto del lote se confirma igual.
+
+Los handlers deben ser idempotentes: un worker que muere después de aplicar efectos
+externos (fuera de la BD) y antes del commit reprocesa el lote.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from peewee import (
+    AutoField, BigIntegerField, CharField, DateTimeField, IntegerField, Model, TextField,
+)
+
+from shared.infrastructure.database import db
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxEventModel(Model):
+    id = AutoField(primary_key=True)
+    topic = CharField(max_length=64, null=False)             # p. ej. "order.paid"
+    aggregate_type = CharField(max_length=32, null=False)    # "order", "coupon", ...
+    aggregate_id = BigIntegerField(null=False)
+    payload = TextField(null=True)                           # JSON
+    attempts = IntegerField(default=0, null=False)
+    last_error = CharField(max_length=500, null=True)
+    created_at = DateTimeField(default=datetime.datetime.now, null=False)
+    available_at = DateTimeField(default=datetime.datetime.now, null=False)
+    processed_at = DateTimeField(null=True)
+
+    class Meta:
+        database = db
+        table_name = "outbox_events"
+        indexes = (
+            (("topic", "processed_at", "id"), False),  # claim por tópico en orden de llegada
+            (("aggregate_type", "aggregate_id"), False),
+        )
+
+
+@dataclass(frozen=True)
+class OutboxEvent:
+    id: int
+    topic: str
+    aggregate_type: str
+    aggregate_id: int
+    payload: Dict[str, Any]
+    attempts: int
+    created_at: datetime.datetime
+
+
+class OutboxRepository:
+    def _to_entity(self, rec: OutboxEventModel) -> OutboxEvent:
+        return OutboxEvent(
+            id=rec.id,
+            topic=rec.topic,
+            aggregate_type=rec.aggregate_type,
+            aggregate_id=rec.aggregate_id,
+            payload=json.loads(rec.payload) if rec.payload else {},
+            attempts=rec.attempts,
+            created_at=rec.created_at,
+        )
+
+    def add(self, topic: str, aggregate_type: str, aggregate_id: int,
+            payload: Optional[Dict[str, Any]] = None) -> int:
+        """Llamar dentro de la transacción del cambio de dominio."""
+        return OutboxEventModel.insert(
+            topic=topic,
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            payload=json.dumps(payload, ensure_ascii=False, default=str) if payload is not None else None,
+        ).execute()
+
+    def claim_batch(self, topic: str, limit: int, now: Optional[datetime.datetime] = None) -> List[OutboxEvent]:
+        """Pendientes del tópico; llamar dentro de una transacción (las filas quedan bloqueadas)."""
+        m = OutboxEventModel
+        q = (m.select()
+             .where((m.topic == topic) & m.processed_at.is_null(True) &
+                    (m.available_at <= (now or datetime.datetime.now())))
+             .order_by(m.id)
+             .limit(limit))
+        if getattr(m._meta.database, "for_update", False):
+            q = q.for_update(skip_locked=True)
+        return [self._to_entity(r) for r in q]
+
+    def mark_processed(self, ids: Iterable[int]) -> int:
+        ids = list(ids)
+        if not ids:
+            return 0
+        return (OutboxEventModel
+                .update(processed_at=datetime.datetime.now())
+                .where(OutboxEventModel.id.in_(ids))
+                .execute())
+
+    def mark_failed(self, ids: Iterable[int], error: str, retry_in: datetime.timedelta) -> int:
+        ids = list(ids)
+        if not ids:
+            return 0
+        m = OutboxEventModel
+        return (m.update(attempts=m.attempts + 1, last_error=error[:500],
+                         available_at=datetime.datetime.now() + retry_in)
+                .where(m.id.in_(ids))
+                .execute())
+
+    def ids_after(self, after_id: int, limit: int) -> List[int]:
+        """Ids (de todos los tópicos) > after_id, en orden: para calcular hasta dónde hay commit."""
+        m = OutboxEventModel
+        return [r[0] for r in m.select(m.id).where(m.id > after_id).order_by(m.id).limit(limit).tuples()]
+
+    def list_after(self, after_id: int, topics: Iterable[str], limit: int,
+                   through_id: Optional[int] = None) -> List[OutboxEvent]:
+        """
+        Eventos (procesados o no) con id > after_id, en orden; lectura del change feed.
+        through_id acota al tramo ya confirmado (ver shared.infrastructure.id_watermark):
+        un id menor puede confirmarse después de uno mayor y el consumidor, que avanza
+        por id, se lo saltaría.
+        """
+        m = OutboxEventModel
+        q = m.select().where((m.id > after_id) & m.topic.in_(list(topics)))
+        if through_id is not None:
+            q = q.where(m.id <= through_id)
+        return [self._to_entity(r) for r in q.order_by(m.id).limit(limit)]
+
+    def purge_processed(self, older_than: datetime.datetime) -> int:
+        m = OutboxEventModel
+        return (m.delete()
+                .where(m.processed_at.is_null(False) & (m.processed_at < older_than))
+                .execute())
+
+    def count_pending(self, topic: Optional[str] = None) -> int:
+        q = OutboxEventModel.select().where(OutboxEventModel.processed_at.is_null(True))
+        if topic:
+            q = q.where(OutboxEventModel.topic == topic)
+        return q.count()
+
+
+# devuelve None o {event_id: error} de los eventos rechazados (payload inválido)
+Handler = Callable[[List[OutboxEvent]], Optional[Dict[int, str]]]
+
+
+class OutboxWorker:
+    """
+    handlers: {tópico: fn(lote)}. Un lote fallido se reintenta entero; después de
+    max_attempts queda con processed_at NULL y available_at muy lejano (dead letter,
+    visible en last_error) para revisión manual.
+    """
+
+    DEAD_LETTER_DELAY = datetime.timedelta(days=3650)
+
+    def __init__(
+        self,
+        repo: OutboxRepository,
+        handlers: Dict[str, Handler],
+        batch_size: int = 100,
+        max_attempts: int = 10,
+        base_backoff: float = 5.0,
+    ):
+        self.repo = repo
+        self.handlers = dict(handlers)
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.base_backoff = base_backoff
+
+    def _backoff(self, attempts: int) -> datetime.timedelta:
+        if attempts + 1 >= self.max_attempts:
+            return self.DEAD_LETTER_DELAY
+        return datetime.timedelta(seconds=min(3600.0, self.base_backoff * (2 ** attempts)))
+
+    def _process_topic(self, topic: str, handler: Handler) -> int:
+        database = OutboxEventModel._meta.database
+        batch: List[OutboxEvent] = []
+        try:
+            with database.atomic():
+                batch = self.repo.claim_batch(topic, self.batch_size)
+                if not batch:
+                    return 0
+                rejected = handler(batch) or {}
+                self.repo.mark_processed(e.id for e in batch if e.id not in rejected)
+                for event_id, error in rejected.items():
+                    # reintentar no arregla un payload inválido: dead letter sin tocar al resto
+                    logger.warning("outbox: evento %s de %s rechazado: %s", event_id, topic, error)
+                    self.repo.mark_failed([event_id], error, self.DEAD_LETTER_DELAY)
+            return len(batch) - len(rejected)
+        except Exception as e:
+            logger.exception("outbox: falló el lote de %s", topic)
+            if batch:
+                # la transacción del lote se revirtió: registrar el intento aparte
+                with database.atomic():
+                    self.repo.mark_failed([ev.id for ev in batch], f"{e.__class__.__name__}: {e}",
+                                          self._backoff(max(ev.attempts for ev in batch)))
+            return 0
+
+    def run_once(self) -> Dict[str, int]:
+        """Un lote por tópico. Devuelve {tópico: eventos procesados}."""
+        return {topic: self._process_topic(topic, handler) for topic, handler in self.handlers.items()}
+
+    def run_forever(self, poll_interval: float = 1.0, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            done = self.run_once()
+            # con trabajo pendiente no se duerme: vacía el backlog a velocidad de lote
+            if not any(done.values()):
+                stop.wait(poll_interval)
@@ -0,0 +1,174 @@
+"""
+Instrumentación de SQL por request sobre la base compartida.
+
+install(db) envuelve db.execute_sql: cada sentencia suma al contador del request
+actual (cantidad, tiempo total y repeticiones por "forma" de la sentencia). Con
+init_app(app):
+
+- Headers X-DB-Queries / X-DB-Time-ms / X-DB-Max-Repeat en modo debug
+  (QUERY_STATS_HEADERS=auto, por defecto) o siempre (=1).
+- Métricas acumuladas por endpoint en el proceso (query_metrics()).
+- Warning en el log si un request ejecuta la misma forma de sentencia más de
+  QUERY_NPLUSONE_THRESHOLD veces (típico N+1: rec.fk.id dentro de un loop).
+
+QUERY_STATS=0 lo desactiva por completo.
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from flask import Flask, current_app, g, has_request_context, request
+
+NPLUSONE_THRESHOLD = int(os.getenv("QUERY_NPLUSONE_THRESHOLD", "10"))
+
+_WS = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)|\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+
+def statement_shape(sql: str) -> str:
+    """SQL parametrizado normalizado: espacios colapsados y listas IN (%s, %s, ...) -> (%s...)."""
+    return _IN_LIST.sub("(%s...)", _WS.sub(" ", sql.strip()))
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "time_ms", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.time_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, sql: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.time_ms += elapsed_ms
+        self.shapes[statement_shape(sql)] += 1
+
+    def repeated(self, threshold: int):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    @property
+    def max_repeat(self) -> int:
+        return max(self.shapes.values()) if self.shapes else 0
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    if not has_request_context():
+        return None
+    return g.get("_query_stats")
+
+
+# -----------------------
+# Hook sobre la base
+# -----------------------
+def install(database) -> None:
+    """Envuelve database.execute_sql (idempotente). Fuera de un request no mide nada."""
+    if getattr(database, "_query_stats_installed", False):
+        return
+    original = database.execute_sql
+
+    def execute_sql(sql, params=None, *args, **kwargs):
+        stats = current_stats()
+        if stats is None:
+            return original(sql, params, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return original(sql, params, *args, **kwargs)
+        finally:
+            stats.record(sql, (time.perf_counter() - start) * 1000.0)
+
+    database.execute_sql = execute_sql
+    database._query_stats_installed = True
+
+
+# -----------------------
+# Métricas por endpoint (proceso)
+# -----------------------
+class _EndpointMetrics:
+    __slots__ = ("requests", "statements", "db_time_ms", "max_statements", "nplusone_warnings")
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.db_time_ms = 0.0
+        self.max_statements = 0
+        self.nplusone_warnings = 0
+
+
+_METRICS: Dict[str, _EndpointMetrics] = {}
+_METRICS_LOCK = threading.Lock()
+
+
+def query_metrics() -> Dict[str, Dict[str, Any]]:
+    with _METRICS_LOCK:
+        return {
+            ep: {
+                "requests": m.requests,
+                "statements": m.statements,
+                "db_time_ms": round(m.db_time_ms, 3),
+                "avg_statements": round(m.statements / m.requests, 2) if m.requests else 0.0,
+                "max_statements": m.max_statements,
+                "nplusone_warnings": m.nplusone_warnings,
+            }
+            for ep, m in _METRICS.items()
+        }
+
+
+def _record_request(endpoint: str, stats: RequestQueryStats, warned: bool) -> None:
+    with _METRICS_LOCK:
+        m = _METRICS.get(endpoint)
+        if m is None:
+            m = _METRICS[endpoint] = _EndpointMetrics()
+        m.requests += 1
+        m.statements += stats.count
+        m.db_time_ms += stats.time_ms
+        m.max_statements = max(m.max_statements, stats.count)
+        m.nplusone_warnings += int(warned)
+
+
+# -----------------------
+# Integración con Flask
+# -----------------------
+def _headers_enabled(app: Flask) -> bool:
+    mode = os.getenv("QUERY_STATS_HEADERS", "auto").lower()
+    if mode == "auto":
+        return bool(app.debug)
+    return mode in ("1", "true", "yes")
+
+
+def init_app(app: Flask, database) -> None:
+    if os.getenv("QUERY_STATS", "1").lower() not in ("1", "true", "yes"):
+        return
+    install(database)
+
+    @app.before_request
+    def _start_query_stats():
+        g._query_stats = RequestQueryStats()
+
+    @app.after_request
+    def _query_stats_headers(response):
+        stats = current_stats()
+        if stats is not None and _headers_enabled(current_app):
+            # en respuestas streaming solo cuenta lo ejecutado antes de empezar a enviar
+            response.headers["X-DB-Queries"] = str(stats.count)
+            response.headers["X-DB-Time-ms"] = f"{stats.time_ms:.2f}"
+            response.headers["X-DB-Max-Repeat"] = str(stats.max_repeat)
+        return response
+
+    @app.teardown_request
+    def _finish_query_stats(_exc):
+        stats = g.pop("_query_stats", None)
+        if stats is None:
+            return
+        endpoint = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        repeated = stats.repeated(NPLUSONE_THRESHOLD)
+        for shape, n in repeated[:3]:
+            current_app.logger.warning(
+                "Posible N+1 en %s %s: %d ejecuciones de %s (total %d sentencias, %.1f ms)",
+                request.method, endpoint, n, shape[:300], stats.count, stats.time_ms,
+            )
+        _record_request(f"{request.method} {endpoint}", stats, bool(repeated))
@@ -0,0 +1,49 @@
+"""
+Recorrido de consultas grandes con cursor del lado del servidor.
+
+Con pymysql el cursor por defecto descarga TODO el resultado al cliente antes de
+devolver la primera fila (peewee .iterator() solo evita el caché de instancias);
+aquí se usa SSCursor y fetchmany() para tener memoria constante. En otros motores
+(SQLite en benchmarks) se cae a .dicts().iterator().
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator
+
+from peewee import MySQLDatabase
+
+try:  # dependencia del driver MySQL
+    from pymysql.cursors import SSCursor
+except ImportError:  # pragma: no cover
+    SSCursor = None
+
+FETCH_SIZE = 1000
+
+
+def iter_dict_rows(query, fetch_size: int = FETCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Ejecuta un SELECT de peewee y devuelve filas como dicts {alias: valor} sin crear
+    instancias de modelo. Los valores llegan tal cual del driver (Decimal, datetime...).
+
+    Mientras el generador esté abierto la conexión queda ocupada: no lanzar otras
+    consultas en el mismo hilo hasta consumirlo o cerrarlo.
+    """
+    database = query.model._meta.database
+    if SSCursor is None or not isinstance(database, MySQLDatabase):
+        yield from query.dicts().iterator()
+        return
+
+    sql, params = query.sql()
+    cursor = database.connection().cursor(SSCursor)
+    try:
+        cursor.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(names, row))
+    finally:
+        # close() drena lo que quede pendiente para dejar la conexión utilizable
+        cursor.close()
@@ -0,0 +1,49 @@
+"""
+Huella barata de una tabla (o de un subconjunto) para validar cachés:
+COUNT(*), MAX(id) y MAX(updated_at) en una sola consulta agregada.
+
+- Altas: cambia el conteo y MAX(id).
+- Bajas: cambia el conteo.
+- Ediciones: cambia MAX(updated_at) (las tablas sin updated_at usan created_at
+  y solo detectan altas/bajas).
+"""
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+from peewee import fn
+
+
+@dataclass(frozen=True)
+class TableFingerprint:
+    count: int
+    max_id: Optional[int]
+    last_modified: Optional[datetime.datetime]
+
+    @property
+    def token(self) -> str:
+        ts = self.last_modified.isoformat() if self.last_modified else ""
+        return f"{self.count}-{self.max_id or 0}-{ts}"
+
+
+def table_fingerprint(model, where=None) -> TableFingerprint:
+    fields = model._meta.fields
+    pk = model._meta.primary_key
+    ts_field = fields.get("updated_at") or fields.get("created_at")
+
+    cols = [fn.COUNT(pk), fn.MAX(pk)]
+    if ts_field is not None:
+        cols.append(fn.MAX(ts_field))
+    q = model.select(*cols)
+    if where is not None:
+        q = q.where(where)
+    row = q.tuples().get()
+
+    last_modified = row[2] if ts_field is not None else None
+    if isinstance(last_modified, (int, float)):  # TimestampField
+        last_modified = datetime.datetime.fromtimestamp(last_modified)
+    elif isinstance(last_modified, str):  # SQLite devuelve texto en agregados
+        last_modified = datetime.datetime.fromisoformat(last_modified)
+    return TableFingerprint(count=int(row[0] or 0), max_id=row[1], last_modified=last_modified)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import time
+
+from flask import Blueprint, jsonify, request, current_app
+
+from shared.infrastructure.change_feed import AGGREGATE_TYPES, to_feed_item, wait_for_change
+from shared.infrastructure.id_watermark import GapHorizon, contiguous_through
+
+# Espera máxima de un long-poll (no retener hilos del servidor indefinidamente)
+MAX_WAIT_SECONDS = float(os.getenv("CHANGE_FEED_MAX_WAIT", "25"))
+# Cuánto se espera a que se confirme un id intermedio antes de darlo por perdido
+# (rollback); ver shared.infrastructure.id_watermark
+GAP_TIMEOUT_SECONDS = float(os.getenv("CHANGE_FEED_GAP_TIMEOUT_MS", "5000")) / 1000.0
+MAX_LIMIT = 500
+# ids de la outbox (todos los tópicos) que se revisan por vuelta para ubicar huecos
+SCAN_LIMIT = 2000
+
+_horizon = GapHorizon(GAP_TIMEOUT_SECONDS)
+
+
+def create_change_feed_blueprint(url_prefix: str = "/api/changes") -> Blueprint:
+    bp = Blueprint("change_feed", __name__, url_prefix=url_prefix)
+
+    @bp.get("")
+    def poll_changes():
+        """
+        Long-poll del change feed.
+        Query: after=<último id visto> (default 0), limit (<=500), wait=<segundos>,
+               types=coupon,coupon_product,order (default: todos)
+        Respuesta: {"ok": true, "data": [...], "next_after": <id>}; el cliente sigue
+        siempre con after=next_after (puede avanzar aunque data venga vacía).
+        """
+        try:
+            after = int(request.args.get("after", 0))
+            limit = max(1, min(int(request.args.get("limit", 100)), MAX_LIMIT))
+            wait = max(0.0, min(float(request.args.get("wait", 0)), MAX_WAIT_SECONDS))
+            types = [t.strip() for t in (request.args.get("types") or "").split(",") if t.strip()]
+        except ValueError:
+            return jsonify(ok=False, error="after/limit/wait deben ser numéricos"), 400
+        unknown = [t for t in types if t not in AGGREGATE_TYPES]
+        if unknown:
+            return jsonify(ok=False, error=f"types inválidos: {', '.join(unknown)}"), 400
+        topics = [f"{t}.changed" for t in (types or AGGREGATE_TYPES)]
+
+        repo = current_app.config["services"]["outbox_repo"]
+        deadline = time.monotonic() + wait
+        cursor = after
+        while True:
+            # solo hasta el último id con commit contiguo: un id menor en vuelo no se salta
+            ids = repo.ids_after(cursor, SCAN_LIMIT)
+            through = contiguous_through(cursor, ids, _horizon.observe(ids[-1] if ids else cursor))
+            events = repo.list_after(cursor, topics, limit, through_id=through) if through > cursor else []
+            if events:
+                break
+            # nada de estos tópicos hasta 'through': el cursor avanza igual
+            more = bool(ids) and through == ids[-1] and len(ids) == SCAN_LIMIT
+            cursor = through
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not more:
+                # despierta con cada commit de este proceso; tope para ver los de otros procesos
+                wait_for_change(min(remaining, 1.0))
+
+        data = [to_feed_item(e) for e in events]
+        if len(events) < limit:
+            next_after = through
+        else:
+            next_after = data[-1]["id"]
+        return jsonify(ok=True, data=data, next_after=next_after), 200
+
+    return bp
@@ -0,0 +1,62 @@
+"""
+GET condicional para recursos de catálogo: ETag derivado de la huella de la tabla
+(ver shared.infrastructure.table_fingerprint) + Cache-Control para que un CDN absorba
+el tráfico. Si el cliente manda If-None-Match con el ETag vigente se responde 304
+sin armar ni serializar el payload.
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import os
+from email.utils import format_datetime
+from typing import Callable, Optional
+
+from flask import Response, request
+
+from shared.infrastructure.table_fingerprint import TableFingerprint
+
+CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", "60"))
+CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("CATALOG_CACHE_SWR", "300"))
+
+
+def cache_control(max_age: Optional[int] = None) -> str:
+    max_age = CACHE_MAX_AGE if max_age is None else max_age
+    if max_age <= 0:
+        return "no-cache"
+    return f"public, max-age={max_age}, stale-while-revalidate={CACHE_STALE_WHILE_REVALIDATE}"
+
+
+def etag_for(fingerprint: TableFingerprint) -> str:
+    # La ruta + query string entran en el hash: ?nombre=... devuelve otro payload
+    raw = f"{request.full_path}|{fingerprint.token}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:32]
+
+
+def _decorate(resp: Response, etag: str, fingerprint: TableFingerprint, max_age: Optional[int]) -> Response:
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = cache_control(max_age)
+    if fingerprint.last_modified is not None:
+        # Informativo: las bajas no mueven MAX(updated_at), por eso solo se valida por ETag.
+        # HTTP-date exige GMT: las columnas guardan hora local naive (datetime.now).
+        last_modified = fingerprint.last_modified.replace(microsecond=0).astimezone(datetime.timezone.utc)
+        resp.headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return resp
+
+
+def conditional_response(
+    fingerprint: TableFingerprint,
+    build: Callable[[], Response],
+    max_age: Optional[int] = None,
+) -> Response:
+    """
+    304 si If-None-Match coincide; si no, build() y agrega ETag/Cache-Control/Last-Modified.
+    Solo aplica a respuestas 200 (los errores salen sin headers de caché).
+    """
+    etag = etag_for(fingerprint)
+    if request.if_none_match.contains(etag):
+        return _decorate(Response(status=304), etag, fingerprint, max_age)
+    resp = build()
+    if resp.status_code != 200:
+        return resp
+    return _decorate(resp, etag, fingerprint, max_age)
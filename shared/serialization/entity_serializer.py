@@ -0,0 +1,85 @@
+"""
+Serializadores por entidad "precompilados": la lista de campos y el conversor de cada uno
+se resuelven una sola vez al definir el serializer, no en cada fila.
+
+    COUPON_SERIALIZER = EntitySerializer({
+        "id": None,
+        "value": "decimal",
+        "start_date": "datetime",
+        ...
+    })
+    COUPON_SERIALIZER(coupon)            -> dict
+    COUPON_SERIALIZER.many(coupons)      -> list[dict]
+
+Tipos soportados (equivalen a lo que hacían los _to_json a mano):
+  None        valor tal cual
+  "decimal"   str(x)            (None -> None)
+  "datetime"  x.isoformat()     (falsy -> None)
+  "enum"      x.value si es Enum, si no x
+  "str"       str(x)            (None -> None)
+  "bool"      bool(x)
+  "dict"      x or {}
+Un campo puede ser (tipo, atributo, default) para renombrar o cambiar el default de getattr.
+"""
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+FieldSpec = Union[None, str, Tuple]
+
+
+def _decimal(v):
+    return str(v) if v is not None else None
+
+
+def _datetime(v):
+    return v.isoformat() if v else None
+
+
+def _enum(v):
+    return v.value if isinstance(v, Enum) else v
+
+
+def _str(v):
+    return str(v) if v is not None else None
+
+
+def _dict(v):
+    return v or {}
+
+
+CONVERTERS: Dict[Optional[str], Optional[Callable[[Any], Any]]] = {
+    None: None,
+    "decimal": _decimal,
+    "datetime": _datetime,
+    "enum": _enum,
+    "str": _str,
+    "bool": bool,
+    "dict": _dict,
+}
+
+
+class EntitySerializer:
+    def __init__(self, fields: Dict[str, FieldSpec]):
+        compiled: List[Tuple[str, str, Any, Optional[Callable]]] = []
+        for key, spec in fields.items():
+            kind, attr, default = spec, key, None
+            if isinstance(spec, tuple):
+                kind = spec[0]
+                attr = spec[1] if len(spec) > 1 and spec[1] else key
+                default = spec[2] if len(spec) > 2 else None
+            if kind not in CONVERTERS:
+                raise ValueError(f"tipo de campo desconocido para '{key}': {kind}")
+            compiled.append((key, attr, default, CONVERTERS[kind]))
+        self._fields = tuple(compiled)
+        self.keys = tuple(fields)
+
+    def __call__(self, obj) -> dict:
+        return {
+            k: (conv(getattr(obj, a, d)) if conv is not None else getattr(obj, a, d))
+            for k, a, d, conv in self._fields
+        }
+
+    def many(self, objs: Iterable) -> List[dict]:
+        return [self(o) for o in objs]
@@ -0,0 +1,94 @@
+"""
+Exportaciones en streaming (NDJSON o CSV) a partir de filas dict.
+Cada chunk se arma con chunk_size filas y se envía enseguida: la memoria no
+depende del tamaño del export.
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+from flask import Response, stream_with_context
+
+from shared.serialization.json_backend import dumps
+
+CHUNK_SIZE = 500
+FORMATS = ("ndjson", "csv")
+MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",  # Flask agrega charset=utf-8
+}
+
+
+def _csv_value(v: Any) -> Any:
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, (datetime.datetime, datetime.date)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    if isinstance(v, Enum):
+        return v.value
+    if isinstance(v, (dict, list)):
+        return dumps(v, sort_keys=False).decode("utf-8")
+    return v
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Una línea JSON por fila (orden de claves = orden de columnas)."""
+    buf = []
+    for row in rows:
+        buf.append(dumps(row, sort_keys=False))
+        if len(buf) >= chunk_size:
+            yield b"\n".join(buf) + b"\n"
+            buf = []
+    if buf:
+        yield b"\n".join(buf) + b"\n"
+
+
+def iter_csv(
+    rows: Iterable[Dict[str, Any]],
+    columns: Sequence[str],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Cabecera + filas; el StringIO se vacía en cada chunk."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    n = 0
+    for row in rows:
+        writer.writerow([_csv_value(row.get(c)) for c in columns])
+        n += 1
+        if n >= chunk_size:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate(0)
+            n = 0
+    tail = out.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def export_response(
+    rows: Iterable[Dict[str, Any]],
+    columns: Sequence[str],
+    fmt: str = "ndjson",
+    filename: str = "export",
+) -> Response:
+    """
+    Respuesta chunked para un export. fmt: ndjson | csv (ValueError si es otro).
+    rows debería ser un generador (p. ej. iter_dict_rows) para no materializar nada.
+    """
+    fmt = (fmt or "ndjson").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    body = iter_csv(rows, columns) if fmt == "csv" else iter_ndjson(rows)
+    resp = Response(stream_with_context(body), mimetype=MIMETYPES[fmt])
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return resp
@@ -0,0 +1,57 @@
+"""
+Backend JSON de las respuestas: orjson si está instalado (JSON_BACKEND=stdlib lo desactiva),
+si no la stdlib. Ambos aceptan Decimal (-> str), datetime/date (-> ISO 8601) y Enum (-> value)
+sin conversión previa, con el mismo formato que usaban los serializers a mano.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import os
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from flask import Response, current_app, has_app_context
+
+try:  # dependencia opcional
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None and os.getenv("JSON_BACKEND", "orjson") != "stdlib" else "stdlib"
+MIMETYPE = "application/json"
+
+
+def _default(o: Any):
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, (datetime.datetime, datetime.date)):
+        return o.isoformat()
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def sort_keys_enabled() -> bool:
+    # Igual que jsonify: respeta app.json.sort_keys (True por defecto en Flask)
+    if has_app_context():
+        return bool(getattr(current_app.json, "sort_keys", False))
+    return False
+
+
+def dumps(obj: Any, sort_keys: bool | None = None) -> bytes:
+    sort_keys = sort_keys_enabled() if sort_keys is None else sort_keys
+    if BACKEND == "orjson":
+        # orjson serializa datetime naive igual que isoformat(); Decimal va por _default
+        opts = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=_default, option=opts)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":"),
+                      sort_keys=sort_keys).encode("utf-8")
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """Reemplazo de jsonify(payload), status usando el backend configurado."""
+    return Response(dumps(payload), status=status, mimetype=MIMETYPE)
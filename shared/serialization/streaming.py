@@ -0,0 +1,78 @@
+"""
+Respuestas de listas grandes como arrays JSON en chunks (Transfer-Encoding: chunked):
+no se arma la lista completa ni el string completo en memoria.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from flask import Response, stream_with_context
+
+from shared.serialization.json_backend import MIMETYPE, dumps, json_response, sort_keys_enabled
+
+# Listas con más filas que esto se envían en streaming (0 = siempre)
+STREAM_THRESHOLD = int(os.getenv("JSON_STREAM_THRESHOLD", "1000"))
+CHUNK_SIZE = 500
+
+
+def iter_json_array(
+    items: Iterable[Any],
+    serialize: Optional[Callable[[Any], Any]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    envelope: Optional[dict] = None,
+    key: str = "data",
+) -> Iterator[bytes]:
+    """
+    Genera b'[' item, item, ... b']' en bloques de chunk_size elementos.
+    Con envelope={"ok": True} produce {"ok":true,"data":[...]}.
+    """
+    sort_keys = sort_keys_enabled()
+    if envelope:
+        head = dumps(envelope)
+        yield head[:-1] + b"," + dumps(key) + b":["
+    else:
+        yield b"["
+    buf = []
+    first = True
+    for item in items:
+        buf.append(dumps(serialize(item) if serialize else item, sort_keys=sort_keys))
+        if len(buf) >= chunk_size:
+            yield (b"" if first else b",") + b",".join(buf)
+            first = False
+            buf = []
+    if buf:
+        yield (b"" if first else b",") + b",".join(buf)
+    yield b"]}" if envelope else b"]"
+
+
+def stream_json_array(
+    items: Iterable[Any],
+    serialize: Optional[Callable[[Any], Any]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    envelope: Optional[dict] = None,
+    key: str = "data",
+    status: int = 200,
+) -> Response:
+    return Response(
+        stream_with_context(iter_json_array(items, serialize, chunk_size, envelope, key)),
+        status=status,
+        mimetype=MIMETYPE,
+    )
+
+
+def list_response(
+    items: Iterable[Any],
+    serialize: Optional[Callable[[Any], Any]] = None,
+    envelope: Optional[dict] = None,
+    key: str = "data",
+    status: int = 200,
+) -> Response:
+    """
+    Respuesta de lista: normal si es chica, streaming si supera STREAM_THRESHOLD
+    (o si items no es una lista, p. ej. un iterador de peewee).
+    """
+    if isinstance(items, list) and len(items) <= STREAM_THRESHOLD:
+        data = [serialize(i) for i in items] if serialize else items
+        return json_response({**envelope, key: data} if envelope else data, status)
+    return stream_json_array(items, serialize, envelope=envelope, key=key, status=status)
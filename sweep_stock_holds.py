@@ -0,0 +1,23 @@
+# sweep_stock_holds.py  (en la raíz del micro-servicio)
+# Expira las reservas de stock vencidas y devuelve sus unidades al disponible.
+import argparse
+import json
+
+from shared.factory.container_factory import build_coupon_services
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep de reservas de stock (coupon_product) vencidas")
+    parser.add_argument("--once", action="store_true", help="Vacía los vencidos actuales y termina")
+    parser.add_argument("--batch-size", type=int, default=500, help="Holds por transacción")
+    parser.add_argument("--interval", type=float, default=5.0, help="Segundos entre pasadas")
+    args = parser.parse_args()
+
+    svc = build_coupon_services(lazy=True)["coupon_product_reservation_service"]
+    if args.once:
+        print(json.dumps({"expired": svc.sweep_expired(batch_size=max(1, args.batch_size))}))
+    else:
+        try:
+            svc.run_sweeper(interval=args.interval, batch_size=max(1, args.batch_size))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,15 @@
+import pytest
+from peewee import SqliteDatabase
+
+from shared.infrastructure.database import get_all_models
+
+
+@pytest.fixture
+def database():
+    """Todos los modelos ligados a un SQLite en memoria mientras dura el test."""
+    d = SqliteDatabase(":memory:")
+    models = get_all_models()
+    with d.bind_ctx(models):
+        d.create_tables(models)
+        yield d
+    d.close()
@@ -0,0 +1,40 @@
+from coupons.coupon.infraestructure.model.coupon_model import CouponModel
+from shared.infrastructure.cache.backends import LocalLRUBackend
+from shared.infrastructure.cache.cache import Cache
+from shared.infrastructure.cache.repository import CachedRepository
+
+
+class _Repo:
+    """El valor escrito se ve recién al commit, como una fila en la BD."""
+
+    def __init__(self, database):
+        self.database = database
+        self.value = 1
+
+    def get_by_id(self, id_):
+        return self.value
+
+    def update(self, value):
+        self.database.after_commit(lambda: setattr(self, "value", value))
+
+
+def _cached(database):
+    return CachedRepository(_Repo(database), Cache(LocalLRUBackend(), "test"),
+                            reads=("get_by_id",), writes=("update",), model=CouponModel)
+
+
+def test_write_in_a_transaction_invalidates_again_after_commit(database):
+    repo = _cached(database)
+    with database.atomic():
+        with database.atomic():
+            repo.update(2)
+        # otro lector, antes del commit, recachea el valor anterior
+        assert repo.get_by_id(1) == 1
+    assert repo.get_by_id(1) == 2
+
+
+def test_write_outside_a_transaction_invalidates_at_once(database):
+    repo = _cached(database)
+    assert repo.get_by_id(1) == 1
+    repo.update(2)
+    assert repo.get_by_id(1) == 2
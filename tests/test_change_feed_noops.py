@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from coupons.product_coupon.application.command.coupon_product_command_service import CouponProductCommandService
+from coupons.product_coupon.infraestructure.repositories.coupon_product_repository import CouponProductRepository
+from payment.orders.application.command.order_command_service import OrderCommandService
+from payment.orders.domain.value_objects.enums import OrderStatus
+from payment.orders.infraestructure.repositories.order_repository import OrderRepository
+from shared.infrastructure.change_feed import ChangeRecorder
+from shared.infrastructure.outbox import OutboxEventModel, OutboxRepository
+
+
+@pytest.fixture
+def changes(database):
+    return ChangeRecorder(OutboxRepository())
+
+
+def _ops(topic):
+    q = OutboxEventModel.select().where(OutboxEventModel.topic == topic).order_by(OutboxEventModel.id)
+    return [json.loads(r.payload)["op"] for r in q]
+
+
+@pytest.fixture
+def orders(changes):
+    return OrderCommandService(OrderRepository(), changes)
+
+
+def test_failing_a_paid_order_records_nothing(orders):
+    order = orders.create(buyer_party_id=1, seller_party_id=2, amount="10.00")
+    orders.mark_paid(order.id, provider_payment_id="p-1")
+    assert orders.mark_failed(order.id, error_code="x").status == OrderStatus.PAID
+    assert orders.cancel(order.id).status == OrderStatus.PAID
+    assert _ops("order.changed") == ["created", "paid"]
+
+
+def test_repeated_mark_paid_records_and_emits_once(orders):
+    order = orders.create(buyer_party_id=1, seller_party_id=2, amount="10.00")
+    orders.mark_paid(order.id, provider_payment_id="p-1")
+    orders.mark_paid(order.id, provider_payment_id="p-1")
+    assert _ops("order.changed") == ["created", "paid"]
+    assert OutboxEventModel.select().where(OutboxEventModel.topic == "order.paid").count() == 1
+
+
+def test_repeated_cancel_records_once(orders):
+    order = orders.create(buyer_party_id=1, seller_party_id=2, amount="10.00")
+    orders.cancel(order.id, reason="x")
+    assert orders.cancel(order.id, reason="x").status == OrderStatus.CANCELED
+    assert orders.mark_failed(order.id).status == OrderStatus.CANCELED
+    assert _ops("order.changed") == ["created", "canceled"]
+
+
+def test_consume_on_exhausted_mapping_records_nothing(changes):
+    cmd = CouponProductCommandService(CouponProductRepository(), changes)
+    cmd.add_mapping(1, 10, "SKU-1", "PRODUCT", stock=1)
+    cmd.add_mapping(1, 20, "SKU-2", "PRODUCT", stock=None)
+    assert cmd.consume_one(1, 10)["stock"] == 0
+    assert cmd.consume_one(1, 10)["stock"] == 0
+    assert cmd.consume_one(1, 20)["stock"] is None
+    assert _ops("coupon_product.changed") == ["upserted", "upserted", "stock_consumed"]
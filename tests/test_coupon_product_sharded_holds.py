@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pytest
+
+from coupons.product_coupon.domain.entities.coupon_product import CouponProductData
+from coupons.product_coupon.domain.entities.coupon_product_hold import InsufficientStockError
+from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+from coupons.product_coupon.infraestructure.repositories.coupon_product_hold_repository import (
+    CouponProductHoldRepository,
+)
+from coupons.product_coupon.infraestructure.repositories.coupon_product_repository import CouponProductRepository
+
+COUPON, PRODUCT = 1, 10
+
+
+@pytest.fixture
+def repos(database):
+    products, holds = CouponProductRepository(), CouponProductHoldRepository()
+    products.add(CouponProductData(coupon_id=COUPON, product_id=PRODUCT, code="SKU-1",
+                                   product_type="PRODUCT", stock=1, status="ACTIVE"))
+    products.set_shard_count(COUPON, PRODUCT, 4)
+    return products, holds
+
+
+def _status():
+    return CouponProductModel.get((CouponProductModel.coupon == COUPON) &
+                                  (CouponProductModel.product_id == PRODUCT)).status
+
+
+def test_consume_does_not_deactivate_while_a_sharded_hold_is_held(repos):
+    products, holds = repos
+    hold = holds.reserve(COUPON, PRODUCT, 1, timedelta(minutes=5))
+    products.consume_one(COUPON, PRODUCT)      # no queda unidad libre: no toma nada
+    assert _status() == "ACTIVE"
+
+    holds.release(hold.hold_id)
+    assert products.shards.total(COUPON, PRODUCT) == 1
+    assert _status() == "ACTIVE"
+    # la unidad devuelta se puede volver a reservar
+    assert holds.reserve(COUPON, PRODUCT, 1, timedelta(minutes=5)) is not None
+
+
+def test_release_reactivates_a_mapping_deactivated_with_units_held(repos):
+    products, holds = repos
+    hold = holds.reserve(COUPON, PRODUCT, 1, timedelta(minutes=5))
+    # como si un consume concurrente lo hubiera desactivado antes de ver el hold
+    CouponProductModel.update(status="INACTIVE").execute()
+
+    holds.release(hold.hold_id)
+    assert _status() == "ACTIVE"
+    assert holds.reserve(COUPON, PRODUCT, 1, timedelta(minutes=5)) is not None
+
+
+def test_consuming_the_last_free_unit_deactivates(repos):
+    products, holds = repos
+    snap, changed = products.consume_one(COUPON, PRODUCT)
+    assert changed
+    assert snap["stock"] == 0 and snap["status"] == "INACTIVE"
+    with pytest.raises(InsufficientStockError):
+        holds.reserve(COUPON, PRODUCT, 1, timedelta(minutes=5))
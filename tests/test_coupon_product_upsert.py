@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+import pytest
+
+from coupons.product_coupon.domain.entities.coupon_product import CouponProductData
+from coupons.product_coupon.infraestructure.model.coupon_product_model import CouponProductModel
+from coupons.product_coupon.infraestructure.repositories.coupon_product_hold_repository import (
+    CouponProductHoldRepository,
+)
+from coupons.product_coupon.infraestructure.repositories.coupon_product_repository import CouponProductRepository
+
+COUPON, PRODUCT = 1, 10
+
+
+def _mapping(stock):
+    return CouponProductData(coupon_id=COUPON, product_id=PRODUCT, code="SKU-1",
+                             product_type="PRODUCT", stock=stock, status="ACTIVE")
+
+
+def _row():
+    return CouponProductModel.get((CouponProductModel.coupon == COUPON) &
+                                  (CouponProductModel.product_id == PRODUCT))
+
+
+@pytest.fixture
+def products(database):
+    repo = CouponProductRepository()
+    repo.add(_mapping(5))
+    return repo
+
+
+def test_upsert_keeps_a_hold_taken_after_its_read(products, monkeypatch):
+    stale = products._find_one(COUPON, PRODUCT)
+    CouponProductHoldRepository().reserve(COUPON, PRODUCT, 2, timedelta(minutes=5))
+    monkeypatch.setattr(products, "_find_one", lambda *a, **k: stale)
+
+    products.add(_mapping(10))
+    row = _row()
+    assert (row.stock, row.reserved) == (8, 2)
+
+
+def test_upsert_does_not_undo_sharding(products, monkeypatch):
+    stale = products._find_one(COUPON, PRODUCT)
+    products.set_shard_count(COUPON, PRODUCT, 4)
+    monkeypatch.setattr(products, "_find_one", lambda *a, **k: stale)
+
+    with pytest.raises(ValueError):
+        products.add(_mapping(7))
+    row = _row()
+    assert row.shard_count == 4 and products.shards.total(COUPON, PRODUCT) == 5
@@ -0,0 +1,53 @@
+import inspect
+
+from payment.reconciliation.application.command import order_reconciliation_service as svc
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+def test_default_batch_is_throttled_to_default_rate(monkeypatch):
+    defaults = inspect.signature(svc.OrderReconciliationService.iter_actions).parameters
+    batch = defaults["batch_size"].default
+    rate = defaults["max_orders_per_second"].default
+    assert batch > rate  # el caso que antes se saltaba el límite
+
+    clock = _FakeClock()
+    monkeypatch.setattr(svc.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(svc.time, "sleep", clock.sleep)
+
+    limiter = svc._RateLimiter(rate)
+    total = 300
+    for _ in range(total // batch):
+        limiter.acquire(batch)
+
+    # ráfaga inicial de `rate` unidades; el resto a `rate` por segundo
+    assert abs(clock.slept - (total - rate) / rate) < 1e-6
+
+
+def test_small_batches_within_bucket_do_not_sleep(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(svc.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(svc.time, "sleep", clock.sleep)
+
+    limiter = svc._RateLimiter(20)
+    for _ in range(4):
+        limiter.acquire(5)
+    assert clock.slept == 0.0
+
+
+def test_zero_rate_means_unlimited(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(svc.time, "sleep", clock.sleep)
+    svc._RateLimiter(0).acquire(10_000)
+    assert clock.slept == 0.0